@@ -28,7 +28,7 @@ class UserAdmin(BaseUserAdmin):
     list_filter = ("is_active", "is_staff", "is_supperuser", "is_block", "is_delete", "is_partner", "can_publish_coupons", "can_rate_coupons")
     search_fields = ("email", "phone", "first_name", "last_name")
     ordering = ("-date_joined",)
-    readonly_fields = ("date_joined", "last_login")
+    readonly_fields = ("date_joined", "last_login", "secret_key_hash")
 
     fieldsets = (
         (
@@ -49,7 +49,7 @@ class UserAdmin(BaseUserAdmin):
             },
         ),
         (_("Références"), {"fields": ("referrer_code", "referral_code")}),
-        (_("Clés API Partenaire"), {"fields": ("public_key", "secret_key")}),
+        (_("Clés API Partenaire"), {"fields": ("public_key", "secret_key", "secret_key_hash")}),
         (
             _("Coupons"),
             {"fields": ("can_publish_coupons", "can_rate_coupons", "coupon_points")},
@@ -10,7 +10,14 @@ import string, secrets, random, re
 from django.core.mail import EmailMultiAlternatives
 from django.template.loader import render_to_string
 from logger import LoggerService
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 from .models import User
 
 logger = logging.getLogger(__name__)
@@ -58,3 +65,152 @@ class CustomPagination(PageNumberPagination):
     page_size_query_param = "page_size"
     max_page_size = 1000
     page_query_param = "page"
+
+
+class KeysetPagination(BasePagination):
+    """
+    Pagination par curseur sur (created_at, id) : ni COUNT(*) ni OFFSET, le
+    coût d'une page ne dépend pas de sa profondeur. Le curseur est opaque
+    (base64). ?with_count=1 ajoute le total : COUNT exact tant que
+    l'estimation du planificateur PostgreSQL reste sous
+    `exact_count_threshold`, sinon l'estimation, signalée par
+    "count_approximate": true.
+
+    La vue peut changer les colonnes avec `cursor_ordering`
+    (même sens pour toutes, la dernière doit être unique).
+    """
+
+    page_size = CustomPagination.page_size
+    page_size_query_param = CustomPagination.page_size_query_param
+    max_page_size = CustomPagination.max_page_size
+    cursor_query_param = "cursor"
+    count_query_param = "with_count"
+    exact_count_threshold = 10_000
+    ordering = ("-created_at", "-id")
+    invalid_cursor_message = "Curseur invalide."
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if size <= 0:
+            return self.page_size
+        return min(size, self.max_page_size)
+
+    def encode_cursor(self, obj, reverse):
+        position = []
+        for field in self.fields:
+            value = getattr(obj, field)
+            position.append(value.isoformat() if hasattr(value, "isoformat") else str(value))
+        raw = json.dumps({"p": position, "r": int(reverse)}, separators=(",", ":"))
+        token = base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+        return replace_query_param(self.base_url, self.cursor_query_param, token)
+
+    def decode_cursor(self, request, model):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            data = json.loads(raw)
+            position = [
+                model._meta.get_field(field).to_python(value)
+                for field, value in zip(self.fields, data["p"], strict=True)
+            ]
+            return position, bool(data.get("r"))
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def _after(self, position, descending):
+        """Lignes strictement après `position` dans l'ordre (lexicographique) demandé."""
+        lookup = "lt" if descending else "gt"
+        condition = Q()
+        for index, field in enumerate(self.fields):
+            step = Q(**{f"{field}__{lookup}": position[index]})
+            for previous, value in zip(self.fields[:index], position[:index]):
+                step &= Q(**{previous: value})
+            condition |= step
+        return condition
+
+    def approximate_count(self, queryset):
+        """(total, approché) : estimation seulement au-delà du seuil."""
+        queryset = queryset.order_by()
+        connection = connections[queryset.db]
+        if connection.vendor == "postgresql":
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+                plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]["Plan"]["Plan Rows"])
+            if estimate >= self.exact_count_threshold:
+                return estimate, True
+        return queryset.count(), False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        ordering = tuple(getattr(view, "cursor_ordering", self.ordering))
+        descending = ordering[0].startswith("-")
+        self.fields = [field.lstrip("-") for field in ordering]
+        self.base_url = remove_query_param(request.build_absolute_uri(), "page")
+        page_size = self.get_page_size(request)
+
+        self.count = None
+        self.count_approximate = False
+        if request.query_params.get(self.count_query_param) in ("1", "true"):
+            self.count, self.count_approximate = self.approximate_count(queryset)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self._after(position, descending != reverse))
+        if reverse:
+            ordering = tuple(
+                field[1:] if field.startswith("-") else f"-{field}" for field in ordering
+            )
+        rows = list(queryset.order_by(*ordering)[: page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+
+        self.next_link = self.previous_link = None
+        if rows:
+            if has_more or reverse:
+                self.next_link = self.encode_cursor(rows[-1], reverse=False)
+            if (has_more and reverse) or (position is not None and not reverse):
+                self.previous_link = self.encode_cursor(rows[0], reverse=True)
+        return rows
+
+    def get_paginated_response(self, data):
+        payload = {"next": self.next_link, "previous": self.previous_link}
+        if self.count is not None:
+            payload["count"] = self.count
+            if self.count_approximate:
+                payload["count_approximate"] = True
+        payload["results"] = data
+        return Response(payload)
+
+
+class CursorOrPagePagination(CustomPagination):
+    """
+    CustomPagination (page / page_size) par défaut ; ?pagination=cursor ou
+    la présence de ?cursor= bascule la requête en KeysetPagination.
+    """
+
+    def _use_cursor(self, request):
+        params = request.query_params
+        return params.get("pagination") == "cursor" or KeysetPagination.cursor_query_param in params
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self._use_cursor(request):
+            self.keyset = KeysetPagination()
+            self.display_page_controls = False
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -1,4 +1,31 @@
-from django.contrib.auth.models import BaseUserManager
+from django.contrib.auth.models import BaseUserManager, UserManager as AuthUserManager
+from django.db import models
+from django.db.models import OuterRef, Subquery, Sum
+
+
+class UserQuerySet(models.QuerySet):
+    def with_bonus_available(self):
+        """
+        Annote `bonus_available` (somme des Bonus non retirés / non supprimés)
+        par une sous-requête corrélée : une seule requête pour toute la page
+        au lieu d'un aggregate par utilisateur.
+        """
+        from mobcash_inte.models import Bonus
+
+        bonus_total = (
+            Bonus.objects.filter(user=OuterRef("pk"), bonus_with=False, bonus_delete=False)
+            .order_by()
+            .values("user")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        )
+        return self.annotate(
+            bonus_available=Subquery(bonus_total, output_field=models.DecimalField())
+        )
+
+
+class AccountUserManager(AuthUserManager.from_queryset(UserQuerySet)):
+    """Manager de User : celui de django.contrib.auth + UserQuerySet."""
 
 
 class UserManager(BaseUserManager):
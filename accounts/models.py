@@ -3,11 +3,22 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 
 # from tinymce.models import HTMLField
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db.models import Sum
-from .manager import UserManager
+from django.db.models.functions import Upper
+from .manager import AccountUserManager, UserManager
 from crypto_fields import encrypt, decrypt
 
 
+def trigram_index(field, name):
+    """
+    Index GIN pg_trgm sur UPPER(champ) : c'est l'expression générée par
+    `__icontains` sous PostgreSQL (UPPER(col::text) LIKE UPPER('%...%')).
+    L'extension est créée au migrate (voir mobcash_inte.signals).
+    """
+    return GinIndex(OpClass(Upper(field), name="gin_trgm_ops"), name=name)
+
+
 class AppName(models.Model):
     id = models.UUIDField(primary_key=True, editable=False, default=uuid.uuid4)
     name = models.CharField(
@@ -78,6 +89,9 @@ class User(AbstractUser):
     is_partner = models.BooleanField(default=False)
     public_key = models.CharField(max_length=255, blank=True, null=True, unique=True)
     secret_key = models.CharField(max_length=255, blank=True, null=True, unique=True)
+    # SHA-256 du secret partenaire (mobcash_inte.partner_auth) ; secret_key
+    # ne garde plus que les anciens secrets en clair, convertis au premier appel
+    secret_key_hash = models.CharField(max_length=64, blank=True, null=True)
     date_joined = models.DateTimeField(auto_now_add=True)
     last_login = models.DateTimeField(auto_now=True)
     can_publish_coupons = models.BooleanField(default=False)
@@ -91,8 +105,13 @@ class User(AbstractUser):
     telegram_verified = models.BooleanField(default=False)
     sms_verified = models.BooleanField(default=False)
 
+    objects = AccountUserManager()
+
     @property
     def bonus_available(self):
+        # Déjà annoté par User.objects.with_bonus_available() (listes)
+        if "_bonus_available" in self.__dict__:
+            return self._bonus_available
         from mobcash_inte.models import Bonus
 
         bonus = (
@@ -103,12 +122,25 @@ class User(AbstractUser):
         )
         return bonus
 
+    @bonus_available.setter
+    def bonus_available(self, value):
+        self._bonus_available = value or 0
+
     def full_name(self):
         return f"{self.last_name} {self.first_name}"
 
     class Meta:
         verbose_name = "User"
         verbose_name_plural = "Users"
+        indexes = [
+            # ListUser (pagination par curseur)
+            models.Index(fields=["-date_joined", "-id"], name="user_joined_id_idx"),
+            # Recherche (mobcash_inte.search, ListUser)
+            trigram_index("email", "user_email_trgm"),
+            trigram_index("first_name", "user_first_name_trgm"),
+            trigram_index("last_name", "user_last_name_trgm"),
+            trigram_index("phone", "user_phone_trgm"),
+        ]
 
 
 class TelegramUser(models.Model):
@@ -126,6 +158,14 @@ class TelegramUser(models.Model):
     def fullname(self):
         return f"{self.last_name} {self.first_name}"
 
+    class Meta:
+        indexes = [
+            # Recherche (mobcash_inte.search)
+            trigram_index("email", "tg_user_email_trgm"),
+            trigram_index("first_name", "tg_user_first_name_trgm"),
+            trigram_index("last_name", "tg_user_last_name_trgm"),
+        ]
+
 
 class Advertisement(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -126,6 +126,7 @@ class UserDetailSerializer(serializers.ModelSerializer):
         exclude = ["password", "groups", "user_permissions"]
 
     def get_bonus_available(self, obj):
+        # Annotation de with_bonus_available() si présente, sinon aggregate
         return obj.bonus_available
 
 
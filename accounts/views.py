@@ -32,7 +32,7 @@ from .serializers import (
     DeleteUserSerializer,
     ValidateOtpSerializer,
 )
-from .helpers import CustomPagination, create_otp, send_mails
+from .helpers import CursorOrPagePagination, create_otp, send_mails
 from mobcash_inte.whatsapp_service import (
     is_whatsapp_enabled,
     normalize_whatsapp_phone,
@@ -48,7 +48,8 @@ from mobcash_inte.telegram_service import (
     validate_telegram_username,
 )
 from mobcash_inte.sms_service import is_sms_enabled, send_sms_message, _get_user_sms_phone
-from mobcash_inte.models import Setting
+from mobcash_inte.partner_auth import set_partner_keys
+from mobcash_inte.setting_cache import get_setting
 
 from django.contrib.gis.geoip2 import GeoIP2
 from rest_framework_simplejwt.token_blacklist.models import (
@@ -82,7 +83,7 @@ def save_user_location(request):
 
 
 def is_registration_enabled() -> bool:
-    setting = Setting.objects.first()
+    setting = get_setting()
     if not setting:
         return True
     return bool(setting.registration_enabled)
@@ -604,7 +605,8 @@ def delete_account_by_admin(request):
 
 class ListUser(generics.ListAPIView):
     serializer_class = UserDetailSerializer
-    pagination_class = CustomPagination
+    pagination_class = CursorOrPagePagination
+    cursor_ordering = ("-date_joined", "-id")
     permission_classes = [permissions.IsAdminUser]
     filter_backends = [DjangoFilterBackend, SearchFilter]
     filterset_fields = ["is_block"]
@@ -619,7 +621,7 @@ class ListUser(generics.ListAPIView):
     ]
 
     def get_queryset(self):
-        return User.objects.all().order_by("-date_joined")
+        return User.objects.with_bonus_available().order_by("-date_joined")
 
 
 @api_view(["GET"])
@@ -756,12 +758,14 @@ class UserToPartner(APIView):
                 {"details": "User not found"},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        # Seul le hash du secret est stocké : il n'est renvoyé qu'à la création
+        # (partenaire existant : /mobcash/new-key pour en générer un nouveau)
+        secret_key = None
         if not user.is_partner:
             user.is_partner = True
             key_data = generate_api_keys()
-            user.secret_key = key_data.get("secret_key")
-            user.public_key = key_data.get("public_key")
-            user.save(update_fields=["is_partner", "secret_key", "public_key"])
+            secret_key = key_data.get("secret_key")
+            user.save(update_fields=["is_partner", *set_partner_keys(user, key_data)])
 
         return Response(
             {
@@ -769,7 +773,7 @@ class UserToPartner(APIView):
                 "email": user.email,
                 "is_partner": user.is_partner,
                 "public_key": user.public_key,
-                "secret_key": user.secret_key,
+                "secret_key": secret_key,
             },
             status=status.HTTP_200_OK,
         )
@@ -6,22 +6,128 @@ Chiffrement Fernet pour les champs sensibles en DB.
 Règle :
 - en DB  → toujours chiffré
 - en mémoire / avant envoi API → toujours déchiffré
+
+Performance :
+- la dérivation PBKDF2 (100 000 itérations) est faite UNE fois par
+  version de clé et par process (trousseau mis en cache) ;
+- les valeurs déchiffrées sont gardées dans un petit LRU borné
+  (clé = token chiffré) pour éviter de re-déchiffrer à chaque accès
+  aux propriétés des modèles.
+
+Rotation de clé :
+- settings.SECRET_KEY est toujours la clé primaire (chiffrement) ;
+- settings.CRYPTO_FIELDS_OLD_SECRET_KEYS (liste, optionnelle) contient les
+  anciennes clés encore acceptées au déchiffrement (MultiFernet) ;
+- `python manage.py rotate_encrypted_fields` re-chiffre les valeurs en DB
+  avec la clé primaire, après quoi l'ancienne clé peut être retirée.
 """
 
 import base64
 import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
 
+KDF_SALT = b"mobcash_salt_v1"
+KDF_ITERATIONS = 100_000
+DEFAULT_DECRYPT_CACHE_SIZE = 1024
 
-def _get_fernet() -> Fernet:
-    from django.conf import settings
 
-    raw = settings.SECRET_KEY.encode("utf-8")
+@lru_cache(maxsize=16)
+def _derive_key(secret: str) -> bytes:
+    """Dérive (une seule fois par secret) la clé Fernet à partir d'un secret."""
     derived = hashlib.pbkdf2_hmac(
-        "sha256", raw, b"mobcash_salt_v1", iterations=100_000, dklen=32
+        "sha256", secret.encode("utf-8"), KDF_SALT, iterations=KDF_ITERATIONS, dklen=32
     )
-    return Fernet(base64.urlsafe_b64encode(derived))
+    return base64.urlsafe_b64encode(derived)
+
+
+class _KeyRing:
+    """
+    Trousseau de clés du process : MultiFernet (clé primaire + anciennes)
+    et LRU borné des valeurs déchiffrées.
+    """
+
+    def __init__(self, secrets: tuple[str, ...], cache_size: int):
+        self.secrets = secrets
+        self.primary = Fernet(_derive_key(secrets[0]))
+        self.fernet = MultiFernet([Fernet(_derive_key(s)) for s in secrets])
+        self.cache_size = max(0, cache_size)
+        self._cache: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def decrypt_token(self, token: str) -> str:
+        """Déchiffre un token (une couche). Lève InvalidToken si clé inconnue."""
+        with self._lock:
+            plain = self._cache.get(token)
+            if plain is not None:
+                self._cache.move_to_end(token)
+                return plain
+
+        plain = self.fernet.decrypt(token.encode("utf-8")).decode("utf-8")
+
+        if self.cache_size:
+            with self._lock:
+                self._cache[token] = plain
+                self._cache.move_to_end(token)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return plain
+
+    def encrypt_value(self, value: str) -> str:
+        return self.fernet.encrypt(value.encode("utf-8")).decode("utf-8")
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+
+_key_ring: _KeyRing | None = None
+_key_ring_lock = threading.Lock()
+
+
+def _current_secrets() -> tuple[str, ...]:
+    from django.conf import settings
+
+    old_keys = getattr(settings, "CRYPTO_FIELDS_OLD_SECRET_KEYS", None) or ()
+    secrets = [settings.SECRET_KEY]
+    secrets.extend(k for k in old_keys if k and k not in secrets)
+    return tuple(secrets)
+
+
+def get_key_ring() -> _KeyRing:
+    """
+    Retourne le trousseau du process, reconstruit seulement si les clés
+    (SECRET_KEY / CRYPTO_FIELDS_OLD_SECRET_KEYS) ont changé.
+    """
+    global _key_ring
+    from django.conf import settings
+
+    secrets = _current_secrets()
+    ring = _key_ring
+    if ring is not None and ring.secrets == secrets:
+        return ring
+
+    with _key_ring_lock:
+        if _key_ring is None or _key_ring.secrets != secrets:
+            cache_size = getattr(
+                settings, "CRYPTO_FIELDS_DECRYPT_CACHE_SIZE", DEFAULT_DECRYPT_CACHE_SIZE
+            )
+            _key_ring = _KeyRing(secrets, cache_size)
+        return _key_ring
+
+
+def reset_key_ring():
+    """Vide le trousseau et le LRU (tests, changement de clés à chaud)."""
+    global _key_ring
+    with _key_ring_lock:
+        _key_ring = None
+
+
+def _get_fernet() -> MultiFernet:
+    return get_key_ring().fernet
 
 
 def _looks_encrypted(value: str) -> bool:
@@ -32,14 +138,15 @@ def encrypt(value: str | None) -> str | None:
     """Chiffre une chaîne pour stockage DB. Idempotent (ne re-chiffre pas)."""
     if not value:
         return value
-    # Déjà chiffré avec notre clé → ne pas double-chiffrer
+    ring = get_key_ring()
+    # Déjà chiffré avec une clé connue → ne pas double-chiffrer
     if _looks_encrypted(value):
         try:
-            _get_fernet().decrypt(value.encode("utf-8"))
+            ring.decrypt_token(value)
             return value
         except (InvalidToken, Exception):
             pass
-    return _get_fernet().encrypt(value.encode("utf-8")).decode("utf-8")
+    return ring.encrypt_value(value)
 
 
 def decrypt(value: str | None) -> str | None:
@@ -51,13 +158,44 @@ def decrypt(value: str | None) -> str | None:
     if not value:
         return value
 
+    ring = get_key_ring()
     current = value
     for _ in range(3):
         if not _looks_encrypted(current):
             return current
         try:
-            current = _get_fernet().decrypt(current.encode("utf-8")).decode("utf-8")
+            current = ring.decrypt_token(current)
         except (InvalidToken, Exception):
-            # Pas chiffré avec notre clé (ancien clair, ou clé différente)
+            # Pas chiffré avec nos clés (ancien clair, ou clé différente)
             return current
     return current
+
+
+def needs_rotation(value: str | None) -> bool:
+    """
+    True si la valeur n'est pas stockée en une seule couche chiffrée avec la
+    clé primaire (clair, ancienne clé, double chiffrement).
+    """
+    if not value:
+        return False
+    if not _looks_encrypted(value):
+        return True
+    try:
+        plain = get_key_ring().primary.decrypt(value.encode("utf-8")).decode("utf-8")
+    except (InvalidToken, Exception):
+        return True
+    return _looks_encrypted(plain)
+
+
+def rotate(value: str | None) -> str | None:
+    """
+    Re-chiffre une valeur avec la clé primaire (après ajout d'une nouvelle
+    SECRET_KEY). Les valeurs en clair sont simplement chiffrées ; une valeur
+    chiffrée avec une clé inconnue est retournée telle quelle.
+    """
+    if not value:
+        return value
+    plain = decrypt(value)
+    if _looks_encrypted(plain):
+        return value
+    return get_key_ring().encrypt_value(plain)
@@ -1,8 +1,9 @@
 from uuid import uuid4
 from decimal import Decimal
 from mobcash_inte.models import (
-    Caisse, Setting, Transaction, Reward
+    Caisse, Transaction, Reward
 )
+from mobcash_inte.setting_cache import get_setting
 from accounts.models import User
 import os
 import re
@@ -15,6 +16,7 @@ from django.utils.timezone import now
 from django.db import transaction as db_transaction
 load_dotenv()
 import requests
+from http_client import get_session
 import constant
 import random
 import time
@@ -117,7 +119,7 @@ def feexpay_payout(transaction: Transaction):
 
     try:
         connect_pro_logger.info("debut de creatuion de retrait feexpay")
-        response = requests.post(url=url, json=data, headers=headers, timeout=45)
+        response = get_session("feexpay").post(url=url, json=data, headers=headers, timeout=45)
         connect_pro_logger.info(f" feexpay payout response {response.json()}")
         
         response_data = response.json()
@@ -221,7 +223,7 @@ def feexpay_deposit(transaction: Transaction):
     }
 
     try:
-        response = requests.post(url=url, json=data, headers=headers, timeout=45)
+        response = get_session("feexpay").post(url=url, json=data, headers=headers, timeout=45)
         connect_pro_logger.info(f" feexpay response {response.json()}")
 
         response_data = response.json()
@@ -302,7 +304,7 @@ def feexpay_webhook(data):
         transaction.webhook_data = json.dumps(data) if isinstance(data, dict) else str(data)
         connect_pro_logger.info(f"la reference qui a ete transmi {reference}")
         
-        setting = Setting.objects.first()
+        setting = get_setting()
         
         # Adapter les statuts Feexpay aux statuts Connect
         if transaction_status == "FAILED" or transaction_status == "failed" or transaction_status == "cancelled":
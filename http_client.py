@@ -0,0 +1,201 @@
+"""
+http_client.py
+==============
+Sessions HTTP partagées (keep-alive) pour tous les fournisseurs externes :
+Connect Pro, Feexpay, BetApp/MobCash, 1win, WhatsApp (My Customer),
+Telegram, SMS, chatbot...
+
+Avant : chaque appel `requests.post(...)` ouvrait une nouvelle connexion
+TCP + TLS vers le même petit nombre d'hôtes. Ici :
+
+- une `requests.Session` par fournisseur et par process (fork-safe :
+  gunicorn / celery prefork recréent leur propre pool après le fork) ;
+- un `HTTPAdapter` avec pool dimensionné et keep-alive ;
+- un timeout par défaut par fournisseur (un timeout explicite passé
+  à l'appel reste prioritaire) ;
+- retry/backoff : erreurs de CONNEXION uniquement pour les POST (la requête
+  n'est jamais partie, donc pas de double paiement), erreurs 502/503/504
+  en plus pour GET ;
+- métriques : requêtes, nouvelles connexions (≈ handshakes), réutilisation.
+
+Usage :
+    from http_client import get_session
+
+    response = get_session("connect_pro").post(url, json=data, headers=headers)
+
+Surcharge possible dans settings.HTTP_CLIENT_POLICIES :
+    HTTP_CLIENT_POLICIES = {"feexpay": {"timeout": (5, 60), "retries": 1}}
+"""
+
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass, field, replace
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+@dataclass(frozen=True)
+class HttpPolicy:
+    timeout: tuple = (5, 30)  # (connect, read)
+    retries: int = 2
+    backoff_factor: float = 0.3
+    pool_connections: int = 4
+    pool_maxsize: int = 20
+    retry_statuses: tuple = (502, 503, 504)
+    retry_methods: frozenset = field(
+        default_factory=lambda: frozenset({"GET", "HEAD", "OPTIONS"})
+    )
+
+
+DEFAULT_POLICY = HttpPolicy()
+
+PROVIDER_POLICIES = {
+    "default": DEFAULT_POLICY,
+    "connect_pro": HttpPolicy(timeout=(10, 30)),
+    "feexpay": HttpPolicy(timeout=(10, 45)),
+    "betapp": HttpPolicy(timeout=(10, 120)),
+    "mobcash": HttpPolicy(timeout=(10, 120)),
+    "one_win": HttpPolicy(timeout=(10, 30)),
+    "whatsapp": HttpPolicy(timeout=(10, 60)),
+    "chatbot": HttpPolicy(timeout=(15, 120), retries=1),
+    "telegram": HttpPolicy(timeout=(5, 15)),
+    "sms": HttpPolicy(timeout=(10, 30)),
+    "fcm": HttpPolicy(timeout=(5, 30)),
+    "partner_webhook": HttpPolicy(timeout=(5, 15)),
+}
+
+
+def get_policy(provider: str) -> HttpPolicy:
+    policy = PROVIDER_POLICIES.get(provider, DEFAULT_POLICY)
+    try:
+        from django.conf import settings
+
+        overrides = getattr(settings, "HTTP_CLIENT_POLICIES", {}).get(provider)
+    except Exception:
+        overrides = None
+    if overrides:
+        policy = replace(policy, **overrides)
+    return policy
+
+
+class ProviderSession(requests.Session):
+    """Session avec timeout par défaut et métriques par fournisseur."""
+
+    def __init__(self, provider: str, policy: HttpPolicy):
+        super().__init__()
+        self.provider = provider
+        self.policy = policy
+        self.requests_count = 0
+        self.errors_count = 0
+        self.total_elapsed = 0.0
+        self._metrics_lock = threading.Lock()
+
+        retry = Retry(
+            total=policy.retries,
+            connect=policy.retries,
+            read=policy.retries,
+            status=policy.retries,
+            backoff_factor=policy.backoff_factor,
+            status_forcelist=policy.retry_statuses,
+            allowed_methods=policy.retry_methods,
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=policy.pool_connections,
+            pool_maxsize=policy.pool_maxsize,
+            max_retries=retry,
+        )
+        self.mount("https://", adapter)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.policy.timeout
+        start = time.perf_counter()
+        try:
+            return super().request(method, url, **kwargs)
+        except requests.RequestException:
+            with self._metrics_lock:
+                self.errors_count += 1
+            raise
+        finally:
+            with self._metrics_lock:
+                self.requests_count += 1
+                self.total_elapsed += time.perf_counter() - start
+
+    def pool_stats(self) -> dict:
+        """Connexions ouvertes vs requêtes servies par les pools urllib3."""
+        connections = 0
+        served = 0
+        seen = set()
+        for adapter in self.adapters.values():
+            if id(adapter) in seen:
+                continue
+            seen.add(id(adapter))
+            pools = adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                connections += pool.num_connections
+                served += pool.num_requests
+        return {
+            "provider": self.provider,
+            "requests": self.requests_count,
+            "errors": self.errors_count,
+            "new_connections": connections,
+            "pool_requests": served,
+            "reuse_ratio": round(1 - connections / served, 3) if served else 0.0,
+            "avg_latency_ms": (
+                round(self.total_elapsed / self.requests_count * 1000, 1)
+                if self.requests_count
+                else 0.0
+            ),
+        }
+
+
+_sessions: dict[str, ProviderSession] = {}
+_sessions_pid = None
+_sessions_lock = threading.Lock()
+
+
+def get_session(provider: str = "default") -> ProviderSession:
+    """Session partagée du fournisseur pour le process courant."""
+    global _sessions_pid
+    pid = os.getpid()
+    session = _sessions.get(provider) if _sessions_pid == pid else None
+    if session is not None:
+        return session
+
+    with _sessions_lock:
+        if _sessions_pid != pid:
+            # Process forké : ne jamais partager les sockets du parent
+            _sessions.clear()
+            _sessions_pid = pid
+        session = _sessions.get(provider)
+        if session is None:
+            session = ProviderSession(provider, get_policy(provider))
+            _sessions[provider] = session
+            logger.debug(f"[HTTP_CLIENT] Nouvelle session pour {provider} (pid={pid})")
+        return session
+
+
+def pool_metrics() -> list[dict]:
+    """Métriques de toutes les sessions du process courant."""
+    with _sessions_lock:
+        sessions = list(_sessions.values()) if _sessions_pid == os.getpid() else []
+    return [session.pool_stats() for session in sessions]
+
+
+def close_sessions():
+    """Ferme toutes les sessions (tests, arrêt de worker)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
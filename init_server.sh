@@ -483,6 +483,18 @@ stdout_logfile=$PROJECT_DIR/logs/celery_worker.log
 stderr_logfile=$PROJECT_DIR/logs/celery_worker_error.log
 environment=PATH="$VENV_PATH/bin"
 
+; Transactions partenaire (?async=1) et webhooks partenaire : file « partner »
+; (task_routes de mobcash_inte_backend/celery.py), appels jusqu'à 300 s
+[program:celery_mobcash_partner]
+command=$VENV_PATH/bin/celery -A mobcash_inte_backend worker -Q partner -n partner@%%h --loglevel=info --concurrency=4
+directory=$PROJECT_DIR
+user=$USER
+autostart=true
+autorestart=true
+stdout_logfile=$PROJECT_DIR/logs/celery_partner.log
+stderr_logfile=$PROJECT_DIR/logs/celery_partner_error.log
+environment=PATH="$VENV_PATH/bin"
+
 [program:celery_mobcash_beat]
 command=$VENV_PATH/bin/celery -A mobcash_inte_backend beat --loglevel=info
 directory=$PROJECT_DIR
@@ -500,12 +512,12 @@ success "Configuration Celery créée"
 info "Rechargement de Supervisor..."
 sudo supervisorctl reread
 sudo supervisorctl update
-sudo supervisorctl start celery_mobcash_worker celery_mobcash_beat
+sudo supervisorctl start celery_mobcash_worker celery_mobcash_partner celery_mobcash_beat
 success "Celery démarré"
 
 # Vérifier le statut
 info "Statut de Celery:"
-sudo supervisorctl status celery_mobcash_worker celery_mobcash_beat
+sudo supervisorctl status celery_mobcash_worker celery_mobcash_partner celery_mobcash_beat
 
 # ============================================================================
 # ÉTAPE 13: Configuration de Nginx
@@ -706,6 +718,13 @@ else
     error "✗ Celery Worker: $CELERY_STATUS"
 fi
 
+CELERY_PARTNER_STATUS=$(sudo supervisorctl status celery_mobcash_partner | awk '{print $2}')
+if [ "$CELERY_PARTNER_STATUS" = "RUNNING" ]; then
+    success "✓ Celery Worker partenaire: actif"
+else
+    error "✗ Celery Worker partenaire: $CELERY_PARTNER_STATUS"
+fi
+
 # ============================================================================
 # RÉSUMÉ FINAL
 # ============================================================================
@@ -738,7 +757,7 @@ echo ""
 info "📝 Commandes utiles:"
 echo "  • Redémarrer Gunicorn: sudo systemctl restart gunicorn_mobcash"
 echo "  • Redémarrer Daphne: sudo systemctl restart daphne_mobcash"
-echo "  • Redémarrer Celery: sudo supervisorctl restart celery_mobcash_worker celery_mobcash_beat"
+echo "  • Redémarrer Celery: sudo supervisorctl restart celery_mobcash_worker celery_mobcash_partner celery_mobcash_beat"
 echo "  • Voir les logs Gunicorn: tail -f $PROJECT_DIR/logs/gunicorn_error.log"
 echo "  • Voir les logs Celery: tail -f $PROJECT_DIR/logs/celery_worker.log"
 echo "  • Voir les logs Nginx: tail -f $PROJECT_DIR/logs/nginx_error.log"
@@ -1,6 +1,7 @@
 # external_integrations/services/mobcash_external_service.py
 
 import requests
+from http_client import get_session
 import logging
 import hmac
 import hashlib
@@ -260,7 +261,7 @@ class MobCashExternalService:
 
         try:
             if method == 'GET':
-                response = requests.get(
+                response = get_session("mobcash").get(
                     url,
                     params=params,
                     headers=headers,
@@ -268,7 +269,7 @@ class MobCashExternalService:
                 )
             elif method == 'POST':
                 # 🔥 IMPORTANT: Envoyer le body normalisé en tant que string, pas json=data
-                response = requests.post(
+                response = get_session("mobcash").post(
                     url,
                     data=body,  # Utiliser 'data' au lieu de 'json' pour garder le format exact
                     headers=headers,
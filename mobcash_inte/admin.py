@@ -6,6 +6,7 @@ from .models import (
     AuthorComment,
     AuthorCouponRating,
     Bonus,
+    Broadcast,
     Caisse,
     Coupon,
     CouponPayout,
@@ -24,6 +25,7 @@ from .models import (
     Setting,
     TestModel,
     Transaction,
+    TransactionDailyRollup,
     TransactionStatusHistory,
     UserCredit,
     UserPhone,
@@ -206,6 +208,19 @@ class NotificationAdmin(admin.ModelAdmin):
     )
 
 
+@admin.register(Broadcast)
+class BroadcastAdmin(admin.ModelAdmin):
+    list_display = ("title", "channel", "status", "total", "sent", "failed", "created_at")
+    list_filter = ("channel", "status", "created_at")
+    search_fields = ("title", "content")
+    ordering = ("-created_at",)
+    list_select_related = ("created_by",)
+    readonly_fields = (
+        "created_by", "status", "total", "sent", "failed", "error_message",
+        "created_at", "started_at", "finished_at",
+    )
+
+
 class SettingAdminForm(forms.ModelForm):
     connect_pro_token = forms.CharField(
         required=False, widget=forms.Textarea(attrs={"rows": 2}), label="Connect Pro Token"
@@ -499,6 +514,36 @@ class TransactionAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
     date_hierarchy = "created_at"
     autocomplete_fields = ("user", "app", "network")
+    list_select_related = ("user", "telegram_user")
+
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        # Changelist : les réponses fournisseurs ne sont affichées que sur la fiche
+        match = request.resolver_match
+        if match and match.url_name == "mobcash_inte_transaction_changelist":
+            queryset = queryset.without_payloads()
+        return queryset
+
+    ROLLUP_FIELDS = ("created_at", "app", "network", "type_trans", "status", "source", "amount")
+
+    def save_model(self, request, obj, form, change):
+        """
+        Sauvegarde complète : TransactionDailyRollup suit l'ancien état lu en
+        base, et un changement de statut passe par change_status (audit).
+        """
+        if not change:
+            return super().save_model(request, obj, form, change)
+        old = Transaction.objects.only(*self.ROLLUP_FIELDS).get(pk=obj.pk)
+        new_status = obj.status
+        obj.status = old.status
+        super().save_model(request, obj, form, change)
+        TransactionDailyRollup.record_change(old, obj)
+        if new_status != old.status:
+            obj.change_status(
+                new_status,
+                TransactionStatusHistory.Source.ADMIN,
+                data={"admin": request.user.get_username()},
+            )
 
     fieldsets = (
         (
@@ -0,0 +1,226 @@
+"""
+Diffusion d'un message à tous les utilisateurs sur WhatsApp, Telegram ou SMS
+(NotificationView sans user_id).
+
+Avant : boucle synchrone `for user in User.objects.filter(is_staff=False)`
+dans la requête HTTP, qui tombait en timeout sur toute la base. Ici :
+
+- `start_broadcast` crée un `Broadcast` et la vue répond 202 tout de suite ;
+- la tâche `dispatch_broadcast` lit les ids destinataires en flux
+  (`.iterator(chunk_size=...)`) et les confie par lots de
+  BROADCAST_CHUNK_SIZE à `send_broadcast_chunk` ;
+- chaque lot envoie via les services existants (sessions HTTP partagées de
+  http_client, Setting en cache), sous un limiteur de débit par canal commun
+  à tous les workers (fenêtre d'une seconde, INCR dans le cache) ;
+- les compteurs sent / failed sont mis à jour par UPDATE `F()` ; le lot qui
+  atteint le total passe la diffusion à `completed`.
+
+Débits et tailles de lot surchargeables dans les settings :
+    BROADCAST_RATE_LIMITS = {"whatsapp": 20, "telegram": 25, "sms": 10}
+    BROADCAST_CHUNK_SIZE = 200
+"""
+
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from accounts.models import User
+from mobcash_inte.models import Broadcast
+from mobcash_inte.sms_service import is_sms_enabled, send_sms_to_user
+from mobcash_inte.telegram_service import is_telegram_enabled, send_telegram_to_user
+from mobcash_inte.whatsapp_service import is_whatsapp_enabled, send_whatsapp_to_user
+
+connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+RATE_LIMIT_KEY_PREFIX = "mobcash:broadcast:rate"
+# Messages par seconde et par canal, tous workers confondus
+DEFAULT_BROADCAST_RATE_LIMITS = {"whatsapp": 20, "telegram": 25, "sms": 10}
+DEFAULT_BROADCAST_CHUNK_SIZE = 200
+BROADCAST_ITERATOR_CHUNK_SIZE = 2000
+# Fréquence de report des compteurs pendant un lot (statut plus fin)
+BROADCAST_PROGRESS_EVERY = 50
+
+CHANNEL_SENDERS = {
+    "whatsapp": send_whatsapp_to_user,
+    "telegram": send_telegram_to_user,
+    "sms": send_sms_to_user,
+}
+CHANNEL_CHECKS = {
+    "whatsapp": is_whatsapp_enabled,
+    "telegram": is_telegram_enabled,
+    "sms": is_sms_enabled,
+}
+
+
+def _rate_limit(channel):
+    limits = {**DEFAULT_BROADCAST_RATE_LIMITS, **getattr(settings, "BROADCAST_RATE_LIMITS", {})}
+    return limits.get(channel) or 0
+
+
+def _chunk_size():
+    return max(1, getattr(settings, "BROADCAST_CHUNK_SIZE", DEFAULT_BROADCAST_CHUNK_SIZE))
+
+
+def recipients(channel):
+    """Utilisateurs (non staff) réellement joignables sur le canal."""
+    users = User.objects.filter(is_staff=False)
+    if channel == "whatsapp":
+        return users.filter(whatsapp_verified=True)
+    if channel == "telegram":
+        return users.filter(telegram_verified=True, user_telegram_chat_id__gt="")
+    if channel == "sms":
+        return users.filter(sms_verified=True)
+    return users.none()
+
+
+class ChannelRateLimiter:
+    """
+    Fenêtre fixe d'une seconde partagée par tous les workers : au-delà de
+    `rate` envois dans la seconde courante, on attend la suivante. Cache
+    indisponible : pas de limite plutôt qu'une diffusion bloquée.
+    """
+
+    def __init__(self, channel, rate=None):
+        self.channel = channel
+        self.rate = _rate_limit(channel) if rate is None else rate
+
+    def wait(self):
+        if not self.rate:
+            return
+        while True:
+            now = time.time()
+            window = int(now)
+            key = f"{RATE_LIMIT_KEY_PREFIX}:{self.channel}:{window}"
+            try:
+                if cache.add(key, 1, timeout=5):
+                    count = 1
+                else:
+                    count = cache.incr(key)
+            except ValueError:
+                # Clé expirée entre add() et incr()
+                continue
+            except Exception as e:
+                connect_pro_logger.warning(f"broadcast: limiteur indisponible ({e})")
+                return
+            if count <= self.rate:
+                return
+            time.sleep(max(0.0, window + 1 - now))
+
+
+def _record_progress(broadcast_id, sent, failed):
+    if not sent and not failed:
+        return
+    Broadcast.objects.filter(pk=broadcast_id).update(
+        sent=F("sent") + sent, failed=F("failed") + failed
+    )
+    _complete_if_done(broadcast_id)
+
+
+def _complete_if_done(broadcast_id):
+    Broadcast.objects.filter(
+        pk=broadcast_id, status="running", total__lte=F("sent") + F("failed")
+    ).update(status="completed", finished_at=timezone.now())
+
+
+def start_broadcast(title, content, channel, created_by=None):
+    """Crée la diffusion ; le découpage part en tâche après le commit."""
+    from mobcash_inte.tasks import dispatch_broadcast
+
+    broadcast = Broadcast.objects.create(
+        title=title, content=content, channel=channel, created_by=created_by
+    )
+    broadcast_id = str(broadcast.id)
+    transaction.on_commit(lambda: dispatch_broadcast.delay(broadcast_id))
+    return broadcast
+
+
+def dispatch(broadcast_id):
+    """Compte les destinataires puis répartit leurs ids en lots."""
+    from mobcash_inte.tasks import send_broadcast_chunk
+
+    broadcast = Broadcast.objects.filter(pk=broadcast_id, status="pending").first()
+    if not broadcast:
+        return 0
+    now = timezone.now()
+    if broadcast.channel not in CHANNEL_SENDERS or not CHANNEL_CHECKS[broadcast.channel]():
+        Broadcast.objects.filter(pk=broadcast_id).update(
+            status="failed",
+            error_message=f"{broadcast.channel}_disabled",
+            started_at=now,
+            finished_at=now,
+        )
+        return 0
+
+    user_ids = recipients(broadcast.channel).order_by().values_list("pk", flat=True)
+    total = user_ids.count()
+    Broadcast.objects.filter(pk=broadcast_id).update(status="running", total=total, started_at=now)
+
+    size = _chunk_size()
+    dispatched = chunks = 0
+    chunk = []
+    for user_id in user_ids.iterator(chunk_size=BROADCAST_ITERATOR_CHUNK_SIZE):
+        chunk.append(str(user_id))
+        if len(chunk) >= size:
+            send_broadcast_chunk.delay(broadcast_id, chunk)
+            dispatched += len(chunk)
+            chunks += 1
+            chunk = []
+    if chunk:
+        send_broadcast_chunk.delay(broadcast_id, chunk)
+        dispatched += len(chunk)
+        chunks += 1
+
+    if dispatched != total:
+        # Inscriptions / suppressions entre le count() et le parcours
+        Broadcast.objects.filter(pk=broadcast_id).update(total=dispatched)
+    _complete_if_done(broadcast_id)
+    connect_pro_logger.info(
+        f"broadcast {broadcast_id}: {dispatched} destinataires, {chunks} lots ({broadcast.channel})"
+    )
+    return chunks
+
+
+def send_chunk(broadcast_id, user_ids):
+    """Envoie un lot, au débit du canal ; retourne (envoyés, échecs)."""
+    broadcast = Broadcast.objects.filter(pk=broadcast_id).only(
+        "title", "content", "channel", "status"
+    ).first()
+    # "completed" possible si le total a été corrigé pendant le découpage
+    if not broadcast or broadcast.status not in ("running", "completed"):
+        return 0, 0
+    sender = CHANNEL_SENDERS[broadcast.channel]
+    limiter = ChannelRateLimiter(broadcast.channel)
+
+    sent = failed = 0
+    pending_sent = pending_failed = 0
+    users = list(User.objects.filter(pk__in=user_ids))
+    for user in users:
+        limiter.wait()
+        try:
+            result = sender(user=user, title=broadcast.title, content=broadcast.content)
+        except Exception as e:
+            connect_pro_logger.error(
+                f"broadcast {broadcast_id}: échec {broadcast.channel} pour {user.id}: {e}",
+                exc_info=True,
+            )
+            result = {"success": False}
+        if result.get("success"):
+            sent += 1
+            pending_sent += 1
+        else:
+            failed += 1
+            pending_failed += 1
+        if pending_sent + pending_failed >= BROADCAST_PROGRESS_EVERY:
+            _record_progress(broadcast_id, pending_sent, pending_failed)
+            pending_sent = pending_failed = 0
+
+    # Utilisateurs supprimés depuis le découpage
+    missing = len(user_ids) - len(users)
+    failed += missing
+    _record_progress(broadcast_id, pending_sent, pending_failed + missing)
+    return sent, failed
@@ -0,0 +1,79 @@
+"""
+Verrou distribué sur le cache partagé (Redis en production).
+
+`cache.add()` pose le verrou avec un jeton propre au détenteur et un TTL.
+`extend()` et `release()` ne touchent au verrou que si le jeton stocké est
+toujours le nôtre (script Lua atomique sous Redis) : un run qui a dépassé
+son TTL ne peut ni prolonger ni supprimer le verrou du run suivant.
+"""
+
+import logging
+import secrets
+
+from django.core.cache import cache
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+# Le jeton est un entier : RedisCache stocke les int tels quels (le reste
+# est picklé), le script Lua peut donc le comparer à ARGV[1].
+_RELEASE_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+_EXTEND_LUA = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('EXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+
+def _redis_client():
+    """Client redis-py du cache par défaut, None si le cache n'est pas Redis."""
+    client = getattr(cache, "_cache", None)
+    if client is None or not hasattr(client, "get_client"):
+        return None
+    try:
+        return client.get_client(write=True)
+    except Exception:
+        return None
+
+
+class CacheLock:
+    def __init__(self, key, ttl):
+        self.key = key
+        self.ttl = ttl
+        self.token = secrets.randbits(62)
+
+    def acquire(self) -> bool:
+        return cache.add(self.key, self.token, timeout=self.ttl)
+
+    def _eval(self, script, *args):
+        client = _redis_client()
+        if client is None:
+            return None
+        try:
+            return int(client.eval(script, 1, cache.make_key(self.key), self.token, *args))
+        except Exception as e:
+            logger.warning(f"[CACHE_LOCK] {self.key}: {e}")
+            return 0
+
+    def extend(self) -> bool:
+        """Repousse l'expiration à `ttl` secondes, si le verrou est encore à nous."""
+        result = self._eval(_EXTEND_LUA, self.ttl)
+        if result is None:
+            # Cache local (dev / tests) : pas de concurrence entre process
+            return cache.get(self.key) == self.token and cache.touch(self.key, self.ttl)
+        return bool(result)
+
+    def release(self) -> bool:
+        result = self._eval(_RELEASE_LUA)
+        if result is None:
+            if cache.get(self.key) != self.token:
+                return False
+            cache.delete(self.key)
+            return True
+        return bool(result)
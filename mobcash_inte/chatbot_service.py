@@ -6,8 +6,9 @@ import logging
 import os
 
 import requests
+from http_client import get_session
 
-from mobcash_inte.models import Setting
+from mobcash_inte.setting_cache import get_setting
 from mobcash_inte.whatsapp_service import get_whatsapp_base_url
 
 logger = logging.getLogger("mobcash_inte_backend.transactions")
@@ -32,7 +33,7 @@ def get_chatbot_message_url() -> str:
 
 
 def is_chatbot_enabled() -> bool:
-    setting = Setting.objects.first()
+    setting = get_setting()
     return bool(setting and setting.use_chatbot and setting.openwa_token)
 
 
@@ -53,7 +54,7 @@ def send_chatbot_message(
     audio_name: str = "message-vocal.ogg",
     audio_content_type: str = "audio/ogg",
 ) -> tuple[dict, int]:
-    setting = Setting.objects.first()
+    setting = get_setting()
     if not setting or not setting.use_chatbot:
         return {"detail": "Chatbot désactivé.", "code": "chatbot_disabled"}, 403
     if not setting.openwa_token:
@@ -109,7 +110,7 @@ def send_chatbot_message(
     logger.info("Chatbot message → %s customer=%s", url, payload["customer_external_id"])
     try:
         if audio_bytes:
-            response = requests.post(
+            response = get_session("chatbot").post(
                 url,
                 headers=headers,
                 data=payload,
@@ -123,7 +124,7 @@ def send_chatbot_message(
                 timeout=REQUEST_TIMEOUT,
             )
         else:
-            response = requests.post(
+            response = get_session("chatbot").post(
                 url,
                 headers={**headers, "Content-Type": "application/json"},
                 json=payload,
@@ -0,0 +1,282 @@
+"""
+Moteur de vote des coupons V2 (VoteCouponV2View).
+
+- Une seule transaction courte : le vote de l'utilisateur est verrouillé
+  (select_for_update), puis compteurs du coupon, points de l'auteur et
+  portefeuille sont modifiés par des UPDATE atomiques `F()` — jamais de
+  lecture-modification-écriture en Python, donc aucun vote perdu.
+- Arithmétique `Decimal` pour les montants et les points.
+- Option COUPON_VOTE_BUFFER : pour les coupons très sollicités, les
+  compteurs likes / dislikes sont accumulés dans le cache (Redis, INCR
+  atomique) et reportés en base par la tâche `flush_coupon_vote_buffers`,
+  qui ne lit que les coupons ayant reçu un vote depuis le dernier report.
+  Votes, points et portefeuille restent écrits en base immédiatement.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import timedelta
+from decimal import Decimal
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from accounts.models import User
+from mobcash_inte.cache_lock import CacheLock, _redis_client
+from mobcash_inte.models import AuthorCouponStats, CouponRatingV2, CouponV2, CouponWallet
+
+connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+VOTE_BUFFER_PREFIX = "mobcash:coupon_votes"
+VOTE_BUFFER_LOCK_KEY = f"{VOTE_BUFFER_PREFIX}:flush_lock"
+VOTE_BUFFER_LOCK_TTL = 60
+VOTE_BUFFER_DIRTY_KEY = f"{VOTE_BUFFER_PREFIX}:dirty"
+# Seuls les coupons récents (ceux listés par CouponV2View) sont bufferisés
+VOTE_BUFFER_WINDOW = timedelta(hours=48)
+
+
+def vote_buffer_enabled() -> bool:
+    return bool(getattr(settings, "COUPON_VOTE_BUFFER", False))
+
+
+def _counter_expr(field, delta):
+    if delta >= 0:
+        return F(field) + delta
+    # Équivalent SQL de max(0, compteur - n)
+    return Greatest(F(field) + delta, Value(0))
+
+
+def _apply_counters(coupon_id, author_id, likes, dislikes):
+    updates = {}
+    if likes:
+        updates["likes_count"] = _counter_expr("likes_count", likes)
+    if dislikes:
+        updates["dislikes_count"] = _counter_expr("dislikes_count", dislikes)
+    if not updates:
+        return
+    CouponV2.objects.filter(pk=coupon_id).update(**updates)
+    AuthorCouponStats.apply(author_id, likes=likes, dislikes=dislikes)
+
+
+class VoteBuffer:
+    """
+    Compteurs likes / dislikes en attente dans le cache, par coupon, et
+    ensemble des coupons « sales » (au moins un vote depuis le dernier
+    report) : flush() ne lit que ceux-là.
+    """
+
+    batch_size = 500
+
+    def _key(self, field, coupon_id):
+        return f"{VOTE_BUFFER_PREFIX}:{field}:{coupon_id}"
+
+    def _mark_dirty(self, coupon_id):
+        client = _redis_client()
+        if client is not None:
+            client.sadd(cache.make_key(VOTE_BUFFER_DIRTY_KEY), str(coupon_id))
+            return
+        # Cache local (dev / tests) : pas de concurrence entre process
+        dirty = cache.get(VOTE_BUFFER_DIRTY_KEY) or set()
+        cache.set(VOTE_BUFFER_DIRTY_KEY, dirty | {str(coupon_id)}, timeout=None)
+
+    def _pop_dirty(self, count):
+        """Retire jusqu'à `count` coupons (id en str) de l'ensemble et les retourne."""
+        client = _redis_client()
+        if client is not None:
+            popped = client.spop(cache.make_key(VOTE_BUFFER_DIRTY_KEY), count) or []
+            return [
+                coupon_id.decode() if isinstance(coupon_id, bytes) else coupon_id for coupon_id in popped
+            ]
+        dirty = sorted(cache.get(VOTE_BUFFER_DIRTY_KEY) or ())
+        popped, rest = dirty[:count], set(dirty[count:])
+        cache.set(VOTE_BUFFER_DIRTY_KEY, rest, timeout=None)
+        return popped
+
+    def add(self, coupon_id, likes=0, dislikes=0):
+        for field, delta in (("likes", likes), ("dislikes", dislikes)):
+            if not delta:
+                continue
+            key = self._key(field, coupon_id)
+            cache.add(key, 0, timeout=None)
+            try:
+                cache.incr(key, delta)
+            except ValueError:
+                # Clé évincée entre add() et incr()
+                cache.add(key, delta, timeout=None)
+        # Après les compteurs : un flush qui a déjà retiré le coupon de
+        # l'ensemble le retrouvera au passage suivant
+        if likes or dislikes:
+            self._mark_dirty(coupon_id)
+
+    def pending(self, coupon_id):
+        values = cache.get_many(
+            [self._key("likes", coupon_id), self._key("dislikes", coupon_id)]
+        )
+        return (
+            values.get(self._key("likes", coupon_id)) or 0,
+            values.get(self._key("dislikes", coupon_id)) or 0,
+        )
+
+    def _take(self, key, value):
+        """Retire `value` du compteur (les votes arrivés entre-temps restent)."""
+        if value:
+            cache.decr(key, value)
+
+    def _flush_batch(self, coupon_ids) -> int:
+        keys = [self._key(field, coupon_id) for coupon_id in coupon_ids for field in ("likes", "dislikes")]
+        values = cache.get_many(keys)
+        authors = {
+            str(coupon_id): author_id
+            for coupon_id, author_id in CouponV2.objects.filter(pk__in=coupon_ids).values_list(
+                "id", "author_id"
+            )
+        }
+        flushed = 0
+        for coupon_id in coupon_ids:
+            likes_key, dislikes_key = self._key("likes", coupon_id), self._key("dislikes", coupon_id)
+            likes, dislikes = values.get(likes_key) or 0, values.get(dislikes_key) or 0
+            if coupon_id not in authors:
+                # Coupon supprimé : compteurs abandonnés
+                cache.delete_many([likes_key, dislikes_key])
+                continue
+            if not (likes or dislikes):
+                continue
+            self._take(likes_key, likes)
+            self._take(dislikes_key, dislikes)
+            try:
+                with transaction.atomic():
+                    _apply_counters(coupon_id, authors[coupon_id], likes, dislikes)
+            except Exception as e:
+                # Remise en file pour le prochain passage
+                self.add(coupon_id, likes=likes, dislikes=dislikes)
+                connect_pro_logger.error(
+                    f"[COUPON_VOTES] Report impossible pour {coupon_id}: {e}"
+                )
+                continue
+            flushed += 1
+        return flushed
+
+    def flush(self) -> int:
+        """Reporte en base les compteurs en attente. Retourne le nombre de coupons mis à jour."""
+        if not vote_buffer_enabled():
+            return 0
+        lock = CacheLock(VOTE_BUFFER_LOCK_KEY, VOTE_BUFFER_LOCK_TTL)
+        if not lock.acquire():
+            return 0
+        flushed = 0
+        try:
+            while True:
+                coupon_ids = self._pop_dirty(self.batch_size)
+                if not coupon_ids:
+                    break
+                flushed += self._flush_batch(coupon_ids)
+                if not lock.extend():
+                    connect_pro_logger.warning("[COUPON_VOTES] Verrou perdu, arrêt du report")
+                    break
+        finally:
+            lock.release()
+        return flushed
+
+
+vote_buffer = VoteBuffer()
+
+
+@dataclass
+class VoteResult:
+    likes: int
+    dislikes: int
+    vote: Optional[bool]  # vote courant de l'utilisateur (None = aucun)
+    adjustment: Decimal
+    points_delta: Decimal
+
+
+def _credit_author(author_id, points_delta, adjustment):
+    if points_delta:
+        User.objects.filter(pk=author_id).update(
+            coupon_points=F("coupon_points") + points_delta
+        )
+    if not adjustment:
+        return
+    updates = {"balance": F("balance") + adjustment}
+    if adjustment > 0:
+        updates["total_earned"] = F("total_earned") + adjustment
+    if not CouponWallet.objects.filter(user_id=author_id).update(**updates):
+        CouponWallet.objects.get_or_create(user_id=author_id)
+        CouponWallet.objects.filter(user_id=author_id).update(**updates)
+
+
+def cast_vote(user, coupon, is_like, setting) -> VoteResult:
+    """
+    Like / dislike de `user` sur `coupon` : nouveau vote, annulation (même
+    vote) ou changement de vote. Les règles d'accès sont vérifiées par la vue.
+    """
+    amount = Decimal(setting.monetization_amount)
+    points = Decimal(setting.coupon_rating_points)
+    sign = 1 if is_like else -1
+    buffered = vote_buffer_enabled() and coupon.created_at >= timezone.now() - VOTE_BUFFER_WINDOW
+
+    with transaction.atomic():
+        rating = (
+            CouponRatingV2.objects.select_for_update()
+            .filter(user=user, coupon=coupon)
+            .first()
+        )
+        duplicate = None
+        if rating is None:
+            try:
+                with transaction.atomic():
+                    CouponRatingV2.objects.create(user=user, coupon=coupon, is_like=is_like)
+            except IntegrityError:
+                # Double envoi : l'autre requête a créé le vote, on la laisse
+                # gagner et on renvoie l'état courant sans second changement
+                duplicate = CouponRatingV2.objects.get(user=user, coupon=coupon)
+
+        if duplicate is not None:
+            likes = dislikes = 0
+            adjustment, points_delta, vote = Decimal("0"), Decimal("0"), duplicate.is_like
+        elif rating is None:
+            # Nouveau vote
+            likes, dislikes = (1, 0) if is_like else (0, 1)
+            adjustment, points_delta, vote = sign * amount, points, is_like
+        elif rating.is_like == is_like:
+            # Annulation du vote
+            rating.delete()
+            likes, dislikes = (-1, 0) if is_like else (0, -1)
+            adjustment, points_delta, vote = -sign * amount, -points, None
+        else:
+            # Changement de vote (pas de changement de points)
+            rating.is_like = is_like
+            rating.save(update_fields=["is_like"])
+            likes, dislikes = (1, -1) if is_like else (-1, 1)
+            adjustment, points_delta, vote = 2 * sign * amount, Decimal("0"), is_like
+
+        if buffered and (likes or dislikes):
+            vote_buffer.add(coupon.pk, likes=likes, dislikes=dislikes)
+        elif likes or dislikes:
+            _apply_counters(coupon.pk, coupon.author_id, likes, dislikes)
+
+        if not setting.enable_coupon_monetization:
+            adjustment = Decimal("0")
+        if coupon.author_id:
+            _credit_author(coupon.author_id, points_delta, adjustment)
+
+    current_likes, current_dislikes = CouponV2.objects.filter(pk=coupon.pk).values_list(
+        "likes_count", "dislikes_count"
+    ).first() or (0, 0)
+    if buffered:
+        pending_likes, pending_dislikes = vote_buffer.pending(coupon.pk)
+        current_likes = max(0, current_likes + pending_likes)
+        current_dislikes = max(0, current_dislikes + pending_dislikes)
+
+    return VoteResult(
+        likes=current_likes,
+        dislikes=current_dislikes,
+        vote=vote,
+        adjustment=adjustment,
+        points_delta=points_delta,
+    )
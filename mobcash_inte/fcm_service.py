@@ -0,0 +1,195 @@
+"""
+Envoi des notifications push FCM (API HTTP v1).
+
+- Le token OAuth du compte de service est gardé en mémoire (partagé par
+  tous les threads et tâches Celery du process) et dans le cache partagé
+  (Redis) pour les autres process ; il n'est rafraîchi qu'à l'approche de
+  son expiration (TOKEN_REFRESH_MARGIN).
+- Tous les appareils d'une notification sont envoyés via la même session
+  HTTP poolée (http_client) et le même token.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from django.core.cache import cache
+
+from http_client import get_session
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+FCM_SCOPES = ["https://www.googleapis.com/auth/firebase.messaging"]
+FCM_TOKEN_CACHE_KEY = "mobcash:fcm:access_token"
+TOKEN_REFRESH_MARGIN = timedelta(minutes=5)
+MAX_PARALLEL_SENDS = 4
+
+
+def fcm_send_url() -> str:
+    base = (os.getenv("FCM_API_BASE_URL") or "https://fcm.googleapis.com").rstrip("/")
+    project = os.getenv("FIREBASE_PROJECT_ID", "turaincash-57c48")
+    return f"{base}/v1/projects/{project}/messages:send"
+
+
+class FcmCredentials:
+    """Token OAuth FCM rafraîchi uniquement près de l'expiration."""
+
+    def __init__(self, service_account_file: str = "mobcash.json"):
+        self.service_account_file = service_account_file
+        self._credentials = None
+        self._token = None
+        self._expiry = None
+        self._lock = threading.Lock()
+
+    def _is_fresh(self, now: datetime) -> bool:
+        return bool(self._token and self._expiry and self._expiry - now > TOKEN_REFRESH_MARGIN)
+
+    def _load_credentials(self):
+        if self._credentials is None:
+            from google.oauth2 import service_account
+
+            self._credentials = service_account.Credentials.from_service_account_file(
+                self.service_account_file, scopes=FCM_SCOPES
+            )
+        return self._credentials
+
+    def _refresh(self):
+        import google.auth.transport.requests
+
+        credentials = self._load_credentials()
+        request = google.auth.transport.requests.Request(session=get_session("fcm"))
+        credentials.refresh(request)
+        expiry = credentials.expiry
+        if expiry is not None and expiry.tzinfo is None:
+            # google-auth renvoie un datetime UTC naïf
+            expiry = expiry.replace(tzinfo=timezone.utc)
+        self._token = credentials.token
+        self._expiry = expiry or datetime.now(timezone.utc) + timedelta(minutes=30)
+        logger.info(f"[FCM] Nouveau token OAuth, expire le {self._expiry.isoformat()}")
+
+        ttl = int((self._expiry - datetime.now(timezone.utc) - TOKEN_REFRESH_MARGIN).total_seconds())
+        if ttl > 0:
+            try:
+                cache.set(
+                    FCM_TOKEN_CACHE_KEY,
+                    {"token": self._token, "expiry": self._expiry.isoformat()},
+                    timeout=ttl,
+                )
+            except Exception as e:
+                logger.warning(f"[FCM] Cache du token impossible: {e}")
+
+    def _load_shared(self, now: datetime) -> bool:
+        try:
+            shared = cache.get(FCM_TOKEN_CACHE_KEY)
+        except Exception:
+            return False
+        if not shared:
+            return False
+        self._token = shared["token"]
+        self._expiry = datetime.fromisoformat(shared["expiry"])
+        return self._is_fresh(now)
+
+    def get_token(self) -> str:
+        now = datetime.now(timezone.utc)
+        if self._is_fresh(now):
+            return self._token
+        with self._lock:
+            now = datetime.now(timezone.utc)
+            if self._is_fresh(now) or self._load_shared(now):
+                return self._token
+            self._refresh()
+            return self._token
+
+    def invalidate(self):
+        """Force un rafraîchissement au prochain appel (ex : 401 de FCM)."""
+        with self._lock:
+            self._token = None
+            self._expiry = None
+            try:
+                cache.delete(FCM_TOKEN_CACHE_KEY)
+            except Exception:
+                pass
+
+
+fcm_credentials = FcmCredentials()
+
+
+def build_fcm_message(fcm_token, title, body, message_data=None, image_url=None) -> dict:
+    # Notification visuelle
+    notification = {"title": title, "body": body}
+    if image_url:
+        notification["image"] = image_url
+
+    return {
+        "message": {
+            "token": fcm_token,
+            "notification": notification,
+            "data": message_data or {},
+            "android": {
+                "priority": "HIGH",
+                "notification": {
+                    "channel_id": os.getenv("NOTIFICATION_CHANNEL"),
+                    "sound": "default",
+                },
+            },
+        }
+    }
+
+
+class FcmSender:
+    """
+    Envoie une notification à plusieurs appareils avec un seul token OAuth
+    et une seule session poolée (envois parallèles bornés).
+    """
+
+    def __init__(self, credentials=None, session=None, url=None, max_workers=MAX_PARALLEL_SENDS):
+        self.credentials = credentials or fcm_credentials
+        self.session = session or get_session("fcm")
+        self.url = url or fcm_send_url()
+        self.max_workers = max_workers
+
+    def _post(self, payload: dict, token: str):
+        return self.session.post(
+            self.url,
+            headers={
+                "Authorization": f"Bearer {token}",
+                "Content-Type": "application/json",
+            },
+            json=payload,
+        )
+
+    def send_one(self, fcm_token, title, body, message_data=None, image_url=None):
+        payload = build_fcm_message(fcm_token, title, body, message_data, image_url)
+        try:
+            response = self._post(payload, self.credentials.get_token())
+            if response.status_code == 401:
+                # Token révoqué / expiré côté Google : un seul nouvel essai
+                self.credentials.invalidate()
+                response = self._post(payload, self.credentials.get_token())
+            logger.info(f"[FCM] Response: {response.status_code} {response.text[:300]}")
+            return response.json()
+        except Exception as e:
+            logger.error(f"[FCM] Error during POST {self.url}: {str(e)}")
+            return str(e)
+
+    def send_many(self, fcm_tokens, title, body, message_data=None, image_url=None) -> list:
+        tokens = [token for token in fcm_tokens if token]
+        if not tokens:
+            return []
+        # Token obtenu une fois avant le fan-out
+        self.credentials.get_token()
+        if len(tokens) == 1 or self.max_workers <= 1:
+            return [
+                self.send_one(token, title, body, message_data, image_url) for token in tokens
+            ]
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(tokens))) as executor:
+            return list(
+                executor.map(
+                    lambda token: self.send_one(token, title, body, message_data, image_url),
+                    tokens,
+                )
+            )
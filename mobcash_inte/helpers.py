@@ -1,14 +1,16 @@
+import asyncio
 import html
 import logging
 import os
 import re
-import requests
 from accounts.models import AppName, TelegramUser, User
 from celery import shared_task
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from django.db import transaction as db_transaction
 from django.utils.html import strip_tags
 
+from http_client import get_session
 from logger import LoggerService
 from mobcash_inte.whatsapp_service import send_whatsapp_to_user
 from mobcash_inte.telegram_service import send_telegram_to_user
@@ -16,9 +18,8 @@ from mobcash_inte.sms_service import send_sms_to_user
 from mobcash_inte.mobcash_service import BetApp
 from mobcash_inte.models import BotMessage, Notification, Transaction
 from mobcash_inte.serializers import NotificationSerializer
-from google.oauth2 import service_account
 from fcm_django.models import FCMDevice
-import google.auth.transport.requests
+from mobcash_inte.fcm_service import FcmSender, fcm_credentials
 from dotenv import load_dotenv
 import time
 import secrets
@@ -42,49 +43,15 @@ def html_to_plain_text(value: str) -> str:
 
 
 def get_access_token():
-    credentials = service_account.Credentials.from_service_account_file(
-        "mobcash.json", scopes=["https://www.googleapis.com/auth/firebase.messaging"]
-    )
-    request = google.auth.transport.requests.Request()
-    credentials.refresh(request)
-    return credentials.token
+    """Token OAuth FCM (mis en cache, rafraîchi seulement près de l'expiration)."""
+    return fcm_credentials.get_token()
 
 
 def call_api(fcm_token, title, body, message_data=None, image_url=None, priority=None):
-    url = f"https://fcm.googleapis.com/v1/projects/{os.getenv('FIREBASE_PROJECT_ID', 'turaincash-57c48')}/messages:send"
-    headers = {
-        "Authorization": f"Bearer {get_access_token()}",
-        "Content-Type": "application/json",
-    }
-
-    # Notification visuelle
-    notification = {"title": title, "body": body}
-    if image_url:
-        notification["image"] = image_url
-
-    payload = {
-        "message": {
-            "token": fcm_token,
-            "notification": notification,
-            "data": message_data or {},
-            "android": {
-                "priority": "HIGH",
-                "notification": {
-                    "channel_id": os.getenv("NOTIFICATION_CHANNEL"),
-                    "sound": "default",
-                },
-            },
-        }
-    }
-
-    try:
-        LoggerService.i(f"POST {url} data={payload}")
-        response = requests.post(url, headers=headers, json=payload)
-        LoggerService.i(f"Response: {response.status_code} {response.text}")
-        return response.json()
-    except Exception as e:
-        LoggerService.e(f"Error during POST {url}: {str(e)}")
-        return str(e)
+    LoggerService.i(f"POST FCM token={fcm_token} title={title}")
+    return FcmSender().send_one(
+        fcm_token, title=title, body=body, message_data=message_data, image_url=image_url
+    )
 
 
 # def call_api(fcm_token, title, body, priority="normal", message_data=None):
@@ -112,25 +79,151 @@ def call_api(fcm_token, title, body, message_data=None, image_url=None, priority
 
 
 def send_push_noti(user: User, title, body, data=None):
-    devices = FCMDevice.objects.filter(user=user)[:3]
-    for device in devices:
-        connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
-        response = call_api(
-            device.registration_id, title=title, body=body, message_data=data
-        )
-        connect_pro_logger.info(f"send notification response 111111111111111 {response}")
-        return response
+    """Push vers les 3 derniers appareils de l'utilisateur (un token, une session)."""
+    registration_ids = list(
+        FCMDevice.objects.filter(user=user)
+        .order_by("-id")
+        .values_list("registration_id", flat=True)[:3]
+    )
+    responses = FcmSender().send_many(
+        registration_ids, title=title, body=body, message_data=data
+    )
+    connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
+    connect_pro_logger.info(f"send notification responses {responses}")
+    return responses
 
 
 @shared_task
 def send_admin_notification(title: str, content: str, data=None, reference=None):
-    users = User.objects.filter(is_staff=True)
-    for user in users:
-        send_notification(
-            title=title, content=content, data=data, user=user, reference=reference
-        )
+    send_notifications(
+        users=list(User.objects.filter(is_staff=True)),
+        title=title,
+        content=content,
+        data=data,
+        reference=reference,
+    )
 
 connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+# Canaux externes, chacun livré par sa propre tâche send_notification_channel
+NOTIFICATION_CHANNELS = ("push", "whatsapp", "telegram", "sms")
+# Nombre maximal d'appareils notifiés par utilisateur (les plus récents)
+PUSH_DEVICES_PER_USER = 3
+
+
+def _group_send_many(messages):
+    """
+    Envoie tous les `(groupe, événement)` au channel layer en un seul passage
+    dans la boucle asyncio (group_send concurrents) au lieu d'un
+    async_to_sync par utilisateur.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not messages:
+        return
+
+    async def _send_all():
+        results = await asyncio.gather(
+            *(channel_layer.group_send(group, event) for group, event in messages),
+            return_exceptions=True,
+        )
+        for (group, _), result in zip(messages, results):
+            if isinstance(result, Exception):
+                connect_pro_logger.error(f"group_send {group} en échec: {result}")
+
+    async_to_sync(_send_all)()
+
+
+def _send_push_many(users, title, content, data=None):
+    """Push vers les PUSH_DEVICES_PER_USER derniers appareils de chaque utilisateur."""
+    tokens, per_user = [], {}
+    devices = (
+        FCMDevice.objects.filter(user__in=users)
+        .order_by("user_id", "-id")
+        .values_list("user_id", "registration_id")
+    )
+    for user_id, registration_id in devices:
+        if per_user.get(user_id, 0) < PUSH_DEVICES_PER_USER:
+            per_user[user_id] = per_user.get(user_id, 0) + 1
+            tokens.append(registration_id)
+    responses = FcmSender().send_many(tokens, title=title, body=content, message_data=data)
+    connect_pro_logger.info(f"send notification responses {responses}")
+    return responses
+
+
+def deliver_notification_channel(channel, user_ids, title, content, data=None):
+    """Livre un canal externe à une liste d'utilisateurs ; les erreurs restent locales."""
+    users = list(User.objects.filter(pk__in=user_ids))
+    if channel == "push":
+        try:
+            _send_push_many(users, title=title, content=content, data=data)
+        except Exception as e:
+            connect_pro_logger.error(f"token expirer ou invalide: {str(e)}")
+        return
+    sender = {
+        "whatsapp": send_whatsapp_to_user,
+        "telegram": send_telegram_to_user,
+        "sms": send_sms_to_user,
+    }[channel]
+    for user in users:
+        try:
+            sender(user=user, title=title, content=content)
+        except Exception as e:
+            connect_pro_logger.error(
+                f"Erreur notification {channel} pour utilisateur {user.id}: {str(e)}",
+                exc_info=True,
+            )
+
+
+@shared_task
+def send_notification_channel(channel, user_ids, title, content, data=None):
+    deliver_notification_channel(channel, user_ids, title, content, data=data)
+
+
+def _dispatch_channels(user_ids, title, content, data=None):
+    for channel in NOTIFICATION_CHANNELS:
+        try:
+            send_notification_channel.delay(channel, user_ids, title, content, data)
+        except Exception as e:
+            # Broker indisponible : livraison sur place plutôt que perdue
+            connect_pro_logger.error(f"send_notification_channel {channel} non planifiée: {e}")
+            deliver_notification_channel(channel, user_ids, title, content, data=data)
+
+
+def send_notifications(users, title: str, content: str, data=None, reference=None):
+    """
+    Notifie plusieurs utilisateurs (User) :
+    1. un seul bulk_create des Notification ;
+    2. un seul passage channel layer pour tous les group_send ;
+    3. une tâche indépendante par canal externe (push, WhatsApp, Telegram,
+       SMS), planifiée après le commit : un canal lent ou en panne ne
+       retarde pas les autres ni l'appelant.
+    """
+    users = [user for user in users if isinstance(user, User)]
+    if not users:
+        return []
+    notifications = Notification.objects.bulk_create(
+        [
+            Notification(title=title, content=content, user=user, reference=reference)
+            for user in users
+        ]
+    )
+    _group_send_many(
+        [
+            (
+                f"private_channel_{str(notification.user_id)}",
+                {
+                    "type": "new_notification",
+                    "data": NotificationSerializer(notification).data,
+                },
+            )
+            for notification in notifications
+        ]
+    )
+    user_ids = [str(user.id) for user in users]
+    db_transaction.on_commit(lambda: _dispatch_channels(user_ids, title, content, data))
+    return notifications
+
+
 def send_notification(
     user: User | TelegramUser, title: str, content: str, data=None, reference=None
 ):
@@ -140,47 +233,10 @@ def send_notification(
             # ✅ Notification via Telegram
             send_telegram_message(content=content, chat_id=user.telegram_user_id)
         elif isinstance(user, User):
-            # ✅ Notification via push et base de données
-            response = None
-            try:
-                response = send_push_noti(user=user, title=title, body=content, data=data)
-            except Exception as e:
-                connect_pro_logger.error(f"token expirer ou invalide: {str(e)}")
-            connect_pro_logger.warning(
-                f"send_notification: 1111111111111 ({response})"
-            )
-            notification = Notification.objects.create(
-                title=title, content=content, user=user, reference=reference
+            # ✅ Notification en base + websocket, canaux externes en tâches
+            send_notifications(
+                [user], title=title, content=content, data=data, reference=reference
             )
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                f"private_channel_{str(user.id)}",
-                {
-                    "type": "new_notification",
-                    "data": NotificationSerializer(notification).data,
-                },
-            )
-            try:
-                send_whatsapp_to_user(user=user, title=title, content=content)
-            except Exception as e:
-                connect_pro_logger.error(
-                    f"Erreur send_whatsapp_to_user pour utilisateur {user.id}: {str(e)}",
-                    exc_info=True,
-                )
-            try:
-                send_telegram_to_user(user=user, title=title, content=content)
-            except Exception as e:
-                connect_pro_logger.error(
-                    f"Erreur send_telegram_to_user pour utilisateur {user.id}: {str(e)}",
-                    exc_info=True,
-                )
-            try:
-                send_sms_to_user(user=user, title=title, content=content)
-            except Exception as e:
-                connect_pro_logger.error(
-                    f"Erreur send_sms_to_user pour utilisateur {user.id}: {str(e)}",
-                    exc_info=True,
-                )
         else:
             connect_pro_logger.warning(
                 f"send_notification: utilisateur inconnu ou non valide ({user})"
@@ -202,8 +258,8 @@ def send_telegram_message(content, chat_id=os.getenv("CHAT_ID")):
         "text": content,
     }
     try:
-
-        response = requests.post(api_url, data=data)
+        # Session partagée : keep-alive et timeout de la politique "telegram"
+        response = get_session("telegram").post(api_url, data=data)
         BotMessage.objects.create(content=content, chat=chat_id)
         return response.json()
     except:
@@ -296,25 +352,97 @@ def generate_ussd_code(transaction :Transaction):
         return None
 
 
+CANCEL_PENDING_LOCK_KEY = "mobcash:lock:cancel_old_pending"
+CANCEL_PENDING_LOCK_TTL = 600
+CANCEL_PENDING_BATCH_SIZE = 500
+CANCEL_PENDING_MESSAGE = "Transaction annulée : en attente depuis plus de 24h"
+
+
+def _cancel_pending_batch(threshold, batch_size, after=None):
+    """
+    Annule un lot de transactions pending via `bulk_change_status` :
+    transaction courte, un seul UPDATE (statut + all_status), historique en
+    bulk_create, rollup groupé.
+
+    Parcours par position (created_at, id) après `after` : les lignes
+    verrouillées ailleurs (skip_locked) sont dépassées, pas relues en boucle.
+    Retourne (annulées, position de la dernière ligne lue), la position étant
+    None en fin de parcours.
+    """
+    from django.db.models import Q
+    from mobcash_inte.models import TransactionStatusHistory
+
+    queryset = Transaction.objects.filter(status="pending", created_at__lte=threshold)
+    if after is not None:
+        created_at, pk = after
+        queryset = queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=pk)
+        )
+    rows = list(
+        queryset.order_by("created_at", "id").values_list("id", "created_at")[:batch_size]
+    )
+    if not rows:
+        return 0, None
+    cancelled = Transaction.objects.bulk_change_status(
+        [pk for pk, _ in rows],
+        "annuler",
+        TransactionStatusHistory.Source.SYSTEM,
+        message=CANCEL_PENDING_MESSAGE,
+        from_status="pending",
+        skip_locked=True,
+        batch_size=batch_size,
+    )
+    last_pk, last_created_at = rows[-1]
+    return cancelled, ((last_created_at, last_pk) if len(rows) == batch_size else None)
+
+
 @shared_task
-def cancel_old_pending_transactions():
+def cancel_old_pending_transactions(batch_size=CANCEL_PENDING_BATCH_SIZE, max_batches=None):
     """
-    Tâche Celery Beat exécutée chaque jour à 00h.
-    - Transactions pending depuis plus de 24h → status = "annuler"
-    - Transactions pending depuis plus de 24h créées il y a au moins 24h → supprimées
+    Tâche Celery Beat : transactions pending depuis plus de 24h → status = "annuler".
+
+    Parcourt l'index (status, created_at) par lots de `batch_size` : chaque
+    lot est une transaction courte (verrous sur le lot seulement, lignes déjà
+    verrouillées ailleurs ignorées jusqu'au prochain run) qui conserve l'audit
+    (all_status + TransactionStatusHistory). Un seul run à la fois (CacheLock,
+    prolongé à chaque lot). Idempotente : peut tourner plus souvent qu'une
+    fois par nuit.
     """
     from django.utils import timezone
     from datetime import timedelta
+    from mobcash_inte.cache_lock import CacheLock
 
     connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
-    threshold = timezone.now() - timedelta(hours=24)
-
-    # Transactions pending créées il y a au moins 24h → annuler
-    to_cancel = Transaction.objects.filter(status="pending", created_at__lte=threshold)
-    cancel_count = to_cancel.count()
-    to_cancel.update(status="annuler")
-    connect_pro_logger.info(f"[CANCEL_PENDING] {cancel_count} transactions annulées")
+    lock = CacheLock(CANCEL_PENDING_LOCK_KEY, CANCEL_PENDING_LOCK_TTL)
+    if not lock.acquire():
+        connect_pro_logger.info("[CANCEL_PENDING] Run précédent encore actif, ignoré")
+        return "0 transactions annulées (run déjà actif)"
 
+    started = time.monotonic()
+    threshold = timezone.now() - timedelta(hours=24)
+    cancel_count = 0
+    batches = 0
+    position = None
+    try:
+        while max_batches is None or batches < max_batches:
+            cancelled, position = _cancel_pending_batch(threshold, batch_size, position)
+            batches += 1
+            cancel_count += cancelled
+            connect_pro_logger.info(
+                f"[CANCEL_PENDING] Lot {batches} : {cancelled} annulées ({cancel_count} au total)"
+            )
+            if position is None:
+                break
+            if not lock.extend():
+                connect_pro_logger.warning("[CANCEL_PENDING] Verrou perdu, arrêt du run")
+                break
+    finally:
+        lock.release()
+
+    connect_pro_logger.info(
+        f"[CANCEL_PENDING] {cancel_count} transactions annulées en {batches} lot(s), "
+        f"{time.monotonic() - started:.1f}s"
+    )
     return f"{cancel_count} transactions annulées"
 
 
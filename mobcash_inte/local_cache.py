@@ -0,0 +1,100 @@
+"""
+Cache en mémoire du process, invalidé dans TOUS les process par un numéro
+de version partagé (cache Django : Redis en prod, mémoire locale en tests).
+
+Utilisé par setting_cache (Setting), whatsapp_service (noms de plateformes)
+et partner_auth (partenaires par clé publique) :
+
+- chaque entrée expire après `ttl` secondes ;
+- la version partagée est relue au plus toutes les `version_check` secondes
+  (pas un aller-retour Redis par appel) ; si elle a changé, toutes les
+  entrées locales sont jetées ;
+- `bump()` incrémente la version, à appeler après commit d'une modification
+  (post_save / post_delete).
+
+`ttl` et `version_check` acceptent un nombre ou une fonction sans argument
+(lecture de settings à chaud).
+"""
+
+import logging
+import threading
+import time
+
+from django.core.cache import cache
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+def _value(option):
+    return option() if callable(option) else option
+
+
+class VersionedLocalCache:
+    def __init__(self, version_key, ttl, version_check=1.0, max_entries=None):
+        self.version_key = version_key
+        self.ttl = ttl
+        self.version_check = version_check
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._version = None
+        self._version_checked_at = 0.0
+
+    def shared_version(self):
+        """Version partagée ; None si le cache partagé est indisponible."""
+        try:
+            return cache.get(self.version_key)
+        except Exception as e:
+            logger.warning(f"[LOCAL_CACHE] Lecture version {self.version_key} impossible: {e}")
+            return None
+
+    def bump(self):
+        """Invalide les entrées dans TOUS les process."""
+        try:
+            try:
+                cache.incr(self.version_key)
+            except ValueError:
+                # Clé absente (premier bump ou cache vidé)
+                cache.set(self.version_key, 1, timeout=None)
+        except Exception as e:
+            logger.warning(f"[LOCAL_CACHE] Incrément version {self.version_key} impossible: {e}")
+        self.clear()
+
+    def clear(self):
+        """Invalide uniquement les entrées du process courant."""
+        with self._lock:
+            self._entries.clear()
+            self._version_checked_at = 0.0
+
+    def current_version(self, now=None):
+        """Version partagée, relue au plus toutes les `version_check` secondes."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if now - self._version_checked_at < _value(self.version_check):
+                return self._version
+        version = self.shared_version()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+            self._version = version
+            self._version_checked_at = now
+        return version
+
+    def get(self, key, loader):
+        """
+        Valeur locale de `key`, sinon `loader(version)` (appelé hors verrou,
+        None compris : le résultat est mis en cache tel quel).
+        """
+        now = time.monotonic()
+        version = self.current_version(now)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        value = loader(version)
+        with self._lock:
+            if self.max_entries and len(self._entries) >= self.max_entries:
+                self._entries.clear()
+            self._entries[key] = (now + _value(self.ttl), value)
+        return value
@@ -0,0 +1,74 @@
+"""
+Management command : backfill_transaction_rollup
+================================================
+(Re)construit TransactionDailyRollup depuis la table Transaction, mois par
+mois (une requête groupée + un bulk_create par mois, dans une transaction).
+
+À lancer une fois après le déploiement du modèle, puis à volonté pour
+corriger une période.
+
+Usage :
+    python manage.py backfill_transaction_rollup
+    python manage.py backfill_transaction_rollup --start 2025-01-01 --end 2025-03-31
+"""
+
+import time
+from datetime import date
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from mobcash_inte.models import Transaction, TransactionDailyRollup
+
+
+def _parse(value, option):
+    try:
+        parsed = parse_date(value) if value else None
+    except ValueError:
+        parsed = None
+    if value and parsed is None:
+        raise CommandError(f"{option} invalide (format AAAA-MM-JJ) : {value}")
+    return parsed
+
+
+class Command(BaseCommand):
+    help = "Reconstruit TransactionDailyRollup depuis Transaction"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--start", help="Premier jour (AAAA-MM-JJ), défaut : 1re transaction")
+        parser.add_argument("--end", help="Dernier jour (AAAA-MM-JJ), défaut : aujourd'hui")
+
+    def handle(self, *args, **options):
+        start = _parse(options["start"], "--start")
+        end = _parse(options["end"], "--end") or timezone.localdate()
+        if start is None:
+            first = Transaction.objects.aggregate(first=Min("created_at"))["first"]
+            if first is None:
+                self.stdout.write(self.style.WARNING("Aucune transaction, rien à faire."))
+                return
+            start = timezone.localtime(first).date()
+        if start > end:
+            raise CommandError("--start doit précéder --end")
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"▶ Rollup du {start} au {end}"))
+        total_rows = 0
+        began = time.perf_counter()
+        chunk_start = start
+        while chunk_start <= end:
+            chunk_end = min(
+                date(chunk_start.year, chunk_start.month, 1) + relativedelta(months=1, days=-1),
+                end,
+            )
+            rows = TransactionDailyRollup.rebuild(start=chunk_start, end=chunk_end)
+            total_rows += rows
+            self.stdout.write(f"  {chunk_start} → {chunk_end} : {rows} lignes")
+            chunk_start = chunk_end + relativedelta(days=1)
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\n✅ {total_rows} lignes de rollup en {time.perf_counter() - began:.1f} s"
+            )
+        )
@@ -0,0 +1,97 @@
+"""
+Micro-benchmark du chiffrement des champs sensibles (crypto_fields).
+
+Compare l'ancien comportement (dérivation PBKDF2 à chaque appel) au
+trousseau mis en cache (dérivation unique + LRU des valeurs déchiffrées).
+
+Usage :
+    python3 manage.py bench_crypto_fields
+    python3 manage.py bench_crypto_fields --iterations 500
+"""
+
+import base64
+import hashlib
+import time
+
+from cryptography.fernet import Fernet
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+import crypto_fields
+
+
+def _legacy_fernet() -> Fernet:
+    derived = hashlib.pbkdf2_hmac(
+        "sha256",
+        settings.SECRET_KEY.encode("utf-8"),
+        crypto_fields.KDF_SALT,
+        iterations=crypto_fields.KDF_ITERATIONS,
+        dklen=32,
+    )
+    return Fernet(base64.urlsafe_b64encode(derived))
+
+
+class Command(BaseCommand):
+    help = "Mesure encrypt/decrypt : PBKDF2 par appel vs trousseau mis en cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--iterations",
+            "-n",
+            type=int,
+            default=200,
+            help="Nombre d'appels decrypt() mesurés (défaut : 200)",
+        )
+
+    def _timed(self, label, func, iterations):
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        per_call_us = elapsed / iterations * 1_000_000
+        self.stdout.write(
+            f"  {label:<32} {elapsed * 1000:10.1f} ms  ({per_call_us:10.1f} µs/appel)"
+        )
+        return elapsed
+
+    def handle(self, *args, **options):
+        iterations = max(1, options["iterations"])
+        plain = "connect-pro-token-0123456789abcdef"
+
+        crypto_fields.reset_key_ring()
+        token = crypto_fields.encrypt(plain)
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"▶ decrypt() × {iterations}"))
+        legacy = self._timed(
+            "PBKDF2 à chaque appel (ancien)",
+            lambda: _legacy_fernet().decrypt(token.encode("utf-8")),
+            iterations,
+        )
+
+        def ring_without_lru():
+            crypto_fields.get_key_ring().clear_cache()
+            crypto_fields.decrypt(token)
+
+        ring = self._timed("Trousseau (sans LRU)", ring_without_lru, iterations)
+        cached = self._timed(
+            "Trousseau + LRU", lambda: crypto_fields.decrypt(token), iterations
+        )
+
+        self.stdout.write(self.style.MIGRATE_HEADING(f"▶ encrypt() × {iterations}"))
+        self._timed(
+            "encrypt() valeur en clair",
+            lambda: crypto_fields.encrypt(plain),
+            iterations,
+        )
+        self._timed(
+            "encrypt() idempotent (déjà chiffré)",
+            lambda: crypto_fields.encrypt(token),
+            iterations,
+        )
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nGain decrypt : x{legacy / max(ring, 1e-9):.0f} (trousseau), "
+                f"x{legacy / max(cached, 1e-9):.0f} (trousseau + LRU)"
+            )
+        )
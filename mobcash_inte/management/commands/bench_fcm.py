@@ -0,0 +1,117 @@
+"""
+Benchmark de l'envoi push FCM contre un stub local (token OAuth + messages:send).
+
+Compare :
+- l'ancien chemin : un token OAuth minté par appareil + `requests.post` nu ;
+- FcmSender : token en cache (rafraîchi près de l'expiration) + session poolée.
+
+Usage :
+    python3 manage.py bench_fcm
+    python3 manage.py bench_fcm --notifications 50 --devices 3 --token-ms 80
+"""
+
+import time
+from datetime import datetime, timedelta, timezone
+
+import requests
+from django.core.management.base import BaseCommand
+
+from http_client import HttpPolicy, ProviderSession
+from mobcash_inte.fcm_service import FcmCredentials, FcmSender, build_fcm_message
+from mobcash_inte.management.stub_server import StubServer
+
+TOKEN_PATH = "/token"
+SEND_PATH = "/v1/projects/bench/messages:send"
+
+
+class _StubFcmCredentials(FcmCredentials):
+    """Credentials dont le refresh OAuth vise le stub local (pas de cache partagé)."""
+
+    def __init__(self, token_url, session):
+        super().__init__(service_account_file=None)
+        self.token_url = token_url
+        self.session = session
+
+    def _refresh(self):
+        self.session.post(self.token_url, data={"grant_type": "jwt-bearer"}).json()
+        self._token = "stub-token"
+        self._expiry = datetime.now(timezone.utc) + timedelta(hours=1)
+
+    def _load_shared(self, now):
+        return False
+
+
+class Command(BaseCommand):
+    help = "Mesure push FCM : token par appareil vs token en cache + session poolée."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--notifications", "-n", type=int, default=30)
+        parser.add_argument("--devices", "-d", type=int, default=3)
+        parser.add_argument(
+            "--token-ms",
+            type=float,
+            default=50.0,
+            help="Latence simulée du refresh OAuth Google (défaut : 50 ms)",
+        )
+        parser.add_argument(
+            "--send-ms",
+            type=float,
+            default=10.0,
+            help="Latence simulée de messages:send (défaut : 10 ms)",
+        )
+
+    def _legacy(self, server, notifications, devices):
+        for _ in range(notifications):
+            for device in range(devices):
+                requests.post(f"{server.base_url}{TOKEN_PATH}", data={"grant_type": "jwt-bearer"})
+                requests.post(
+                    f"{server.base_url}{SEND_PATH}",
+                    headers={"Authorization": "Bearer stub-token"},
+                    json=build_fcm_message(f"device-{device}", "Titre", "Contenu"),
+                )
+
+    def _pooled(self, server, notifications, devices):
+        session = ProviderSession("bench-fcm", HttpPolicy())
+        credentials = _StubFcmCredentials(f"{server.base_url}{TOKEN_PATH}", session)
+        sender = FcmSender(
+            credentials=credentials, session=session, url=f"{server.base_url}{SEND_PATH}"
+        )
+        tokens = [f"device-{device}" for device in range(devices)]
+        for _ in range(notifications):
+            sender.send_many(tokens, "Titre", "Contenu")
+        session.close()
+
+    def _measure(self, label, func, server, notifications, devices):
+        server.reset_counters()
+        start = time.perf_counter()
+        func(server, notifications, devices)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"  {label:<28} tokens={server.paths[TOKEN_PATH]:<5} "
+            f"envois={server.paths[SEND_PATH]:<5} connexions={server.connections:<5} "
+            f"durée={elapsed * 1000:9.1f} ms "
+            f"({elapsed / notifications * 1000:7.1f} ms/notification)"
+        )
+        return elapsed
+
+    def handle(self, *args, **options):
+        notifications = max(1, options["notifications"])
+        devices = max(1, options["devices"])
+        delays = {
+            TOKEN_PATH: options["token_ms"] / 1000,
+            SEND_PATH: options["send_ms"] / 1000,
+        }
+        responses = {
+            TOKEN_PATH: {"access_token": "stub-token", "expires_in": 3600},
+            SEND_PATH: {"name": "projects/bench/messages/1"},
+        }
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"▶ {notifications} notifications × {devices} appareils"
+            )
+        )
+        with StubServer(delays=delays, responses=responses) as server:
+            legacy = self._measure("token par appareil (ancien)", self._legacy, server, notifications, devices)
+            pooled = self._measure("FcmSender", self._pooled, server, notifications, devices)
+
+        self.stdout.write(self.style.SUCCESS(f"\nGain : x{legacy / max(pooled, 1e-9):.1f}"))
@@ -0,0 +1,100 @@
+"""
+Benchmark des sessions HTTP partagées (http_client) contre un serveur local.
+
+Lance un serveur HTTP/1.1 keep-alive sur 127.0.0.1 (port libre) qui simule
+la latence d'un fournisseur, puis compare :
+- `requests.post` nu (une connexion TCP par appel) ;
+- `get_session(...)` (pool keep-alive).
+
+Affiche le nombre de connexions acceptées par le serveur (≈ handshakes ;
+TLS en plus en production) et les latences p50 / p95.
+
+Usage :
+    python3 manage.py bench_http_client
+    python3 manage.py bench_http_client --requests 500 --threads 8 --delay-ms 5
+"""
+
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from http_client import HttpPolicy, ProviderSession
+from mobcash_inte.management.stub_server import StubServer
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+class Command(BaseCommand):
+    help = "Compare requests nu et sessions poolées (connexions, p50/p95)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", "-n", type=int, default=300)
+        parser.add_argument("--threads", "-t", type=int, default=8)
+        parser.add_argument(
+            "--delay-ms",
+            type=float,
+            default=2.0,
+            help="Latence simulée côté fournisseur (défaut : 2 ms)",
+        )
+
+    def _run(self, server, label, post, total, threads):
+        url = f"{server.base_url}/api/payments/"
+        server.reset_counters()
+        latencies = []
+        lock = threading.Lock()
+
+        def call(_):
+            start = time.perf_counter()
+            response = post(url, json={"amount": 1000}, timeout=(5, 30))
+            response.raise_for_status()
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies.append(elapsed)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            list(executor.map(call, range(total)))
+        wall = time.perf_counter() - start
+
+        self.stdout.write(
+            f"  {label:<22} connexions={server.connections:<5} "
+            f"p50={statistics.median(latencies):7.2f} ms  "
+            f"p95={_percentile(latencies, 95):7.2f} ms  "
+            f"débit={total / wall:8.1f} req/s"
+        )
+        return server.connections, _percentile(latencies, 95)
+
+    def handle(self, *args, **options):
+        total = max(1, options["requests"])
+        threads = max(1, options["threads"])
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(
+                f"▶ {total} POST, {threads} threads, latence fournisseur "
+                f"{options['delay_ms']} ms"
+            )
+        )
+        with StubServer(delay=options["delay_ms"] / 1000) as server:
+            bare_conn, bare_p95 = self._run(server, "requests.post nu", requests.post, total, threads)
+            session = ProviderSession("bench", HttpPolicy(pool_maxsize=threads))
+            pooled_conn, pooled_p95 = self._run(server, "session poolée", session.post, total, threads)
+            stats = session.pool_stats()
+            session.close()
+
+        self.stdout.write(
+            f"  métriques pool : {stats['new_connections']} connexions pour "
+            f"{stats['pool_requests']} requêtes (réutilisation {stats['reuse_ratio']:.1%})"
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"\nConnexions : {bare_conn} → {pooled_conn} ; "
+                f"p95 : {bare_p95:.2f} ms → {pooled_p95:.2f} ms"
+            )
+        )
@@ -0,0 +1,150 @@
+"""
+Benchmark des tâches nocturnes grant_coupon_rating_permissions et
+grant_daily_user_credits : ancienne boucle par utilisateur vs version
+ensembliste (sous-requête + update(), bulk_create par lots).
+
+Les données sont générées dans une transaction ANNULÉE à la fin : la base
+n'est pas modifiée. À lancer sur une base de dev / staging.
+
+Usage :
+    python3 manage.py bench_nightly_tasks
+    python3 manage.py bench_nightly_tasks --users 100000 --skip-legacy
+"""
+
+import time
+import uuid
+from contextlib import contextmanager
+
+from dateutil.relativedelta import relativedelta
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from accounts.models import User
+from mobcash_inte import tasks
+from mobcash_inte.models import Transaction, UserCredit
+
+
+class _Rollback(Exception):
+    pass
+
+
+@contextmanager
+def _count_queries():
+    counter = {"queries": 0}
+
+    def wrapper(execute, sql, params, many, context):
+        counter["queries"] += 1
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield counter
+
+
+def _legacy_rating_permissions():
+    one_month_ago = timezone.now() - relativedelta(months=1)
+    for user in User.objects.filter(
+        date_joined__lte=one_month_ago, can_rate_coupons=False, is_active=True, is_delete=False
+    ):
+        total = Transaction.objects.filter(
+            user=user, type_trans="deposit", status="accept"
+        ).aggregate(total=Sum("amount"))["total"] or 0
+        if total >= tasks.COUPON_RATING_MIN_DEPOSITS:
+            user.can_rate_coupons = True
+            user.save(update_fields=["can_rate_coupons"])
+
+
+def _legacy_daily_credits():
+    for user in User.objects.filter(is_active=True, is_delete=False):
+        if not UserCredit.objects.filter(user=user).exists():
+            UserCredit.objects.create(user=user, amount=tasks.DAILY_USER_CREDITS)
+
+
+class Command(BaseCommand):
+    help = "Mesure les tâches nocturnes (boucle par utilisateur vs ensembliste)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", "-u", type=int, default=100_000)
+        parser.add_argument(
+            "--skip-legacy",
+            action="store_true",
+            help="Ne mesure que la version ensembliste (l'ancienne est très lente à 100k)",
+        )
+
+    def _seed(self, total):
+        two_months_ago = timezone.now() - relativedelta(months=2)
+        batch = 5000
+        for start in range(0, total, batch):
+            users = [
+                User(
+                    id=uuid.uuid4(),
+                    username=f"bench_{start + i}_{uuid.uuid4().hex[:6]}",
+                    email=f"bench.{start + i}.{uuid.uuid4().hex[:6]}@example.com",
+                    phone="2250700000000",
+                )
+                for i in range(min(batch, total - start))
+            ]
+            User.objects.bulk_create(users, batch_size=batch)
+            # date_joined est auto_now_add : vieillissement après coup
+            User.objects.filter(pk__in=[u.pk for u in users]).update(date_joined=two_months_ago)
+            # Un utilisateur sur trois a assez de dépôts acceptés
+            Transaction.objects.bulk_create(
+                [
+                    Transaction(user=u, type_trans="deposit", status="accept", amount=20000)
+                    for u in users[::3]
+                ],
+                batch_size=batch,
+            )
+
+    def _measure(self, label, func):
+        start = time.perf_counter()
+        with _count_queries() as counter:
+            func()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(f"  {label:<46} requêtes={counter['queries']:<8} durée={elapsed:8.2f} s")
+        return elapsed
+
+    def _run(self, label, legacy, setbased, skip_legacy):
+        results = {}
+        if not skip_legacy:
+            sid = transaction.savepoint()
+            results["legacy"] = self._measure(f"{label} (boucle)", legacy)
+            transaction.savepoint_rollback(sid)
+        results["set"] = self._measure(f"{label} (ensembliste)", setbased)
+        return results
+
+    def handle(self, *args, **options):
+        total = max(1, options["users"])
+        skip_legacy = options["skip_legacy"]
+        self.stdout.write(self.style.MIGRATE_HEADING(f"▶ {total} utilisateurs générés"))
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                self._seed(total)
+                self.stdout.write(f"  génération : {time.perf_counter() - start:.1f} s\n")
+
+                rating = self._run(
+                    "grant_coupon_rating_permissions",
+                    _legacy_rating_permissions,
+                    tasks.grant_coupon_rating_permissions,
+                    skip_legacy,
+                )
+                credits = self._run(
+                    "grant_daily_user_credits",
+                    _legacy_daily_credits,
+                    tasks.grant_daily_user_credits,
+                    skip_legacy,
+                )
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        if not skip_legacy:
+            for label, result in (("permissions", rating), ("crédits", credits)):
+                self.stdout.write(
+                    self.style.SUCCESS(
+                        f"Gain {label} : x{result['legacy'] / max(result['set'], 1e-9):.1f}"
+                    )
+                )
+        self.stdout.write("Données de bench annulées (rollback).")
@@ -0,0 +1,146 @@
+"""
+Benchmark des listes de transactions avec / sans les réponses brutes des
+fournisseurs (Transaction.PAYLOAD_FIELDS : webhook_data, mobcash_response,
+connect_pro_response).
+
+Mesure :
+- la taille moyenne des charges utiles (et de la ligne complète sous PostgreSQL) ;
+- la latence de HistoryTransactionViews : colonnes complètes (?payloads=1,
+  ancien comportement) vs without_payloads() + TransactionListSerializer.
+
+Les données sont générées dans une transaction ANNULÉE à la fin : la base
+n'est pas modifiée. À lancer sur une base de dev / staging.
+
+Usage :
+    python3 manage.py bench_transaction_payloads
+    python3 manage.py bench_transaction_payloads --rows 100000 --requests 30
+"""
+
+import json
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Avg, TextField, Value
+from django.db.models.functions import Cast, Coalesce, Length
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from accounts.models import User
+from mobcash_inte.models import Transaction
+from mobcash_inte.views import HistoryTransactionViews
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _payload_values(index):
+    webhook = {"event": "payment.success", "uid": str(uuid.uuid4()), "meta": "x" * 1200}
+    return {
+        "webhook_data": json.dumps(webhook),
+        "mobcash_response": json.dumps({"Success": True, "Message": "ok", "trace": "y" * 600}),
+        "connect_pro_response": "b'" + json.dumps({"data": {"uid": str(index)}, "raw": "z" * 800}) + "'",
+        "error_message": "" if index % 10 else "Erreur fournisseur " + "e" * 300,
+        "all_status": [
+            {"status": status, "timestamp": "2026-01-01T00:00:00+00:00", "source": "WEBHOOK"}
+            for status in ("pending", "init_payment", "accept")
+        ],
+    }
+
+
+class Command(BaseCommand):
+    help = "Mesure taille des lignes et latence des listes avec / sans PAYLOAD_FIELDS."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", "-r", type=int, default=1_000_000)
+        parser.add_argument("--requests", "-n", type=int, default=20)
+        parser.add_argument("--page-size", type=int, default=50)
+
+    def _seed(self, user, total):
+        batch = 5000
+        for start in range(0, total, batch):
+            Transaction.objects.bulk_create(
+                [
+                    Transaction(
+                        user=user,
+                        type_trans="deposit",
+                        status="accept",
+                        amount=1000,
+                        reference=f"bench-{start + i}",
+                        **_payload_values(start + i),
+                    )
+                    for i in range(min(batch, total - start))
+                ],
+                batch_size=batch,
+            )
+
+    def _row_sizes(self):
+        lengths = [
+            Length(Coalesce(Cast(field, TextField()), Value("")))
+            for field in Transaction.PAYLOAD_FIELDS
+        ]
+        payload = sum(lengths[1:], lengths[0])
+        sizes = {"charges utiles": Transaction.objects.aggregate(avg=Avg(payload))["avg"] or 0}
+        if connection.vendor == "postgresql":
+            table = Transaction._meta.db_table
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT avg(pg_column_size(t.*)) FROM {table} t")
+                sizes["ligne complète"] = float(cursor.fetchone()[0] or 0)
+        return sizes
+
+    def _measure(self, label, user, requests, page_size, payloads):
+        factory = APIRequestFactory(SERVER_NAME=settings.ALLOWED_HOSTS[0])
+        view = HistoryTransactionViews.as_view()
+        params = {"page_size": page_size}
+        if payloads:
+            params["payloads"] = "1"
+        timings, size = [], 0
+        for _ in range(requests):
+            request = factory.get("/mobcash/transaction-history", params)
+            force_authenticate(request, user=user)
+            start = time.perf_counter()
+            response = view(request)
+            response.render()
+            timings.append(time.perf_counter() - start)
+            size = len(response.content)
+        median = statistics.median(timings)
+        self.stdout.write(
+            f"  {label:<32} médiane={median * 1000:8.1f} ms  "
+            f"p95={sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:8.1f} ms  "
+            f"réponse={size / 1024:7.1f} Ko"
+        )
+        return median
+
+    def handle(self, *args, **options):
+        total = max(1, options["rows"])
+        requests = max(1, options["requests"])
+        page_size = max(1, options["page_size"])
+        self.stdout.write(self.style.MIGRATE_HEADING(f"▶ {total} transactions générées"))
+        try:
+            with transaction.atomic():
+                user = User.objects.create(
+                    username=f"bench_payloads_{uuid.uuid4().hex[:6]}",
+                    email=f"bench.payloads.{uuid.uuid4().hex[:6]}@example.com",
+                    phone="2250700000000",
+                    is_staff=True,
+                )
+                start = time.perf_counter()
+                self._seed(user, total)
+                self.stdout.write(f"  génération : {time.perf_counter() - start:.1f} s\n")
+
+                for label, value in self._row_sizes().items():
+                    self.stdout.write(f"  taille moyenne {label:<16} {value:10.0f} octets")
+
+                legacy = self._measure(
+                    "colonnes complètes (?payloads=1)", user, requests, page_size, True
+                )
+                deferred = self._measure("without_payloads()", user, requests, page_size, False)
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(self.style.SUCCESS(f"\nGain : x{legacy / max(deferred, 1e-9):.1f}"))
+        self.stdout.write("Données de bench annulées (rollback).")
@@ -0,0 +1,150 @@
+"""
+Benchmark de la recherche de transactions : ancien OR de `icontains` avec
+jointures LEFT OUTER + DISTINCT (TransactionStatusHistoryView) vs
+TransactionSearch (sous-requêtes, index GIN pg_trgm).
+
+Les données sont générées dans une transaction ANNULÉE à la fin : la base
+n'est pas modifiée. À lancer sur une base PostgreSQL de dev / staging, index
+de recherche migrés (sinon les deux versions font des seq scans).
+
+Usage :
+    python3 manage.py bench_transaction_search
+    python3 manage.py bench_transaction_search --rows 5000000 --users 300000 --explain
+"""
+
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from accounts.models import User
+from mobcash_inte.models import Transaction
+from mobcash_inte.search import TransactionSearch
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_queryset(term):
+    query = Q(reference__icontains=term)
+    query |= Q(user__email__icontains=term) | Q(telegram_user__email__icontains=term)
+    query |= (
+        Q(user__first_name__icontains=term)
+        | Q(user__last_name__icontains=term)
+        | Q(telegram_user__first_name__icontains=term)
+        | Q(telegram_user__last_name__icontains=term)
+    )
+    return Transaction.objects.filter(query).distinct()
+
+
+SEARCH = TransactionSearch(
+    transaction_fields=("reference",),
+    user_fields=("email", "first_name", "last_name"),
+    telegram_user_fields=("email", "first_name", "last_name"),
+)
+
+
+class Command(BaseCommand):
+    help = "Mesure la recherche de transactions (jointures + DISTINCT vs TransactionSearch)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", "-r", type=int, default=2_000_000)
+        parser.add_argument("--users", "-u", type=int, default=200_000)
+        parser.add_argument("--repeat", "-n", type=int, default=5)
+        parser.add_argument("--explain", action="store_true", help="Affiche les plans PostgreSQL")
+
+    def _seed(self, total_users, total_rows):
+        batch = 5000
+        user_ids = []
+        for start in range(0, total_users, batch):
+            users = [
+                User(
+                    id=uuid.uuid4(),
+                    username=f"bench_search_{start + i}",
+                    email=f"client.{start + i}.{uuid.uuid4().hex[:6]}@example.com",
+                    phone=f"22507{start + i:08d}",
+                    first_name=f"Prenom{start + i}",
+                    last_name=f"Nom{start + i}",
+                )
+                for i in range(min(batch, total_users - start))
+            ]
+            User.objects.bulk_create(users, batch_size=batch)
+            user_ids.extend(u.id for u in users)
+        for start in range(0, total_rows, batch):
+            Transaction.objects.bulk_create(
+                [
+                    Transaction(
+                        user_id=user_ids[(start + i) % len(user_ids)],
+                        type_trans="deposit",
+                        status="accept",
+                        amount=1000,
+                        reference=f"DEP-{uuid.uuid4().hex[:12].upper()}",
+                        phone_number=f"07{start + i:08d}",
+                    )
+                    for i in range(min(batch, total_rows - start))
+                ],
+                batch_size=batch,
+            )
+
+    def _time(self, label, build, term, repeat, explain):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            queryset = build(term)
+            count = queryset.count()
+            list(queryset.order_by("-created_at")[:10])
+            timings.append(time.perf_counter() - start)
+        median = statistics.median(timings)
+        self.stdout.write(f"    {label:<22} {median * 1000:9.1f} ms  ({count} résultats)")
+        if explain and connection.vendor == "postgresql":
+            plan = build(term).order_by("-created_at")[:10].explain(analyze=True)
+            self.stdout.write("      " + "\n      ".join(plan.splitlines()[:12]))
+        return median
+
+    def handle(self, *args, **options):
+        total_rows = max(1, options["rows"])
+        total_users = max(1, options["users"])
+        repeat = max(1, options["repeat"])
+        self.stdout.write(
+            self.style.MIGRATE_HEADING(f"▶ {total_rows} transactions, {total_users} utilisateurs")
+        )
+        gains = []
+        try:
+            with transaction.atomic():
+                start = time.perf_counter()
+                self._seed(total_users, total_rows)
+                if connection.vendor == "postgresql":
+                    with connection.cursor() as cursor:
+                        cursor.execute("ANALYZE accounts_user, mobcash_inte_transaction")
+                self.stdout.write(f"  génération : {time.perf_counter() - start:.1f} s\n")
+
+                sample = Transaction.objects.order_by("-id").values_list("reference", flat=True).first()
+                terms = {
+                    "référence": sample[4:12],
+                    "email": f"client.{total_users // 2}.",
+                    "prénom": f"Prenom{total_users // 3}",
+                    "introuvable": "ZZZ-NOPE",
+                }
+                for label, term in terms.items():
+                    self.stdout.write(f"  {label} « {term} »")
+                    legacy = self._time("jointures + DISTINCT", _legacy_queryset, term, repeat, options["explain"])
+                    search = self._time(
+                        "TransactionSearch",
+                        lambda t: SEARCH.filter(Transaction.objects.all(), t),
+                        term,
+                        repeat,
+                        options["explain"],
+                    )
+                    gains.append(legacy / max(search, 1e-9))
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.stdout.write(
+            self.style.SUCCESS(f"\nGain médian : x{statistics.median(gains):.1f}")
+        )
+        self.stdout.write("Données de bench annulées (rollback).")
@@ -0,0 +1,119 @@
+"""
+Benchmark de strip_platform_names_for_whatsapp : ancienne version (requête
+AppName + 9 regex recompilées par message) vs PlatformNameStripper en cache.
+Vérifie aussi que les deux versions produisent exactement le même texte.
+
+Les AppName de test sont créés dans une transaction ANNULÉE à la fin : la
+base n'est pas modifiée.
+
+Usage :
+    python3 manage.py bench_whatsapp_strip
+    python3 manage.py bench_whatsapp_strip --messages 10000 --apps 40
+"""
+
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from accounts.models import AppName
+from mobcash_inte.whatsapp_service import (
+    _platform_labels,
+    bump_platform_labels_version,
+    strip_platform_names_for_whatsapp,
+)
+
+TEMPLATES = (
+    "Votre dépôt de {amount} FCFA sur votre compte {app} a été effectué avec succès.",
+    "Une erreur est survenue lors de votre dépôt de {amount} FCFA sur {app}. {app} Message: solde insuffisant.",
+    "Votre demande de retrait de {app} de {amount} FCFA est en cours de traitement .",
+    "Retrait de {amount} FCFA depuis {app} validé. Référence depot-{ref}",
+    "Bonus de {amount} FCFA crédité sur la plateforme  suite à votre parrainage.",
+    "Votre code promo est disponible, rendez-vous sur l'application pour en profiter..",
+)
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _legacy_strip(text):
+    if not text:
+        return text
+    labels = _platform_labels()
+    if not labels:
+        return text
+    names_alt = "|".join(re.escape(label) for label in labels)
+    patterns = [
+        (rf"\s+sur votre compte\s+(?:{names_alt})\b", ""),
+        (rf"\s+de votre compte\s+(?:{names_alt})\b", ""),
+        (rf"\s+depuis\s+(?:{names_alt})\b", ""),
+        (rf"\s+sur\s+(?:{names_alt})\b", ""),
+        (rf"\s+de\s+(?:{names_alt})\b", ""),
+        (rf"(?:{names_alt})\s+Message\s*:", "Message:"),
+        (rf"(?:{names_alt})\s+Message\b", "Message"),
+        (rf"(demande de (?:dépôt|retrait)(?:\s+de)?)\s+(?:{names_alt})\b", r"\1"),
+        (rf"\s+(?:{names_alt})\b", ""),
+    ]
+    result = text
+    for pattern, repl in patterns:
+        result = re.sub(pattern, repl, result, flags=re.IGNORECASE)
+    result = re.sub(r"[ \t]{2,}", " ", result)
+    result = re.sub(r"\s+\.", ".", result)
+    result = re.sub(r"\.\.+", ".", result)
+    return result.strip()
+
+
+class Command(BaseCommand):
+    help = "Mesure strip_platform_names_for_whatsapp (ancienne version vs stripper en cache)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", "-m", type=int, default=10_000)
+        parser.add_argument("--apps", "-a", type=int, default=30)
+
+    def _measure(self, label, func, messages):
+        start = time.perf_counter()
+        outputs = [func(message) for message in messages]
+        elapsed = time.perf_counter() - start
+        self.stdout.write(
+            f"  {label:<24} {elapsed * 1000:9.1f} ms  ({elapsed / len(messages) * 1e6:7.1f} µs/message)"
+        )
+        return elapsed, outputs
+
+    def handle(self, *args, **options):
+        total = max(1, options["messages"])
+        rng = random.Random(42)
+        try:
+            with transaction.atomic():
+                names = [f"benchapp{i}" for i in range(max(1, options["apps"]))]
+                AppName.objects.bulk_create([AppName(name=name) for name in names])
+                bump_platform_labels_version()
+                messages = [
+                    rng.choice(TEMPLATES).format(
+                        app=rng.choice(names).upper() if rng.random() < 0.5 else rng.choice(names),
+                        amount=rng.randint(500, 500_000),
+                        ref=rng.randint(10_000, 99_999),
+                    )
+                    for _ in range(total)
+                ]
+                self.stdout.write(
+                    self.style.MIGRATE_HEADING(f"▶ {total} messages, {len(names)} AppName de test")
+                )
+                legacy, legacy_out = self._measure("ancienne version", _legacy_strip, messages)
+                cached, cached_out = self._measure(
+                    "stripper en cache", strip_platform_names_for_whatsapp, messages
+                )
+                raise _Rollback
+        except _Rollback:
+            pass
+        bump_platform_labels_version()
+
+        diffs = sum(1 for a, b in zip(legacy_out, cached_out) if a != b)
+        if diffs:
+            self.stdout.write(self.style.ERROR(f"{diffs} message(s) différent(s) !"))
+        else:
+            self.stdout.write("  sorties identiques")
+        self.stdout.write(self.style.SUCCESS(f"\nGain : x{legacy / max(cached, 1e-9):.1f}"))
+        self.stdout.write("Données de bench annulées (rollback).")
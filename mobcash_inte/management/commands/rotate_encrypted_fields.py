@@ -0,0 +1,115 @@
+"""
+Management command : rotate_encrypted_fields
+============================================
+À lancer après un changement de SECRET_KEY : l'ancienne clé est ajoutée à
+CRYPTO_FIELDS_OLD_SECRET_KEYS (toujours acceptée au déchiffrement), puis
+cette commande re-chiffre les valeurs en DB avec la nouvelle clé. Une fois
+terminée sans valeur « clé inconnue », l'ancienne clé peut être retirée.
+
+Usage :
+    python manage.py rotate_encrypted_fields
+    python manage.py rotate_encrypted_fields --dry-run   # simulation sans écriture
+
+Champs concernés :
+    - AppName   : hash, cashierpass
+    - Setting   : connect_pro_token, connect_pro_refresh
+"""
+
+from django.core.management.base import BaseCommand
+
+from crypto_fields import needs_rotation, rotate
+
+
+class Command(BaseCommand):
+    help = "Re-chiffre les champs chiffrés en DB avec la clé primaire (SECRET_KEY)"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Simule sans écrire en DB",
+        )
+
+    def _rotate_fields(self, obj, label, fields, dry_run):
+        """Re-chiffre les `fields` de `obj` ; retourne les champs modifiés."""
+        changed = []
+        for field in fields:
+            raw = getattr(obj, field)
+            name = field.lstrip("_")
+            if not raw:
+                self.total_empty += 1
+            elif not needs_rotation(raw):
+                self.total_skipped += 1
+            else:
+                rotated = rotate(raw)
+                if rotated == raw:
+                    self.stdout.write(
+                        self.style.ERROR(f"  [{label}] {name} → clé inconnue, non re-chiffré")
+                    )
+                    self.total_unknown += 1
+                    continue
+                self.stdout.write(f"  [{label}] {name} → re-chiffrement")
+                if not dry_run:
+                    setattr(obj, field, rotated)
+                changed.append(field)
+                self.total_rotated += 1
+        return changed
+
+    def handle(self, *args, **options):
+        dry_run = options["dry_run"]
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("=== MODE DRY-RUN — aucune écriture ===\n"))
+
+        self.total_rotated = 0
+        self.total_skipped = 0
+        self.total_empty = 0
+        self.total_unknown = 0
+
+        # ── AppName ────────────────────────────────────────────────────────
+        self.stdout.write(self.style.MIGRATE_HEADING("▶ AppName (hash, cashierpass)"))
+
+        from accounts.models import AppName
+
+        app_names = AppName.objects.all()
+        self.stdout.write(f"  {app_names.count()} enregistrements trouvés")
+
+        for app in app_names.iterator():
+            changed = self._rotate_fields(app, app.name, ["_hash", "_cashierpass"], dry_run)
+            if changed and not dry_run:
+                app.save(update_fields=changed)
+
+        # ── Setting ────────────────────────────────────────────────────────
+        self.stdout.write(self.style.MIGRATE_HEADING("\n▶ Setting (connect_pro_token, connect_pro_refresh)"))
+
+        from mobcash_inte.models import Setting
+
+        settings_qs = Setting.objects.all()
+        self.stdout.write(f"  {settings_qs.count()} enregistrements trouvés")
+
+        for setting in settings_qs.iterator():
+            changed = self._rotate_fields(
+                setting,
+                f"Setting #{setting.id}",
+                ["_connect_pro_token", "_connect_pro_refresh"],
+                dry_run,
+            )
+            if changed and not dry_run:
+                setting.save(update_fields=changed)
+
+        # ── Résumé ─────────────────────────────────────────────────────────
+        self.stdout.write("")
+        self.stdout.write(self.style.SUCCESS(f"✅ Re-chiffrés  : {self.total_rotated}"))
+        self.stdout.write(self.style.WARNING(f"⏭  Déjà OK      : {self.total_skipped}"))
+        self.stdout.write(f"○  Vides/null   : {self.total_empty}")
+        if self.total_unknown:
+            self.stdout.write(
+                self.style.ERROR(
+                    f"❌ Clé inconnue : {self.total_unknown} (ne pas retirer l'ancienne clé)"
+                )
+            )
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING("\n⚠️  DRY-RUN : rien n'a été écrit en DB."))
+        else:
+            self.stdout.write(self.style.SUCCESS("\n✅ Rotation terminée."))
@@ -0,0 +1,86 @@
+"""
+Serveur HTTP local pour les benchmarks (bench_http_client, bench_fcm) et
+les tests de http_client.
+
+HTTP/1.1 keep-alive sur 127.0.0.1 (port libre), latence et code HTTP
+simulés par chemin, et compteurs : connexions TCP acceptées (≈ handshakes)
+et requêtes par chemin.
+"""
+
+from __future__ import annotations
+
+import json
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+        path = self.path.split("?")[0]
+        with self.server.lock:
+            self.server.paths[path] += 1
+        time.sleep(self.server.delays.get(path, self.server.delay))
+        payload = self.server.responses.get(path, {"status": "success"})
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(self.server.statuses.get(path, 200))
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST
+
+    def log_message(self, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        delay: float = 0.0,
+        delays: dict | None = None,
+        responses: dict | None = None,
+        statuses: dict | None = None,
+    ):
+        super().__init__(("127.0.0.1", 0), _StubHandler)
+        self.delay = delay
+        self.delays = delays or {}
+        self.responses = responses or {}
+        self.statuses = statuses or {}
+        self.connections = 0
+        self.paths: Counter = Counter()
+        self.lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+    def get_request(self):
+        request = super().get_request()
+        with self.lock:
+            self.connections += 1
+        return request
+
+    def reset_counters(self):
+        with self.lock:
+            self.connections = 0
+            self.paths.clear()
+
+    def __enter__(self):
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
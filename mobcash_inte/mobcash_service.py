@@ -1,4 +1,5 @@
 import requests
+from http_client import get_session
 from datetime import datetime
 import constant
 import base64, hashlib
@@ -78,7 +79,7 @@ class BetApp:
                 "confirm": signatures["confirm"],
             }
 
-            response = requests.post(url=url, json=data, headers=headers)
+            response = get_session("betapp").post(url=url, json=data, headers=headers)
             print(f"status {response.status_code}")
             return {
                 "code": constant.CODE_SUCCESS,
@@ -105,7 +106,7 @@ class BetApp:
                 "confirm": signatures["confirm"],
             }
 
-            response = requests.post(url=url, json=data, headers=headers)
+            response = get_session("betapp").post(url=url, json=data, headers=headers)
             return {"code": constant.CODE_SUCCESS, "data": response.json()}
 
         except requests.exceptions.RequestException as e:
@@ -129,8 +130,8 @@ class BetApp:
                 "Sign": signatures["signature"],
             }
 
-            # Utiliser requests.get avec params pour gérer correctement l'encodage
-            response = requests.get(
+            # Utiliser session.get avec params pour gérer correctement l'encodage
+            response = get_session("betapp").get(
                 url=base_url,
                 params={"confirm": signatures["confirm"], "dt": date},
                 headers=headers,
@@ -182,7 +183,7 @@ class BetApp:
             # Paramètres de la requête GET
             params = {"confirm": signatures["confirm"], "cashdeskid": self.cashdesk_id}
 
-            response = requests.get(url=base_url, params=params, headers=headers)
+            response = get_session("betapp").get(url=base_url, params=params, headers=headers)
 
             print(f"Final URL: {response.url}")  # Pour debug
             print(f"Status: {response.status_code}")  # Pour debug
@@ -215,7 +216,7 @@ class CashAPIService:
         headers = {"X-API-KEY": self.api_key}
         data = {"userId": user_id, "amount": amount}
 
-        response = requests.post(url, json=data, headers=headers, timeout=30)
+        response = get_session("betapp").post(url, json=data, headers=headers, timeout=30)
         return response.json()
 
     def process_withdrawal(self, withdrawal_id: int, code: int):
@@ -224,6 +225,6 @@ class CashAPIService:
         headers = {"X-API-KEY": self.api_key}
         data = {"withdrawalId": withdrawal_id, "code": code}
 
-        response = requests.post(url, json=data, headers=headers, timeout=30)
+        response = get_session("betapp").post(url, json=data, headers=headers, timeout=30)
         return response.json()
 
@@ -1,9 +1,13 @@
+import json
+import logging
 import uuid
 
-from django.db import models
-from django.db.models import Q
+from django.db import IntegrityError, NotSupportedError, models, transaction as db_transaction
+from django.db.models import Count, F, Func, Q, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncDate
+from django.utils import timezone
 
-from accounts.models import AppName, TelegramUser, User
+from accounts.models import AppName, TelegramUser, User, trigram_index
 import constant
 from crypto_fields import encrypt, decrypt
 
@@ -227,10 +231,69 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     title = models.CharField(max_length=100, blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # NotificationView (pagination par curseur) : admin puis utilisateur
+            models.Index(fields=["-created_at", "-id"], name="notif_created_id_idx"),
+            models.Index(
+                fields=["user", "is_read", "-created_at", "-id"],
+                name="notif_user_unread_created_idx",
+            ),
+        ]
+
     def total_unread_notification(self, user):
         return Notification.objects.filter(user=user, is_read=False).count()
 
 
+BROADCAST_CHANNELS = [
+    ("whatsapp", "WhatsApp"),
+    ("telegram", "Telegram"),
+    ("sms", "SMS"),
+]
+BROADCAST_STATUS = [
+    ("pending", "En attente"),
+    ("running", "En cours"),
+    ("completed", "Terminé"),
+    ("failed", "Échec"),
+]
+
+
+class Broadcast(models.Model):
+    """
+    Diffusion d'un message à tous les utilisateurs sur un canal externe
+    (NotificationView sans user_id). Les compteurs sent / failed sont
+    incrémentés par les tâches de lot (mobcash_inte.broadcast).
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name="broadcasts"
+    )
+    title = models.CharField(max_length=100, blank=True, null=True)
+    content = models.TextField()
+    channel = models.CharField(max_length=20, choices=BROADCAST_CHANNELS)
+    status = models.CharField(max_length=20, choices=BROADCAST_STATUS, default="pending")
+    total = models.PositiveIntegerField(default=0)
+    sent = models.PositiveIntegerField(default=0)
+    failed = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True, default="")
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        verbose_name = "Diffusion"
+        verbose_name_plural = "Diffusions"
+
+    def __str__(self):
+        return f"{self.channel} - {self.title}"
+
+    @property
+    def pending(self):
+        return max(0, self.total - self.sent - self.failed)
+
+
 NETWORK_CHOICES = [
     ("mtn", "MTN"),
     ("moov", "MOOV"),
@@ -439,6 +502,120 @@ TRANS_STATUS = [
 SOURCE_CHOICE = [("mobile", "Mobile"), ("web", "Web"), ("bot", "bot")]
 
 
+class JSONArrayAppend(Func):
+    """
+    Ajoute `entry` à la fin d'une liste JSON directement en SQL
+    (`all_status || jsonb_build_array(...)`), sans relire la colonne en Python.
+    """
+
+    output_field = models.JSONField()
+
+    def __init__(self, field, entry):
+        super().__init__(F(field), Value(json.dumps(entry, default=str)))
+
+    def _compile(self, compiler):
+        column, column_params = compiler.compile(self.source_expressions[0])
+        value, value_params = compiler.compile(self.source_expressions[1])
+        return column, value, (*column_params, *value_params)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        column, value, params = self._compile(compiler)
+        return f"(COALESCE({column}, '[]'::jsonb) || jsonb_build_array({value}::jsonb))", params
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        column, value, params = self._compile(compiler)
+        return f"json_insert(COALESCE({column}, '[]'), '$[#]', json({value}))", params
+
+    def as_sql(self, compiler, connection, **extra_context):
+        raise NotSupportedError(f"JSONArrayAppend non supporté sur {connection.vendor}")
+
+
+ERROR_STATUS_SOURCES = ("EXCEPTION", "API_ERROR", "WEBHOOK_ERROR")
+
+
+def _status_entry(new_status, source):
+    return {"status": new_status, "timestamp": timezone.now().isoformat(), "source": source}
+
+
+def _status_error_message(source, data):
+    if source in ERROR_STATUS_SOURCES and data:
+        return str(data)[:1000]
+    return None
+
+
+def _status_trigger_data(data):
+    if isinstance(data, (dict, list)):
+        return data
+    return {"raw_info": str(data)} if data else {}
+
+
+class TransactionQuerySet(models.QuerySet):
+    def without_payloads(self):
+        """Listes : ne charge pas les réponses brutes des fournisseurs (Transaction.PAYLOAD_FIELDS)."""
+        return self.defer(*self.model.PAYLOAD_FIELDS)
+
+    def bulk_change_status(
+        self,
+        ids,
+        new_status,
+        source,
+        data=None,
+        message=None,
+        from_status=None,
+        skip_locked=False,
+        batch_size=500,
+    ):
+        """
+        Équivalent de `change_status` pour une liste d'ids (admin, expiration) :
+        par lot, un seul UPDATE (statut + ajout à all_status en SQL), un
+        bulk_create de l'historique et un rollup groupé.
+        `from_status` limite aux transactions encore dans ce statut ;
+        `skip_locked` ignore les lignes verrouillées par un autre worker.
+        Retourne le nombre de transactions modifiées.
+        """
+        ids = list(ids)
+        entry = _status_entry(new_status, source)
+        updates = {"status": new_status, "all_status": JSONArrayAppend("all_status", entry)}
+        if message:
+            updates["message"] = message
+        error_message = _status_error_message(source, data)
+        if error_message:
+            updates["error_message"] = error_message
+
+        changed = 0
+        for start in range(0, len(ids), batch_size):
+            with db_transaction.atomic():
+                locked = (
+                    self.select_for_update(skip_locked=skip_locked)
+                    .filter(pk__in=ids[start:start + batch_size])
+                    .exclude(status=new_status)
+                )
+                if from_status is not None:
+                    locked = locked.filter(status=from_status)
+                rows = list(locked.order_by("pk").values_list("pk", "status"))
+                if not rows:
+                    continue
+
+                batch = self.model.objects.filter(pk__in=[pk for pk, _ in rows])
+                TransactionDailyRollup.record_bulk_transition(batch, new_status)
+                batch.update(**updates)
+                TransactionStatusHistory.objects.bulk_create(
+                    [
+                        TransactionStatusHistory(
+                            transaction_id=pk,
+                            old_status=old_status,
+                            new_status=new_status,
+                            trigger_source=source,
+                            trigger_data=_status_trigger_data(data),
+                            message=message or f"Status changed from {old_status} to {new_status} via {source}",
+                        )
+                        for pk, old_status in rows
+                    ]
+                )
+            changed += len(rows)
+        return changed
+
+
 class Transaction(models.Model):
     amount = models.PositiveIntegerField(blank=True, null=True)
     deposit_reward_amount = models.PositiveIntegerField(blank=True, null=True)
@@ -513,55 +690,106 @@ class Transaction(models.Model):
     hash = models.CharField(max_length=250, blank=True, null=True)
     fee = models.PositiveIntegerField(default=0)
 
+    objects = TransactionQuerySet.as_manager()
+
+    # Réponses brutes des fournisseurs : lues par le détail et l'admin, pas
+    # par les listes (voir without_payloads). error_message et all_status
+    # restent dans les listes, les clients les affichent.
+    PAYLOAD_FIELDS = (
+        "webhook_data",
+        "mobcash_response",
+        "connect_pro_response",
+    )
+
     class Meta:
         verbose_name = "Transaction"
         verbose_name_plural = "Transactions"
         ordering = ["-created_at"]
+        indexes = [
+            # Recherche par référence (support, webhooks, partenaires)
+            models.Index(fields=["reference"], name="trans_reference_idx"),
+            # Webhooks Connect Pro / Feexpay
+            models.Index(fields=["public_id"], name="trans_public_id_idx"),
+            # check_pending_feexpay_transactions
+            models.Index(fields=["status", "api"], name="trans_status_api_idx"),
+            # LastTransactionView, historique utilisateur
+            models.Index(
+                fields=["user", "status", "-created_at"],
+                name="trans_user_status_created_idx",
+            ),
+            # user_has_recent_accepted_deposit
+            models.Index(
+                fields=["user", "type_trans", "status", "-created_at"],
+                name="trans_user_type_status_idx",
+            ),
+            # cancel_old_pending_transactions, statistiques ; `id` inclus : les
+            # lots d'ids à annuler sont lus sans toucher à la table
+            models.Index(
+                fields=["status", "created_at"],
+                include=["id"],
+                name="trans_status_created_idx",
+            ),
+            # HistoryTransactionViews admin (pagination par curseur)
+            models.Index(fields=["-created_at", "-id"], name="trans_created_id_idx"),
+            # Recherche (mobcash_inte.search) : icontains servis par pg_trgm
+            trigram_index("reference", "trans_reference_trgm"),
+            trigram_index("phone_number", "trans_phone_trgm"),
+            trigram_index("user_app_id", "trans_user_app_id_trgm"),
+            trigram_index("public_id", "trans_public_id_trgm"),
+            # Partiel : les pending sont une petite fraction de la table
+            models.Index(
+                fields=["api", "-created_at"],
+                condition=Q(status="pending"),
+                name="trans_pending_api_created_idx",
+            ),
+        ]
 
     def __str__(self):
         return str(self.id)
 
-    def change_status(self, new_status, source, data=None, message=None, extra_fields=None):
+    def change_status(
+        self, new_status, source, data=None, message=None, extra_fields=None, old_amount=None
+    ):
         """
         Change le statut de la transaction ET crée une entrée d'audit automatiquement.
         Remplace le pattern : transaction.status = "xxx" + track_status_change() + save()
+
+        Un seul UPDATE : statut, message, `extra_fields` et ajout à all_status
+        (concaténation JSONB côté base, pas d'aller-retour de la liste).
+        `old_amount` : montant en base avant l'appel si `amount` est dans
+        `extra_fields` (rollup : l'ancien statut perd l'ancien montant).
         """
-        from django.utils import timezone as tz
         old_status = self.status
+        entry = _status_entry(new_status, source)
         self.status = new_status
-        fields_to_update = ["status"]
+        updates = {"status": new_status}
 
         if message:
             self.message = message
-            fields_to_update.append("message")
+            updates["message"] = message
 
-        if source in [
-            TransactionStatusHistory.Source.EXCEPTION,
-            TransactionStatusHistory.Source.API_ERROR,
-            TransactionStatusHistory.Source.WEBHOOK_ERROR,
-        ] and data:
-            self.error_message = str(data)[:1000]
-            fields_to_update.append("error_message")
+        error_message = _status_error_message(source, data)
+        if error_message:
+            self.error_message = error_message
+            updates["error_message"] = error_message
 
-        if extra_fields:
-            fields_to_update.extend(extra_fields)
+        for field in extra_fields or []:
+            updates[field] = getattr(self, field)
 
-        self.save(update_fields=list(set(fields_to_update)))
+        updates["all_status"] = JSONArrayAppend("all_status", entry)
+        Transaction.objects.filter(pk=self.pk).update(**updates)
+        TransactionDailyRollup.record_transition(self, old_status, new_status, old_amount=old_amount)
 
-        # Mise à jour all_status (compatibilité avec l'existant)
-        if not isinstance(self.all_status, list):
-            self.all_status = []
-        temp = list(self.all_status)
-        temp.append({"status": new_status, "timestamp": tz.now().isoformat(), "source": source})
-        self.all_status = temp
-        self.save(update_fields=["all_status"])
+        # Mise à jour all_status de l'instance (compatibilité avec l'existant)
+        all_status = self.all_status if isinstance(self.all_status, list) else []
+        self.all_status = all_status + [entry]
 
         TransactionStatusHistory.objects.create(
             transaction=self,
             old_status=old_status,
             new_status=new_status,
             trigger_source=source,
-            trigger_data=data if isinstance(data, (dict, list)) else {"raw_info": str(data)} if data else {},
+            trigger_data=_status_trigger_data(data),
             message=message or f"Status changed from {old_status} to {new_status} via {source}",
         )
 
@@ -595,6 +823,193 @@ class TransactionStatusHistory(models.Model):
         return f"{self.transaction_id} | {self.old_status} → {self.new_status} ({self.trigger_source})"
 
 
+class TransactionDailyRollup(models.Model):
+    """
+    Agrégat journalier des transactions : nombre et somme des montants par
+    (jour, app, réseau, type, statut, source).
+
+    Maintenu incrémentalement (création d'une transaction, change_status,
+    sauvegarde depuis l'admin) et reconstruit par `python manage.py backfill_transaction_rollup`.
+    Les séries de StatisticsView sont lues ici plutôt que sur Transaction.
+    """
+
+    date = models.DateField()
+    app = models.ForeignKey(
+        AppName, on_delete=models.CASCADE, blank=True, null=True, related_name="+"
+    )
+    network = models.ForeignKey(
+        Network, on_delete=models.CASCADE, blank=True, null=True, related_name="+"
+    )
+    type_trans = models.CharField(max_length=120, choices=TYPE_TRANS)
+    status = models.CharField(max_length=120, choices=TRANS_STATUS)
+    source = models.CharField(
+        max_length=120, blank=True, null=True, choices=SOURCE_CHOICE
+    )
+    count = models.IntegerField(default=0)
+    total_amount = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    KEY_FIELDS = ("date", "app_id", "network_id", "type_trans", "status", "source")
+
+    class Meta:
+        verbose_name = "Agrégat journalier transactions"
+        verbose_name_plural = "Agrégats journaliers transactions"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["date", "app", "network", "type_trans", "status", "source"],
+                name="trans_rollup_key_uniq",
+                nulls_distinct=False,
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["type_trans", "status", "date"], name="trans_rollup_series_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.date} | {self.type_trans} {self.status} : {self.count}"
+
+    @classmethod
+    def _key(cls, trans, status):
+        return (
+            timezone.localtime(trans.created_at).date(),
+            trans.app_id,
+            trans.network_id,
+            trans.type_trans,
+            status,
+            trans.source,
+        )
+
+    @classmethod
+    def apply_deltas(cls, deltas):
+        """deltas : {clé (voir KEY_FIELDS) : (nombre, montant)}"""
+        for key, (count, amount) in deltas.items():
+            if not count and not amount:
+                continue
+            lookup = dict(zip(cls.KEY_FIELDS, key))
+            increment = {
+                "count": F("count") + count,
+                "total_amount": F("total_amount") + amount,
+                "updated_at": timezone.now(),
+            }
+            if cls.objects.filter(**lookup).update(**increment):
+                continue
+            try:
+                with db_transaction.atomic():
+                    cls.objects.create(**lookup, count=count, total_amount=amount)
+            except IntegrityError:
+                # Créée entre-temps par un autre worker
+                cls.objects.filter(**lookup).update(**increment)
+
+    @classmethod
+    def _apply_on_commit(cls, deltas):
+        def apply():
+            try:
+                cls.apply_deltas(deltas)
+            except Exception as e:
+                # Jamais bloquant : la reconstruction nocturne corrige l'écart
+                logging.getLogger("mobcash_inte_backend.transactions").error(
+                    f"[ROLLUP] Mise à jour impossible: {e}", exc_info=True
+                )
+
+        db_transaction.on_commit(apply)
+
+    @classmethod
+    def _move(cls, old_key, old_amount, new_key, new_amount):
+        deltas = {new_key: (1, new_amount)}
+        if old_key is not None:
+            count, amount = deltas.get(old_key, (0, 0))
+            deltas[old_key] = (count - 1, amount - old_amount)
+        cls._apply_on_commit(deltas)
+
+    @classmethod
+    def record_transition(cls, trans, old_status, new_status, old_amount=None):
+        """
+        Déplace une transaction de old_status vers new_status (None = création).
+        `old_amount` : montant avant la transition quand elle le modifie aussi
+        (sinon le montant courant est retiré de l'ancien statut).
+        """
+        if trans.created_at is None:
+            return
+        amount = trans.amount or 0
+        old_amount = amount if old_amount is None else old_amount
+        if old_status == new_status and old_amount == amount:
+            return
+        old_key = cls._key(trans, old_status) if old_status is not None else None
+        cls._move(old_key, old_amount, cls._key(trans, new_status), amount)
+
+    @classmethod
+    def record_change(cls, old, new):
+        """
+        Sauvegarde complète (admin) : retire `old` (état lu en base avant la
+        sauvegarde) de son agrégat et ajoute `new` au sien.
+        """
+        if new.created_at is None:
+            return
+        old_key, new_key = cls._key(old, old.status), cls._key(new, new.status)
+        old_amount, amount = old.amount or 0, new.amount or 0
+        if old_key == new_key and old_amount == amount:
+            return
+        cls._move(old_key, old_amount, new_key, amount)
+
+    @classmethod
+    def _grouped(cls, queryset):
+        return (
+            queryset.order_by()
+            .annotate(day=TruncDate("created_at"))
+            .values("day", "app_id", "network_id", "type_trans", "status", "source")
+            .annotate(n=Count("id"), amount=Sum("amount"))
+        )
+
+    @classmethod
+    def record_bulk_transition(cls, queryset, new_status):
+        """
+        À appeler AVANT un `queryset.update(status=new_status)` : une requête
+        groupée calcule les deltas au lieu d'un aller-retour par transaction.
+        """
+        deltas = {}
+        for row in cls._grouped(queryset.exclude(status=new_status)):
+            amount = row["amount"] or 0
+            base = (row["day"], row["app_id"], row["network_id"], row["type_trans"])
+            for key, sign in (
+                (base + (row["status"], row["source"]), -1),
+                (base + (new_status, row["source"]), 1),
+            ):
+                count, total = deltas.get(key, (0, 0))
+                deltas[key] = (count + sign * row["n"], total + sign * amount)
+        if deltas:
+            cls._apply_on_commit(deltas)
+
+    @classmethod
+    def rebuild(cls, start=None, end=None):
+        """Recalcule les jours [start, end] depuis Transaction. Retourne le nombre de lignes."""
+        transactions = Transaction.objects.all()
+        rollups = cls.objects.all()
+        if start:
+            transactions = transactions.filter(created_at__date__gte=start)
+            rollups = rollups.filter(date__gte=start)
+        if end:
+            transactions = transactions.filter(created_at__date__lte=end)
+            rollups = rollups.filter(date__lte=end)
+
+        rows = [
+            cls(
+                date=row["day"],
+                app_id=row["app_id"],
+                network_id=row["network_id"],
+                type_trans=row["type_trans"],
+                status=row["status"],
+                source=row["source"],
+                count=row["n"],
+                total_amount=row["amount"] or 0,
+            )
+            for row in cls._grouped(transactions)
+        ]
+        with db_transaction.atomic():
+            rollups.delete()
+            cls.objects.bulk_create(rows, batch_size=1000)
+        return len(rows)
+
+
 class Bonus(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     amount = models.DecimalField(max_digits=10, decimal_places=2, blank=True, null=True)
@@ -617,7 +1032,9 @@ class Reward(models.Model):
         return self.user.referral_code
 
     def share_link(self):
-        return f"Utilisez le code {self.user.referral_code} pour bénéficier d'avantages exclusifs sur Coobet. Effectuez vos dépôts et retraits 1xbet de façon instantanée et bénéficiez de 2'%' sur chaque dépôt effectué par votre filiale. Téléchargez l'application maintenant et partagez le plaisir avec vos proches ! 📲 Lien pour télécharger l'application :\n 👉 {Setting.objects.first().dowload_apk_link}"
+        from mobcash_inte.setting_cache import get_setting
+
+        return f"Utilisez le code {self.user.referral_code} pour bénéficier d'avantages exclusifs sur Coobet. Effectuez vos dépôts et retraits 1xbet de façon instantanée et bénéficiez de 2'%' sur chaque dépôt effectué par votre filiale. Téléchargez l'application maintenant et partagez le plaisir avec vos proches ! 📲 Lien pour télécharger l'application :\n 👉 {get_setting().dowload_apk_link}"
 
     def __str__(self):
         return str(self.id)
@@ -663,6 +1080,8 @@ class WebhookLog(models.Model):
     processed_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(null=True, blank=True)
     processed = models.BooleanField(default=False)
+    # Début de la dernière prise en charge (status PROCESSING)
+    processing_started_at = models.DateTimeField(null=True, blank=True)
 
 
 class Coupon(models.Model):
@@ -699,6 +1118,8 @@ PARTNER_TRANS_STATUS = [
     ("accept", "Accept"),
     ("failed", "Failed"),
     ("annuler", "Annulé"),
+    # Appel bookmaker sans résultat (worker interrompu) : vérification manuelle
+    ("review", "À vérifier"),
 ]
 
 PARTNER_TRANS_TYPE = [
@@ -721,7 +1142,11 @@ class PartnerTransaction(models.Model):
     bet_response = models.TextField(blank=True, null=True)
     event_send = models.BooleanField(default=False)
     mobcash_api_is_call = models.BooleanField(default=False)
+    # Prise en charge (mobcash_api_is_call) : base du délai de reap_stale_partner_claims
+    claimed_at = models.DateTimeField(blank=True, null=True)
     last_xbet_trans = models.DateTimeField(blank=True, null=True)
+    # Webhook signé envoyé au partenaire à la fin du traitement (event_send)
+    callback_url = models.URLField(max_length=500, blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
     validated_at = models.DateTimeField(blank=True, null=True)
 
@@ -815,6 +1240,78 @@ class CouponRatingV2(models.Model):
         return str(self.id)
 
 
+class AuthorCouponStats(models.Model):
+    """
+    Totaux dénormalisés des coupons V2 d'un auteur (note affichée sur chaque
+    coupon). Tenus à jour par F() dans VoteCouponV2View et par les signaux
+    de création / suppression de CouponV2 ; créés à la volée depuis les
+    coupons si absents.
+    """
+
+    author = models.OneToOneField(
+        User, on_delete=models.CASCADE, primary_key=True, related_name="coupon_stats"
+    )
+    total_coupons = models.IntegerField(default=0)
+    total_likes = models.IntegerField(default=0)
+    total_dislikes = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Stats auteur coupons"
+        verbose_name_plural = "Stats auteurs coupons"
+
+    def __str__(self):
+        return f"{self.author_id} | {self.total_likes}/{self.total_dislikes}"
+
+    @property
+    def author_rating(self):
+        total_votes = self.total_likes + self.total_dislikes
+        if total_votes <= 0:
+            return 0.0
+        return round((self.total_likes / total_votes) * 5, 2)
+
+    @classmethod
+    def _totals(cls, author_id):
+        return CouponV2.objects.filter(author_id=author_id).aggregate(
+            total_coupons=Count("id"),
+            total_likes=Coalesce(Sum("likes_count"), 0),
+            total_dislikes=Coalesce(Sum("dislikes_count"), 0),
+        )
+
+    @classmethod
+    def for_author(cls, author):
+        """Stats de l'auteur ; calculées depuis ses coupons à la première lecture."""
+        stats = cls.objects.filter(author=author).first()
+        if stats is None:
+            stats, _ = cls.objects.get_or_create(author=author, defaults=cls._totals(author.pk))
+        return stats
+
+    @classmethod
+    def apply(cls, author_id, coupons=0, likes=0, dislikes=0):
+        """
+        Incrément atomique, borné à 0 comme les compteurs du coupon ; sans
+        ligne, for_author() la calculera plus tard.
+        """
+        if not author_id or not (coupons or likes or dislikes):
+            return
+
+        def counter(field, delta):
+            if delta >= 0:
+                return F(field) + delta
+            return Greatest(F(field) + delta, Value(0))
+
+        cls.objects.filter(author_id=author_id).update(
+            total_coupons=counter("total_coupons", coupons),
+            total_likes=counter("total_likes", likes),
+            total_dislikes=counter("total_dislikes", dislikes),
+            updated_at=timezone.now(),
+        )
+
+    @classmethod
+    def rebuild(cls, author_id):
+        cls.objects.update_or_create(author_id=author_id, defaults=cls._totals(author_id))
+
+
 class CouponWallet(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='coupon_wallet')
@@ -0,0 +1,229 @@
+"""
+Authentification et limitation de débit de l'API partenaire
+(CreatePartnerTransactionView, PartnerTransactionStatusView).
+
+Avant : une requête `User` sur (secret_key, public_key, is_partner, is_block)
+à chaque appel, secret comparé en clair dans le SQL. Ici :
+
+- le secret n'est plus stocké qu'en empreinte SHA-256 (`secret_key_hash`),
+  comparée en temps constant (hmac.compare_digest) ; il n'est montré qu'une
+  fois, à la génération. Les anciens secrets en clair sont convertis au
+  premier appel réussi ;
+- le partenaire est mis en cache par clé publique : copie locale au process
+  (PARTNER_AUTH_LOCAL_TTL) puis cache partagé Redis (PARTNER_AUTH_TTL), clé
+  inconnue comprise. Seuls l'id et l'empreinte du secret sont cachés
+  (jamais l'objet User ni un secret en clair) ; authenticate_partner renvoie
+  un User minimal reconstruit. Chaque entrée porte un numéro de version
+  partagé, incrémenté par le post_save d'un partenaire (RegenerateKey,
+  blocage / déblocage, admin) : toutes les entrées deviennent obsolètes
+  d'un coup ;
+- un seau à jetons par partenaire (PARTNER_RATE_LIMIT, script Lua atomique
+  sous Redis, seau local au process sinon) renvoie 429 aux rafales.
+"""
+
+import hashlib
+import hmac
+import logging
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+
+from accounts.models import User
+from mobcash_inte.local_cache import VersionedLocalCache
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+PARTNER_AUTH_PREFIX = "mobcash:partner_auth"
+PARTNER_AUTH_VERSION_KEY = f"{PARTNER_AUTH_PREFIX}:version"
+PARTNER_AUTH_TTL = 60
+PARTNER_AUTH_LOCAL_TTL = 10
+PARTNER_AUTH_VERSION_CHECK = 1.0
+PARTNER_AUTH_LOCAL_MAX_ENTRIES = 1000
+PARTNER_RATE_LIMIT_PREFIX = "mobcash:partner_rate"
+# Jetons par seconde et taille du seau, par partenaire
+DEFAULT_PARTNER_RATE_LIMIT = {"rate": 10, "burst": 20}
+
+
+def hash_secret(secret: str) -> str:
+    # Secret aléatoire de 256 bits : un SHA-256 suffit, pas besoin d'un KDF lent
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def set_partner_keys(user, keys: dict):
+    """
+    Affecte une nouvelle paire de clés (sans sauvegarder) : seule l'empreinte
+    du secret est gardée. Retourne les update_fields à sauvegarder.
+    """
+    user.public_key = keys["public_key"]
+    user.secret_key_hash = hash_secret(keys["secret_key"])
+    user.secret_key = None
+    return ["public_key", "secret_key_hash", "secret_key"]
+
+
+# --- Cache des partenaires --------------------------------------------------
+
+
+_local_cache = VersionedLocalCache(
+    PARTNER_AUTH_VERSION_KEY,
+    ttl=PARTNER_AUTH_LOCAL_TTL,
+    version_check=PARTNER_AUTH_VERSION_CHECK,
+    max_entries=PARTNER_AUTH_LOCAL_MAX_ENTRIES,
+)
+
+
+def bump_partner_auth_version():
+    """Invalide les partenaires en cache dans TOUS les process."""
+    _local_cache.bump()
+
+
+def _shared_key(public_key):
+    return f"{PARTNER_AUTH_PREFIX}:{hashlib.sha1(public_key.encode()).hexdigest()}"
+
+
+def _load_entry(public_key):
+    row = (
+        User.objects.filter(public_key=public_key, is_partner=True, is_block=False)
+        .values("id", "secret_key", "secret_key_hash")
+        .first()
+    )
+    if row is None:
+        return {"user_id": None, "secret_hash": None, "legacy": False}
+    if row["secret_key_hash"]:
+        return {"user_id": row["id"], "secret_hash": row["secret_key_hash"], "legacy": False}
+    # Ancien secret en clair : seule son empreinte entre dans le cache
+    secret_hash = hash_secret(row["secret_key"]) if row["secret_key"] else None
+    return {"user_id": row["id"], "secret_hash": secret_hash, "legacy": True}
+
+
+def _load_shared_entry(public_key, version):
+    """Entrée du cache partagé si elle est à la version courante, sinon depuis la base."""
+    try:
+        shared = cache.get(_shared_key(public_key))
+        if shared and shared.get("version") == version:
+            return shared
+    except Exception as e:
+        logger.warning(f"[PARTNER_AUTH] Lecture cache impossible: {e}")
+    entry = {**_load_entry(public_key), "version": version}
+    try:
+        cache.set(_shared_key(public_key), entry, timeout=PARTNER_AUTH_TTL)
+    except Exception as e:
+        logger.warning(f"[PARTNER_AUTH] Écriture cache impossible: {e}")
+    return entry
+
+
+def _get_entry(public_key):
+    return _local_cache.get(public_key, lambda version: _load_shared_entry(public_key, version))
+
+
+def _upgrade_legacy_secret(user, secret_key):
+    user.secret_key_hash = hash_secret(secret_key)
+    User.objects.filter(pk=user.pk).update(secret_key_hash=user.secret_key_hash, secret_key=None)
+    # update() ne déclenche pas post_save : invalidation explicite
+    db_transaction.on_commit(bump_partner_auth_version)
+
+
+def authenticate_partner(public_key, secret_key):
+    """
+    Partenaire actif correspondant aux clés, ou None. Le User renvoyé est
+    minimal (pk, clé publique, empreinte) : suffisant pour les FK et les
+    filtres ; refresh_from_db() pour les autres champs.
+    """
+    if not public_key or not secret_key:
+        return None
+    entry = _get_entry(public_key)
+    if entry["user_id"] is None or not entry["secret_hash"]:
+        return None
+    if not hmac.compare_digest(entry["secret_hash"], hash_secret(secret_key)):
+        return None
+    user = User(
+        pk=entry["user_id"],
+        public_key=public_key,
+        secret_key_hash=None if entry["legacy"] else entry["secret_hash"],
+        is_partner=True,
+        is_block=False,
+    )
+    user._state.adding = False  # ligne existante : save() fera un UPDATE
+    if entry["legacy"]:
+        _upgrade_legacy_secret(user, secret_key)
+    return user
+
+
+# --- Seau à jetons ----------------------------------------------------------
+
+_TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local data = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(data[1]) or burst
+local ts = tonumber(data[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return {allowed, tostring(tokens)}
+"""
+
+_local_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def _rate_limit():
+    return {**DEFAULT_PARTNER_RATE_LIMIT, **getattr(settings, "PARTNER_RATE_LIMIT", {})}
+
+
+def _redis_client():
+    """Client redis-py du cache par défaut, None si le cache n'est pas Redis."""
+    client = getattr(cache, "_cache", None)
+    if client is None or not hasattr(client, "get_client"):
+        return None
+    try:
+        return client.get_client(write=True)
+    except Exception:
+        return None
+
+
+def _take_local(key, rate, burst, now):
+    with _buckets_lock:
+        tokens, ts = _local_buckets.get(key, (burst, now))
+        tokens = min(burst, tokens + max(0.0, now - ts) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        _local_buckets[key] = (tokens, now)
+    return allowed, tokens
+
+
+def take_partner_token(partner_id):
+    """
+    Consomme un jeton du partenaire. Retourne (autorisé, retry_after en s).
+    Redis indisponible : seau local au process plutôt qu'un refus.
+    """
+    limits = _rate_limit()
+    rate, burst = float(limits["rate"]), float(limits["burst"])
+    if rate <= 0:
+        return True, 0
+    key = f"{PARTNER_RATE_LIMIT_PREFIX}:{partner_id}"
+    now = time.time()
+    client = _redis_client()
+    allowed = None
+    if client is not None:
+        try:
+            result, tokens = client.eval(
+                _TOKEN_BUCKET_LUA, 1, cache.make_key(key), rate, burst, now
+            )
+            allowed, tokens = bool(int(result)), float(tokens)
+        except Exception as e:
+            logger.warning(f"[PARTNER_AUTH] Seau Redis indisponible: {e}")
+    if allowed is None:
+        allowed, tokens = _take_local(key, rate, burst, now)
+    retry_after = 0 if allowed else math.ceil((1 - tokens) / rate)
+    return allowed, retry_after
@@ -0,0 +1,343 @@
+"""
+Exécution des transactions partenaire (CreatePartnerTransactionView).
+
+L'appel bookmaker (`recharge_account` / `withdraw_from_account`) ou
+MobCashExternalService (timeout 300 s) peut durer plusieurs minutes. En mode
+asynchrone (`?async=1`) la vue répond 202 avec la référence ; l'appel tourne
+dans la file Celery « partner » (task_routes de mobcash_inte_backend/celery.py)
+et le partenaire suit le résultat via PartnerTransactionStatusView
+(?reference=) ou reçoit un webhook signé sur `callback_url`.
+
+- `mobcash_api_is_call` sert de verrou : un UPDATE conditionnel réserve la
+  transaction avant l'appel externe (`claimed_at`), une tâche rejouée ne
+  paie jamais deux fois ;
+- si le worker meurt après la réservation, la transaction resterait pending :
+  reap_stale_partner_claims (Celery Beat) la passe en « review » après
+  PARTNER_CLAIM_STALE_AFTER, alerte sur Telegram et envoie le webhook ; une
+  transaction asynchrone jamais réservée dans ce délai (file « partner » sans
+  worker) est annulée, le bookmaker n'ayant pas été appelé ;
+- webhook : POST JSON avec l'en-tête
+      X-Mobcash-Signature: t=<timestamp>,v1=<hex HMAC-SHA256>
+  calculé sur « <timestamp>.<corps> » avec pour clé le SHA-256 hexadécimal
+  du secret partenaire (le partenaire le recalcule depuis son secret ;
+  nous ne stockons que cette empreinte). `event_send` passe à True sur 2xx
+  pour le statut envoyé et repart à False quand le résultat final remplace
+  « review » (webhook « review » puis « completed ») ;
+- `callback_url` est fournie par le partenaire (risque SSRF) : https
+  obligatoire, et avant chaque envoi toutes les adresses résolues doivent
+  être publiques (ni privée, ni loopback, ni link-local...), sans suivre de
+  redirection.
+"""
+
+import hashlib
+import hmac
+import ipaddress
+import json
+import logging
+import socket
+import time
+from datetime import timedelta
+from urllib.parse import urlparse
+
+from django.db.models import Q
+from django.utils import timezone
+
+from http_client import get_session
+from mobcash_inte.helpers import resolve_api_service, send_telegram_message
+from mobcash_inte.models import PartnerTransaction
+from mobcash_inte.partner_auth import hash_secret
+
+connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+WEBHOOK_SIGNATURE_HEADER = "X-Mobcash-Signature"
+WEBHOOK_EVENT = "partner_transaction.completed"
+WEBHOOK_REVIEW_EVENT = "partner_transaction.review"
+# Appel externe (300 s max) + CELERY_TASK_TIME_LIMIT (600 s), avec marge
+PARTNER_CLAIM_STALE_AFTER = timedelta(minutes=15)
+PARTNER_CLAIM_REAP_BATCH = 100
+
+
+def _run_deposit(transaction):
+    from mobcash_external_service import MobCashExternalService
+
+    servculAPI = resolve_api_service(transaction.app)
+    if servculAPI:
+        response = servculAPI.recharge_account(
+            amount=float(transaction.amount), userid=transaction.user_app_id
+        )
+        xbet_data = response.get("data") if "data" in response and "code" in response else response
+    else:
+        xbet_data = MobCashExternalService().create_deposit(transaction=transaction)
+
+    if xbet_data.get("Success") == True or str(xbet_data.get("Success", "")).lower() == "true":
+        transaction.status = "accept"
+        transaction.validated_at = timezone.now()
+    else:
+        transaction.status = "failed"
+        transaction.bet_response = str(xbet_data.get("Message", ""))
+
+
+def _run_withdrawal(transaction):
+    from mobcash_external_service import MobCashExternalService
+
+    servculAPI = resolve_api_service(transaction.app)
+    if servculAPI:
+        response = servculAPI.withdraw_from_account(
+            userid=transaction.user_app_id, code=transaction.withdriwal_code
+        )
+        xbet_data = response.get("data") if "data" in response and "code" in response else response
+    else:
+        xbet_data = MobCashExternalService().create_withdrawal(transaction=transaction)
+
+    if str(xbet_data.get("Success", "")).lower() == "true":
+        amount = float(xbet_data.get("Summa", transaction.amount)) * (-1)
+        transaction.amount = abs(amount)
+        transaction.status = "accept"
+        transaction.validated_at = timezone.now()
+    else:
+        transaction.status = "failed"
+        transaction.bet_response = str(xbet_data.get("Message", ""))
+
+
+def execute_partner_transaction(transaction_id):
+    """
+    Appelle le bookmaker / MobCash pour une transaction partenaire en attente
+    et enregistre le résultat. Sans effet si elle a déjà été prise en charge.
+    """
+    claimed = PartnerTransaction.objects.filter(
+        pk=transaction_id, status="pending", mobcash_api_is_call=False
+    ).update(mobcash_api_is_call=True, claimed_at=timezone.now())
+    transaction = PartnerTransaction.objects.select_related("app").get(pk=transaction_id)
+    if not claimed:
+        connect_pro_logger.warning(
+            f"[PARTNER] Transaction {transaction.reference} déjà prise en charge, appel ignoré."
+        )
+        return transaction
+
+    if transaction.type_trans == "withdrawal" and transaction.validated_at:
+        connect_pro_logger.warning(
+            f"[VALIDATION_CHECK] La transaction partenaire {transaction.id} (ref: {transaction.reference}) "
+            f"a déjà été validée. Arrêt du processus."
+        )
+        transaction.status = "accept"
+        return _save_result(transaction)
+
+    try:
+        if transaction.type_trans == "deposit":
+            _run_deposit(transaction)
+        else:
+            _run_withdrawal(transaction)
+    except Exception as e:
+        transaction.status = "failed"
+        transaction.bet_response = str(e)
+
+    return _save_result(transaction)
+
+
+def _save_result(transaction):
+    """
+    Enregistre le résultat de l'appel externe, seulement si la transaction est
+    encore pending ou passée en « review » entre-temps (reap_stale_partner_claims
+    pendant un appel très long) : le vrai résultat remplace alors « review ».
+    `event_send` repart à False pour que le webhook du résultat final parte.
+    """
+    updated = PartnerTransaction.objects.filter(
+        pk=transaction.pk, status__in=("pending", "review")
+    ).update(
+        status=transaction.status,
+        bet_response=transaction.bet_response,
+        amount=transaction.amount,
+        validated_at=transaction.validated_at,
+        event_send=False,
+    )
+    if not updated:
+        connect_pro_logger.error(
+            f"[PARTNER] Résultat {transaction.status} de {transaction.reference} non enregistré : "
+            f"statut modifié pendant l'appel"
+        )
+    transaction.refresh_from_db()
+    return transaction
+
+
+class UnsafeCallbackUrl(ValueError):
+    """callback_url refusée : pas https ou adresse non publique."""
+
+
+def _check_public_address(address):
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if not ip.is_global or ip.is_multicast:
+        raise UnsafeCallbackUrl(f"callback_url pointe vers une adresse non publique ({ip})")
+
+
+def check_callback_url(url, resolve=True):
+    """
+    Lève UnsafeCallbackUrl si `url` n'est pas en https ou vise une adresse non
+    publique. `resolve=False` (création) : seuls le schéma et une IP littérale
+    sont vérifiés ; la résolution DNS est refaite avant chaque envoi.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme != "https" or not parsed.hostname:
+        raise UnsafeCallbackUrl("callback_url doit être une URL https")
+    try:
+        _check_public_address(parsed.hostname)
+        return
+    except UnsafeCallbackUrl:
+        raise
+    except ValueError:
+        pass  # nom d'hôte, pas une IP littérale
+    if not resolve:
+        return
+    for *_, sockaddr in socket.getaddrinfo(
+        parsed.hostname, parsed.port or 443, proto=socket.IPPROTO_TCP
+    ):
+        _check_public_address(sockaddr[0])
+
+
+def partner_signing_key(partner):
+    """Clé HMAC du webhook : SHA-256 hexadécimal du secret partenaire."""
+    if partner.secret_key_hash:
+        return partner.secret_key_hash
+    return hash_secret(partner.secret_key) if partner.secret_key else None
+
+
+def sign_webhook(key, body: bytes, timestamp: int) -> str:
+    digest = hmac.new(key.encode(), f"{timestamp}.".encode() + body, hashlib.sha256).hexdigest()
+    return f"t={timestamp},v1={digest}"
+
+
+def deliver_partner_webhook(transaction_id):
+    """
+    Envoie le webhook de fin de traitement. Retourne True (livré), False
+    (à réessayer) ou None (rien à envoyer).
+    """
+    from mobcash_inte.serializers import PartnerTransactionSerializer
+
+    transaction = (
+        PartnerTransaction.objects.select_related("partner").filter(pk=transaction_id).first()
+    )
+    if not transaction or not transaction.callback_url or transaction.event_send:
+        return None
+    if transaction.status == "pending":
+        return None
+    key = partner_signing_key(transaction.partner)
+    if not key:
+        connect_pro_logger.warning(f"[PARTNER] Pas de secret pour signer le webhook {transaction.reference}")
+        return None
+
+    event = WEBHOOK_REVIEW_EVENT if transaction.status == "review" else WEBHOOK_EVENT
+    body = json.dumps(
+        {"event": event, "data": PartnerTransactionSerializer(transaction).data},
+        default=str,
+        separators=(",", ":"),
+    ).encode()
+    headers = {
+        "Content-Type": "application/json",
+        WEBHOOK_SIGNATURE_HEADER: sign_webhook(key, body, int(time.time())),
+    }
+    try:
+        check_callback_url(transaction.callback_url)
+    except UnsafeCallbackUrl as e:
+        connect_pro_logger.warning(f"[PARTNER] Webhook {transaction.reference} refusé: {e}")
+        return None
+    except OSError as e:
+        connect_pro_logger.error(f"[PARTNER] Webhook {transaction.reference}: résolution DNS impossible: {e}")
+        return False
+    try:
+        response = get_session("partner_webhook").post(
+            transaction.callback_url, data=body, headers=headers, allow_redirects=False
+        )
+    except Exception as e:
+        connect_pro_logger.error(f"[PARTNER] Webhook {transaction.reference} en échec: {e}")
+        return False
+    if 200 <= response.status_code < 300:
+        # Seulement pour le statut envoyé : si le résultat final a remplacé
+        # « review » pendant l'envoi, son webhook reste à livrer
+        PartnerTransaction.objects.filter(pk=transaction.pk, status=transaction.status).update(
+            event_send=True
+        )
+        return True
+    connect_pro_logger.warning(
+        f"[PARTNER] Webhook {transaction.reference} refusé: {response.status_code} {response.text[:200]}"
+    )
+    return False
+
+
+def schedule_partner_webhook(transaction):
+    """Planifie le webhook (file « partner ») ; broker indisponible : journalisé."""
+    from mobcash_inte.tasks import send_partner_webhook
+
+    if not transaction.callback_url:
+        return
+    try:
+        send_partner_webhook.delay(transaction.id)
+    except Exception as e:
+        connect_pro_logger.error(f"[PARTNER] Webhook {transaction.reference} non planifié: {e}")
+
+
+def reap_stale_partner_claims():
+    """
+    Transactions toujours pending après PARTNER_CLAIM_STALE_AFTER :
+
+    - réservées (worker mort pendant l'appel bookmaker) : on ne sait pas si
+      le compte a été crédité, elles passent en « review » pour vérification
+      manuelle (pas de nouvel appel) ;
+    - jamais réservées (tâche asynchrone jamais consommée) : le bookmaker n'a
+      pas été appelé, elles sont annulées et ne seront plus exécutées.
+
+    Alerte Telegram et webhook dans les deux cas.
+    """
+    cutoff = timezone.now() - PARTNER_CLAIM_STALE_AFTER
+    pending = PartnerTransaction.objects.filter(status="pending")
+    claimed_ids = list(
+        pending.filter(mobcash_api_is_call=True)
+        .filter(Q(claimed_at__lt=cutoff) | Q(claimed_at__isnull=True, created_at__lt=cutoff))
+        .values_list("id", flat=True)[:PARTNER_CLAIM_REAP_BATCH]
+    )
+    unclaimed_ids = list(
+        pending.filter(mobcash_api_is_call=False, created_at__lt=cutoff).values_list(
+            "id", flat=True
+        )[:PARTNER_CLAIM_REAP_BATCH]
+    )
+    if not claimed_ids and not unclaimed_ids:
+        return 0
+    # Conditionnels : une tâche qui vient de finir (ou de réserver) garde la main
+    if claimed_ids:
+        PartnerTransaction.objects.filter(
+            pk__in=claimed_ids, status="pending", mobcash_api_is_call=True
+        ).update(
+            status="review",
+            bet_response="Aucun résultat de l'appel bookmaker (traitement interrompu), vérification manuelle requise",
+        )
+    if unclaimed_ids:
+        PartnerTransaction.objects.filter(
+            pk__in=unclaimed_ids, status="pending", mobcash_api_is_call=False
+        ).update(
+            status="annuler",
+            bet_response="Non exécutée dans le délai (file « partner » indisponible), bookmaker non appelé",
+        )
+    reviewed = list(PartnerTransaction.objects.filter(pk__in=claimed_ids, status="review"))
+    cancelled = list(PartnerTransaction.objects.filter(pk__in=unclaimed_ids, status="annuler"))
+    if not reviewed and not cancelled:
+        return 0
+
+    lines = []
+    if reviewed:
+        references = ", ".join(transaction.reference for transaction in reviewed)
+        connect_pro_logger.warning(f"[PARTNER] {len(reviewed)} transaction(s) à vérifier: {references}")
+        lines.append(
+            f"⚠️ {len(reviewed)} transaction(s) partenaire sans résultat bookmaker, "
+            f"à vérifier manuellement :\n{references}"
+        )
+    if cancelled:
+        references = ", ".join(transaction.reference for transaction in cancelled)
+        connect_pro_logger.error(
+            f"[PARTNER] {len(cancelled)} transaction(s) jamais exécutée(s), annulée(s): {references}"
+        )
+        lines.append(
+            f"❌ {len(cancelled)} transaction(s) partenaire jamais exécutée(s) "
+            f"(worker « partner » arrêté ?), annulée(s) :\n{references}"
+        )
+    send_telegram_message(content="\n\n".join(lines))
+    for transaction in reviewed + cancelled:
+        schedule_partner_webhook(transaction)
+    return len(reviewed) + len(cancelled)
@@ -0,0 +1,79 @@
+"""
+Recherche de transactions (HistoryTransactionViews, TransactionStatusHistoryView).
+
+Chaque champ est cherché en `icontains`, servi sous PostgreSQL par les index
+GIN pg_trgm (accounts.models.trigram_index). Les champs utilisateur / Telegram
+passent par des sous-requêtes `user_id IN (...)` plutôt que par des jointures
+LEFT OUTER : chaque table utilise son propre index, les résultats sont
+combinés en BitmapOr, sans DISTINCT.
+"""
+
+from django.db.models import Q
+from rest_framework.filters import SearchFilter
+
+from accounts.models import TelegramUser, User
+
+NAME_FIELDS = ("first_name", "last_name")
+
+
+class TransactionSearch:
+    """
+    Backend de recherche : `transaction_fields` sur Transaction, `user_fields`
+    sur User et `telegram_user_fields` sur TelegramUser. Si first_name et
+    last_name sont tous deux cherchés, « Jean Dupont » cherche « Jean » dans
+    le prénom ET « Dupont » dans le nom.
+    """
+
+    def __init__(
+        self,
+        transaction_fields=("reference", "phone_number", "user_app_id", "public_id"),
+        user_fields=("email",),
+        telegram_user_fields=(),
+    ):
+        self.transaction_fields = tuple(transaction_fields)
+        self.user_fields = tuple(user_fields)
+        self.telegram_user_fields = tuple(telegram_user_fields)
+
+    def _fields_q(self, fields, term):
+        query = Q()
+        parts = term.split()
+        split_names = len(parts) >= 2 and all(name in fields for name in NAME_FIELDS)
+        for field in fields:
+            if split_names and field in NAME_FIELDS:
+                continue
+            query |= Q(**{f"{field}__icontains": term})
+        if split_names:
+            query |= Q(first_name__icontains=parts[0], last_name__icontains=" ".join(parts[1:]))
+        return query
+
+    def q(self, term):
+        term = term.strip()
+        query = Q()
+        for field in self.transaction_fields:
+            query |= Q(**{f"{field}__icontains": term})
+        if self.user_fields:
+            users = User.objects.filter(self._fields_q(self.user_fields, term))
+            query |= Q(user_id__in=users.values("pk"))
+        if self.telegram_user_fields:
+            telegram_users = TelegramUser.objects.filter(
+                self._fields_q(self.telegram_user_fields, term)
+            )
+            query |= Q(telegram_user_id__in=telegram_users.values("pk"))
+        return query
+
+    def filter(self, queryset, term):
+        if not term or not term.strip():
+            return queryset
+        return queryset.filter(self.q(term))
+
+
+class TransactionSearchFilter(SearchFilter):
+    """
+    SearchFilter DRF (même paramètre ?search=) délégué au `search_backend`
+    de la vue (TransactionSearch par défaut).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        term = request.query_params.get(self.search_param, "")
+        backend = getattr(view, "search_backend", None) or TransactionSearch()
+        return backend.filter(queryset, term)
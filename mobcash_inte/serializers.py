@@ -8,7 +8,9 @@ from mobcash_inte.models import (
     TRANS_STATUS,
     AuthorComment,
     AuthorCouponRating,
+    AuthorCouponStats,
     Bonus,
+    Broadcast,
     Caisse,
     Coupon,
     CouponPayout,
@@ -30,6 +32,7 @@ from mobcash_inte.models import (
     UploadFile,
     UserPhone,
 )
+from mobcash_inte.setting_cache import get_setting
 from dateutil.relativedelta import relativedelta
 from django.utils import timezone
 
@@ -65,6 +68,14 @@ class NetworkSerializer(serializers.ModelSerializer):
         fields = "__all__"
 
 
+class BroadcastSerializer(serializers.ModelSerializer):
+    pending = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Broadcast
+        fields = "__all__"
+
+
 class SendNotificationSerializer(serializers.Serializer):
     content = serializers.CharField()
     title = serializers.CharField()
@@ -295,6 +306,14 @@ class TransactionDetailsSerializer(serializers.ModelSerializer):
         return None
 
 
+class TransactionListSerializer(TransactionDetailsSerializer):
+    """Listes : TransactionDetailsSerializer sans Transaction.PAYLOAD_FIELDS."""
+
+    class Meta:
+        model = Transaction
+        exclude = Transaction.PAYLOAD_FIELDS
+
+
 class DepositTransactionSerializer(serializers.ModelSerializer):
     user = SmallUserSerializer(read_only=True)
 
@@ -320,7 +339,7 @@ class DepositTransactionSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, data):
-        setting = Setting.objects.first()
+        setting = get_setting()
 
         # Vérifie s'il y a une transaction acceptée dans les 5 dernières minutes
         transaction = Transaction.objects.filter(
@@ -495,7 +514,7 @@ class BotDepositTransactionSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, data):
-        setting = Setting.objects.first()
+        setting = get_setting()
 
         # Vérifie s'il y a une transaction acceptée dans les 5 dernières minutes
         transaction = Transaction.objects.filter(
@@ -610,7 +629,7 @@ class BonusTransactionSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, data):
-        setting = Setting.objects.first()
+        setting = get_setting()
         user = self.context.get("request").user
 
         # Vérifie s'il y a une transaction acceptée dans les 5 dernières minutes
@@ -685,7 +704,7 @@ class PartnerTransactionSerializer(serializers.ModelSerializer):
             "id", "user_id", "betapp", "network", "type_trans", "amount", "withdriwal_code",
             "external_reference", "reference", "status", "bet_response",
             "event_send", "mobcash_api_is_call", "last_xbet_trans",
-            "created_at", "validated_at", "partner",
+            "callback_url", "created_at", "validated_at", "partner",
         ]
         read_only_fields = [
             "partner", "reference", "status", "bet_response",
@@ -693,6 +712,16 @@ class PartnerTransactionSerializer(serializers.ModelSerializer):
             "created_at", "validated_at",
         ]
 
+    def validate_callback_url(self, value):
+        from mobcash_inte.partner_transactions import UnsafeCallbackUrl, check_callback_url
+
+        if value:
+            try:
+                check_callback_url(value, resolve=False)
+            except UnsafeCallbackUrl as e:
+                raise serializers.ValidationError(str(e))
+        return value
+
     def validate(self, data):
         type_trans = data.get("type_trans")
         amount = data.get("amount")
@@ -730,30 +759,35 @@ class CouponV2Serializer(serializers.ModelSerializer):
     def get_author_rating(self, obj):
         if not obj.author:
             return 0.0
-        author_coupons = CouponV2.objects.filter(author=obj.author)
-        total_likes = sum(c.likes_count for c in author_coupons)
-        total_dislikes = sum(c.dislikes_count for c in author_coupons)
-        total_votes = total_likes + total_dislikes
-        if total_votes == 0:
-            return 0.0
-        return round((total_likes / total_votes) * 5, 2)
+        # Pré-chargé par select_related("author__coupon_stats") dans les listes
+        try:
+            stats = obj.author.coupon_stats
+        except AuthorCouponStats.DoesNotExist:
+            stats = AuthorCouponStats.for_author(obj.author)
+        return stats.author_rating
 
     def get_author_coupon_points(self, obj):
         if obj.author:
             return float(obj.author.coupon_points or 0)
         return 0
 
-    def get_user_liked(self, obj):
+    def _user_vote(self, obj):
+        """True (like), False (dislike) ou None ; votes pré-chargés par la vue si possible."""
         request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return CouponRatingV2.objects.filter(user=request.user, coupon=obj, is_like=True).exists()
-        return False
+        if not (request and request.user.is_authenticated):
+            return None
+        ratings = getattr(obj, 'user_ratings', None)
+        if ratings is None:
+            ratings = CouponRatingV2.objects.filter(user=request.user, coupon=obj)
+        for rating in ratings:
+            return rating.is_like
+        return None
+
+    def get_user_liked(self, obj):
+        return self._user_vote(obj) is True
 
     def get_user_disliked(self, obj):
-        request = self.context.get('request')
-        if request and request.user.is_authenticated:
-            return CouponRatingV2.objects.filter(user=request.user, coupon=obj, is_like=False).exists()
-        return False
+        return self._user_vote(obj) is False
 
     def get_total_ratings(self, obj):
         return obj.likes_count + obj.dislikes_count
@@ -908,7 +942,7 @@ class CryptoBuyTransactionSerializer(serializers.ModelSerializer):
         }
 
     def validate(self, data):
-        setting = Setting.objects.first()
+        setting = get_setting()
         type_trans = self.context.get("type_trans")
         crypto = self.context.get("crypto")
 
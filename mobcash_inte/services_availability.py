@@ -10,7 +10,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from accounts.models import AppName
-from mobcash_inte.models import Network, Setting
+from mobcash_inte.models import Network
+from mobcash_inte.setting_cache import get_setting
 
 
 TYPE_ALIASES = {
@@ -62,7 +63,7 @@ def _matches_focus(label: str, name: str, focus: str) -> bool:
 
 
 def _setting_flags() -> tuple[bool, bool]:
-    s = Setting.objects.first()
+    s = get_setting()
     if not s:
         return True, True
     return bool(s.deposit_enable), bool(s.withdraw_enable)
@@ -0,0 +1,70 @@
+"""
+Cache process-local du singleton Setting.
+
+`get_setting()` remplace `Setting.objects.first()` sur les chemins chauds
+(token Connect Pro, webhooks, notifications, is_*_enabled des services...).
+
+- chaque process (gunicorn, daphne, worker celery) garde sa copie en mémoire
+  pendant SETTING_CACHE_TTL secondes maximum ;
+- un numéro de version est stocké dans le cache partagé (Redis en prod,
+  cache mémoire local en tests). Le post_save / post_delete de Setting
+  l'incrémente : tous les process rechargent au prochain appel ;
+- la version partagée est relue au plus toutes les
+  SETTING_CACHE_VERSION_CHECK secondes pour ne pas frapper Redis à chaque
+  appel (mécanique commune : local_cache.VersionedLocalCache).
+
+Chaque appel retourne une COPIE de l'instance : un appelant qui modifie puis
+sauvegarde ne pollue pas le cache des autres threads. Pour une écriture,
+toujours utiliser save(update_fields=[...]) afin de ne pas écraser une
+modification faite entre-temps par l'admin.
+"""
+
+import copy
+
+from django.conf import settings
+
+from mobcash_inte.local_cache import VersionedLocalCache
+
+SETTING_VERSION_CACHE_KEY = "mobcash:setting:version"
+DEFAULT_SETTING_CACHE_TTL = 30
+DEFAULT_SETTING_CACHE_VERSION_CHECK = 1.0
+
+
+def _ttl() -> float:
+    return getattr(settings, "SETTING_CACHE_TTL", DEFAULT_SETTING_CACHE_TTL)
+
+
+def _version_check_interval() -> float:
+    return getattr(
+        settings, "SETTING_CACHE_VERSION_CHECK", DEFAULT_SETTING_CACHE_VERSION_CHECK
+    )
+
+
+_cache = VersionedLocalCache(
+    SETTING_VERSION_CACHE_KEY, ttl=_ttl, version_check=_version_check_interval
+)
+
+
+def bump_setting_version():
+    """Invalide le Setting en cache dans TOUS les process."""
+    _cache.bump()
+
+
+def invalidate_local_setting():
+    """Invalide uniquement la copie du process courant."""
+    _cache.clear()
+
+
+def _load_setting(version):
+    from mobcash_inte.models import Setting
+
+    return Setting.objects.first()
+
+
+def get_setting():
+    """
+    Retourne le Setting courant (copie), ou None si aucun Setting n'existe.
+    Au plus une requête SQL par process tant que le cache est valide.
+    """
+    instance = _cache.get("setting", _load_setting)
+    return copy.copy(instance) if instance is not None else None
@@ -1,6 +1,28 @@
-from django.db.models.signals import post_save
+from django.db import connections, transaction
+from django.db.models.signals import post_delete, post_save, pre_migrate
 from django.dispatch import receiver
-from accounts.models import User
+from accounts.models import AppName, User
+from mobcash_inte.models import (
+    AuthorCouponStats,
+    CouponV2,
+    Setting,
+    Transaction,
+    TransactionDailyRollup,
+)
+from mobcash_inte.partner_auth import bump_partner_auth_version
+from mobcash_inte.setting_cache import bump_setting_version, invalidate_local_setting
+from mobcash_inte.whatsapp_service import bump_platform_labels_version
+
+
+@receiver(pre_migrate)
+def create_pg_trgm_extension(sender, using, **kwargs):
+    """Les index de recherche (trigram_index) nécessitent l'extension pg_trgm."""
+    if sender.label != "mobcash_inte":
+        return
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
 
 
 @receiver(post_save, sender=User)
@@ -9,3 +31,61 @@ def create_user_coupon_wallet(sender, instance, created, **kwargs):
     if created:
         from mobcash_inte.models import CouponWallet
         CouponWallet.objects.get_or_create(user=instance)
+
+
+PARTNER_AUTH_FIELDS = {"public_key", "secret_key", "secret_key_hash", "is_partner", "is_block"}
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_partner_auth_cache(sender, instance, update_fields=None, **kwargs):
+    """
+    Clés régénérées (RegenerateKey, UserToPartner), blocage / déblocage ou
+    modification admin d'un partenaire : cache d'authentification obsolète.
+    """
+    if not (instance.is_partner or instance.public_key):
+        return
+    if update_fields is not None and not PARTNER_AUTH_FIELDS & set(update_fields):
+        return
+    transaction.on_commit(bump_partner_auth_version)
+
+
+@receiver(post_save, sender=Setting)
+@receiver(post_delete, sender=Setting)
+def invalidate_setting_cache(sender, instance, **kwargs):
+    """
+    Invalide le cache de get_setting() : tout de suite dans ce process,
+    et dans les autres workers une fois la transaction commitée.
+    """
+    invalidate_local_setting()
+    transaction.on_commit(bump_setting_version)
+
+
+@receiver(post_save, sender=AppName)
+@receiver(post_delete, sender=AppName)
+def invalidate_platform_name_stripper(sender, instance, **kwargs):
+    """Les libellés retirés des messages WhatsApp viennent d'AppName."""
+    transaction.on_commit(bump_platform_labels_version)
+
+
+@receiver(post_save, sender=Transaction)
+def add_transaction_to_daily_rollup(sender, instance, created, **kwargs):
+    """Compte chaque nouvelle transaction dans TransactionDailyRollup."""
+    if created:
+        TransactionDailyRollup.record_transition(instance, None, instance.status)
+
+
+@receiver(post_save, sender=CouponV2)
+def count_published_coupon(sender, instance, created, **kwargs):
+    if created:
+        AuthorCouponStats.apply(instance.author_id, coupons=1)
+
+
+@receiver(post_delete, sender=CouponV2)
+def uncount_deleted_coupon(sender, instance, **kwargs):
+    AuthorCouponStats.apply(
+        instance.author_id,
+        coupons=-1,
+        likes=-instance.likes_count,
+        dislikes=-instance.dislikes_count,
+    )
@@ -1,10 +1,10 @@
 import logging
 import re
 
-import requests
+from http_client import get_session
 
 from accounts.models import User
-from mobcash_inte.models import Setting
+from mobcash_inte.setting_cache import get_setting
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ def normalize_sms_phone(phone: str) -> str:
 
 
 def is_sms_enabled() -> bool:
-    setting = Setting.objects.first()
+    setting = get_setting()
     return bool(setting and setting.use_sms)
 
 
@@ -47,7 +47,7 @@ def send_sms_message(to_phone: str, message: str) -> dict:
     }
     payload = {"to_phone": to_phone, "message": message}
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_session("sms").post(url, json=payload, headers=headers, timeout=30)
         if response.status_code in (200, 201):
             return {"success": True, "data": response.json()}
         return {
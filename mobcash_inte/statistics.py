@@ -0,0 +1,410 @@
+"""
+Calcul des statistiques du dashboard admin (StatisticsView).
+
+Avant : ~40 requêtes + une requête par utilisateur parrain (top_referrers)
+et par couple (app, type de transaction). Ici chaque bloc est une seule
+requête à agrégats conditionnels (`Count/Sum(..., filter=Q(...))`) ou
+groupée (`values(...).annotate(...)`) ; les séries hebdo / mensuelles /
+annuelles sont recomposées en Python à partir de la série journalière,
+elle-même lue dans TransactionDailyRollup (pas de scan de Transaction).
+
+Sans filtre de dates, le résultat est précalculé par la tâche Celery
+`refresh_statistics_snapshot` et servi depuis le cache (`?fresh=1` pour
+forcer un calcul à la demande).
+"""
+
+import logging
+from collections import OrderedDict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDate
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from accounts.models import Advertisement, AppName, TelegramUser, User
+from mobcash_external_service import MobCashExternalService
+from mobcash_inte.models import (
+    TYPE_TRANS,
+    Bonus,
+    Caisse,
+    Coupon,
+    Deposit,
+    Reward,
+    Transaction,
+    TransactionDailyRollup,
+)
+
+connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+STATISTICS_SNAPSHOT_CACHE_KEY = "mobcash:statistics:snapshot"
+STATISTICS_SNAPSHOT_TTL = getattr(settings, "STATISTICS_SNAPSHOT_TTL", 15 * 60)
+# À activer (settings) une fois backfill_transaction_rollup lancé
+STATISTICS_USE_ROLLUP = getattr(settings, "STATISTICS_USE_ROLLUP", False)
+
+USER_SOURCES = ["mobile", "web", "bot"]
+
+
+def _date_q(field, start_date=None, end_date=None):
+    date_filter = Q()
+    if start_date:
+        date_filter &= Q(**{f"{field}__gte": start_date})
+    if end_date:
+        date_filter &= Q(**{f"{field}__lte": end_date})
+    return date_filter
+
+
+def _period_start(day, period):
+    """Équivalent Python de TruncWeek / TruncMonth / TruncYear (fuseau courant)."""
+    if period == "week":
+        day = day - timedelta(days=day.weekday())
+    elif period == "month":
+        day = day.replace(day=1)
+    elif period == "year":
+        day = day.replace(month=1, day=1)
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _rollup_series(daily_rows, period, keys=()):
+    """Regroupe une série journalière ({"date", *keys, "count"[, "total_amount"]})."""
+    buckets = OrderedDict()
+    for row in daily_rows:
+        bucket_key = (_period_start(row["date"], period),) + tuple(row[k] for k in keys)
+        bucket = buckets.get(bucket_key)
+        if bucket is None:
+            bucket = {period: bucket_key[0]}
+            bucket.update({k: row[k] for k in keys})
+            if "total_amount" in row:
+                bucket["total_amount"] = 0
+            bucket["count"] = 0
+            buckets[bucket_key] = bucket
+        if "total_amount" in row:
+            bucket["total_amount"] += row["total_amount"] or 0
+        bucket["count"] += row["count"]
+    return sorted(buckets.values(), key=lambda bucket: bucket[period])
+
+
+def _as_day(value):
+    """Date seule (AAAA-MM-JJ) → date ; None si absente ou avec une heure."""
+    if not value:
+        return None
+    try:
+        return parse_date(value)
+    except ValueError:
+        return None
+
+
+def _transaction_evolution_daily(transactions, start_date=None, end_date=None):
+    start_day, end_day = _as_day(start_date), _as_day(end_date)
+    # Bornes avec une heure : le rollup (au jour) ne suffit pas
+    whole_days = bool(start_date) == bool(start_day) and bool(end_date) == bool(end_day)
+    if STATISTICS_USE_ROLLUP and whole_days:
+        rollups = TransactionDailyRollup.objects.filter(
+            type_trans__in=["deposit", "withdrawal"], status="accept"
+        )
+        if start_day:
+            rollups = rollups.filter(date__gte=start_day)
+        if end_day:
+            # Même borne que les totaux : created_at__lte=<date> exclut ce jour
+            rollups = rollups.filter(date__lt=end_day)
+        return list(
+            rollups.values("date", "type_trans")
+            .annotate(total_amount=Sum("total_amount"), count=Sum("count"))
+            .filter(count__gt=0)
+            .order_by("date", "type_trans")
+        )
+
+    return list(
+        transactions.filter(type_trans__in=["deposit", "withdrawal"], status="accept")
+        .annotate(date=TruncDate("created_at"))
+        .values("date", "type_trans")
+        .annotate(total_amount=Sum("amount"), count=Count("id"))
+        .order_by("date", "type_trans")
+    )
+
+
+def _net_volume(apps):
+    connect_pro_logger.info("[STATISTICS] Début calcul net_volume")
+    connect_pro_logger.info("[STATISTICS] Nombre d'apps: %s", len(apps))
+
+    has_app_with_hash = any(app["_hash"] for app in apps)
+    connect_pro_logger.info("[STATISTICS] has_app_with_hash=%s", has_app_with_hash)
+
+    if has_app_with_hash:
+        # Au moins une app a un hash → somme des soldes via Caisse
+        net_volume = Caisse.objects.aggregate(total=Sum("solde"))["total"] or 0
+        connect_pro_logger.info("[STATISTICS] [SOURCE=CAISSE] net_volume=%s", net_volume)
+    elif apps:
+        # Des apps existent mais aucune n'a de hash → get_wallet_balance
+        connect_pro_logger.info(
+            "[STATISTICS] [SOURCE=GET_WALLET_BALANCE] Appel get_wallet_balance()"
+        )
+        try:
+            net_volume = MobCashExternalService().get_wallet_balance()
+        except Exception as e:
+            connect_pro_logger.error(
+                "[STATISTICS] [GET_WALLET_BALANCE] Erreur: %s", e, exc_info=True
+            )
+            net_volume = None
+        if net_volume is not None:
+            connect_pro_logger.info(
+                "[STATISTICS] [GET_WALLET_BALANCE_RESULT] Valeur retournée: %s",
+                net_volume,
+            )
+        else:
+            connect_pro_logger.warning(
+                "[STATISTICS] [GET_WALLET_BALANCE_RESULT] get_wallet_balance() a retourné None"
+            )
+            net_volume = 0.0
+    else:
+        connect_pro_logger.warning("[STATISTICS] Aucune app trouvée, net_volume=0")
+        net_volume = 0.0
+
+    connect_pro_logger.info("[STATISTICS] net_volume final=%s", net_volume)
+    return net_volume
+
+
+def _top_referrers(limit=10):
+    filleuls = (
+        User.objects.filter(referrer_code=OuterRef("referral_code"), is_delete=False)
+        .order_by()
+        .values("referrer_code")
+        .annotate(total=Count("id"))
+        .values("total")
+    )
+    rows = (
+        User.objects.filter(referral_code__isnull=False, referral_code__gt="")
+        .annotate(
+            filleuls_count=Coalesce(Subquery(filleuls, output_field=IntegerField()), 0)
+        )
+        .filter(filleuls_count__gt=0)
+        .order_by("-filleuls_count")
+        .values("id", "username", "email", "referral_code", "filleuls_count")[:limit]
+    )
+    return [{**row, "id": str(row["id"])} for row in rows]
+
+
+def compute_statistics(start_date=None, end_date=None):
+    """
+    Retourne les statistiques (même structure que la réponse de StatisticsView).
+    `start_date` / `end_date` : bornes optionnelles sur created_at / date_joined.
+    """
+    transactions = Transaction.objects.filter(_date_q("created_at", start_date, end_date))
+    deposit_ok = Q(type_trans="deposit", status="accept")
+    withdrawal_ok = Q(type_trans="withdrawal", status="accept")
+
+    # ========== VOLUME DES TRANSACTIONS (une requête) ==========
+    tx = transactions.aggregate(
+        total_transactions=Count("id"),
+        deposits_count=Count("id", filter=deposit_ok),
+        deposits_amount=Sum("amount", filter=deposit_ok),
+        withdrawals_count=Count("id", filter=withdrawal_ok),
+        withdrawals_amount=Sum("amount", filter=withdrawal_ok),
+        bot_total=Count("id", filter=Q(source="bot")),
+        bot_deposits=Count("id", filter=Q(source="bot") & deposit_ok),
+        bot_withdrawals=Count("id", filter=Q(source="bot") & withdrawal_ok),
+        disbursements_count=Count("id", filter=Q(type_trans="disbursements")),
+        disbursements_amount=Sum("amount", filter=Q(type_trans="disbursements")),
+        active_users=Count("user", distinct=True),
+        active_telegram_users=Count("telegram_user", distinct=True),
+    )
+    total_deposits_amount = tx["deposits_amount"] or 0
+    total_withdrawals_amount = tx["withdrawals_amount"] or 0
+
+    apps = list(AppName.objects.values("id", "name", "_hash"))
+    net_volume = _net_volume(apps)
+
+    # Évolution par période : série journalière (rollup), le reste en Python
+    evolution_daily = _transaction_evolution_daily(transactions, start_date, end_date)
+
+    # ========== CROISSANCE UTILISATEURS ==========
+    users_date_filter = _date_q("date_joined", start_date, end_date)
+    new_users_daily = list(
+        User.objects.filter(users_date_filter, is_delete=False)
+        .annotate(date=TruncDate("date_joined"))
+        .values("date")
+        .annotate(count=Count("id"))
+        .order_by("date")
+    )
+
+    # Utilisateurs distincts par source (une requête groupée)
+    by_source = {
+        row["source"]: row["users"] + row["telegram_users"]
+        for row in transactions.filter(source__in=USER_SOURCES)
+        .order_by()
+        .values("source")
+        .annotate(
+            users=Count("user", distinct=True),
+            telegram_users=Count("telegram_user", distinct=True),
+        )
+    }
+    users_by_source = [
+        {"source": source, "count": by_source.get(source, 0)} for source in USER_SOURCES
+    ]
+
+    # Compteurs utilisateurs + parrainage (une requête)
+    has_referrer = Q(referrer_code__isnull=False, referrer_code__gt="")
+    # Comme avant : parrainages bornés à maintenant si seule start_date est donnée
+    parrainages_date_filter = _date_q(
+        "date_joined", start_date, end_date or (timezone.now() if start_date else None)
+    )
+    users = User.objects.filter(is_delete=False).aggregate(
+        total=Count("id"),
+        blocked=Count("id", filter=Q(is_block=True)),
+        active=Count("id", filter=Q(is_active=True, is_block=False)),
+        inactive=Count("id", filter=Q(is_active=False)),
+        parrainages=Count("id", filter=has_referrer & parrainages_date_filter),
+        referral_codes=Count(
+            "id", filter=Q(referral_code__isnull=False, referral_code__gt="")
+        ),
+        activated_referral_codes=Count("referrer_code", distinct=True, filter=has_referrer),
+    )
+    activation_rate = (
+        (users["activated_referral_codes"] / users["referral_codes"] * 100)
+        if users["referral_codes"] > 0
+        else 0
+    )
+
+    bonuses = Bonus.objects.aggregate(
+        total=Sum("amount", filter=Q(bonus_delete=False)),
+        referral=Sum(
+            "amount",
+            filter=Q(reason_bonus__icontains="parrainage")
+            & _date_q("created_at", start_date, end_date),
+        ),
+    )
+
+    # ========== STATISTIQUES DASHBOARD ==========
+    telegram_users_count = TelegramUser.objects.filter(
+        _date_q("created_at", start_date, end_date)
+    ).count()
+
+    # Transactions par application : une requête groupée, toutes les
+    # combinaisons (app, type) présentes même à 0
+    transactions_by_app = {
+        app["name"]: {
+            type_key: {"count": 0, "total_amount": 0.0} for type_key, _ in TYPE_TRANS
+        }
+        for app in apps
+    }
+    app_names = {app["id"]: app["name"] for app in apps}
+    for row in (
+        transactions.filter(status="accept", app__isnull=False)
+        .order_by()
+        .values("app", "type_trans")
+        .annotate(count=Count("id"), total_amount=Sum("amount"))
+    ):
+        per_type = transactions_by_app.get(app_names.get(row["app"]))
+        if per_type is not None and row["type_trans"] in per_type:
+            per_type[row["type_trans"]] = {
+                "count": row["count"],
+                "total_amount": float(row["total_amount"] or 0),
+            }
+
+    total_balance_bizao = Caisse.objects.aggregate(total=Sum("solde"))["total"] or 0
+    deposits_bizao = Deposit.objects.filter(
+        _date_q("created_at", start_date, end_date)
+    ).aggregate(count=Count("id"), amount=Sum("amount"))
+    total_rewards = Reward.objects.aggregate(total=Sum("amount"))["total"] or 0
+    advertisements = Advertisement.objects.aggregate(
+        total=Count("id"), active=Count("id", filter=Q(enable=True))
+    )
+    # Coupons en cours (moins de 24h)
+    coupons = Coupon.objects.aggregate(
+        total=Count("id"),
+        active=Count("id", filter=Q(created_at__gte=timezone.now() - timedelta(hours=24))),
+    )
+
+    return {
+        "dashboard_stats": {
+            "total_users": users["total"],
+            "active_users": users["active"],
+            "inactive_users": users["inactive"],
+            "total_bonus": float(bonuses["total"] or 0),
+            "bot_stats": {
+                "total_transactions": tx["bot_total"],
+                "total_deposits": tx["bot_deposits"],
+                "total_withdrawals": tx["bot_withdrawals"],
+                "total_users": telegram_users_count,
+            },
+            "total_transactions": tx["total_transactions"],
+            "transactions_by_app": transactions_by_app,
+            "balance_bizao": float(total_balance_bizao),
+            "deposits_bizao": {
+                "count": deposits_bizao["count"],
+                "amount": float(deposits_bizao["amount"] or 0),
+            },
+            "withdrawals_bizao": {
+                "count": tx["withdrawals_count"],
+                "amount": float(total_withdrawals_amount),
+            },
+            "rewards": {"total": float(total_rewards)},
+            "disbursements": {
+                "count": tx["disbursements_count"],
+                "amount": float(tx["disbursements_amount"] or 0),
+            },
+            "advertisements": advertisements,
+            "coupons": coupons,
+        },
+        "volume_transactions": {
+            "deposits": {
+                "total_amount": float(total_deposits_amount),
+                "total_count": tx["deposits_count"],
+            },
+            "withdrawals": {
+                "total_amount": float(total_withdrawals_amount),
+                "total_count": tx["withdrawals_count"],
+            },
+            "net_volume": float(net_volume),
+            "evolution": {
+                "daily": evolution_daily,
+                "weekly": _rollup_series(evolution_daily, "week", keys=("type_trans",)),
+                "monthly": _rollup_series(evolution_daily, "month", keys=("type_trans",)),
+                "yearly": _rollup_series(evolution_daily, "year", keys=("type_trans",)),
+            },
+        },
+        "user_growth": {
+            "new_users": {
+                "daily": new_users_daily,
+                "weekly": _rollup_series(new_users_daily, "week"),
+                "monthly": _rollup_series(new_users_daily, "month"),
+            },
+            "active_users_count": tx["active_users"] + tx["active_telegram_users"],
+            "users_by_source": users_by_source,
+            "status": {
+                "blocked": users["blocked"],
+                "active": users["active"],
+                "inactive": users["inactive"],
+            },
+        },
+        "referral_system": {
+            "parrainages_count": users["parrainages"],
+            "total_referral_bonus": float(bonuses["referral"] or 0),
+            "top_referrers": _top_referrers(),
+            "activation_rate": round(activation_rate, 2),
+        },
+    }
+
+
+def refresh_statistics_snapshot():
+    """Recalcule les statistiques sans filtre de dates et les met en cache."""
+    snapshot = {"generated_at": timezone.now(), "data": compute_statistics()}
+    try:
+        cache.set(STATISTICS_SNAPSHOT_CACHE_KEY, snapshot, timeout=STATISTICS_SNAPSHOT_TTL)
+    except Exception as e:
+        connect_pro_logger.warning(f"[STATISTICS] Écriture du snapshot impossible: {e}")
+    return snapshot
+
+
+def get_statistics_snapshot():
+    """Snapshot en cache, recalculé à la demande s'il a expiré."""
+    try:
+        snapshot = cache.get(STATISTICS_SNAPSHOT_CACHE_KEY)
+    except Exception as e:
+        connect_pro_logger.warning(f"[STATISTICS] Lecture du snapshot impossible: {e}")
+        snapshot = None
+    if snapshot is None:
+        snapshot = refresh_statistics_snapshot()
+    return snapshot
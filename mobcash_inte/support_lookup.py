@@ -3,12 +3,17 @@
 from __future__ import annotations
 
 import ast
+import hashlib
 import json
 import logging
 import re
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError, as_completed
+from contextlib import closing
 from datetime import datetime, timezone as dt_timezone
 from typing import Any
 
+from django.core.cache import cache
+from django.db import connections
 from django.utils import timezone
 from django.utils.dateparse import parse_datetime
 from rest_framework import status
@@ -19,6 +24,7 @@ from rest_framework.views import APIView
 from mobcash_inte.models import Transaction, TransactionStatusHistory
 from payment import (
     connect_pro_status,
+    connect_pro_token,
     connect_pro_verify_transaction_by_user_sms,
     connect_pro_confirm_withdrawal,
     connect_pro_retry_deposit,
@@ -123,13 +129,40 @@ def _reference_candidates(reference: str) -> list[str]:
     return out
 
 
+# Cache négatif : le bot relance souvent la même référence introuvable
+REFERENCE_MISS_CACHE_PREFIX = "mobcash:support:reference_miss"
+REFERENCE_MISS_CACHE_TTL = 30
+
+
+def _reference_miss_key(reference: str) -> str:
+    digest = hashlib.sha1(reference.strip().encode()).hexdigest()
+    return f"{REFERENCE_MISS_CACHE_PREFIX}:{digest}"
+
+
 def _find_transaction_by_reference(reference: str):
-    """Retrouve une TX en essayant référence brute puis variantes préfixe."""
-    qs = Transaction.objects.select_related("app", "network")
-    for ref in _reference_candidates(reference):
-        tx = qs.filter(reference=ref).first()
-        if tx:
-            return tx
+    """
+    Retrouve une TX par référence brute ou variantes préfixe, en UNE requête
+    (`reference__in`) : la première variante (ordre de _reference_candidates)
+    présente en base l'emporte, TX la plus récente à référence égale.
+    """
+    candidates = _reference_candidates(reference)
+    if not candidates:
+        return None
+    miss_key = _reference_miss_key(reference)
+    if cache.get(miss_key):
+        return None
+
+    best = {}
+    for tx in (
+        Transaction.objects.select_related("app", "network")
+        .filter(reference__in=candidates)
+        .order_by("-created_at")
+    ):
+        best.setdefault(tx.reference, tx)
+    for ref in candidates:
+        if ref in best:
+            return best[ref]
+    cache.set(miss_key, 1, timeout=REFERENCE_MISS_CACHE_TTL)
     return None
 
 
@@ -362,6 +395,76 @@ def _connect_sms_type_for_transaction(transaction: Transaction) -> str:
     return "withdrawal"
 
 
+# Fan-out verify-transaction-by-user-sms (variantes téléphone × réseau)
+SMS_VERIFY_WORKERS = 4
+SMS_VERIFY_DEADLINE = 20  # secondes pour l'ensemble des tentatives
+SMS_VERIFY_CACHE_PREFIX = "mobcash:support:sms_verify"
+SMS_VERIFY_CACHE_TTL = 60
+
+
+def _sms_verify_cache_key(attempt: dict) -> str:
+    raw = "|".join(
+        str(attempt.get(field) or "")
+        for field in ("transaction_uid", "phone", "network_id", "sms_type")
+    )
+    return f"{SMS_VERIFY_CACHE_PREFIX}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+
+def _verify_attempt(attempt: dict) -> dict | None:
+    """Une tentative verify (thread du pool), réponse en cache si exploitable."""
+    key = _sms_verify_cache_key(attempt)
+    try:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+        verify = connect_pro_verify_transaction_by_user_sms(**attempt)
+        if isinstance(verify, dict) and verify.get("result") != "technical_error":
+            cache.set(key, verify, timeout=SMS_VERIFY_CACHE_TTL)
+        return verify
+    finally:
+        # Connexions DB ouvertes par ce thread (get_setting, token)
+        connections.close_all()
+
+
+def _iter_verify_attempts(attempts: list[dict]):
+    """
+    Lance les tentatives en parallèle (pool borné) et produit les réponses
+    dans l'ordre d'arrivée. L'appelant s'arrête au premier résultat utile :
+    les tentatives pas encore démarrées sont annulées, celles en vol sont
+    abandonnées (leur réponse alimente quand même le cache). Au-delà de
+    SMS_VERIFY_DEADLINE, les réponses restantes sont ignorées.
+    """
+    if not attempts:
+        return
+    # Token Connect obtenu une fois avant le fan-out
+    connect_pro_token()
+    executor = ThreadPoolExecutor(max_workers=min(SMS_VERIFY_WORKERS, len(attempts)))
+    futures = {executor.submit(_verify_attempt, attempt): attempt for attempt in attempts}
+    try:
+        for future in as_completed(futures, timeout=SMS_VERIFY_DEADLINE):
+            attempt = futures[future]
+            try:
+                verify = future.result()
+            except Exception as exc:
+                logger.warning(
+                    "verify SMS+ussd failed phone=%s net=%s: %s",
+                    (attempt["phone"] or "")[-4:],
+                    attempt["network_id"],
+                    exc,
+                )
+                continue
+            if isinstance(verify, dict):
+                yield verify
+    except FuturesTimeoutError:
+        logger.warning(
+            "verify SMS+ussd : délai de %ss dépassé (%s tentatives)",
+            SMS_VERIFY_DEADLINE,
+            len(attempts),
+        )
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
 def _fetch_nearby_sms_for_agent(
     transaction: Transaction,
     connect_payload: dict | None,
@@ -416,30 +519,23 @@ def _fetch_agent_sms_and_ussd(
 
     if connect_uid:
         meta["attempted"] = True
-        for phone in _phone_variants_for_sms(transaction.phone_number):
-            network_attempts: list[str | None] = [network_id] if network_id else [None]
-            if network_id:
-                network_attempts.append(None)
-            for net in network_attempts:
-                try:
-                    verify = connect_pro_verify_transaction_by_user_sms(
-                        transaction_uid=connect_uid,
-                        amount=amount_norm,
-                        phone=phone,
-                        network_id=net,
-                        operation_at=operation_at,
-                        sms_type=resolved_sms_type or None,
-                    )
-                except Exception as exc:
-                    logger.warning(
-                        "verify SMS+ussd failed phone=%s net=%s: %s",
-                        phone[-4:] if phone else "",
-                        net,
-                        exc,
-                    )
-                    continue
-                if not isinstance(verify, dict):
-                    continue
+        network_attempts: list[str | None] = [network_id] if network_id else [None]
+        if network_id:
+            network_attempts.append(None)
+        attempts = [
+            {
+                "transaction_uid": connect_uid,
+                "amount": amount_norm,
+                "phone": phone,
+                "network_id": net,
+                "operation_at": operation_at,
+                "sms_type": resolved_sms_type or None,
+            }
+            for phone in _phone_variants_for_sms(transaction.phone_number)
+            for net in network_attempts
+        ]
+        with closing(_iter_verify_attempts(attempts)) as verifies:
+            for verify in verifies:
                 last_verify = verify
                 nearby = _sms_entries_from_verify(verify)
                 raw_ussd = verify.get("ussd_path")
@@ -622,22 +718,13 @@ def _mark_deposit_accept_aligned(transaction: Transaction) -> bool:
     """
     if transaction.status == "accept":
         return False
-    old_status = transaction.status
     try:
-        transaction.status = "accept"
-        transaction.message = (
-            "Crédité — aligné via support lookup (Connect OK + app Success)"
-        )
-        transaction.save(update_fields=["status", "message"])
-        TransactionStatusHistory.objects.create(
-            transaction=transaction,
-            old_status=old_status,
-            new_status="accept",
-            trigger_source=TransactionStatusHistory.Source.AGENT_BOT,
-            trigger_data={
-                "action": "align_accept_connect_and_mobcash_success",
-            },
-            message=transaction.message[:500],
+        # change_status : audit + all_status + rollup
+        transaction.change_status(
+            "accept",
+            TransactionStatusHistory.Source.AGENT_BOT,
+            data={"action": "align_accept_connect_and_mobcash_success"},
+            message="Crédité — aligné via support lookup (Connect OK + app Success)",
         )
         logger.info(
             "TX %s aligned to accept (Connect OK + mobcash Success)",
@@ -2531,23 +2618,15 @@ def build_expire_transaction_response(
 
     reason = (note or "").strip() or "Refusé depuis l'app agent support"
     old_status = transaction.status
-    transaction.status = "expired"
     transaction.error_message = reason[:1000]
-    transaction.save(update_fields=["status", "error_message"])
-    try:
-        TransactionStatusHistory.objects.create(
-            transaction=transaction,
-            old_status=old_status,
-            new_status="expired",
-            trigger_source=TransactionStatusHistory.Source.AGENT_BOT,
-            trigger_data={
-                "action": "expire",
-                "note": reason[:500],
-            },
-            message=reason[:500],
-        )
-    except Exception:
-        logger.exception("TransactionStatusHistory expire failed ref=%s", reference)
+    # change_status : audit + all_status + rollup ; `message` (affiché au
+    # client) inchangé, le motif reste dans error_message et l'historique
+    transaction.change_status(
+        "expired",
+        TransactionStatusHistory.Source.AGENT_BOT,
+        data={"action": "expire", "note": reason[:500]},
+        extra_fields=["error_message"],
+    )
 
     logger.info(
         "TX expired by support ref=%s from=%s",
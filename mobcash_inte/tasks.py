@@ -1,7 +1,16 @@
+import logging
+import time
+
 from celery import shared_task
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
-from django.db.models import Sum
+from django.db.models import OuterRef, Subquery, Sum
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+COUPON_RATING_MIN_DEPOSITS = 15000
+DAILY_USER_CREDITS = 3
+USER_CREDITS_CHUNK_SIZE = 2000
 
 
 @shared_task
@@ -29,32 +38,42 @@ def grant_coupon_rating_permissions():
     - Au moins 1 mois d'ancienneté
     - Au moins 15 000 FCFA de transactions de dépôt acceptées
     Planifié chaque nuit à 00h00.
+
+    Un seul UPDATE : le total des dépôts est une sous-requête corrélée.
     """
     from accounts.models import User
     from mobcash_inte.models import Transaction
 
+    started = time.monotonic()
     one_month_ago = timezone.now() - relativedelta(months=1)
-    eligible_by_age = User.objects.filter(
-        date_joined__lte=one_month_ago,
-        can_rate_coupons=False,
-        is_active=True,
-        is_delete=False,
-    )
-
-    updated_count = 0
-    for user in eligible_by_age:
-        total_amount = Transaction.objects.filter(
-            user=user,
+    deposits_total = (
+        Transaction.objects.filter(
+            user=OuterRef("pk"),
             type_trans="deposit",
             status="accept",
-        ).aggregate(total=Sum('amount'))['total'] or 0
-
-        if total_amount >= 15000:
-            user.can_rate_coupons = True
-            user.save(update_fields=['can_rate_coupons'])
-            updated_count += 1
+        )
+        .order_by()
+        .values("user")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    eligible = (
+        User.objects.filter(
+            date_joined__lte=one_month_ago,
+            can_rate_coupons=False,
+            is_active=True,
+            is_delete=False,
+        )
+        .annotate(deposits_total=Subquery(deposits_total))
+        .filter(deposits_total__gte=COUPON_RATING_MIN_DEPOSITS)
+    )
+    updated_count = User.objects.filter(pk__in=eligible.values("pk")).update(
+        can_rate_coupons=True
+    )
 
-    return updated_count
+    stats = {"updated": updated_count, "duration_s": round(time.monotonic() - started, 3)}
+    logger.info(f"[COUPON_RATING_PERMISSIONS] {stats}")
+    return stats
 
 
 @shared_task
@@ -80,30 +99,153 @@ def grant_daily_user_credits():
     """
     Accorde les crédits quotidiens aux utilisateurs actifs.
     Planifié chaque nuit à 00h00.
+
+    UserCredit est un solde unique par utilisateur (user / amount) :
+    - utilisateurs sans UserCredit → bulk_create(ignore_conflicts) par lots ;
+    - soldes sous l'allocation quotidienne, pas encore touchés aujourd'hui
+      → remis à DAILY_USER_CREDITS en un seul UPDATE (idempotent).
     """
     from accounts.models import User
     from mobcash_inte.models import UserCredit
-    
-    active_users = User.objects.filter(
-        is_active=True,
-        is_delete=False
+
+    started = time.monotonic()
+    stats = {"attempted": 0, "created": 0, "topped_up": 0, "chunks": 0}
+
+    missing = (
+        User.objects.filter(is_active=True, is_delete=False, credit__isnull=True)
+        .order_by()
+        .values_list("pk", flat=True)
     )
-    
-    created_count = 0
-    for user in active_users:
-        # Vérifier si l'utilisateur a déjà reçu ses crédits aujourd'hui
-        today = timezone.now().date()
-        existing_credit = UserCredit.objects.filter(
-            user=user,
-            granted_at__date=today
-        ).exists()
-        
-        if not existing_credit:
-            UserCredit.objects.create(
-                user=user,
-                credits_remaining=3,
-                credits_used=0
-            )
-            created_count += 1
-    
-    return created_count
+    chunk = []
+    for user_id in missing.iterator(chunk_size=USER_CREDITS_CHUNK_SIZE):
+        chunk.append(UserCredit(user_id=user_id, amount=DAILY_USER_CREDITS))
+        if len(chunk) >= USER_CREDITS_CHUNK_SIZE:
+            _create_user_credits(chunk, stats)
+            chunk = []
+    if chunk:
+        _create_user_credits(chunk, stats)
+
+    start_of_day = timezone.localtime().replace(hour=0, minute=0, second=0, microsecond=0)
+    stats["topped_up"] = UserCredit.objects.filter(
+        user__is_active=True,
+        user__is_delete=False,
+        amount__lt=DAILY_USER_CREDITS,
+        updated_at__lt=start_of_day,
+    ).update(amount=DAILY_USER_CREDITS, updated_at=timezone.now())
+
+    stats["duration_s"] = round(time.monotonic() - started, 3)
+    logger.info(f"[DAILY_USER_CREDITS] {stats}")
+    return stats
+
+
+def _create_user_credits(chunk, stats):
+    from mobcash_inte.models import UserCredit
+
+    # ignore_conflicts ne renvoie pas les lignes ignorées : on compte avant / après
+    existing = UserCredit.objects.filter(user_id__in=[credit.user_id for credit in chunk])
+    before = existing.count()
+    UserCredit.objects.bulk_create(chunk, ignore_conflicts=True)
+    stats["attempted"] += len(chunk)
+    stats["created"] += existing.count() - before
+    stats["chunks"] += 1
+    logger.info(
+        f"[DAILY_USER_CREDITS] Lot {stats['chunks']} : {stats['created']} crédits créés"
+    )
+
+
+@shared_task
+def refresh_statistics_snapshot():
+    """
+    Recalcule les statistiques du dashboard (sans filtre de dates) et les
+    met en cache pour StatisticsView.
+    Planifié toutes les 5 minutes.
+    """
+    from mobcash_inte.statistics import refresh_statistics_snapshot as refresh
+
+    snapshot = refresh()
+    return snapshot["generated_at"].isoformat()
+
+
+@shared_task
+def rebuild_recent_transaction_rollup(days=2):
+    """
+    Reconstruit TransactionDailyRollup pour les `days` derniers jours :
+    corrige les écarts laissés par les changements de statut qui ne passent
+    pas par change_status (save() direct, update()).
+    Planifié chaque nuit à 00h30.
+    """
+    from mobcash_inte.models import TransactionDailyRollup
+
+    start = timezone.localdate() - relativedelta(days=days)
+    return TransactionDailyRollup.rebuild(start=start)
+
+
+@shared_task
+def flush_coupon_vote_buffers():
+    """
+    Reporte en base les compteurs likes / dislikes bufferisés dans le cache
+    (settings.COUPON_VOTE_BUFFER), pour les seuls coupons ayant reçu un vote
+    depuis le dernier report. Sans effet option désactivée (un reliquat,
+    conservé sans expiration, est reporté à la réactivation). Planifié
+    toutes les 10 secondes.
+    """
+    from mobcash_inte.coupon_votes import vote_buffer
+
+    return vote_buffer.flush()
+
+
+@shared_task
+def dispatch_broadcast(broadcast_id):
+    """
+    Découpe les destinataires d'une diffusion (NotificationView sans user_id)
+    en lots `send_broadcast_chunk`.
+    """
+    from mobcash_inte.broadcast import dispatch
+
+    return dispatch(broadcast_id)
+
+
+@shared_task
+def send_broadcast_chunk(broadcast_id, user_ids):
+    """Envoie un lot de diffusion, au débit du canal (mobcash_inte.broadcast)."""
+    from mobcash_inte.broadcast import send_chunk
+
+    return send_chunk(broadcast_id, user_ids)
+
+
+@shared_task(acks_late=True)
+def execute_partner_transaction_task(transaction_id):
+    """
+    Transaction partenaire en mode asynchrone (CreatePartnerTransactionView
+    ?async=1), routée sur la file « partner » : appel bookmaker / MobCash,
+    puis webhook signé si un callback_url a été fourni.
+    """
+    from mobcash_inte.partner_transactions import (
+        execute_partner_transaction,
+        schedule_partner_webhook,
+    )
+
+    transaction = execute_partner_transaction(transaction_id)
+    schedule_partner_webhook(transaction)
+    return transaction.status
+
+
+@shared_task
+def reap_stale_partner_claims():
+    """
+    Transactions partenaire restées pending : réservées (worker mort pendant
+    l'appel bookmaker) → « review », jamais réservées → « annuler » ;
+    webhook dans les deux cas. Planifié toutes les 5 minutes.
+    """
+    from mobcash_inte.partner_transactions import reap_stale_partner_claims as reap
+
+    return reap()
+
+
+@shared_task(bind=True, max_retries=6)
+def send_partner_webhook(self, transaction_id):
+    """Webhook de fin de traitement, réessayé avec backoff (30 s, 60 s, 2 min...)."""
+    from mobcash_inte.partner_transactions import deliver_partner_webhook
+
+    if deliver_partner_webhook(transaction_id) is False:
+        raise self.retry(countdown=30 * 2 ** self.request.retries)
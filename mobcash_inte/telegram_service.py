@@ -1,10 +1,10 @@
 import logging
 import os
 
-import requests
+from http_client import get_session
 
 from accounts.models import User
-from mobcash_inte.models import Setting
+from mobcash_inte.setting_cache import get_setting
 
 logger = logging.getLogger("mobcash_inte_backend.transactions")
 
@@ -21,7 +21,7 @@ def normalize_telegram_username(value: str) -> str:
 
 
 def _get_setting():
-    return Setting.objects.first()
+    return get_setting()
 
 
 def get_bot_token() -> str:
@@ -57,7 +57,7 @@ def _bot_api(method: str, params: dict = None) -> dict:
         return {"ok": False, "error": "telegram_bot_not_configured"}
     url = f"https://api.telegram.org/bot{bot_token}/{method}"
     try:
-        response = requests.get(url, params=params or {}, timeout=15)
+        response = get_session("telegram").get(url, params=params or {}, timeout=15)
         return response.json()
     except Exception as e:
         logger.error(f"telegram api {method} error: {e}", exc_info=True)
@@ -70,7 +70,7 @@ def _bot_api_post(method: str, params: dict = None) -> dict:
         return {"ok": False, "error": "telegram_bot_not_configured"}
     url = f"https://api.telegram.org/bot{bot_token}/{method}"
     try:
-        response = requests.post(url, data=params or {}, timeout=15)
+        response = get_session("telegram").post(url, data=params or {}, timeout=15)
         return response.json()
     except Exception as e:
         logger.error(f"telegram api POST {method} error: {e}", exc_info=True)
@@ -123,7 +123,7 @@ def send_telegram_message(chat_id: str, text: str) -> dict:
     bot_token = get_bot_token()
     url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
     try:
-        response = requests.post(
+        response = get_session("telegram").post(
             url,
             data={"chat_id": chat_id, "text": text},
             timeout=15,
@@ -30,6 +30,8 @@ urlpatterns = [
     path("app_name", views.BetAppName.as_view()),
     path("plateform/<str:pk>", views.DetailAppName.as_view()),
     path("notification", views.NotificationView.as_view()),
+    path("notification/broadcast", views.BroadcastListView.as_view()),
+    path("notification/broadcast/<uuid:pk>", views.BroadcastDetailView.as_view()),
     path("delete-notification", views.ReadAllNotificaation.as_view()),
     path("read-notification", views.ReadNotificationView.as_view()),
     path("bot-transaction-deposit", views.BotDepositTransactionViews.as_view()),
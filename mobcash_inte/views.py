@@ -6,10 +6,11 @@ from datetime import timedelta
 from django.conf import settings
 from django.conf.urls import handler404
 import requests
+from http_client import get_session
 from rest_framework.permissions import BasePermission
 from rest_framework import generics, permissions, status, decorators, viewsets
 from rest_framework.views import APIView
-from accounts.helpers import CustomPagination
+from accounts.helpers import CursorOrPagePagination, CustomPagination
 from accounts.models import Advertisement, AppName, TelegramUser, User
 from rest_framework.filters import SearchFilter
 import constant
@@ -34,7 +35,9 @@ from mobcash_inte.models import (
     TYPE_TRANS,
     AuthorComment,
     AuthorCouponRating,
+    AuthorCouponStats,
     Bonus,
+    Broadcast,
     Caisse,
     Coupon,
     CouponPayout,
@@ -57,6 +60,17 @@ from mobcash_inte.models import (
     UserPhone,
     WebhookLog,
 )
+from mobcash_inte.setting_cache import get_setting
+from mobcash_inte.broadcast import start_broadcast
+from mobcash_inte.coupon_votes import cast_vote
+from mobcash_inte.partner_auth import authenticate_partner, set_partner_keys, take_partner_token
+from mobcash_inte.partner_transactions import execute_partner_transaction, schedule_partner_webhook
+from mobcash_inte.search import TransactionSearch, TransactionSearchFilter
+from mobcash_inte.statistics import (
+    compute_statistics,
+    get_statistics_snapshot,
+    refresh_statistics_snapshot,
+)
 from django_filters.rest_framework import DjangoFilterBackend
 from mobcash_inte.permissions import IsAuthenticated
 from mobcash_inte.serializers import (
@@ -67,6 +81,7 @@ from mobcash_inte.serializers import (
     AuthorRatingCreateSerializer,
     BonusSerializer,
     BonusTransactionSerializer,
+    BroadcastSerializer,
     CreateBonusSerializer,
     BotDepositTransactionSerializer,
     BotWithdrawalTransactionSerializer,
@@ -105,6 +120,7 @@ from mobcash_inte.serializers import (
     SearchUserBetSerializer,
     SendNotificationSerializer,
     TransactionDetailsSerializer,
+    TransactionListSerializer,
     UploadFileSerializer,
     UserPhoneSerializer,
     WithdrawalTransactionSerializer,
@@ -128,8 +144,7 @@ from payment import (
     check_solde,
     process_transaction_notifications_and_bonus,
 )
-from django.db.models import Sum, Count, Q, Avg
-from django.db.models.functions import TruncDate, TruncWeek, TruncMonth, TruncYear
+from django.db.models import Sum, Count, Q, Avg, Prefetch
 
 
 connect_pro_logger = logging.getLogger("mobcash_inte_backend.transactions")
@@ -266,7 +281,7 @@ class DetailsNetworkView(generics.RetrieveUpdateDestroyAPIView):
 class NotificationView(generics.ListCreateAPIView):
     serializer_class = NotificationSerializer
     permission_classes = [permissions.IsAuthenticated]
-    pagination_class = CustomPagination
+    pagination_class = CursorOrPagePagination
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["user"]
 
@@ -341,18 +356,34 @@ class NotificationView(generics.ListCreateAPIView):
         else:
             if channel in ("push", "all"):
                 send_admin_notification.delay(title=title, content=content)
-            elif channel == "whatsapp":
-                for user in User.objects.filter(is_staff=False):
-                    send_whatsapp_to_user(user=user, title=title, content=content)
-            elif channel == "telegram":
-                for user in User.objects.filter(is_staff=False):
-                    send_telegram_to_user(user=user, title=title, content=content)
-            elif channel == "sms":
-                for user in User.objects.filter(is_staff=False):
-                    send_sms_to_user(user=user, title=title, content=content)
+            else:
+                # Diffusion en tâches de fond, suivie via BroadcastDetailView
+                broadcast = start_broadcast(
+                    title=title, content=content, channel=channel, created_by=request.user
+                )
+                return Response(
+                    BroadcastSerializer(broadcast).data, status=status.HTTP_202_ACCEPTED
+                )
         return Response(status=status.HTTP_200_OK)
 
 
+class BroadcastListView(generics.ListAPIView):
+    serializer_class = BroadcastSerializer
+    permission_classes = [permissions.IsAdminUser]
+    queryset = Broadcast.objects.all()
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ["channel", "status"]
+    pagination_class = CustomPagination
+
+
+class BroadcastDetailView(generics.RetrieveAPIView):
+    """Avancement d'une diffusion : total, sent, failed, pending."""
+
+    serializer_class = BroadcastSerializer
+    permission_classes = [permissions.IsAdminUser]
+    queryset = Broadcast.objects.all()
+
+
 class ListDeposit(generics.ListAPIView):
     serializer_class = DepositSerializer
     permission_classes = [permissions.IsAdminUser]
@@ -474,7 +505,7 @@ class SettingViews(decorators.APIView):
         return Response(ReadSettingSerializer(setting).data)
 
     def get(self, request, *args, **kwargs):
-        setting = Setting.objects.first()
+        setting = get_setting()
         return Response(ReadSettingSerializer(setting).data)
 
 
@@ -484,7 +515,7 @@ class SettingMobileView(decorators.APIView):
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        setting = Setting.objects.first()
+        setting = get_setting()
         if not setting:
             return Response({})
         response = Response(SettingMobileSerializer(setting).data)
@@ -500,7 +531,7 @@ class ValidateVersionView(decorators.APIView):
         serializer.is_valid(raise_exception=True)
 
         user_version = serializer.validated_data.get("version")
-        setting = Setting.objects.first()
+        setting = get_setting()
 
         if not setting:
             return Response(
@@ -653,7 +684,7 @@ class CreateBonusDepositTransactionViews(generics.CreateAPIView):
         TransactionStatusHistory.objects.create(transaction=transaction, old_status=transaction.status, new_status=transaction.status, trigger_source=TransactionStatusHistory.Source.SYSTEM, message="Statut initial enregistré")
         transaction.save()
         webhook_transaction_success(
-            transaction=transaction, setting=Setting.objects.first()
+            transaction=transaction, setting=get_setting()
         )
         transaction.refresh_from_db()
         return Response(
@@ -717,7 +748,7 @@ class RewardTransactionViews(generics.CreateAPIView):
                 )
 
             # 6. Appeler directement l'API (comme dans webhook_transaction_success)
-            setting = Setting.objects.first()
+            setting = get_setting()
             if not setting:
                 return Response(
                     {"error": "Configuration système non trouvée"},
@@ -887,6 +918,16 @@ class GetRewardView(decorators.APIView):
 
 
 class ConnectProWebhook(decorators.APIView):
+    """
+    Réception du webhook Connect Pro : prise en charge idempotente sur
+    WebhookLog.reference (lock court) puis traitement dans la tâche Celery
+    connect_pro_webhook, après commit. Répond immédiatement.
+    """
+
+    # Au-delà (depuis processing_started_at), un WebhookLog resté "processing"
+    # (tâche perdue) peut être relancé
+    PROCESSING_STALE_AFTER = timedelta(minutes=5)
+
     def post(self, request, *args, **kwargs):
         try:
             connect_pro_logger.info(
@@ -903,104 +944,68 @@ class ConnectProWebhook(decorators.APIView):
                     status=status.HTTP_400_BAD_REQUEST,
                 )
 
-            # ✅ TOUT DANS UNE SEULE TRANSACTION ATOMIQUE
+            # ✅ Transaction courte : uniquement la prise en charge du WebhookLog
             with transaction.atomic():
-                connect_pro_logger.info(f"[STEP 1] Entrée transaction pour {uid}")
-
-                # Vérifier si déjà traité (avec lock pour éviter race condition)
-                existing_log = (
+                webhook_log = (
                     WebhookLog.objects.select_for_update()
-                    .filter(reference=uid, processed=True)
+                    .filter(reference=uid)
+                    .order_by("-processed", "created_at")
                     .first()
                 )
+                created = webhook_log is None
+                if created:
+                    webhook_log = WebhookLog.objects.create(
+                        reference=uid,
+                        api="CONNECT PRO",
+                        webhook_data=data,
+                        header=str(request.headers),
+                        processed=False,
+                    )
 
-                if existing_log:
+                if webhook_log.processed:
                     connect_pro_logger.info(
-                        f"[DUPLICATION] Webhook {uid} déjà traité le {existing_log.processed_at}"
+                        f"[DUPLICATION] Webhook {uid} déjà traité le {webhook_log.processed_at}"
                     )
                     return Response(
                         {"message": "Webhook déjà traité"}, status=status.HTTP_200_OK
                     )
 
-                connect_pro_logger.info(f"[STEP 2] Création WebhookLog pour {uid}")
-
-                # Créer ou récupérer le WebhookLog (avec lock)
-                (
-                    webhook_log,
-                    created,
-                ) = WebhookLog.objects.select_for_update().get_or_create(
-                    reference=uid,
-                    defaults={
-                        "api": "CONNECT PRO",
-                        "webhook_data": data,
-                        "header": str(request.headers),
-                        "processed": False,
-                    },
-                )
-
-                connect_pro_logger.info(
-                    f"[STEP 3] WebhookLog created={created}, processed={webhook_log.processed}"
-                )
-
-                # Si déjà en cours de traitement par une autre requête
-                if not created and webhook_log.processed:
+                if (
+                    not created
+                    and webhook_log.status == WebhookLog.Status.PROCESSING
+                    and (webhook_log.processing_started_at or webhook_log.created_at)
+                    > timezone.now() - self.PROCESSING_STALE_AFTER
+                ):
                     connect_pro_logger.info(
-                        f"[RACE-CONDITION] Webhook {uid} déjà traité"
+                        f"[DUPLICATION] Webhook {uid} déjà en cours de traitement"
                     )
                     return Response(
-                        {"message": "Webhook déjà traité"}, status=status.HTTP_200_OK
+                        {"message": "Webhook en cours de traitement"},
+                        status=status.HTTP_200_OK,
                     )
 
-                # Si déjà créé mais pas encore traité (retry)
-                if not created and not webhook_log.processed:
+                if not created:
                     connect_pro_logger.warning(
                         f"[RETRY] Webhook {uid} en retry (erreur: {webhook_log.error_message})"
                     )
 
-                # ✅ TRAITEMENT DANS LA TRANSACTION
-                connect_pro_logger.info(
-                    f"[STEP 4] AVANT appel connect_pro_webhook pour {uid}"
-                )
+                webhook_log.status = WebhookLog.Status.PROCESSING
+                webhook_log.processing_started_at = timezone.now()
+                webhook_log.save(update_fields=["status", "processing_started_at"])
 
-                try:
-                    connect_pro_webhook(data=data)
-
-                    connect_pro_logger.info(
-                        f"[STEP 5] APRÈS appel connect_pro_webhook pour {uid}"
-                    )
-
-                    # ✅ MARQUER COMME TRAITÉ (dans la même transaction)
-                    webhook_log.processed = True
-                    webhook_log.processed_at = timezone.now()
-                    webhook_log.error_message = None  # Clear previous errors
-                    webhook_log.save(
-                        update_fields=["processed", "processed_at", "error_message"]
-                    )
-
-                    connect_pro_logger.info(
-                        f"[SUCCESS] Webhook {uid} traité avec succès"
-                    )
-
-                    return Response(
-                        {"message": "Webhook traité avec succès"},
-                        status=status.HTTP_200_OK,
-                    )
-
-                except Exception as e:
-                    # ✅ ENREGISTRER L'ERREUR mais NE PAS marquer comme processed
-                    webhook_log.error_message = str(e)
-                    webhook_log.save(update_fields=["error_message"])
-
-                    connect_pro_logger.error(
-                        f"[ERROR] Erreur traitement {uid}: {str(e)}",
-                        exc_info=True,
+                webhook_log_id = webhook_log.id
+                payload = data.dict() if hasattr(data, "dict") else dict(data)
+                transaction.on_commit(
+                    lambda: connect_pro_webhook.delay(
+                        data=payload, webhook_log_id=webhook_log_id
                     )
+                )
 
-                    # La transaction sera automatiquement rollback
-                    return Response(
-                        {"error": "Erreur lors du traitement"},
-                        status=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    )
+            connect_pro_logger.info(f"[QUEUED] Webhook {uid} planifié pour traitement")
+            return Response(
+                {"message": "Webhook reçu, traitement en cours"},
+                status=status.HTTP_200_OK,
+            )
 
         except Exception as e:
             connect_pro_logger.error(
@@ -1187,7 +1192,7 @@ class ChangeTransactionStatus(decorators.APIView):
         serializer.is_valid(raise_exception=True)
         reference = serializer.validated_data.get("reference")
         transaction = Transaction.objects.filter(reference=reference).first()
-        setting = Setting.objects.first()
+        setting = get_setting()
         destination_status = serializer.validated_data.get("status")
         if not transaction:
             return Response(status=status.HTTP_404_NOT_FOUND)
@@ -1437,10 +1442,16 @@ class ReadNotificationView(decorators.APIView):
 
 
 class HistoryTransactionViews(generics.ListAPIView):
-    serializer_class = TransactionDetailsSerializer
+    """
+    Historique des transactions. Les réponses brutes des fournisseurs
+    (Transaction.PAYLOAD_FIELDS) ne sont ni lues ni renvoyées ; un admin
+    peut les obtenir avec ?payloads=1 (sinon : TransactionDetailView).
+    """
+
+    serializer_class = TransactionListSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = CustomPagination
-    filter_backends = [DjangoFilterBackend, SearchFilter]
+    pagination_class = CursorOrPagePagination
+    filter_backends = [DjangoFilterBackend, TransactionSearchFilter]
     filterset_fields = [
         "user",
         "telegram_user",
@@ -1450,20 +1461,25 @@ class HistoryTransactionViews(generics.ListAPIView):
         "source",
         "network",
     ]
-    search_fields = [
-        "reference",
-        "phone_number",
-        "user_app_id",
-        "public_id",
-        "user__email",
-    ]
+    search_backend = TransactionSearch()
+
+    def _with_payloads(self):
+        return self.request.user.is_staff and self.request.query_params.get("payloads") == "1"
+
+    def get_serializer_class(self):
+        if self._with_payloads():
+            return TransactionDetailsSerializer
+        return self.serializer_class
 
     def get_queryset(self):
+        queryset = Transaction.objects.select_related("user", "app", "crypto")
+        if not self._with_payloads():
+            queryset = queryset.without_payloads()
         if self.request.user.is_authenticated and self.request.user.is_staff:
-            return Transaction.objects.all()
+            return queryset
         if self.request.user.is_authenticated:
-            return Transaction.objects.filter(user=self.request.user)
-        return Transaction.objects.filter(telegram_user=self.request.telegram_user)
+            return queryset.filter(user=self.request.user)
+        return queryset.filter(telegram_user=self.request.telegram_user)
 
 
 class TransactionDetailView(decorators.APIView):
@@ -1608,7 +1624,7 @@ class CreateCoupon(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """Afficher uniquement les coupons de moins de 24 heures"""
-        setting = Setting.objects.first()
+        setting = get_setting()
         if self.request.user.is_staff:
             return Coupon.objects.all()
         else:
@@ -1693,450 +1709,27 @@ class StatisticsView(decorators.APIView):
         - Volume des transactions
         - Croissance utilisateurs
         - Système de parrainage
+
+        Sans start_date / end_date, la réponse vient du snapshot recalculé
+        par Celery toutes les 5 minutes ; `?fresh=1` force le calcul.
         """
         # Paramètres de période (optionnels)
         start_date = request.GET.get("start_date")
         end_date = request.GET.get("end_date")
+        fresh = request.GET.get("fresh") in ("1", "true", "True")
 
-        # Filtre de base pour les dates
-        date_filter = Q()
-        if start_date:
-            date_filter &= Q(created_at__gte=start_date)
-        if end_date:
-            date_filter &= Q(created_at__lte=end_date)
-
-        # ========== VOLUME DES TRANSACTIONS ==========
-        transactions = Transaction.objects.filter(date_filter)
-
-        # Total des dépôts
-        deposits = transactions.filter(type_trans="deposit", status="accept")
-        total_deposits_amount = deposits.aggregate(total=Sum("amount"))["total"] or 0
-        total_deposits_count = deposits.count()
-
-        # Total des retraits
-        withdrawals = transactions.filter(type_trans="withdrawal", status="accept")
-        total_withdrawals_amount = (
-            withdrawals.aggregate(total=Sum("amount"))["total"] or 0
-        )
-        total_withdrawals_count = withdrawals.count()
-
-        # Volume net
-        connect_pro_logger.info("[STATISTICS] Début calcul net_volume")
-
-        apps = AppName.objects.all()
-        connect_pro_logger.info("[STATISTICS] Nombre d'apps: %s", apps.count())
-
-        has_app_with_hash = apps.filter(_hash__isnull=False).exclude(_hash="").exists()
-        connect_pro_logger.info("[STATISTICS] has_app_with_hash=%s", has_app_with_hash)
-
-        net_volume = 0
-        if has_app_with_hash:
-            # Au moins une app a un hash → somme des soldes via Caisse
-            caisses = Caisse.objects.select_related("bet_app").all()
-            net_volume = sum(float(caisse.solde) for caisse in caisses)
-            connect_pro_logger.info(
-                "[STATISTICS] [SOURCE=CAISSE] net_volume=%s", net_volume
-            )
-        elif apps.exists():
-            # Des apps existent mais aucune n'a de hash → get_wallet_balance
-            connect_pro_logger.info(
-                "[STATISTICS] [SOURCE=GET_WALLET_BALANCE] Appel get_wallet_balance()"
-            )
-            try:
-                net_volume = MobCashExternalService().get_wallet_balance()
-            except Exception as e:
-                connect_pro_logger.error(
-                    "[STATISTICS] [GET_WALLET_BALANCE] Erreur: %s", e, exc_info=True
-                )
-                net_volume = None
-            if net_volume is not None:
-                connect_pro_logger.info(
-                    "[STATISTICS] [GET_WALLET_BALANCE_RESULT] Valeur retournée: %s",
-                    net_volume,
-                )
-            else:
-                connect_pro_logger.warning(
-                    "[STATISTICS] [GET_WALLET_BALANCE_RESULT] get_wallet_balance() a retourné None"
-                )
-                net_volume = 0.0
-        else:
-            connect_pro_logger.warning("[STATISTICS] Aucune app trouvée, net_volume=0")
-            net_volume = 0.0
-
-        connect_pro_logger.info("[STATISTICS] net_volume final=%s", net_volume)
-
-        # Évolution par période
-        evolution_daily = (
-            transactions.filter(
-                type_trans__in=["deposit", "withdrawal"], status="accept"
-            )
-            .annotate(date=TruncDate("created_at"))
-            .values("date", "type_trans")
-            .annotate(total_amount=Sum("amount"), count=Count("id"))
-            .order_by("date")
-        )
-
-        evolution_weekly = (
-            transactions.filter(
-                type_trans__in=["deposit", "withdrawal"], status="accept"
-            )
-            .annotate(week=TruncWeek("created_at"))
-            .values("week", "type_trans")
-            .annotate(total_amount=Sum("amount"), count=Count("id"))
-            .order_by("week")
-        )
-
-        evolution_monthly = (
-            transactions.filter(
-                type_trans__in=["deposit", "withdrawal"], status="accept"
-            )
-            .annotate(month=TruncMonth("created_at"))
-            .values("month", "type_trans")
-            .annotate(total_amount=Sum("amount"), count=Count("id"))
-            .order_by("month")
-        )
-
-        evolution_yearly = (
-            transactions.filter(
-                type_trans__in=["deposit", "withdrawal"], status="accept"
-            )
-            .annotate(year=TruncYear("created_at"))
-            .values("year", "type_trans")
-            .annotate(total_amount=Sum("amount"), count=Count("id"))
-            .order_by("year")
-        )
-
-        # ========== CROISSANCE UTILISATEURS ==========
-        users_date_filter = Q()
-        if start_date:
-            users_date_filter &= Q(date_joined__gte=start_date)
-        if end_date:
-            users_date_filter &= Q(date_joined__lte=end_date)
-
-        all_users = User.objects.filter(users_date_filter, is_delete=False)
-
-        # Nouveaux utilisateurs par période
-        new_users_daily = (
-            all_users.annotate(date=TruncDate("date_joined"))
-            .values("date")
-            .annotate(count=Count("id"))
-            .order_by("date")
-        )
-
-        new_users_weekly = (
-            all_users.annotate(week=TruncWeek("date_joined"))
-            .values("week")
-            .annotate(count=Count("id"))
-            .order_by("week")
-        )
-
-        new_users_monthly = (
-            all_users.annotate(month=TruncMonth("date_joined"))
-            .values("month")
-            .annotate(count=Count("id"))
-            .order_by("month")
-        )
-
-        # Utilisateurs actifs (qui ont fait au moins une transaction)
-        # Compte les User normaux avec transactions
-        user_transactions_filter = Q(transaction__isnull=False)
-        if start_date:
-            user_transactions_filter &= Q(transaction__created_at__gte=start_date)
-        if end_date:
-            user_transactions_filter &= Q(transaction__created_at__lte=end_date)
-
-        active_users = User.objects.filter(user_transactions_filter).distinct().count()
-
-        # Compte les TelegramUser avec transactions
-        telegram_transactions_filter = Q(transaction__isnull=False)
-        if start_date:
-            telegram_transactions_filter &= Q(transaction__created_at__gte=start_date)
-        if end_date:
-            telegram_transactions_filter &= Q(transaction__created_at__lte=end_date)
-
-        active_telegram_users = (
-            TelegramUser.objects.filter(telegram_transactions_filter).distinct().count()
-        )
-
-        active_users_count = active_users + active_telegram_users
-
-        # Utilisateurs par source
-        users_by_source = []
-        for source in ["mobile", "web", "bot"]:
-            source_transactions = transactions.filter(source=source)
-            unique_users = (
-                source_transactions.exclude(user__isnull=True)
-                .values("user")
-                .distinct()
-                .count()
-            )
-            unique_telegram_users = (
-                source_transactions.exclude(telegram_user__isnull=True)
-                .values("telegram_user")
-                .distinct()
-                .count()
-            )
-            users_by_source.append(
-                {"source": source, "count": unique_users + unique_telegram_users}
-            )
-
-        # Utilisateurs bloqués vs actifs
-        blocked_users = User.objects.filter(is_block=True, is_delete=False).count()
-        active_status_users = User.objects.filter(
-            is_active=True, is_block=False, is_delete=False
-        ).count()
-        inactive_status_users = User.objects.filter(
-            is_active=False, is_delete=False
-        ).count()
-
-        # ========== SYSTÈME DE PARRAINAGE ==========
-        # Nombre de parrainages effectués (utilisateurs avec referrer_code)
-        parrainages_count = User.objects.filter(
-            referrer_code__isnull=False, referrer_code__gt="", is_delete=False
-        ).count()
-
-        if start_date or end_date:
-            parrainages_count = User.objects.filter(
-                referrer_code__isnull=False,
-                referrer_code__gt="",
-                is_delete=False,
-                date_joined__gte=start_date if start_date else timezone.datetime.min,
-                date_joined__lte=end_date if end_date else timezone.now(),
-            ).count()
-
-        # Montant total des bonus de parrainage distribués
-        referral_bonuses = Bonus.objects.filter(reason_bonus__icontains="parrainage")
-        if start_date:
-            referral_bonuses = referral_bonuses.filter(created_at__gte=start_date)
-        if end_date:
-            referral_bonuses = referral_bonuses.filter(created_at__lte=end_date)
-
-        total_referral_bonus = (
-            referral_bonuses.aggregate(total=Sum("amount"))["total"] or 0
-        )
-
-        # Top utilisateurs par nombre de filleuls
-        top_referrers_list = []
-        for user in User.objects.filter(
-            referral_code__isnull=False, referral_code__gt=""
-        ):
-            filleuls = User.objects.filter(
-                referrer_code=user.referral_code, is_delete=False
-            ).count()
-            if filleuls > 0:
-                top_referrers_list.append(
-                    {
-                        "id": str(user.id),
-                        "username": user.username,
-                        "email": user.email,
-                        "referral_code": user.referral_code,
-                        "filleuls_count": filleuls,
-                    }
-                )
-
-        top_referrers_list = sorted(
-            top_referrers_list, key=lambda x: x["filleuls_count"], reverse=True
-        )[:10]
-
-        # Taux d'activation des codes de parrainage
-        total_referral_codes = User.objects.filter(
-            referral_code__isnull=False, referral_code__gt="", is_delete=False
-        ).count()
-
-        activated_referral_codes = (
-            User.objects.filter(
-                referrer_code__isnull=False, referrer_code__gt="", is_delete=False
-            )
-            .values("referrer_code")
-            .distinct()
-            .count()
-        )
-
-        activation_rate = (
-            (activated_referral_codes / total_referral_codes * 100)
-            if total_referral_codes > 0
-            else 0
-        )
-
-        # ========== STATISTIQUES DASHBOARD ==========
-        # Total Utilisateurs
-        total_users = User.objects.filter(is_delete=False).count()
-
-        # Utilisateurs Actifs/Inactifs
-        active_users_total = User.objects.filter(
-            is_active=True, is_block=False, is_delete=False
-        ).count()
-        inactive_users_total = User.objects.filter(
-            is_active=False, is_delete=False
-        ).count()
-
-        # Total Bonus
-        total_bonus = (
-            Bonus.objects.filter(bonus_delete=False).aggregate(total=Sum("amount"))[
-                "total"
-            ]
-            or 0
-        )
-
-        # Statistiques Bot
-        bot_transactions = transactions.filter(source="bot")
-        total_transactions_bot = bot_transactions.count()
-        total_deposit_bot = bot_transactions.filter(
-            type_trans="deposit", status="accept"
-        ).count()
-        total_withdrawal_bot = bot_transactions.filter(
-            type_trans="withdrawal", status="accept"
-        ).count()
-
-        # Utilisateurs Bot (TelegramUser)
-        telegram_users_count = TelegramUser.objects.count()
         if start_date or end_date:
-            telegram_users_filter = Q()
-            if start_date:
-                telegram_users_filter &= Q(created_at__gte=start_date)
-            if end_date:
-                telegram_users_filter &= Q(created_at__lte=end_date)
-            telegram_users_count = TelegramUser.objects.filter(
-                telegram_users_filter
-            ).count()
-
-        # Total Transactions
-        total_transactions = transactions.count()
-
-        # Transactions par application
-        transactions_by_app = {}
-        apps = AppName.objects.all()
-
-        for app in apps:
-            transactions_by_app[app.name] = {}
-
-            for type_key, _ in TYPE_TRANS:
-                app_transactions = transactions.filter(
-                    app=app, status="accept", type_trans=type_key
-                )
-
-                transactions_by_app[app.name][type_key] = {
-                    "count": app_transactions.count(),
-                    "total_amount": float(
-                        app_transactions.aggregate(total=Sum("amount"))["total"] or 0
-                    ),
-                }
-
-        # Balance Bizao (Solde de caisse total)
-        total_balance_bizao = Caisse.objects.aggregate(total=Sum("solde"))["total"] or 0
-
-        # Dépôts et Retraits Bizao (depuis le modèle Deposit)
-        deposits_bizao = Deposit.objects.all()
-        if start_date:
-            deposits_bizao = deposits_bizao.filter(created_at__gte=start_date)
-        if end_date:
-            deposits_bizao = deposits_bizao.filter(created_at__lte=end_date)
-
-        total_deposits_bizao_count = deposits_bizao.count()
-        total_deposits_bizao_amount = (
-            deposits_bizao.aggregate(total=Sum("amount"))["total"] or 0
-        )
-
-        # Retraits Bizao (depuis Caisse - calculé différemment)
-        # On utilise les retraits acceptés des transactions
-        withdrawals_bizao = withdrawals
-        total_withdrawals_bizao_count = withdrawals_bizao.count()
-        total_withdrawals_bizao_amount = float(total_withdrawals_amount)
-
-        # Récompenses (Rewards)
-        total_rewards = Reward.objects.aggregate(total=Sum("amount"))["total"] or 0
-
-        # Remboursements (Disbursements)
-        disbursements = transactions.filter(type_trans="disbursements")
-        total_disbursements = disbursements.count()
-        total_disbursements_amount = (
-            disbursements.aggregate(total=Sum("amount"))["total"] or 0
-        )
-
-        # Publicités (Advertisements)
-        total_advertisements = Advertisement.objects.count()
-        active_advertisements = Advertisement.objects.filter(enable=True).count()
-
-        # Coupons
-        total_coupons = Coupon.objects.count()
-        # Coupons en cours (moins de 24h)
-        now = timezone.now()
-        last_24h = now - timedelta(hours=24)
-        active_coupons = Coupon.objects.filter(created_at__gte=last_24h).count()
+            generated_at = timezone.now()
+            data = compute_statistics(start_date=start_date, end_date=end_date)
+        elif fresh:
+            snapshot = refresh_statistics_snapshot()
+            generated_at, data = snapshot["generated_at"], snapshot["data"]
+        else:
+            snapshot = get_statistics_snapshot()
+            generated_at, data = snapshot["generated_at"], snapshot["data"]
 
         return Response(
-            {
-                "dashboard_stats": {
-                    "total_users": total_users,
-                    "active_users": active_users_total,
-                    "inactive_users": inactive_users_total,
-                    "total_bonus": float(total_bonus),
-                    "bot_stats": {
-                        "total_transactions": total_transactions_bot,
-                        "total_deposits": total_deposit_bot,
-                        "total_withdrawals": total_withdrawal_bot,
-                        "total_users": telegram_users_count,
-                    },
-                    "total_transactions": total_transactions,
-                    "transactions_by_app": transactions_by_app,
-                    "balance_bizao": float(total_balance_bizao),
-                    "deposits_bizao": {
-                        "count": total_deposits_bizao_count,
-                        "amount": float(total_deposits_bizao_amount),
-                    },
-                    "withdrawals_bizao": {
-                        "count": total_withdrawals_bizao_count,
-                        "amount": total_withdrawals_bizao_amount,
-                    },
-                    "rewards": {"total": float(total_rewards)},
-                    "disbursements": {
-                        "count": total_disbursements,
-                        "amount": float(total_disbursements_amount),
-                    },
-                    "advertisements": {
-                        "total": total_advertisements,
-                        "active": active_advertisements,
-                    },
-                    "coupons": {"total": total_coupons, "active": active_coupons},
-                },
-                "volume_transactions": {
-                    "deposits": {
-                        "total_amount": float(total_deposits_amount),
-                        "total_count": total_deposits_count,
-                    },
-                    "withdrawals": {
-                        "total_amount": float(total_withdrawals_amount),
-                        "total_count": total_withdrawals_count,
-                    },
-                    "net_volume": float(net_volume),
-                    "evolution": {
-                        "daily": list(evolution_daily),
-                        "weekly": list(evolution_weekly),
-                        "monthly": list(evolution_monthly),
-                        "yearly": list(evolution_yearly),
-                    },
-                },
-                "user_growth": {
-                    "new_users": {
-                        "daily": list(new_users_daily),
-                        "weekly": list(new_users_weekly),
-                        "monthly": list(new_users_monthly),
-                    },
-                    "active_users_count": active_users_count,
-                    "users_by_source": list(users_by_source),
-                    "status": {
-                        "blocked": blocked_users,
-                        "active": active_status_users,
-                        "inactive": inactive_status_users,
-                    },
-                },
-                "referral_system": {
-                    "parrainages_count": parrainages_count,
-                    "total_referral_bonus": float(total_referral_bonus),
-                    "top_referrers": top_referrers_list,
-                    "activation_rate": round(activation_rate, 2),
-                },
-            }
+            data, headers={"X-Statistics-Generated-At": generated_at.isoformat()}
         )
 
 
@@ -2241,7 +1834,7 @@ def feexpay_payout_task(amount: int, phone_number: str, network_name: str):
     try:
         connect_pro_logger.info("Envoi requête Feexpay payout")
 
-        response = requests.post(url=url, json=data, headers=headers, timeout=90)
+        response = get_session("feexpay").post(url=url, json=data, headers=headers, timeout=90)
 
         connect_pro_logger.info(
             f"Réponse Feexpay | status={response.status_code} | body={response.text}"
@@ -2450,7 +2043,7 @@ class ProcessTransactionView(decorators.APIView):
                 or transaction.type_trans == "reward"
             ):
                 # Pour les dépôts, utiliser webhook_transaction_success qui gère automatiquement betpay/mobcash
-                setting = Setting.objects.first()
+                setting = get_setting()
                 webhook_transaction_success(transaction=transaction, setting=setting)
             elif transaction.type_trans == "withdrawal":
                 # Pour les retraits, utiliser l'API appropriée selon transaction.api
@@ -2546,59 +2139,25 @@ class TransactionStatusHistoryView(decorators.APIView):
     """
 
     permission_classes = [permissions.IsAdminUser]
+    # Référence, email et nom complet (User ou TelegramUser)
+    search_backend = TransactionSearch(
+        transaction_fields=("reference",),
+        user_fields=("email", "first_name", "last_name"),
+        telegram_user_fields=("email", "first_name", "last_name"),
+    )
 
     def get(self, request, *args, **kwargs):
         search = request.GET.get("search")
 
         # Vérifier qu'un critère de recherche est fourni
-        if not search:
+        if not search or not search.strip():
             return Response(
                 {"error": "Le paramètre 'search' est requis"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        search_term = search.strip()
-
-        # Construire la requête pour rechercher dans tous les champs pertinents
-        query = Q()
-
-        # Recherche par référence (exacte ou partielle)
-        query |= Q(reference__icontains=search_term)
-
-        # Recherche par email dans User ou TelegramUser
-        query |= Q(user__email__icontains=search_term) | Q(
-            telegram_user__email__icontains=search_term
-        )
-
-        # Recherche par fullname (first_name + last_name) dans User ou TelegramUser
-        # Split le search_term en parties pour rechercher dans first_name et last_name
-        search_parts = search_term.split()
-        if len(search_parts) >= 2:
-            # Si plusieurs mots, chercher le premier dans first_name et le reste dans last_name
-            first_name_part = search_parts[0]
-            last_name_part = " ".join(search_parts[1:])
-            query |= Q(
-                user__first_name__icontains=first_name_part,
-                user__last_name__icontains=last_name_part,
-            ) | Q(
-                telegram_user__first_name__icontains=first_name_part,
-                telegram_user__last_name__icontains=last_name_part,
-            )
-        else:
-            # Si un seul mot, chercher dans first_name ou last_name
-            name_part = search_parts[0]
-            query |= (
-                Q(user__first_name__icontains=name_part)
-                | Q(user__last_name__icontains=name_part)
-                | Q(telegram_user__first_name__icontains=name_part)
-                | Q(telegram_user__last_name__icontains=name_part)
-            )
-
-        # Si plusieurs critères sont fournis, utiliser AND (tous doivent correspondre)
-        transactions = (
-            Transaction.objects.filter(query)
-            .select_related("user", "telegram_user")
-            .distinct()
+        transactions = self.search_backend.filter(
+            Transaction.objects.select_related("user", "telegram_user"), search
         )
 
         transaction_count = transactions.count()
@@ -2769,7 +2328,7 @@ class LastTransactionView(generics.RetrieveAPIView):
     """
     Récupère la dernière transaction de l'utilisateur.
     """
-    serializer_class = TransactionDetailsSerializer
+    serializer_class = TransactionListSerializer
     permission_classes = [IsAuthenticated]
 
     def get_object(self):
@@ -2781,7 +2340,9 @@ class LastTransactionView(generics.RetrieveAPIView):
         user = self.request.user
         if user and user.is_authenticated:
             return (
-                Transaction.objects.filter(
+                Transaction.objects.without_payloads()
+                .select_related("user", "app", "crypto")
+                .filter(
                     user=user,
                     status="pending",
                     created_at__gte=cutoff,
@@ -2794,7 +2355,9 @@ class LastTransactionView(generics.RetrieveAPIView):
         telegram_user = getattr(self.request, "telegram_user", None)
         if telegram_user:
             return (
-                Transaction.objects.filter(
+                Transaction.objects.without_payloads()
+                .select_related("user", "app", "crypto")
+                .filter(
                     telegram_user=telegram_user,
                     status="pending",
                     created_at__gte=cutoff,
@@ -2864,7 +2427,7 @@ class FinalizeDepositTransactionByUser(decorators.APIView):
 
     def post(self, request, *args, **kwargs):
         old_reference = request.data.get("reference")
-        setting = Setting.objects.first()
+        setting = get_setting()
         if not old_reference:
             return Response({"error": "La référence est requise."}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -2965,14 +2528,25 @@ def generate_api_keys() -> dict:
 
 
 def validate_partner_key(secret_key, public_key):
-    user = User.objects.filter(
-        secret_key=secret_key, public_key=public_key, is_partner=True, is_block=False
-    ).first()
+    user = authenticate_partner(public_key=public_key, secret_key=secret_key)
     if not user:
         return {"is_valid": False}
+    allowed, retry_after = take_partner_token(user.id)
+    if not allowed:
+        return {"is_valid": False, "throttled": True, "retry_after": retry_after}
     return {"is_valid": True, "user": user}
 
 
+def partner_auth_error(auth):
+    if auth.get("throttled"):
+        return Response(
+            {"details": "Trop de requêtes, réessayez plus tard."},
+            status=status.HTTP_429_TOO_MANY_REQUESTS,
+            headers={"Retry-After": str(auth["retry_after"])},
+        )
+    return Response(status=status.HTTP_401_UNAUTHORIZED)
+
+
 class RegenerateKey(decorators.APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -2995,25 +2569,22 @@ class RegenerateKey(decorators.APIView):
             )
 
         keys = generate_api_keys()
-        user.secret_key = keys["secret_key"]
-        user.public_key = keys["public_key"]
-        user.save(update_fields=["secret_key", "public_key"])
+        user.save(update_fields=set_partner_keys(user, keys))
         return Response(keys)
 
 
 class CreatePartnerTransactionView(decorators.APIView):
 
     def post(self, request, *args, **kwargs):
-        from mobcash_inte.models import PartnerTransaction
-        from mobcash_inte.helpers import generate_reference, init_mobcash
+        from mobcash_inte.helpers import generate_reference
         from mobcash_inte.serializers import PartnerTransactionSerializer
-        from mobcash_external_service import MobCashExternalService
+        from mobcash_inte.tasks import execute_partner_transaction_task
 
         secret = request.headers.get("X-Secret-Key")
         public = request.headers.get("X-Public-Key")
         auth = validate_partner_key(secret_key=secret, public_key=public)
         if not auth.get("is_valid"):
-            return Response(status=status.HTTP_401_UNAUTHORIZED)
+            return partner_auth_error(auth)
 
         serializer = PartnerTransactionSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -3022,64 +2593,19 @@ class CreatePartnerTransactionView(decorators.APIView):
         reference = generate_reference(prefix="partner-")
         transaction = serializer.save(partner=partner, reference=reference)
 
-        app = transaction.app
-
-        if transaction.type_trans == "deposit":
-            try:
-                servculAPI = resolve_api_service(app)
-                if servculAPI:
-                    response = servculAPI.recharge_account(
-                        amount=float(transaction.amount), userid=transaction.user_app_id
-                    )
-                    xbet_data = response.get("data") if "data" in response and "code" in response else response
-                else:
-                    response = MobCashExternalService().create_deposit(transaction=transaction)
-                    xbet_data = response
-
-                if xbet_data.get("Success") == True or str(xbet_data.get("Success", "")).lower() == "true":
-                    transaction.status = "accept"
-                    transaction.validated_at = timezone.now()
-                else:
-                    transaction.status = "failed"
-                    transaction.bet_response = str(xbet_data.get("Message", ""))
-            except Exception as e:
-                transaction.status = "failed"
-                transaction.bet_response = str(e)
-
-        else:  # withdrawal
-            if transaction.validated_at:
-                connect_pro_logger.warning(
-                    f"[VALIDATION_CHECK] La transaction partenaire {transaction.id} (ref: {transaction.reference}) "
-                    f"a déjà été validée. Arrêt du processus."
-                )
-                transaction.status = "accept"
-                transaction.save()
-                return Response(PartnerTransactionSerializer(transaction).data, status=status.HTTP_201_CREATED)
-
-            try:
-                servculAPI = resolve_api_service(app)
-                if servculAPI:
-                    response = servculAPI.withdraw_from_account(
-                        userid=transaction.user_app_id, code=transaction.withdriwal_code
-                    )
-                    xbet_data = response.get("data") if "data" in response and "code" in response else response
-                else:
-                    response = MobCashExternalService().create_withdrawal(transaction=transaction)
-                    xbet_data = response
-
-                if str(xbet_data.get("Success", "")).lower() == "true":
-                    amount = float(xbet_data.get("Summa", transaction.amount)) * (-1)
-                    transaction.amount = abs(amount)
-                    transaction.status = "accept"
-                    transaction.validated_at = timezone.now()
-                else:
-                    transaction.status = "failed"
-                    transaction.bet_response = str(xbet_data.get("Message", ""))
-            except Exception as e:
-                transaction.status = "failed"
-                transaction.bet_response = str(e)
+        if request.GET.get("async") in ("1", "true"):
+            # Appel externe dans la file « partner » ; suivi via
+            # PartnerTransactionStatusView?reference= ou webhook callback_url
+            transaction_id = transaction.id
+            db_transaction.on_commit(
+                lambda: execute_partner_transaction_task.delay(transaction_id)
+            )
+            return Response(
+                PartnerTransactionSerializer(transaction).data, status=status.HTTP_202_ACCEPTED
+            )
 
-        transaction.save()
+        transaction = execute_partner_transaction(transaction.id)
+        schedule_partner_webhook(transaction)
         transaction.refresh_from_db()
         return Response(PartnerTransactionSerializer(transaction).data, status=status.HTTP_201_CREATED)
 
@@ -3091,7 +2617,7 @@ class CreatePartnerTransactionView(decorators.APIView):
         public = request.headers.get("X-Public-Key")
         auth = validate_partner_key(secret_key=secret, public_key=public)
         if not auth.get("is_valid"):
-            return Response(status=status.HTTP_401_UNAUTHORIZED)
+            return partner_auth_error(auth)
 
         reference = request.GET.get("reference")
         transaction = PartnerTransaction.objects.filter(reference=reference).first()
@@ -3110,18 +2636,19 @@ class PartnerTransactionStatusView(decorators.APIView):
         public = request.headers.get("X-Public-Key")
         auth = validate_partner_key(secret_key=secret, public_key=public)
         if not auth.get("is_valid"):
-            return Response(status=status.HTTP_401_UNAUTHORIZED)
+            return partner_auth_error(auth)
 
+        # reference : renvoyée par le 202 du mode asynchrone
+        reference = request.GET.get("reference")
         external_reference = request.GET.get("external_reference")
-        if not external_reference:
+        if not (reference or external_reference):
             return Response(
-                {"external_reference": ["external_reference is required"]},
+                {"external_reference": ["external_reference or reference is required"]},
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
-        transaction = PartnerTransaction.objects.filter(
-            external_reference=external_reference, partner=auth["user"]
-        ).first()
+        lookup = {"reference": reference} if reference else {"external_reference": external_reference}
+        transaction = PartnerTransaction.objects.filter(partner=auth["user"], **lookup).first()
         if not transaction:
             return Response(status=status.HTTP_404_NOT_FOUND)
         return Response(PartnerTransactionSerializer(transaction).data)
@@ -3142,10 +2669,21 @@ class CouponV2View(generics.ListCreateAPIView):
 
     def get_queryset(self):
         last_24h = timezone.now() - relativedelta(hours=24)
-        qs = CouponV2.objects.filter(created_at__gte=last_24h)
+        qs = CouponV2.objects.filter(created_at__gte=last_24h).select_related(
+            'bet_app', 'author', 'author__coupon_stats'
+        )
         bet_app = self.request.query_params.get('bet_app')
         if bet_app:
             qs = qs.filter(bet_app__id=bet_app)
+        if self.request.user.is_authenticated:
+            # Votes de l'utilisateur courant sur la page : une seule requête
+            qs = qs.prefetch_related(
+                Prefetch(
+                    'ratings',
+                    queryset=CouponRatingV2.objects.filter(user=self.request.user),
+                    to_attr='user_ratings',
+                )
+            )
         return qs
 
     def create(self, request, *args, **kwargs):
@@ -3153,7 +2691,7 @@ class CouponV2View(generics.ListCreateAPIView):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        setting = Setting.objects.first()
+        setting = get_setting()
 
         if not setting.coupon_enable:
             return Response({"error": "Le système de coupons est désactivé."}, status=status.HTTP_403_FORBIDDEN)
@@ -3201,7 +2739,7 @@ class CouponV2View(generics.ListCreateAPIView):
 
 
 class CouponV2DetailView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = CouponV2.objects.all()
+    queryset = CouponV2.objects.select_related('bet_app', 'author', 'author__coupon_stats')
     serializer_class = CouponV2Serializer
 
     def get_permissions(self):
@@ -3219,7 +2757,7 @@ class VoteCouponV2View(APIView):
         vote_type = serializer.validated_data['vote_type']
         is_like = (vote_type == 'like')
 
-        setting = Setting.objects.first()
+        setting = get_setting()
         if not (setting.allow_all_users_publish_coupons or getattr(request.user, 'can_rate_coupons', False)):
             return Response({"error": "Vous n'avez pas l'autorisation de noter des coupons."}, status=status.HTTP_403_FORBIDDEN)
 
@@ -3227,7 +2765,7 @@ class VoteCouponV2View(APIView):
         if not coupon:
             return Response({"error": "Coupon non trouvé."}, status=status.HTTP_404_NOT_FOUND)
 
-        if coupon.author == request.user:
+        if coupon.author_id == request.user.pk:
             return Response({"error": "Vous ne pouvez pas voter sur votre propre coupon."}, status=status.HTTP_400_BAD_REQUEST)
 
         # Règle 1 vote/jour/auteur
@@ -3240,79 +2778,20 @@ class VoteCouponV2View(APIView):
         if already_voted_today:
             return Response({"error": "Vous avez déjà voté aujourd'hui sur un coupon de cet auteur."}, status=status.HTTP_400_BAD_REQUEST)
 
+        result = cast_vote(request.user, coupon, is_like, setting)
         monetization_enabled = setting.enable_coupon_monetization
-        monetization_amount = setting.monetization_amount
-        coupon_rating_points = setting.coupon_rating_points
-
-        author = coupon.author
-        wallet = None
-        if author:
-            wallet, _ = CouponWallet.objects.get_or_create(user=author)
-
-        existing_rating = CouponRatingV2.objects.filter(user=request.user, coupon=coupon).first()
-        adjustment = 0
-        points_delta = 0
-
-        if existing_rating is None:
-            # Nouveau vote
-            CouponRatingV2.objects.create(user=request.user, coupon=coupon, is_like=is_like)
-            if is_like:
-                coupon.likes_count += 1
-                adjustment = monetization_amount
-            else:
-                coupon.dislikes_count += 1
-                adjustment = -monetization_amount
-            points_delta = float(coupon_rating_points)
-
-        elif existing_rating.is_like == is_like:
-            # Annulation du vote
-            existing_rating.delete()
-            if is_like:
-                coupon.likes_count = max(0, coupon.likes_count - 1)
-                adjustment = -monetization_amount
-            else:
-                coupon.dislikes_count = max(0, coupon.dislikes_count - 1)
-                adjustment = monetization_amount
-            points_delta = -float(coupon_rating_points)
-
-        else:
-            # Changement de vote
-            existing_rating.is_like = is_like
-            existing_rating.save()
-            if is_like:
-                coupon.likes_count += 1
-                coupon.dislikes_count = max(0, coupon.dislikes_count - 1)
-                adjustment = 2 * monetization_amount
-            else:
-                coupon.dislikes_count += 1
-                coupon.likes_count = max(0, coupon.likes_count - 1)
-                adjustment = -2 * monetization_amount
-            # Pas de changement de points lors d'un changement de vote
-
-        coupon.save()
-
-        if author:
-            if points_delta != 0:
-                author.coupon_points = float(author.coupon_points or 0) + points_delta
-                author.save(update_fields=['coupon_points'])
-
-            if monetization_enabled and wallet and adjustment != 0:
-                wallet.balance = float(wallet.balance) + float(adjustment)
-                if float(adjustment) > 0:
-                    wallet.total_earned = float(wallet.total_earned) + float(adjustment)
-                wallet.save()
 
         return Response({
             "message": f"Vote {vote_type} enregistré avec succès",
             "coupon": {
                 "id": str(coupon.id),
-                "likes": coupon.likes_count,
-                "dislikes": coupon.dislikes_count,
-                "user_liked": is_like if existing_rating is None else (existing_rating.is_like if existing_rating else False),
-                "user_disliked": not is_like if existing_rating is None else (not existing_rating.is_like if existing_rating else False),
+                "likes": result.likes,
+                "dislikes": result.dislikes,
+                "user_liked": result.vote is True,
+                "user_disliked": result.vote is False,
             },
-            "amount_earned": str(adjustment) if monetization_enabled else "0",
-            "points_delta": points_delta,
+            "amount_earned": str(result.adjustment) if monetization_enabled else "0",
+            "points_delta": float(result.points_delta),
         }, status=status.HTTP_200_OK)
 
 
@@ -3333,7 +2812,7 @@ class CouponWithdrawalView(APIView):
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
 
-        setting = Setting.objects.first()
+        setting = get_setting()
         wallet, _ = CouponWallet.objects.get_or_create(user=request.user)
 
         amount = data['amount']
@@ -3384,7 +2863,7 @@ class CouponWithdrawalView(APIView):
 class CouponPayoutListView(generics.ListAPIView):
     serializer_class = CouponPayoutSerializer
     permission_classes = [permissions.IsAdminUser]
-    pagination_class = CustomPagination
+    pagination_class = CursorOrPagePagination
     queryset = CouponPayout.objects.all().order_by('-created_at')
 
 
@@ -3484,9 +2963,13 @@ class AuthorStatsView(APIView):
         if not author:
             return Response({"error": "Auteur non trouvé."}, status=status.HTTP_404_NOT_FOUND)
 
-        total_likes = AuthorCouponRating.objects.filter(coupon_author=author, is_like=True).count()
-        total_dislikes = AuthorCouponRating.objects.filter(coupon_author=author, is_like=False).count()
-        total_coupons = CouponV2.objects.filter(author=author).count()
+        votes = AuthorCouponRating.objects.filter(coupon_author=author).aggregate(
+            likes=Count('id', filter=Q(is_like=True)),
+            dislikes=Count('id', filter=Q(is_like=False)),
+        )
+        total_likes = votes['likes']
+        total_dislikes = votes['dislikes']
+        total_coupons = AuthorCouponStats.for_author(author).total_coupons
         total_votes = total_likes + total_dislikes
         author_rating = round((total_likes / total_votes) * 5, 2) if total_votes > 0 else 0.0
 
@@ -3509,15 +2992,13 @@ class UserCouponStatsView(APIView):
 
     def get(self, request):
         user = request.user
-        total_coupons = CouponV2.objects.filter(author=user).count()
-        total_likes = sum(c.likes_count for c in CouponV2.objects.filter(author=user))
-        total_dislikes = sum(c.dislikes_count for c in CouponV2.objects.filter(author=user))
+        stats = AuthorCouponStats.for_author(user)
         wallet, _ = CouponWallet.objects.get_or_create(user=user)
 
         return Response({
-            "total_published_coupons": total_coupons,
-            "total_likes_received": total_likes,
-            "total_dislikes_received": total_dislikes,
+            "total_published_coupons": stats.total_coupons,
+            "total_likes_received": stats.total_likes,
+            "total_dislikes_received": stats.total_dislikes,
             "wallet_balance": str(wallet.balance),
             "total_earned": str(wallet.total_earned),
             "pending_payouts": str(wallet.pending_payout),
@@ -3,9 +3,11 @@ import os
 import re
 
 import requests
+from http_client import get_session
 
 from accounts.models import User
-from mobcash_inte.models import Setting
+from mobcash_inte.local_cache import VersionedLocalCache
+from mobcash_inte.setting_cache import get_setting
 
 # Sur le même serveur que My Customer, préfère une URL interne via env
 # pour éviter le timeout hairpin NAT (appel public vers soi-même) :
@@ -32,12 +34,12 @@ def normalize_whatsapp_phone(phone: str) -> str:
 
 
 def is_whatsapp_enabled() -> bool:
-    setting = Setting.objects.first()
+    setting = get_setting()
     return bool(setting and setting.use_whatsapp and setting.openwa_token)
 
 
 def _get_whatsapp_setting():
-    setting = Setting.objects.first()
+    setting = get_setting()
     if not setting or not setting.use_whatsapp:
         return None
     if not setting.openwa_token:
@@ -74,7 +76,7 @@ def validate_whatsapp_phone(phone: str) -> dict:
     url = f"{base}/messages/check/"
     logger.info("WhatsApp check → %s phone=%s", url, phone)
     try:
-        response = requests.post(
+        response = get_session("whatsapp").post(
             url,
             headers=_api_headers(setting),
             json={"phone": phone},
@@ -155,7 +157,7 @@ def send_whatsapp_message(
         check_whatsapp,
     )
     try:
-        response = requests.post(
+        response = get_session("whatsapp").post(
             url,
             headers=_api_headers(setting),
             json=payload,
@@ -233,6 +235,79 @@ def _platform_labels() -> list[str]:
     return sorted(labels, key=len, reverse=True)
 
 
+# Nettoyage final, commun à tous les messages
+_CLEANUP_PATTERNS = (
+    (re.compile(r"[ \t]{2,}"), " "),
+    (re.compile(r"\s+\."), "."),
+    (re.compile(r"\.\.+"), "."),
+)
+
+
+class PlatformNameStripper:
+    """
+    Passes de remplacement compilées UNE fois pour une liste de libellés.
+    Les passes restent appliquées dans l'ordre (même résultat qu'avant) ;
+    un texte sans aucun libellé ne passe que par le nettoyage final.
+    """
+
+    def __init__(self, labels: list[str]):
+        self.labels = labels
+        names_alt = "|".join(re.escape(label) for label in labels)
+        flags = re.IGNORECASE
+        self.prefilter = re.compile(names_alt, flags) if labels else None
+        self.patterns = [
+            (re.compile(pattern, flags), repl)
+            for pattern, repl in (
+                (rf"\s+sur votre compte\s+(?:{names_alt})\b", ""),
+                (rf"\s+de votre compte\s+(?:{names_alt})\b", ""),
+                (rf"\s+depuis\s+(?:{names_alt})\b", ""),
+                (rf"\s+sur\s+(?:{names_alt})\b", ""),
+                (rf"\s+de\s+(?:{names_alt})\b", ""),
+                (rf"(?:{names_alt})\s+Message\s*:", "Message:"),
+                (rf"(?:{names_alt})\s+Message\b", "Message"),
+                (rf"(demande de (?:dépôt|retrait)(?:\s+de)?)\s+(?:{names_alt})\b", r"\1"),
+                (rf"\s+(?:{names_alt})\b", ""),
+            )
+        ] if labels else []
+
+    def strip(self, text: str) -> str:
+        if not text:
+            return text
+        if not self.labels:
+            return text
+        result = text
+        if self.prefilter.search(result):
+            for pattern, repl in self.patterns:
+                result = pattern.sub(repl, result)
+        for pattern, repl in _CLEANUP_PATTERNS:
+            result = pattern.sub(repl, result)
+        return result.strip()
+
+
+# Stripper par process, reconstruit quand AppName change (version partagée,
+# incrémentée par le post_save / post_delete d'AppName) ou après le TTL.
+PLATFORM_LABELS_VERSION_KEY = "mobcash:app_names:version"
+PLATFORM_STRIPPER_TTL = 300
+PLATFORM_STRIPPER_VERSION_CHECK = 1.0
+
+_stripper_cache = VersionedLocalCache(
+    PLATFORM_LABELS_VERSION_KEY,
+    ttl=PLATFORM_STRIPPER_TTL,
+    version_check=PLATFORM_STRIPPER_VERSION_CHECK,
+)
+
+
+def bump_platform_labels_version():
+    """Invalide le stripper dans TOUS les process (AppName modifié)."""
+    _stripper_cache.bump()
+
+
+def get_platform_name_stripper() -> PlatformNameStripper:
+    return _stripper_cache.get(
+        "stripper", lambda version: PlatformNameStripper(_platform_labels())
+    )
+
+
 def strip_platform_names_for_whatsapp(text: str) -> str:
     """
     Retire le nom de plateforme des textes WhatsApp.
@@ -240,31 +315,7 @@ def strip_platform_names_for_whatsapp(text: str) -> str:
     """
     if not text:
         return text
-
-    labels = _platform_labels()
-    if not labels:
-        return text
-
-    names_alt = "|".join(re.escape(label) for label in labels)
-    patterns = [
-        (rf"\s+sur votre compte\s+(?:{names_alt})\b", ""),
-        (rf"\s+de votre compte\s+(?:{names_alt})\b", ""),
-        (rf"\s+depuis\s+(?:{names_alt})\b", ""),
-        (rf"\s+sur\s+(?:{names_alt})\b", ""),
-        (rf"\s+de\s+(?:{names_alt})\b", ""),
-        (rf"(?:{names_alt})\s+Message\s*:", "Message:"),
-        (rf"(?:{names_alt})\s+Message\b", "Message"),
-        (rf"(demande de (?:dépôt|retrait)(?:\s+de)?)\s+(?:{names_alt})\b", r"\1"),
-        (rf"\s+(?:{names_alt})\b", ""),
-    ]
-    result = text
-    for pattern, repl in patterns:
-        result = re.sub(pattern, repl, result, flags=re.IGNORECASE)
-
-    result = re.sub(r"[ \t]{2,}", " ", result)
-    result = re.sub(r"\s+\.", ".", result)
-    result = re.sub(r"\.\.+", ".", result)
-    return result.strip()
+    return get_platform_name_stripper().strip(text)
 
 
 def send_whatsapp_to_user(user, title: str, content: str) -> dict:
@@ -10,6 +10,15 @@ app.config_from_object("django.conf:settings", namespace="CELERY")
 app.autodiscover_tasks()
 app.conf.broker_connection_retry_on_startup = True
 
+# Appels bookmaker / MobCash des partenaires (jusqu'à 300 s) : file dédiée,
+# pour ne pas bloquer les autres tâches. Worker (programme Supervisor
+# celery_mobcash_partner, voir init_server.sh) :
+#   celery -A mobcash_inte_backend worker -Q partner
+app.conf.task_routes = {
+    'mobcash_inte.tasks.execute_partner_transaction_task': {'queue': 'partner'},
+    'mobcash_inte.tasks.send_partner_webhook': {'queue': 'partner'},
+}
+
 app.conf.beat_schedule = {
     'grant-coupon-publishing-permissions': {
         'task': 'mobcash_inte.tasks.grant_coupon_publishing_permissions',
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from datetime import timedelta
 from pathlib import Path
 import os
+import sys
 from celery.schedules import crontab
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -609,7 +610,23 @@ CELERY_BEAT_SCHEDULE = {
     },
     "cancel-old-pending-transactions": {
         "task": "mobcash_inte.helpers.cancel_old_pending_transactions",
-        "schedule": crontab(hour=0, minute=0),  # Chaque jour à 00h00
+        "schedule": crontab(minute=15),  # Toutes les heures (lots courts)
+    },
+    "refresh-statistics-snapshot": {
+        "task": "mobcash_inte.tasks.refresh_statistics_snapshot",
+        "schedule": crontab(minute="*/5"),  # Toutes les 5 minutes
+    },
+    "rebuild-recent-transaction-rollup": {
+        "task": "mobcash_inte.tasks.rebuild_recent_transaction_rollup",
+        "schedule": crontab(hour=0, minute=30),
+    },
+    "flush-coupon-vote-buffers": {
+        "task": "mobcash_inte.tasks.flush_coupon_vote_buffers",
+        "schedule": 10.0,  # Toutes les 10 secondes
+    },
+    "reap-stale-partner-claims": {
+        "task": "mobcash_inte.tasks.reap_stale_partner_claims",
+        "schedule": crontab(minute="*/5"),  # Toutes les 5 minutes
     },
 }
 
@@ -639,3 +656,25 @@ CHANNEL_LAYERS = {
         },
     },
 }
+
+"""CACHE CONFIGURATION"""
+# Cache partagé entre gunicorn / daphne / celery (ex : version du Setting
+# pour invalider get_setting() dans tous les workers).
+# En tests : cache mémoire local, aucun Redis requis.
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.getenv("CACHE_REDIS_URL", "redis://127.0.0.1:6379/1"),
+        "KEY_PREFIX": "mobcash",
+    }
+}
+if "test" in sys.argv:
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    }
+
+# Durée max (secondes) de la copie locale du Setting dans chaque process
+SETTING_CACHE_TTL = int(os.getenv("SETTING_CACHE_TTL", "30"))
+
+# Compteurs de votes CouponV2 bufferisés dans le cache (coupons très sollicités)
+COUPON_VOTE_BUFFER = os.getenv("COUPON_VOTE_BUFFER", "false").lower() == "true"
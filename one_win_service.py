@@ -1,4 +1,4 @@
-import requests
+from http_client import get_session
 import logging
 
 logger = logging.getLogger("mobcash_inte_backend.transactions")
@@ -20,7 +20,7 @@ class OneWinService:
         data = {"userId": int(userid), "amount": amount}
 
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = get_session("one_win").post(url, json=data, headers=headers, timeout=30)
             logger.info(f"[1WIN] [DEPOSIT] status={response.status_code} body={response.text[:300]}")
 
             if response.status_code in (200, 201):
@@ -55,7 +55,7 @@ class OneWinService:
         data = { "code": str(userid), "userId": int(userid)}
 
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = get_session("one_win").post(url, json=data, headers=headers, timeout=30)
             logger.info(f"[1WIN] [WITHDRAWAL] status={response.status_code} body={response.text[:300]}")
 
             if response.status_code in (200, 201):
@@ -1,5 +1,10 @@
 import asyncio
 import requests
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from functools import partial
+from http_client import get_session
 import os
 import re
 from accounts.models import User
@@ -17,11 +22,14 @@ from mobcash_inte.helpers import (
     send_notification,
     send_telegram_message,
 )
-from mobcash_inte.models import Bonus, Caisse, Reward, Setting, Transaction
+from mobcash_inte.cache_lock import CacheLock
+from mobcash_inte.models import Bonus, Caisse, Reward, Setting, Transaction, WebhookLog
+from mobcash_inte.setting_cache import get_setting
 from django.utils import timezone
 from dateutil.relativedelta import relativedelta
 import logging
 from django.db import OperationalError, transaction as db_transaction
+from django.core.cache import cache
 from django.db.models import Q
 from mobcash_inte.serializers import TransactionDetailsSerializer
 from mobcash_inte_backend.settings import BASE_URL
@@ -65,7 +73,7 @@ def track_status_change(transaction: Transaction, new_status: str, source: str =
 
 
 def connect_base_url():
-    setting = Setting.objects.first()
+    setting = get_setting()
     return setting.connect_pro_base_url or "https://connect.turaincash.com"
 
 CONNECT_PRO_BASE_URL = os.getenv("CONNECT_PRO_BASE_URL")
@@ -86,7 +94,7 @@ def _connect_pro_api_base() -> str:
 
 
 def connect_pro_token():
-    setting = Setting.objects.first()
+    setting = get_setting()
     token = None
     if (
         setting.expired_connect_pro_token
@@ -107,13 +115,20 @@ def connect_pro_token():
         "Content-Type": "application/json",
     }
     try:
-        response = requests.post(url, json=data, headers=headers, timeout=30)
+        response = get_session("connect_pro").post(url, json=data, headers=headers, timeout=30)
 
         setting.expired_connect_pro_token = timezone.now() + relativedelta(hours=23)
         setting.connect_pro_token = response.json().get("access")
         setting.connect_pro_refresh = response.json().get("refresh")
         connect_pro_logger.info(f"Un nouveau token generer {response.json()}")
-        setting.save()
+        # update_fields : la copie vient de get_setting(), ne pas écraser le reste
+        setting.save(
+            update_fields=[
+                "expired_connect_pro_token",
+                "_connect_pro_token",
+                "_connect_pro_refresh",
+            ]
+        )
         return response.json().get("access")
     except Exception as e:
         connect_pro_logger.critical(f"Une erreur de generation de token {e}")
@@ -133,7 +148,7 @@ def get_network_id(name):
     url = CONNECT_PRO_BASE_URL + "/api/payments/networks/"
     connect_pro_logger.info(f"[GET_NETWORK_ID] GET {url} | recherche réseau: {name}")
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_session("connect_pro").get(url, headers=headers, timeout=30)
         connect_pro_logger.info(
             f"[GET_NETWORK_ID] Response status={response.status_code} | body={response.text[:500]}"
         )
@@ -199,9 +214,8 @@ def connect_withdrawal(transaction: Transaction):
     amount = transaction.amount
     if transaction.network.name.lower() == "wave" and not transaction.network.customer_pay_fee:
         transaction.net_payable_amout = total_amount_to_send_wave(amount)
-        transaction.save()
+        transaction.save(update_fields=["net_payable_amout"])
         amount = transaction.net_payable_amout
-    transaction.save()
 
     data = {
         "type": "deposit",
@@ -224,13 +238,13 @@ def connect_withdrawal(transaction: Transaction):
         f"[CONNECT_WITHDRAWAL] POST {url} | transaction_id={transaction.id} | body={data}"
     )
     try:
-        response = requests.post(url, json=data, headers=headers, timeout=30)
+        response = get_session("connect_pro").post(url, json=data, headers=headers, timeout=30)
         connect_pro_logger.info(
             f"[CONNECT_WITHDRAWAL] Response status={response.status_code} | body={response.text[:500]}"
         )
         transaction.connect_pro_response = str(response.content)
         transaction.public_id = response.json().get("data").get("uid")
-        transaction.save()
+        transaction.save(update_fields=["connect_pro_response", "public_id"])
     except Exception as e:
         connect_pro_logger.info(f"[CONNECT_WITHDRAWAL] Erreur: {e}")
 
@@ -271,7 +285,7 @@ def round_up_half(n):
 
 def deposit_connect(transaction: Transaction):
     token = connect_pro_token()
-    setting = Setting.objects.first()
+    setting = get_setting()
     headers = {
         "Authorization": f"Bearer {token}",
         "Content-Type": "application/json",
@@ -295,17 +309,17 @@ def deposit_connect(transaction: Transaction):
             "callback_url": f"{BASE_URL}/connect-pro-webhook",
         }
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = get_session("connect_pro").post(url, json=data, headers=headers, timeout=30)
             connect_pro_logger.info(f" connect pro  response {response.json()}")
             transaction.public_id = response.json().get("data").get("uid")
             transaction.transaction_link = (
                 setting.wave_default_link + f"?amount={amount}"
             )
             transaction.connect_pro_response = str(response.content)
-            transaction.save()
+            transaction.save(update_fields=["public_id", "transaction_link", "connect_pro_response"])
         except Exception as e:
             transaction.connect_pro_response = str(e)
-            transaction.save()
+            transaction.save(update_fields=["public_id", "transaction_link", "connect_pro_response"])
             connect_pro_logger.critical(
                 f" Erreur de creation wave pour connect pro {e}"
             )
@@ -328,7 +342,7 @@ def deposit_connect(transaction: Transaction):
             f"[CONNECT_MOMO_PAY] POST {url} | transaction_id={transaction.id} | body={data}"
         )
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = get_session("connect_pro").post(url, json=data, headers=headers, timeout=30)
             connect_pro_logger.info(
                 f"[CONNECT_MOMO_PAY] Response status={response.status_code} | body={response.text[:500]}"
             )
@@ -343,10 +357,10 @@ def deposit_connect(transaction: Transaction):
                     + f"?amount={amount}&reference={transaction.reference}"
                 )
             transaction.connect_pro_response = str(response.content)
-            transaction.save()
+            transaction.save(update_fields=["public_id", "transaction_link", "connect_pro_response"])
         except Exception as e:
             transaction.connect_pro_response = str(e)
-            transaction.save()
+            transaction.save(update_fields=["public_id", "transaction_link", "connect_pro_response"])
             connect_pro_logger.critical(
                 f" Erreur de creation de transaction {transaction.network.name} pour connect pro {e}"
             )
@@ -377,16 +391,16 @@ def deposit_connect(transaction: Transaction):
             f"[CONNECT_USSD_WITHDRAWAL] POST {url} | transaction_id={transaction.id} | body={data}"
         )
         try:
-            response = requests.post(url, json=data, headers=headers, timeout=30)
+            response = get_session("connect_pro").post(url, json=data, headers=headers, timeout=30)
             connect_pro_logger.info(
                 f"[CONNECT_USSD_WITHDRAWAL] Response status={response.status_code} | body={response.text[:500]}"
             )
             transaction.connect_pro_response = str(response.content)
             transaction.public_id = response.json().get("data").get("uid")
-            transaction.save()
+            transaction.save(update_fields=["connect_pro_response", "public_id"])
         except Exception as e:
             transaction.connect_pro_response = str(e)
-            transaction.save()
+            transaction.save(update_fields=["connect_pro_response", "public_id"])
             connect_pro_logger.info(f"[CONNECT_USSD_WITHDRAWAL] Erreur: {e}")
 
 
@@ -410,7 +424,7 @@ def connect_pro_status(reference, is_wave=False, is_momo_pay=False):
         "Content-Type": "application/json",
     }
     try:
-        response = requests.get(url, headers=headers, timeout=30)
+        response = get_session("connect_pro").get(url, headers=headers, timeout=30)
         connect_pro_logger.info(
             f" connect pro  response status {response.content} status {response.status_code}"
         )
@@ -430,53 +444,303 @@ def transaction_process(reference):
         pass
 
 
-@shared_task
-def connect_pro_webhook(data):
+# Erreurs passagères (statut Connect Pro illisible, base indisponible) :
+# la tâche est rejouée après 30 s, 1, 2, 4 puis 8 min
+CONNECT_PRO_WEBHOOK_MAX_RETRIES = 5
+
+
+class ConnectProUnavailable(Exception):
+    """Statut Connect Pro illisible (token, réseau, réponse invalide)."""
+
+
+def _start_webhook_log(webhook_log_id):
+    if webhook_log_id:
+        WebhookLog.objects.filter(id=webhook_log_id).update(
+            status=WebhookLog.Status.PROCESSING, processing_started_at=timezone.now()
+        )
+
+
+def _finish_webhook_log(webhook_log_id, error_message=None):
+    """Marque le WebhookLog traité, ou enregistre l'erreur (non traité → retry possible)."""
+    if not webhook_log_id:
+        return
+    if error_message:
+        WebhookLog.objects.filter(id=webhook_log_id).update(
+            status=WebhookLog.Status.FAILED, error_message=error_message
+        )
+        return
+    WebhookLog.objects.filter(id=webhook_log_id).update(
+        status=WebhookLog.Status.SUCCESS,
+        processed=True,
+        processed_at=timezone.now(),
+        error_message=None,
+    )
+
+
+@shared_task(bind=True, acks_late=True, max_retries=CONNECT_PRO_WEBHOOK_MAX_RETRIES)
+def connect_pro_webhook(self, data, webhook_log_id=None):
+    """
+    Traitement du webhook Connect Pro, sans lock DB pendant les appels externes :
+    1. lock court : dépôt/reward → init_payment (prise en charge idempotente) ;
+    2. hors lock : appel API betting (peut durer plusieurs minutes) ;
+    3. lock court : accept, ou message d'erreur + notification.
+    Échecs, retraits et achats/ventes restent traités sous un lock court.
+
+    La vue répond 200 avant traitement : les erreurs passagères sont rejouées
+    ici (le WebhookLog reste PROCESSING), les autres le marquent FAILED. Un
+    rejeu ne recrédite jamais : la prise en charge (init_payment) est unique.
+    """
     connect_pro_logger.info(
         f"le data recue est {data} aavec le public id {data.get('uid')}"
     )
+    _start_webhook_log(webhook_log_id)
+    try:
+        _connect_pro_webhook_process(data)
+    except (ConnectProUnavailable, OperationalError) as e:
+        if self.request.retries < self.max_retries:
+            countdown = 30 * 2**self.request.retries
+            connect_pro_logger.warning(
+                f"[WEBHOOK] Erreur passagère {data.get('uid')}: {e}, nouvel essai dans {countdown}s"
+            )
+            if webhook_log_id:
+                WebhookLog.objects.filter(id=webhook_log_id).update(error_message=str(e))
+            raise self.retry(exc=e, countdown=countdown)
+        connect_pro_logger.error(
+            f"[WEBHOOK] Abandon {data.get('uid')} après {self.request.retries} essais: {e}"
+        )
+        _finish_webhook_log(webhook_log_id, error_message=str(e))
+        return
+    except Exception as e:
+        connect_pro_logger.error(
+            f"[WEBHOOK] Erreur traitement {data.get('uid')}: {str(e)}", exc_info=True
+        )
+        _finish_webhook_log(webhook_log_id, error_message=str(e))
+        return
+    _finish_webhook_log(webhook_log_id)
+
+
+def _lock_webhook_transaction(uid):
+    return (
+        Transaction.objects.filter(public_id=uid)
+        .exclude(Q(status="error") | Q(status="accept"))
+        .select_for_update()
+        .first()
+    )
+
+
+def _connect_pro_webhook_process(data):
+    uid = data.get("uid")
+    transaction = (
+        Transaction.objects.select_related("network", "app")
+        .filter(public_id=uid)
+        .exclude(Q(status="error") | Q(status="accept"))
+        .first()
+    )
+    if not transaction:
+        connect_pro_logger.info(
+            f"La transaction avec public id {uid} n'existe pas ou a ete deja traiter"
+        )
+        return
+    connect_pro_logger.info(f"la reference qui a ete transmi {uid}")
+
+    # Vérification du statut chez Connect Pro (appel HTTP, hors lock)
+    if transaction.network.name == "wave" and transaction.type_trans != "withdrawal":
+        provider_data = connect_pro_status(reference=transaction.public_id, is_wave=True)
+    else:
+        provider_data = connect_pro_status(
+            reference=transaction.public_id,
+            is_momo_pay=(
+                False
+                if (
+                    not transaction.network.payment_by_link
+                    or transaction.type_trans == "withdrawal"
+                )
+                else True
+            ),
+        )
+    if not isinstance(provider_data, dict):
+        raise ConnectProUnavailable(f"Statut Connect Pro indisponible pour {uid}")
+    provider_status = provider_data.get("status")
+    setting = get_setting()
+
+    if provider_status in ("failed", "cancelled", "timeout"):
+        connect_pro_logger.info("Transaction is fail")
+        with db_transaction.atomic():
+            transaction = _lock_webhook_transaction(uid)
+            if not transaction:
+                return
+            transaction.wehook_receive_at = timezone.now()
+            transaction.webhook_data = data
+            webhook_transaction_failled(transaction=transaction)
+    elif provider_status in ("success", "confirmed"):
+        connect_pro_logger.info("Transaction is success")
+        if transaction.type_trans in ("deposit", "reward"):
+            claimed, amount = claim_deposit_for_payment(
+                transaction_id=transaction.id, setting=setting, webhook_data=data
+            )
+            if not claimed:
+                return
+            try:
+                xbet_response_data = _call_betting_api(claimed, amount)
+            except Exception as e:
+                # Le crédit a peut-être été effectué : la transaction reste en
+                # init_payment (pas de nouvel appel automatique, vérif. agent).
+                connect_pro_logger.error(
+                    f"Erreur appel API betting transaction {claimed.id}: {str(e)}",
+                    exc_info=True,
+                )
+                raise
+            commit_deposit_payment(
+                transaction_id=claimed.id, xbet_response_data=xbet_response_data
+            )
+        else:
+            with db_transaction.atomic():
+                transaction = _lock_webhook_transaction(uid)
+                if not transaction:
+                    return
+                transaction.wehook_receive_at = timezone.now()
+                transaction.webhook_data = data
+                webhook_transaction_success(transaction=transaction, setting=setting)
+
+
+def claim_deposit_for_payment(transaction_id, setting, webhook_data=None):
+    """
+    Phase 1 (lock court) : passe le dépôt/reward en init_payment.
+    Retourne (transaction, montant à créditer), ou (None, None) si la
+    transaction est déjà prise en charge (init_payment) ou finalisée.
+    """
     with db_transaction.atomic():
         transaction = (
-            Transaction.objects.filter(public_id=data.get("uid"))
-            .exclude(Q(status="error") | Q(status="accept"))
-            .select_for_update()
+            Transaction.objects.select_for_update()
+            .filter(id=transaction_id)
+            .exclude(status__in=["accept", "error", "init_payment"])
             .first()
         )
         if not transaction:
             connect_pro_logger.info(
-                f"La transaction avec public id {data.get('uid')} n'existe pas ou a ete deja traiter"
+                f"[CLAIM] Transaction {transaction_id} déjà prise en charge ou finalisée"
             )
-            return
-            # data = None
-        transaction.wehook_receive_at = timezone.now()
-        transaction.webhook_data = data
-        connect_pro_logger.info(f"la reference qui a ete transmi {data.get('uid')}")
-        if (
-            transaction.network.name == "wave"
-            and transaction.type_trans != "withdrawal"
-        ):
-            data = connect_pro_status(reference=transaction.public_id, is_wave=True)
-        else:
-            data = connect_pro_status(
-                reference=transaction.public_id,
-                is_momo_pay=(
-                    False
-                    if (
-                        not transaction.network.payment_by_link
-                        or transaction.type_trans == "withdrawal"
-                    )
-                    else True
-                ),
+            return None, None
+        if webhook_data is not None:
+            transaction.wehook_receive_at = timezone.now()
+            transaction.webhook_data = webhook_data
+            transaction.save(update_fields=["wehook_receive_at", "webhook_data"])
+        transaction.change_status(
+            new_status="init_payment",
+            source="WEBHOOK",
+            message="Paiement reçu, appel API betting en cours",
+        )
+        amount = _deposit_amount_with_reward(transaction, setting)
+    return transaction, amount
+
+
+def commit_deposit_payment(transaction_id, xbet_response_data):
+    """Phase 3 (lock court) : applique la réponse de l'API betting."""
+    with db_transaction.atomic():
+        transaction = (
+            Transaction.objects.select_for_update()
+            .filter(id=transaction_id, status="init_payment")
+            .first()
+        )
+        if not transaction:
+            connect_pro_logger.warning(
+                f"[COMMIT] Transaction {transaction_id} n'est plus en init_payment, réponse ignorée: {xbet_response_data}"
             )
-        setting = Setting.objects.first()
-        if (
-            data.get("status") == "failed" or data.get("status") == "cancelled"
-        ) or data.get("status") == "timeout":
-            connect_pro_logger.info("Transaction is fail")
-            webhook_transaction_failled(transaction=transaction)
-        elif data.get("status") == "success" or data.get("status") == "confirmed":
-            connect_pro_logger.info("Transaction is success")
-            webhook_transaction_success(transaction=transaction, setting=setting)
+            return None
+        _apply_betting_api_response(transaction, xbet_response_data)
+    return transaction
+
+
+def _deposit_amount_with_reward(transaction: Transaction, setting: Setting):
+    """Montant à créditer, bonus de dépôt inclus (persisté sur la transaction)."""
+    amount = transaction.amount
+    if setting.deposit_reward and transaction.type_trans != "reward":
+        bonus = (
+            setting.deposit_reward_percent * transaction.amount
+        ) / constant.BONUS_PERCENT_MAX
+        amount = amount + bonus
+        transaction.deposit_reward_amount = bonus
+        transaction.net_payable_amout = amount
+        transaction.save(update_fields=["deposit_reward_amount", "net_payable_amout"])
+    return amount
+
+
+def _call_betting_api(transaction: Transaction, amount):
+    """Recharge le compte betting. Aucun lock DB ne doit être tenu pendant cet appel."""
+    servculAPI = resolve_api_service(transaction.app)
+    if servculAPI:
+        response = servculAPI.recharge_account(
+            amount=float(amount), userid=transaction.user_app_id
+        )
+        connect_pro_logger.info(
+            f"Reponse de l'api de {transaction.app.name}: {response}"
+        )
+        # BetApp retourne {"code": 0, "data": {...}}, OneWinService/MobCash retournent directement le dict
+        return response.get("data") if "data" in response and "code" in response else response
+    response = MobCashExternalService().create_deposit(transaction=transaction)
+    connect_pro_logger.info(
+        f"Reponse de l'api de {transaction.app.name}: {response}"
+    )
+    return response
+
+
+def _apply_betting_api_response(transaction: Transaction, xbet_response_data):
+    if xbet_response_data.get("Success") == True or str(xbet_response_data.get("Success")).lower() == "true":
+        connect_pro_logger.info(
+            f"Transaction de {transaction.app.name} success - passage au statut accept"
+        )
+        transaction.validated_at = timezone.now()
+        transaction.change_status(
+            new_status="accept",
+            source="API_RESPONSE",
+            data=xbet_response_data,
+            message="Dépôt confirmé par l'API betting",
+            extra_fields=["validated_at"],
+        )
+        connect_pro_logger.info(f"Transaction {transaction.id} sauvegardée avec succès au statut accept")
+
+        # Appel de la tâche Celery pour les opérations lentes (notifications, bonus, etc.)
+        try:
+            connect_pro_logger.info(f"Planification notification task pour transaction {transaction.id} après commit")
+            db_transaction.on_commit(lambda: process_transaction_notifications_and_bonus.delay(transaction_id=transaction.id))
+        except Exception as e:
+            connect_pro_logger.error(
+                f"Erreur planification process_transaction_notifications_and_bonus pour transaction {transaction.id}: {str(e)}",
+                exc_info=True,
+            )
+
+        # check_solde pour les rewards comme pour les dépôts normaux
+        try:
+            connect_pro_logger.info(f"Planification check_solde task pour transaction {transaction.id} ({transaction.type_trans}) après commit")
+            db_transaction.on_commit(lambda: check_solde.delay(transaction_id=transaction.id))
+        except Exception as e:
+            connect_pro_logger.error(
+                f"Erreur planification check_solde pour transaction {transaction.id}: {str(e)}",
+                exc_info=True,
+            )
+        return
+
+    # Handle transaction failure - Appel de la tâche Celery pour les notifications d'erreur
+    app_name = transaction.app.name.upper() if transaction.app else "l'application"
+    error_message = (
+        f"Une erreur est survenue lors de votre dépôt de {transaction.amount} FCFA sur "
+        f"{app_name}. "
+        f"{app_name} Message: {xbet_response_data.get('Message')}. "
+        f"Référence de la transaction {transaction.reference}"
+    )
+    transaction.message=xbet_response_data.get('Message')
+    transaction.save(update_fields=["message"])
+    try:
+        process_transaction_notifications_and_bonus.delay(
+            transaction_id=transaction.id,
+            is_error=True,
+            error_message=error_message
+        )
+    except Exception as e:
+        connect_pro_logger.error(
+            f"Erreur process_transaction_notifications_and_bonus.delay (erreur) pour transaction {transaction.id}: {str(e)}",
+            exc_info=True,
+        )
 
 
 def webhook_transaction_success(transaction: Transaction, setting: Setting):
@@ -495,102 +759,9 @@ def webhook_transaction_success(transaction: Transaction, setting: Setting):
                     source="WEBHOOK",
                     message="Paiement reçu, appel API betting en cours",
                 )
-                app = transaction.app
-                amount = transaction.amount
-
-                if setting.deposit_reward and transaction.type_trans != "reward":
-                    bonus = (
-                        setting.deposit_reward_percent * transaction.amount
-                    ) / constant.BONUS_PERCENT_MAX
-                    amount = amount + bonus
-                    transaction.deposit_reward_amount = bonus
-                    transaction.net_payable_amout = amount
-                    transaction.save()
-
-                servculAPI = resolve_api_service(transaction.app)
-                if servculAPI:
-                    response = servculAPI.recharge_account(
-                        amount=float(amount), userid=transaction.user_app_id
-                    )
-                    connect_pro_logger.info(
-                        f"Reponse de l'api de {transaction.app.name}: {response}"
-                    )
-                    # BetApp retourne {"code": 0, "data": {...}}, OneWinService/MobCash retournent directement le dict
-                    xbet_response_data = response.get("data") if "data" in response and "code" in response else response
-                else:
-                    response = MobCashExternalService().create_deposit(transaction=transaction)
-                    connect_pro_logger.info( 
-                        f"Reponse de l'api de {transaction.app.name}: {response}"
-                    )
-                    xbet_response_data = response
-                if xbet_response_data.get("Success") == True or str(xbet_response_data.get("Success")).lower() == "true":
-                    connect_pro_logger.info(
-                        f"Transaction de {transaction.app.name} success - passage au statut accept"
-                    )
-                    transaction.validated_at = timezone.now()
-                    transaction.change_status(
-                        new_status="accept",
-                        source="API_RESPONSE",
-                        data=xbet_response_data,
-                        message="Dépôt confirmé par l'API betting",
-                        extra_fields=["validated_at"],
-                    )
-                    connect_pro_logger.info(f"Transaction {transaction.id} sauvegardée avec succès au statut accept")
-
-                    # Appel de la tâche Celery pour les opérations lentes (notifications, bonus, etc.)
-                    try:
-                        connect_pro_logger.info(f"Planification notification task pour transaction {transaction.id} après commit")
-                        db_transaction.on_commit(lambda: process_transaction_notifications_and_bonus.delay(transaction_id=transaction.id))
-                    except Exception as e:
-                        connect_pro_logger.error(
-                            f"Erreur planification process_transaction_notifications_and_bonus pour transaction {transaction.id}: {str(e)}",
-                            exc_info=True,
-                        )
-
-                    # Si c'est une reward, on doit aussi appeler check_solde
-                    if transaction.type_trans == "reward":
-                        try:
-                            connect_pro_logger.info(f"Planification check_solde task pour transaction {transaction.id} (reward) après commit")
-                            db_transaction.on_commit(lambda: check_solde.delay(transaction_id=transaction.id))
-                        except Exception as e:
-                            connect_pro_logger.error(
-                                f"Erreur planification check_solde pour transaction {transaction.id}: {str(e)}",
-                                exc_info=True,
-                            )
-                        return 
-
-                    # Pour les dépôts normaux, on appelle aussi check_solde
-                    try:
-                        connect_pro_logger.info(f"Planification check_solde task pour transaction {transaction.id} (deposit) après commit")
-                        db_transaction.on_commit(lambda: check_solde.delay(transaction_id=transaction.id))
-                    except Exception as e:
-                        connect_pro_logger.error(
-                            f"Erreur planification check_solde pour transaction {transaction.id}: {str(e)}",
-                            exc_info=True,
-                        )
-                else:
-                    # Handle transaction failure - Appel de la tâche Celery pour les notifications d'erreur
-                    app_name = transaction.app.name.upper() if transaction.app else "l'application"
-                    error_message = (
-                        f"Une erreur est survenue lors de votre dépôt de {transaction.amount} FCFA sur "
-                        f"{app_name}. "
-                        f"{app_name} Message: {xbet_response_data.get('Message')}. "
-                        f"Référence de la transaction {transaction.reference}"
-                    )
-                    transaction.message=xbet_response_data.get('Message')
-                    transaction.save()
-                    try:
-                        process_transaction_notifications_and_bonus.delay(
-                            transaction_id=transaction.id,
-                            is_error=True,
-                            error_message=error_message
-                        )
-                    except Exception as e:
-                        connect_pro_logger.error(
-                            f"Erreur process_transaction_notifications_and_bonus.delay (erreur) pour transaction {transaction.id}: {str(e)}",
-                            exc_info=True,
-                        )
-
+                amount = _deposit_amount_with_reward(transaction, setting)
+                xbet_response_data = _call_betting_api(transaction, amount)
+                _apply_betting_api_response(transaction, xbet_response_data)
             except Exception as e:
                 connect_pro_logger.error(
                     f"Erreur traitement deposit/reward transaction {transaction.id}: {str(e)}",
@@ -768,7 +939,7 @@ def process_transaction_notifications_and_bonus(transaction_id, is_error=False,
 
         user = transaction.user if transaction.user else transaction.telegram_user
 
-        setting = Setting.objects.first()
+        setting = get_setting()
         if not setting:
             connect_pro_logger.error("Setting non trouvé dans process_transaction_notifications_and_bonus")
             return
@@ -1095,6 +1266,7 @@ def xbet_withdrawal_process(transaction: Transaction):
         elif str(xbet_response_data.get("Success")).lower() == "true":
             connect_pro_logger.info("app BET step suvccess 11111111")
             amount = float(xbet_response_data.get("Summa")) * (-1)
+            old_amount = transaction.amount
             transaction.amount = amount
             transaction.change_status(
                 new_status="init_payment",
@@ -1102,6 +1274,7 @@ def xbet_withdrawal_process(transaction: Transaction):
                 data=xbet_response_data,
                 message="Retrait validé par l'API betting, paiement en cours",
                 extra_fields=["amount"],
+                old_amount=old_amount,
             )
             transaction.validated_at = timezone.now()
             transaction.save(update_fields=["validated_at"])
@@ -1235,7 +1408,7 @@ def feexpay_payout(transaction: Transaction):
 
     try:
         connect_pro_logger.info("debut de creatuion de retrait feexpay")
-        response = requests.post(url=url, json=data, headers=headers, timeout=120)
+        response = get_session("feexpay").post(url=url, json=data, headers=headers, timeout=120)
         connect_pro_logger.info(f"le data envoyer data======{data}, url======{url} ")
         connect_pro_logger.info(f" feexpay payout response {response.json()}")
 
@@ -1249,7 +1422,7 @@ def feexpay_payout(transaction: Transaction):
             feexpay_uid = response_data.get("uid") or response_data.get("data", {}).get("uid")
             if feexpay_uid:
                 transaction.public_id = feexpay_uid
-            transaction.save()
+            transaction.save(update_fields=["public_id"])
 
         # connect_pro_logger.critical(f" Erreur de creation feexpay payout network error {e}")
     except Exception as e:
@@ -1334,7 +1507,7 @@ def feexpay_deposit(transaction: Transaction):
     }
 
     try:
-        response = requests.post(url=url, json=data, headers=headers, timeout=45)
+        response = get_session("feexpay").post(url=url, json=data, headers=headers, timeout=45)
         connect_pro_logger.info(
             f" feexpay response 22 {response.json()} data === {data}"
         )
@@ -1349,7 +1522,7 @@ def feexpay_deposit(transaction: Transaction):
             feexpay_uid = response_data.get("uid") or response_data.get("data", {}).get("uid")
             if feexpay_uid:
                 transaction.public_id = feexpay_uid
-            transaction.save()
+            transaction.save(update_fields=["public_id"])
 
     except requests.exceptions.Timeout as e:
         connect_pro_logger.critical(f" Erreur de creation feexpay timeout {e}")
@@ -1457,7 +1630,7 @@ def feexpay_check_status(public_id):
     }
     try:
         connect_pro_logger.info(f"GET {url}")
-        response = requests.get(url=url, headers=header, timeout=30)
+        response = get_session("feexpay").get(url=url, headers=header, timeout=30)
         connect_pro_logger.info(f"Response: {response.status_code} {response.text}")
         return {"code": constant.CODE_SUCCESS, "data": response.json()}
     except Exception as e:
@@ -1504,7 +1677,7 @@ def feexpay_webhook(data):
         transaction.webhook_data = json.dumps(data) if isinstance(data, dict) else str(data)
         connect_pro_logger.info(f"la reference qui a ete transmi {reference}")
 
-        setting = Setting.objects.first()
+        setting = get_setting()
 
         # Adapter les statuts Feexpay aux statuts Connect
         if transaction_status == "FAILED" or transaction_status == "failed" or transaction_status == "cancelled":
@@ -1515,166 +1688,263 @@ def feexpay_webhook(data):
             webhook_transaction_success(transaction=transaction, setting=setting)
 
 
-@shared_task
-def check_pending_feexpay_transactions():
+FEEXPAY_RECONCILE_LOCK_KEY = "mobcash:lock:check_pending_feexpay"
+# Le verrou est prolongé après chaque étape (statut Feexpay, transaction
+# appliquée) : son TTL doit couvrir la plus longue étape, un appel API
+# betting (jusqu'à 300 s) sous select_for_update dans feexpay_webhook.
+FEEXPAY_RECONCILE_LOCK_TTL = 360
+# Aucun nouvel appel Feexpay ni nouvelle transaction appliquée au-delà :
+# le reste est repris au run suivant (toujours pending)
+FEEXPAY_RECONCILE_MAX_RUN_SECONDS = 90
+FEEXPAY_RECONCILE_MAX_PER_RUN = 200
+FEEXPAY_RECONCILE_WORKERS = 8
+FEEXPAY_RECONCILE_BATCH_SIZE = 20
+FEEXPAY_SUCCESS_STATUSES = ("SUCCESSFUL", "success", "confirmed")
+FEEXPAY_FINAL_STATUSES = FEEXPAY_SUCCESS_STATUSES + ("FAILED", "failed", "cancelled")
+
+
+def _feexpay_recheck_interval(age: timedelta) -> int:
+    """Backoff selon l'âge : les transactions récentes sont vérifiées à chaque run."""
+    if age < timedelta(minutes=10):
+        return 0
+    if age < timedelta(hours=1):
+        return 120
+    if age < timedelta(hours=6):
+        return 600
+    return 1800
+
+
+def _feexpay_next_check_key(transaction_id) -> str:
+    return f"mobcash:feexpay:next_check:{transaction_id}"
+
+
+def _alert_feexpay_success_not_accepted(transaction: Transaction, feexpay_status):
+    """Feexpay dit SUCCESSFUL mais la transaction (déjà tentée) n'est pas accept."""
+    try:
+        if transaction.user:
+            user_info = f"User: {transaction.user.email} (ID: {transaction.user.id})"
+        elif transaction.telegram_user:
+            user_info = f"Telegram User: {transaction.telegram_user.telegram_user_id}"
+        else:
+            user_info = "User inconnu"
+
+        app_name = transaction.app.name if transaction.app else "Application inconnue"
+
+        message = (
+            f"⚠️ ALERTE: Transaction Feexpay SUCCESSFUL mais non traitée\n\n"
+            f"Référence: {transaction.reference}\n"
+            f"Numero: {transaction.phone_number}\n"
+            f"Reseau: {transaction.network.public_name}\n"
+            f"Montant: {transaction.amount} FCFA\n"
+            f"Type: {transaction.type_trans}\n"
+            f"Application: {app_name}\n"
+            f"{user_info}\n"
+            f"Statut Feexpay: {feexpay_status}\n"
+            f"Statut actuel DB: {transaction.status}\n"
+            f"Timestamp: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
+            f"⚠️ Cette transaction a déjà été tentée dans webhook_transaction_success mais n'a pas été acceptée."
+        )
+
+        send_telegram_message(content=message)
+        connect_pro_logger.warning(
+            f"Notification Telegram envoyée pour transaction {transaction.id} - "
+            f"Feexpay SUCCESSFUL mais status DB: {transaction.status}"
+        )
+    except Exception as e:
+        connect_pro_logger.error(
+            f"Erreur envoi notification Telegram pour transaction {transaction.id}: {str(e)}",
+            exc_info=True
+        )
+
+
+def _feexpay_fetch_status(candidate, deadline=None):
     """
-    Vérifie le statut de toutes les transactions Feexpay en attente (pending)
-    et les traite via feexpay_webhook si leur statut a changé.
-    Cette fonction est appelée toutes les 2 minutes par Celery Beat.
+    Exécuté dans le pool de threads : appel HTTP uniquement, aucun accès DB.
+    Retourne None sans appel si `deadline` (time.monotonic) est dépassée.
     """
-    connect_pro_logger.info("Début de la vérification des transactions Feexpay pending")
-    
-    # Récupérer toutes les transactions pending avec api="feexpay"
-    # Exclure celles qui sont déjà acceptées ou en erreur (pour éviter de retraiter)
-    pending_transactions = Transaction.objects.filter(
-        status="pending",
-        api="feexpay"
-    ).exclude(
-        Q(public_id__isnull=True) | Q(public_id="")
-    ).exclude(
-        Q(status="accept") | Q(status="error")
-    )
-    
-    if not pending_transactions.exists():
-        connect_pro_logger.info("Aucune transaction Feexpay pending à vérifier")
-        return
-    
-    count = pending_transactions.count()
-    connect_pro_logger.info(f"Vérification de {count} transaction(s) Feexpay pending")
-    
-    processed_count = 0
-    error_count = 0
-    
-    for transaction in pending_transactions:
+    if deadline is not None and time.monotonic() >= deadline:
+        return None
+    transaction_id, public_id, reference = candidate
+    status_result = feexpay_check_status(public_id)
+    if status_result.get("code") != constant.CODE_SUCCESS:
+        return transaction_id, None, status_result.get("erreur")
+    status_data = status_result.get("data") or {}
+    if not status_data:
+        return transaction_id, None, None
+    # Formater les données comme un webhook Feexpay
+    webhook_data = {
+        "reference": status_data.get("reference") or public_id,
+        "externalId": reference or public_id,
+        "uid": public_id,
+        "status": status_data.get("status") or status_data.get("transactionStatus"),
+        **status_data  # Inclure toutes les autres données
+    }
+    return transaction_id, webhook_data, None
+
+
+def _apply_feexpay_batch(batch, stats, lock=None, deadline=None):
+    """
+    Applique un lot de statuts finaux (feexpay_webhook) puis recharge le lot
+    en une requête. S'arrête à `deadline` ou si le verrou du run est perdu ;
+    retourne False dans ce cas.
+    """
+    attempted = {}
+    completed = True
+    for transaction_id, webhook_data, already_attempted in batch:
+        if deadline is not None and time.monotonic() >= deadline:
+            completed = False
+            break
         try:
-            # Vérifier le statut avec feexpay_check_status
-            # feexpay_check_status utilise public_id dans l'URL, donc on doit utiliser public_id uniquement
-            public_id = transaction.public_id
-            
-            if not public_id:
-                connect_pro_logger.warning(
-                    f"Transaction {transaction.id} n'a pas de public_id, ignorée"
-                )
-                continue
-            
-            connect_pro_logger.info(
-                f"Vérification du statut pour transaction {transaction.id} (reference: {transaction.reference}) avec public_id: {public_id}"
-            )
-            
-            status_result = feexpay_check_status(public_id)
-            
-            # Vérifier si la vérification a réussi
-            if status_result.get("code") != constant.CODE_SUCCESS:
-                connect_pro_logger.error(
-                    f"Erreur lors de la vérification du statut pour transaction {transaction.id}: {status_result.get('erreur')}"
-                )
-                error_count += 1
-                continue
-            
-            # Récupérer les données de statut
-            status_data = status_result.get("data", {})
-            
-            if not status_data:
-                connect_pro_logger.warning(
-                    f"Aucune donnée retournée pour transaction {transaction.id}"
-                )
-                continue
-            
-            # Formater les données comme un webhook Feexpay
-            # Le webhook Feexpay attend un format avec reference/externalId et status
-            webhook_data = {
-                "reference": status_data.get("reference") or public_id,
-                "externalId": transaction.reference or public_id,
-                "uid": public_id,
-                "status": status_data.get("status") or status_data.get("transactionStatus"),
-                **status_data  # Inclure toutes les autres données
-            }
-            
-            # Appeler feexpay_webhook pour traiter la transaction
-            feexpay_status = webhook_data.get('status')
-            connect_pro_logger.info(
-                f"Traitement de la transaction {transaction.id} via feexpay_webhook avec status: {feexpay_status}"
-            )
-            
-            # Sauvegarder l'ID de la transaction avant l'appel
-            transaction_id = transaction.id
-            
-            # Vérifier si la transaction a déjà été tentée dans webhook_transaction_success
-            transaction_already_attempted = (
-                transaction.status == "init_payment" or 
-                transaction.webhook_data is not None or 
-                transaction.wehook_receive_at is not None
-            )
-            
             feexpay_webhook(webhook_data)
-            
-            # Recharger la transaction depuis la DB pour voir son statut actuel
-            transaction.refresh_from_db()
-            
-            # Vérifier si Feexpay dit SUCCESSFUL mais la transaction n'est pas accept
-            if (
-                feexpay_status in ["SUCCESSFUL", "success", "confirmed"] and
-                transaction.status != "accept" and
-                transaction_already_attempted
-            ):
-                # C'est un 2ème appel qui a échoué - envoyer notification Telegram
-                try:
-                    user_info = ""
-                    if transaction.user:
-                        user_info = f"User: {transaction.user.email} (ID: {transaction.user.id})"
-                    elif transaction.telegram_user:
-                        user_info = f"Telegram User: {transaction.telegram_user.telegram_user_id}"
-                    else:
-                        user_info = "User inconnu"
-                    
-                    app_name = transaction.app.name if transaction.app else "Application inconnue"
-                    
-                    message = (
-                        f"⚠️ ALERTE: Transaction Feexpay SUCCESSFUL mais non traitée\n\n"
-                        f"Référence: {transaction.reference}\n"
-                        f"Numero: {transaction.phone_number}\n"
-                        f"Reseau: {transaction.network.public_name}\n"
-                        f"Montant: {transaction.amount} FCFA\n"
-                        f"Type: {transaction.type_trans}\n"
-                        f"Application: {app_name}\n"
-                        f"{user_info}\n"
-                        f"Statut Feexpay: {feexpay_status}\n"
-                        f"Statut actuel DB: {transaction.status}\n"
-                        
-                        f"Timestamp: {timezone.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n"
-                        f"⚠️ Cette transaction a déjà été tentée dans webhook_transaction_success mais n'a pas été acceptée."
-                    )
-                    
-                    send_telegram_message(content=message)
-                    connect_pro_logger.warning(
-                        f"Notification Telegram envoyée pour transaction {transaction_id} - "
-                        f"Feexpay SUCCESSFUL mais status DB: {transaction.status}"
-                    )
-                except Exception as e:
-                    connect_pro_logger.error(
-                        f"Erreur envoi notification Telegram pour transaction {transaction_id}: {str(e)}",
-                        exc_info=True
-                    )
-            
-            processed_count += 1
-            
+            attempted[transaction_id] = (webhook_data.get("status"), already_attempted)
+            stats["processed"] += 1
         except Exception as e:
             connect_pro_logger.error(
-                f"Erreur lors du traitement de la transaction {transaction.id}: {str(e)}",
+                f"Erreur lors du traitement de la transaction {transaction_id}: {str(e)}",
                 exc_info=True
             )
-            error_count += 1
-            continue
-    
-    connect_pro_logger.info(
-        f"Vérification terminée: {processed_count} transaction(s) traitée(s), {error_count} erreur(s)"
-    )
-    
-    return {
-        "total": count,
-        "processed": processed_count,
-        "errors": error_count
+            stats["errors"] += 1
+        if lock is not None and not lock.extend():
+            connect_pro_logger.warning("[FEEXPAY_RECONCILE] Verrou perdu, arrêt du run")
+            completed = False
+            break
+
+    refreshed = Transaction.objects.select_related(
+        "user", "telegram_user", "app", "network"
+    ).in_bulk(list(attempted.keys()))
+    for transaction_id, (feexpay_status, already_attempted) in attempted.items():
+        transaction = refreshed.get(transaction_id)
+        if (
+            transaction
+            and feexpay_status in FEEXPAY_SUCCESS_STATUSES
+            and transaction.status != "accept"
+            and already_attempted
+        ):
+            # C'est un 2ème appel qui a échoué - envoyer notification Telegram
+            _alert_feexpay_success_not_accepted(transaction, feexpay_status)
+    return completed
+
+
+@shared_task
+def check_pending_feexpay_transactions():
+    """
+    Réconciliation des transactions Feexpay pending (Celery Beat, toutes les 30 s).
+
+    - verrou distribué (CacheLock) : un seul run actif à la fois, prolongé
+      après chaque étape, supprimé seulement s'il est encore à nous ;
+    - durée bornée (FEEXPAY_RECONCILE_MAX_RUN_SECONDS) : au-delà, plus
+      d'appel Feexpay ni de transaction appliquée, reprise au run suivant ;
+    - priorité aux transactions récentes, backoff sur les anciennes ;
+    - statuts Feexpay récupérés en parallèle (pool de threads borné) ;
+    - changements d'état appliqués par petits lots ;
+    - débit du run journalisé et retourné.
+    """
+    lock = CacheLock(FEEXPAY_RECONCILE_LOCK_KEY, FEEXPAY_RECONCILE_LOCK_TTL)
+    if not lock.acquire():
+        connect_pro_logger.info("[FEEXPAY_RECONCILE] Run précédent encore actif, tick ignoré")
+        return {"skipped": True}
+
+    started = time.monotonic()
+    deadline = started + FEEXPAY_RECONCILE_MAX_RUN_SECONDS
+    stats = {
+        "total": 0,
+        "checked": 0,
+        "backoff_skipped": 0,
+        "deadline_skipped": 0,
+        "changed": 0,
+        "processed": 0,
+        "errors": 0,
     }
+    try:
+        now = timezone.now()
+        # Récupérer les transactions pending avec api="feexpay", les plus récentes d'abord
+        pending = list(
+            Transaction.objects.filter(status="pending", api="feexpay")
+            .exclude(Q(public_id__isnull=True) | Q(public_id=""))
+            .order_by("-created_at")
+            .values_list("id", "public_id", "reference", "created_at", "webhook_data", "wehook_receive_at")
+        )
+        stats["total"] = len(pending)
+        if not pending:
+            connect_pro_logger.info("Aucune transaction Feexpay pending à vérifier")
+            return stats
+
+        next_checks = cache.get_many([_feexpay_next_check_key(row[0]) for row in pending])
+        now_ts = now.timestamp()
+        candidates = []
+        already_attempted = {}
+        schedule = {}
+        for transaction_id, public_id, reference, created_at, webhook_data, received_at in pending:
+            key = _feexpay_next_check_key(transaction_id)
+            if next_checks.get(key, 0) > now_ts:
+                stats["backoff_skipped"] += 1
+                continue
+            if len(candidates) >= FEEXPAY_RECONCILE_MAX_PER_RUN:
+                break
+            candidates.append((transaction_id, public_id, reference))
+            # Vérifier si la transaction a déjà été tentée dans webhook_transaction_success
+            already_attempted[transaction_id] = webhook_data is not None or received_at is not None
+            interval = _feexpay_recheck_interval(now - created_at)
+            if interval:
+                schedule[transaction_id] = (key, now_ts + interval)
+
+        connect_pro_logger.info(
+            f"[FEEXPAY_RECONCILE] {len(candidates)}/{stats['total']} transaction(s) à vérifier "
+            f"({stats['backoff_skipped']} en backoff)"
+        )
+
+        changes = []
+        checked = set()
+        lock_lost = False
+        fetch = partial(_feexpay_fetch_status, deadline=deadline)
+        with ThreadPoolExecutor(max_workers=FEEXPAY_RECONCILE_WORKERS) as executor:
+            for result in executor.map(fetch, candidates):
+                if result is None:
+                    stats["deadline_skipped"] += 1
+                    continue
+                transaction_id, webhook_data, error = result
+                stats["checked"] += 1
+                checked.add(transaction_id)
+                if not lock_lost and not lock.extend():
+                    connect_pro_logger.warning("[FEEXPAY_RECONCILE] Verrou perdu, arrêt du run")
+                    lock_lost = True
+                if error:
+                    connect_pro_logger.error(
+                        f"Erreur lors de la vérification du statut pour transaction {transaction_id}: {error}"
+                    )
+                    stats["errors"] += 1
+                    continue
+                if not webhook_data or webhook_data.get("status") not in FEEXPAY_FINAL_STATUSES:
+                    continue
+                changes.append((transaction_id, webhook_data, already_attempted[transaction_id]))
+
+        # Backoff pour les transactions vérifiées sans statut final ; les
+        # statuts finaux non appliqués (durée, verrou) sont repris au run suivant
+        checked -= {change[0] for change in changes}
+        schedule = {key: ts for transaction_id, (key, ts) in schedule.items() if transaction_id in checked}
+        if schedule:
+            cache.set_many(schedule, timeout=FEEXPAY_RECONCILE_LOCK_TTL + 1800)
+
+        stats["changed"] = len(changes)
+        if lock_lost:
+            return stats
+        for start in range(0, len(changes), FEEXPAY_RECONCILE_BATCH_SIZE):
+            if not _apply_feexpay_batch(
+                changes[start:start + FEEXPAY_RECONCILE_BATCH_SIZE], stats, lock=lock, deadline=deadline
+            ):
+                break
+
+        return stats
+    finally:
+        elapsed = time.monotonic() - started
+        stats["duration_s"] = round(elapsed, 3)
+        stats["throughput_per_s"] = round(stats["checked"] / elapsed, 1) if elapsed > 0 else 0.0
+        connect_pro_logger.info(
+            f"[FEEXPAY_RECONCILE] Terminé: {stats['checked']} vérifiée(s), {stats['changed']} changement(s), "
+            f"{stats['processed']} traitée(s), {stats['errors']} erreur(s) en {stats['duration_s']}s "
+            f"({stats['throughput_per_s']} tx/s)"
+        )
+        lock.release()
 
 
 def connect_balance():
@@ -1687,7 +1957,7 @@ def connect_balance():
         "Content-Type": "application/json",
     }
     try:
-        response = requests.get(url=url, headers=headers, timeout=30)
+        response = get_session("connect_pro").get(url=url, headers=headers, timeout=30)
         return {"data": response.json(), "code": constant.CODE_SUCCESS}
     except Exception as e:
         return {"error": str(e), "code": constant.CODE_EXEPTION}
@@ -1704,6 +1974,7 @@ def connect_pro_verify_transaction_by_user_sms(
     ref: str = "",
     operator_id: str = "",
     operation_at: str | None = None,
+    sms_type: str | None = None,
 ) -> dict:
     """
     POST /api/payments/user/verify-transaction-by-user-sms/
@@ -1742,9 +2013,11 @@ def connect_pro_verify_transaction_by_user_sms(
         payload["network_id"] = str(network_id).strip()
     if operation_at and str(operation_at).strip():
         payload["operation_at"] = str(operation_at).strip()
+    if sms_type and str(sms_type).strip():
+        payload["sms_type"] = str(sms_type).strip()
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_session("connect_pro").post(url, json=payload, headers=headers, timeout=30)
         try:
             data = response.json()
         except Exception:
@@ -1824,7 +2097,7 @@ def connect_pro_confirm_withdrawal(
         payload["note"] = str(note).strip()
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_session("connect_pro").post(url, json=payload, headers=headers, timeout=30)
         try:
             data = response.json()
         except Exception:
@@ -1876,7 +2149,7 @@ def connect_pro_retry_deposit(
         payload["note"] = str(note).strip()
 
     try:
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = get_session("connect_pro").post(url, json=payload, headers=headers, timeout=30)
         try:
             data = response.json()
         except Exception:
@@ -0,0 +1,70 @@
+import logging
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import AppName, User
+from mobcash_inte.models import AuthorCouponStats, CouponRatingV2, CouponV2
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class CouponV2ListTests(APITestCase):
+    """Liste CouponV2 : nombre de requêtes constant par page"""
+
+    url = "/mobcash/v2/coupons"
+
+    def setUp(self):
+        self.app = AppName.objects.create(name="app_coupons")
+        self.voter = User.objects.create(
+            username="voter", email="voter@example.com", phone="2250700000001"
+        )
+        self.client.force_authenticate(self.voter)
+        self.author_index = 0
+
+    def _publish(self, count, likes=0, dislikes=0):
+        self.author_index += 1
+        author = User.objects.create(
+            username=f"auteur_{self.author_index}",
+            email=f"auteur.{self.author_index}@example.com",
+            phone="2250700000002",
+        )
+        coupons = [
+            CouponV2.objects.create(
+                author=author,
+                bet_app=self.app,
+                likes_count=likes,
+                dislikes_count=dislikes,
+            )
+            for _ in range(count)
+        ]
+        AuthorCouponStats.rebuild(author.pk)
+        return coupons
+
+    def _list(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"page_size": 50})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response.json()["results"]
+
+    def test_query_count_constant_per_page(self):
+        coupons = self._publish(2, likes=3, dislikes=1)
+        CouponRatingV2.objects.create(user=self.voter, coupon=coupons[0], is_like=True)
+        baseline, _ = self._list()
+
+        for _ in range(5):
+            liked = self._publish(3, likes=1)
+            CouponRatingV2.objects.create(user=self.voter, coupon=liked[0], is_like=False)
+        count, results = self._list()
+
+        self.assertEqual(len(results), 17)
+        self.assertEqual(count, baseline)
+        by_id = {item["id"]: item for item in results}
+        first = by_id[str(coupons[0].id)]
+        self.assertTrue(first["user_liked"])
+        self.assertFalse(first["user_disliked"])
+        self.assertEqual(first["author_rating"], 3.75)  # 6 likes / 8 votes
+        self.assertEqual(sum(item["user_disliked"] for item in results), 5)
+        logger.info(f"✅ Liste CouponV2 : {count} requêtes pour {len(results)} coupons")
@@ -0,0 +1,203 @@
+import logging
+import threading
+import unittest
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import TransactionTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+
+from accounts.models import AppName, User
+from mobcash_inte.cache_lock import CacheLock
+from mobcash_inte.coupon_votes import VOTE_BUFFER_LOCK_KEY, vote_buffer
+from mobcash_inte.models import AuthorCouponStats, CouponV2, CouponWallet, Setting
+from mobcash_inte.setting_cache import invalidate_local_setting
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class CouponVoteFixtures:
+    def _setup_coupon(self):
+        cache.clear()
+        invalidate_local_setting()
+        Setting.objects.create(
+            minimum_deposit=200,
+            minimum_withdrawal=500,
+            bonus_percent=2,
+            allow_all_users_publish_coupons=True,
+            enable_coupon_monetization=True,
+            monetization_amount=Decimal("1.50"),
+            coupon_rating_points=Decimal("0.50"),
+        )
+        self.author = User.objects.create(
+            username="auteur", email="auteur@example.com", phone="2250700000001"
+        )
+        app = AppName.objects.create(name="app_votes")
+        self.coupon = CouponV2.objects.create(author=self.author, bet_app=app)
+        AuthorCouponStats.rebuild(self.author.pk)
+
+    def _voter(self, index):
+        return User.objects.create(
+            username=f"votant_{index}",
+            email=f"votant.{index}@example.com",
+            phone="2250700000002",
+        )
+
+    def _vote(self, client, vote_type):
+        return client.post(
+            f"/mobcash/v2/coupons/{self.coupon.id}/vote",
+            {"vote_type": vote_type},
+            format="json",
+        )
+
+
+class CouponVoteTests(CouponVoteFixtures, APITestCase):
+    """Moteur de vote : nouveau vote, changement, annulation"""
+
+    def setUp(self):
+        self._setup_coupon()
+        self.client.force_authenticate(self._voter(0))
+
+    def test_like_switch_and_cancel(self):
+        data = self._vote(self.client, "like").json()
+        self.assertEqual(data["coupon"]["likes"], 1)
+        self.assertTrue(data["coupon"]["user_liked"])
+        self.assertEqual(data["amount_earned"], "1.50")
+
+        data = self._vote(self.client, "dislike").json()
+        self.assertEqual((data["coupon"]["likes"], data["coupon"]["dislikes"]), (0, 1))
+        self.assertEqual(data["amount_earned"], "-3.00")
+        self.assertEqual(data["points_delta"], 0.0)
+
+        data = self._vote(self.client, "dislike").json()
+        self.assertEqual((data["coupon"]["likes"], data["coupon"]["dislikes"]), (0, 0))
+        self.assertFalse(data["coupon"]["user_disliked"])
+
+        self.author.refresh_from_db()
+        wallet = CouponWallet.objects.get(user=self.author)
+        self.assertEqual(self.author.coupon_points, Decimal("0.00"))
+        self.assertEqual(wallet.balance, Decimal("0.00"))
+        # Comme avant : tout ajustement positif compte dans total_earned
+        self.assertEqual(wallet.total_earned, Decimal("3.00"))
+        stats = AuthorCouponStats.objects.get(author=self.author)
+        self.assertEqual((stats.total_likes, stats.total_dislikes), (0, 0))
+        logger.info("✅ Vote : like → dislike → annulation cohérents")
+
+    @override_settings(COUPON_VOTE_BUFFER=True)
+    def test_buffered_counters_flushed(self):
+        data = self._vote(self.client, "like").json()
+        self.assertEqual(data["coupon"]["likes"], 1)
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.likes_count, 0)
+
+        self.assertEqual(vote_buffer.flush(), 1)
+        self.coupon.refresh_from_db()
+        self.assertEqual(self.coupon.likes_count, 1)
+        self.assertEqual(vote_buffer.pending(self.coupon.id), (0, 0))
+        self.assertEqual(AuthorCouponStats.objects.get(author=self.author).total_likes, 1)
+        logger.info("✅ Compteurs bufferisés reportés en base")
+
+    def test_flush_reads_only_dirty_coupons(self):
+        app = self.coupon.bet_app
+        CouponV2.objects.bulk_create([CouponV2(author=self.author, bet_app=app) for _ in range(30)])
+        with override_settings(COUPON_VOTE_BUFFER=True):
+            self._vote(self.client, "like")
+            # Verrou détenu par un autre run : rien n'est reporté
+            other = CacheLock(VOTE_BUFFER_LOCK_KEY, 60)
+            self.assertTrue(other.acquire())
+            self.assertEqual(vote_buffer.flush(), 0)
+            other.release()
+
+            # Un seul coupon sale : SELECT des auteurs + report (savepoint,
+            # UPDATE coupon, UPDATE stats), quel que soit le nombre de coupons
+            with self.assertNumQueries(5):
+                self.assertEqual(vote_buffer.flush(), 1)
+            with self.assertNumQueries(0):
+                self.assertEqual(vote_buffer.flush(), 0)
+
+            vote_buffer.add(self.coupon.id, likes=1)
+        # Option désactivée : aucun report
+        with self.assertNumQueries(0):
+            self.assertEqual(vote_buffer.flush(), 0)
+        self.assertEqual(vote_buffer.pending(self.coupon.id), (1, 0))
+        self.assertIsNone(cache.get(VOTE_BUFFER_LOCK_KEY))
+        logger.info("✅ Flush : coupons sales uniquement, verrou possédé, option désactivée")
+
+    def test_author_stats_clamped_at_zero(self):
+        AuthorCouponStats.apply(self.author.pk, likes=-2, dislikes=-1)
+        stats = AuthorCouponStats.objects.get(author=self.author)
+        self.assertEqual((stats.total_likes, stats.total_dislikes), (0, 0))
+        logger.info("✅ AuthorCouponStats borné à 0 comme les compteurs du coupon")
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "select_for_update PostgreSQL")
+class CouponVoteConcurrencyTests(CouponVoteFixtures, TransactionTestCase):
+    """Rafale de votes simultanés sur un même coupon"""
+
+    concurrent_votes = 20
+
+    def setUp(self):
+        self._setup_coupon()
+
+    def _fire(self, barrier, client, vote_type, responses):
+        try:
+            barrier.wait()
+            responses.append(self._vote(client, vote_type).status_code)
+        finally:
+            connections.close_all()
+
+    def _burst(self, votes):
+        barrier = threading.Barrier(len(votes))
+        responses = []
+        threads = [
+            threading.Thread(target=self._fire, args=(barrier, client, vote_type, responses))
+            for client, vote_type in votes
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(responses, [status.HTTP_200_OK] * len(votes))
+
+    def test_concurrent_votes_are_exact(self):
+        clients = []
+        for index in range(self.concurrent_votes):
+            client = APIClient()
+            client.force_authenticate(self._voter(index))
+            clients.append(client)
+
+        # Rafale 1 : tout le monde like ; rafale 2 : la moitié passe en dislike
+        self._burst([(client, "like") for client in clients])
+        half = self.concurrent_votes // 2
+        self._burst([(client, "dislike") for client in clients[:half]])
+
+        self.coupon.refresh_from_db()
+        self.author.refresh_from_db()
+        wallet = CouponWallet.objects.get(user=self.author)
+        stats = AuthorCouponStats.objects.get(author=self.author)
+
+        self.assertEqual(self.coupon.likes_count, self.concurrent_votes - half)
+        self.assertEqual(self.coupon.dislikes_count, half)
+        self.assertEqual((stats.total_likes, stats.total_dislikes), (self.concurrent_votes - half, half))
+        self.assertEqual(self.author.coupon_points, Decimal("0.50") * self.concurrent_votes)
+        self.assertEqual(
+            wallet.balance,
+            Decimal("1.50") * self.concurrent_votes - Decimal("3.00") * half,
+        )
+        self.assertEqual(wallet.total_earned, Decimal("1.50") * self.concurrent_votes)
+        logger.info(f"✅ {self.concurrent_votes} votes simultanés, compteurs exacts")
+
+    def test_double_submitted_like_counts_once(self):
+        client = APIClient()
+        client.force_authenticate(self._voter(0))
+        # Même like envoyé deux fois en même temps : un seul vote, un seul crédit
+        self._burst([(client, "like"), (client, "like")])
+
+        self.coupon.refresh_from_db()
+        wallet = CouponWallet.objects.get(user=self.author)
+        self.assertEqual((self.coupon.likes_count, self.coupon.dislikes_count), (1, 0))
+        self.assertEqual(self.coupon.ratings.count(), 1)
+        self.assertEqual(wallet.balance, Decimal("1.50"))
+        logger.info("✅ Double envoi d'un like : vote conservé, crédit unique")
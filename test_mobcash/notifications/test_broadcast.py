@@ -0,0 +1,68 @@
+import logging
+from unittest import mock
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from mobcash_inte import broadcast
+from mobcash_inte.models import Broadcast
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+@override_settings(BROADCAST_CHUNK_SIZE=2, BROADCAST_RATE_LIMITS={"whatsapp": 0})
+class BroadcastTests(APITestCase):
+    """Diffusion WhatsApp depuis NotificationView : lots en tâche + suivi"""
+
+    url = "/mobcash/notification"
+
+    def setUp(self):
+        self.admin = User.objects.create(
+            username="broadcast_admin",
+            email="broadcast.admin@example.com",
+            phone="2250700000000",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        for index in range(5):
+            User.objects.create(
+                username=f"broadcast_{index}",
+                email=f"broadcast.{index}@example.com",
+                phone="2250700000000",
+                # Le dernier n'a pas lié WhatsApp : pas destinataire
+                whatsapp_verified=index < 4,
+            )
+
+    @mock.patch("mobcash_inte.tasks.send_broadcast_chunk.delay", new=broadcast.send_chunk)
+    @mock.patch("mobcash_inte.tasks.dispatch_broadcast.delay", new=broadcast.dispatch)
+    def test_broadcast_progress(self):
+        sender = mock.Mock(side_effect=[{"success": True}] * 3 + [{"success": False}])
+        with mock.patch.dict(broadcast.CHANNEL_SENDERS, {"whatsapp": sender}), mock.patch.dict(
+            broadcast.CHANNEL_CHECKS, {"whatsapp": lambda: True}
+        ), self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                self.url, {"title": "Promo", "content": "Bonus x2", "channel": "whatsapp"}
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(sender.call_count, 4)
+
+        detail = self.client.get(f"{self.url}/broadcast/{response.json()['id']}").json()
+        self.assertEqual(detail["status"], "completed")
+        self.assertEqual(
+            (detail["total"], detail["sent"], detail["failed"], detail["pending"]), (4, 3, 1, 0)
+        )
+        logger.info("✅ Diffusion : 4 destinataires en 2 lots, compteurs à jour")
+
+    @mock.patch("mobcash_inte.tasks.dispatch_broadcast.delay", new=broadcast.dispatch)
+    def test_disabled_channel(self):
+        with mock.patch.dict(broadcast.CHANNEL_CHECKS, {"whatsapp": lambda: False}), (
+            self.captureOnCommitCallbacks(execute=True)
+        ):
+            response = self.client.post(
+                self.url, {"title": "Promo", "content": "Bonus x2", "channel": "whatsapp"}
+            )
+        item = Broadcast.objects.get(pk=response.json()["id"])
+        self.assertEqual((item.status, item.error_message), ("failed", "whatsapp_disabled"))
+        logger.info("✅ Diffusion : canal désactivé → échec immédiat")
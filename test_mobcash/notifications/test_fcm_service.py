@@ -0,0 +1,95 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from fcm_django.models import FCMDevice
+
+from accounts.models import User
+from mobcash_inte.fcm_service import FCM_TOKEN_CACHE_KEY, FcmCredentials, FcmSender
+from mobcash_inte.helpers import send_push_noti
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class FakeServiceAccount:
+    """Compte de service google-auth : un nouveau token à chaque refresh."""
+
+    def __init__(self, lifetime=timedelta(hours=1)):
+        self.lifetime = lifetime
+        self.refresh_count = 0
+        self.token = None
+        self.expiry = None
+
+    def refresh(self, request):
+        self.refresh_count += 1
+        self.token = f"token-{self.refresh_count}"
+        # google-auth renvoie un datetime UTC naïf
+        self.expiry = datetime.now(timezone.utc).replace(tzinfo=None) + self.lifetime
+
+
+def fcm_response(status_code, payload=None):
+    response = mock.Mock(status_code=status_code, text="")
+    response.json.return_value = payload or {}
+    return response
+
+
+@mock.patch("google.auth.transport.requests.Request", new=mock.Mock())
+class FcmServiceTests(TestCase):
+    """FCM : token OAuth en cache, marge de rafraîchissement, 401, envoi groupé"""
+
+    def setUp(self):
+        cache.clear()
+        self.account = FakeServiceAccount()
+
+    def _credentials(self):
+        credentials = FcmCredentials()
+        credentials._credentials = self.account
+        return credentials
+
+    def test_token_cached_until_refresh_margin(self):
+        credentials = self._credentials()
+        self.assertEqual(credentials.get_token(), "token-1")
+        self.assertEqual(credentials.get_token(), "token-1")
+        # Autre process : token repris du cache partagé, pas de refresh
+        self.assertEqual(self._credentials().get_token(), "token-1")
+        self.assertEqual(self.account.refresh_count, 1)
+
+        # Moins de 5 minutes avant l'expiration : rafraîchi
+        credentials._expiry = datetime.now(timezone.utc) + timedelta(minutes=4)
+        cache.delete(FCM_TOKEN_CACHE_KEY)
+        self.assertEqual(credentials.get_token(), "token-2")
+        self.assertEqual(self.account.refresh_count, 2)
+        logger.info("✅ FCM : token réutilisé, rafraîchi dans la marge de 5 min")
+
+    def test_unauthorized_invalidates_token(self):
+        session = mock.Mock()
+        session.post.side_effect = [fcm_response(401), fcm_response(200, {"name": "msg-1"})]
+        sender = FcmSender(credentials=self._credentials(), session=session, url="https://fcm.test/send")
+
+        self.assertEqual(sender.send_one("device-1", "Titre", "Corps"), {"name": "msg-1"})
+        self.assertEqual(self.account.refresh_count, 2)
+        tokens = [call.kwargs["headers"]["Authorization"] for call in session.post.call_args_list]
+        self.assertEqual(tokens, ["Bearer token-1", "Bearer token-2"])
+        self.assertEqual(cache.get(FCM_TOKEN_CACHE_KEY)["token"], "token-2")
+        logger.info("✅ FCM : 401, token invalidé puis un seul nouvel essai")
+
+    def test_send_push_noti_returns_one_response_per_device(self):
+        user = User.objects.create(username="fcm_user", email="fcm.user@example.com", phone="2250700000000")
+        session = mock.Mock()
+        session.post.return_value = fcm_response(200, {"name": "msg"})
+
+        with mock.patch("mobcash_inte.fcm_service.fcm_credentials", new=self._credentials()), mock.patch(
+            "mobcash_inte.fcm_service.get_session", return_value=session
+        ):
+            self.assertEqual(send_push_noti(user=user, title="Titre", body="Corps"), [])
+            for index in range(4):
+                FCMDevice.objects.create(user=user, registration_id=f"device-{index}", type="android")
+            responses = send_push_noti(user=user, title="Titre", body="Corps")
+
+        self.assertEqual(responses, [{"name": "msg"}] * 3)
+        sent_to = sorted(call.kwargs["json"]["message"]["token"] for call in session.post.call_args_list)
+        self.assertEqual(sent_to, ["device-1", "device-2", "device-3"])
+        self.assertEqual(self.account.refresh_count, 1)
+        logger.info("✅ FCM : send_push_noti renvoie une réponse par appareil (3 max)")
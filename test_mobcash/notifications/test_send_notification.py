@@ -0,0 +1,52 @@
+import logging
+from unittest import mock
+
+from django.test import TestCase
+
+from accounts.models import User
+from mobcash_inte.helpers import NOTIFICATION_CHANNELS, send_admin_notification
+from mobcash_inte.models import Notification
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class SendNotificationPipelineTests(TestCase):
+    """send_notification / send_admin_notification : insertion groupée + tâches par canal"""
+
+    def setUp(self):
+        self.staff = [
+            User.objects.create(
+                username=f"notif_staff_{index}",
+                email=f"notif.staff.{index}@example.com",
+                phone="2250700000000",
+                is_staff=True,
+            )
+            for index in range(3)
+        ]
+
+    @mock.patch("mobcash_inte.helpers.send_notification_channel.delay")
+    def test_admin_notification_batched(self, delay_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            send_admin_notification(title="Alerte", content="Solde bas")
+        self.assertEqual(Notification.objects.filter(title="Alerte").count(), 3)
+        expected_ids = sorted(str(user.id) for user in self.staff)
+        self.assertEqual(
+            sorted(call.args[0] for call in delay_mock.call_args_list), sorted(NOTIFICATION_CHANNELS)
+        )
+        for call in delay_mock.call_args_list:
+            self.assertEqual(sorted(call.args[1]), expected_ids)
+        logger.info("✅ Notification admin : 3 lignes, une tâche par canal")
+
+    @mock.patch("mobcash_inte.helpers.send_sms_to_user")
+    @mock.patch("mobcash_inte.helpers.send_telegram_to_user")
+    @mock.patch("mobcash_inte.helpers.send_whatsapp_to_user", side_effect=RuntimeError("timeout"))
+    @mock.patch("mobcash_inte.helpers._send_push_many")
+    @mock.patch("mobcash_inte.helpers.send_notification_channel.delay", side_effect=OSError("broker"))
+    def test_channel_failure_is_isolated(self, delay_mock, push_mock, whatsapp_mock, telegram_mock, sms_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            send_admin_notification(title="Alerte", content="Solde bas")
+        push_mock.assert_called_once()
+        self.assertEqual(whatsapp_mock.call_count, 3)
+        self.assertEqual(telegram_mock.call_count, 3)
+        self.assertEqual(sms_mock.call_count, 3)
+        logger.info("✅ Notification : un canal en erreur ne bloque pas les autres")
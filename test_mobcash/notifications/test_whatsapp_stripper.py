@@ -0,0 +1,47 @@
+import logging
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from accounts.models import AppName
+from mobcash_inte.whatsapp_service import (
+    bump_platform_labels_version,
+    strip_platform_names_for_whatsapp,
+)
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class PlatformNameStripperTests(TestCase):
+    """strip_platform_names_for_whatsapp : matcher compilé, invalidé sur AppName"""
+
+    def setUp(self):
+        cache.clear()
+        AppName.objects.create(name="1xbet")
+        bump_platform_labels_version()
+
+    def test_strip_and_cache(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                strip_platform_names_for_whatsapp("Dépôt de 1000 FCFA sur 1XBET effectué ."),
+                "Dépôt de 1000 FCFA effectué.",
+            )
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                strip_platform_names_for_whatsapp("1xbet Message : solde insuffisant"),
+                "Message: solde insuffisant",
+            )
+            self.assertEqual(
+                strip_platform_names_for_whatsapp("Retrait  validé"), "Retrait validé"
+            )
+        logger.info("✅ Stripper WhatsApp compilé une fois, sans requête ensuite")
+
+    def test_rebuilt_when_app_name_changes(self):
+        strip_platform_names_for_whatsapp("warm-up")
+        with self.captureOnCommitCallbacks(execute=True):
+            AppName.objects.create(name="melbet")
+        self.assertEqual(
+            strip_platform_names_for_whatsapp("Votre demande de retrait melbet est en cours"),
+            "Votre demande de retrait est en cours",
+        )
+        logger.info("✅ Stripper WhatsApp reconstruit après modification d'AppName")
@@ -0,0 +1,22 @@
+import logging
+
+from django.test import SimpleTestCase
+
+from mobcash_inte_backend.celery import app
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class BeatScheduleTests(SimpleTestCase):
+    """Planning effectif de Celery Beat (settings.CELERY_BEAT_SCHEDULE l'emporte)"""
+
+    def test_periodic_tasks_are_scheduled(self):
+        tasks = {entry["task"] for entry in app.conf.beat_schedule.values()}
+        for task in (
+            "mobcash_inte.tasks.refresh_statistics_snapshot",
+            "mobcash_inte.tasks.rebuild_recent_transaction_rollup",
+            "mobcash_inte.tasks.flush_coupon_vote_buffers",
+            "mobcash_inte.tasks.reap_stale_partner_claims",
+        ):
+            self.assertIn(task, tasks)
+        logger.info("✅ Beat : tâches périodiques présentes dans le planning effectif")
@@ -0,0 +1,110 @@
+import logging
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import AppName, User
+from mobcash_inte.helpers import CANCEL_PENDING_LOCK_KEY, cancel_old_pending_transactions
+from mobcash_inte.models import (
+    Network,
+    Transaction,
+    TransactionDailyRollup,
+    TransactionStatusHistory,
+)
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class CancelOldPendingTransactionsTests(TestCase):
+    """Expiration des pending par lots, avec audit"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(
+            username="pending_user", email="pending.user@example.com", phone="2250700000000"
+        )
+        self.app = AppName.objects.create(name="app_pending")
+        self.network = Network.objects.create(name="mtn", public_name="MTN test")
+
+    def _pending(self, hours_old):
+        with self.captureOnCommitCallbacks(execute=True):
+            trans = Transaction.objects.create(
+                user=self.user,
+                app=self.app,
+                network=self.network,
+                type_trans="deposit",
+                amount=1000,
+                all_status=[{"status": "pending", "source": "USER"}],
+            )
+        Transaction.objects.filter(pk=trans.pk).update(
+            created_at=timezone.now() - timedelta(hours=hours_old)
+        )
+        return trans
+
+    def test_cancels_in_batches_with_audit(self):
+        old = [self._pending(hours_old=30) for _ in range(5)]
+        recent = self._pending(hours_old=2)
+        TransactionDailyRollup.rebuild()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = cancel_old_pending_transactions(batch_size=2)
+
+        self.assertEqual(result, "5 transactions annulées")
+        for trans in old:
+            trans.refresh_from_db()
+            self.assertEqual(trans.status, "annuler")
+            self.assertEqual([s["status"] for s in trans.all_status], ["pending", "annuler"])
+        recent.refresh_from_db()
+        self.assertEqual(recent.status, "pending")
+        self.assertEqual(
+            TransactionStatusHistory.objects.filter(
+                new_status="annuler", trigger_source=TransactionStatusHistory.Source.SYSTEM
+            ).count(),
+            5,
+        )
+        incremental = {
+            (row.date, row.status): row.count
+            for row in TransactionDailyRollup.objects.filter(count__gt=0)
+        }
+        TransactionDailyRollup.rebuild()
+        rebuilt = {
+            (row.date, row.status): row.count
+            for row in TransactionDailyRollup.objects.filter(count__gt=0)
+        }
+        self.assertEqual(incremental, rebuilt)
+
+        # Relancer ne change rien
+        self.assertEqual(cancel_old_pending_transactions(), "0 transactions annulées")
+        logger.info("✅ cancel_old_pending_transactions : lots + audit + rollup")
+
+    def test_locked_batch_and_lock_ownership(self):
+        old = [self._pending(hours_old=30) for _ in range(5)]
+        bulk_change_status = Transaction.objects.bulk_change_status
+        calls = []
+
+        def first_batch_locked(ids, *args, **kwargs):
+            calls.append(list(ids))
+            if len(calls) == 1:
+                return 0  # lot entier verrouillé par un autre worker (skip_locked)
+            return bulk_change_status(ids, *args, **kwargs)
+
+        with mock.patch.object(Transaction.objects, "bulk_change_status", side_effect=first_batch_locked):
+            self.assertEqual(cancel_old_pending_transactions(batch_size=2), "3 transactions annulées")
+        self.assertEqual(len(calls), 3)
+        statuses = [Transaction.objects.get(pk=trans.pk).status for trans in old]
+        self.assertEqual(statuses.count("annuler"), 3)
+        self.assertIsNone(cache.get(CANCEL_PENDING_LOCK_KEY))
+
+        # Run plus long que le TTL : le verrou repris par un autre run n'est pas supprimé
+        def lock_taken_over(ids, *args, **kwargs):
+            cache.set(CANCEL_PENDING_LOCK_KEY, 42)
+            return 0
+
+        with mock.patch.object(Transaction.objects, "bulk_change_status", side_effect=lock_taken_over):
+            cancel_old_pending_transactions(batch_size=1)
+        self.assertEqual(cache.get(CANCEL_PENDING_LOCK_KEY), 42)
+        self.assertEqual(cancel_old_pending_transactions(), "0 transactions annulées (run déjà actif)")
+        logger.info("✅ cancel_old_pending_transactions : lots verrouillés dépassés, verrou propre au run")
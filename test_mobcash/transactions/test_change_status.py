@@ -0,0 +1,85 @@
+import logging
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from accounts.models import AppName, User
+from mobcash_inte.models import Network, Transaction, TransactionStatusHistory
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class ChangeStatusTests(TestCase):
+    """change_status en un seul UPDATE + bulk_change_status"""
+
+    def setUp(self):
+        self.user = User.objects.create(
+            username="status_user", email="status.user@example.com", phone="2250700000000"
+        )
+        self.app = AppName.objects.create(name="app_status")
+        self.network = Network.objects.create(name="mtn", public_name="MTN test")
+
+    def _transaction(self, status_value="pending"):
+        return Transaction.objects.create(
+            user=self.user,
+            app=self.app,
+            network=self.network,
+            type_trans="deposit",
+            amount=1000,
+            status=status_value,
+            all_status=[{"status": status_value, "source": "USER"}],
+        )
+
+    def test_change_status_single_update(self):
+        trans = self._transaction()
+        with CaptureQueriesContext(connection) as queries:
+            trans.change_status(
+                "accept",
+                TransactionStatusHistory.Source.API_RESPONSE,
+                message="Dépôt confirmé",
+                extra_fields=["validated_at"],
+            )
+        updates = [q["sql"] for q in queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+
+        stored = Transaction.objects.get(pk=trans.pk)
+        self.assertEqual(stored.status, "accept")
+        self.assertEqual(stored.message, "Dépôt confirmé")
+        self.assertEqual([s["status"] for s in stored.all_status], ["pending", "accept"])
+        self.assertEqual(stored.all_status, trans.all_status)
+        self.assertTrue(
+            TransactionStatusHistory.objects.filter(
+                transaction=trans, old_status="pending", new_status="accept"
+            ).exists()
+        )
+        logger.info("✅ change_status : un seul UPDATE, all_status complété en SQL")
+
+    def test_bulk_change_status(self):
+        pending = [self._transaction() for _ in range(3)]
+        accepted = self._transaction("accept")
+        ids = [t.pk for t in pending] + [accepted.pk]
+
+        changed = Transaction.objects.bulk_change_status(
+            ids,
+            "error",
+            TransactionStatusHistory.Source.ADMIN,
+            message="Corrigé par l'admin",
+            from_status="pending",
+            batch_size=2,
+        )
+
+        self.assertEqual(changed, 3)
+        for trans in pending:
+            trans.refresh_from_db()
+            self.assertEqual(trans.status, "error")
+            self.assertEqual([s["status"] for s in trans.all_status], ["pending", "error"])
+        accepted.refresh_from_db()
+        self.assertEqual(accepted.status, "accept")
+        self.assertEqual(
+            TransactionStatusHistory.objects.filter(
+                new_status="error", old_status="pending", message="Corrigé par l'admin"
+            ).count(),
+            3,
+        )
+        logger.info("✅ bulk_change_status : lots, audit, filtre from_status")
@@ -0,0 +1,175 @@
+import logging
+import threading
+import unittest
+from datetime import timedelta
+from unittest import mock
+
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from accounts.models import AppName, User
+from mobcash_inte.models import Network, Setting, Transaction, WebhookLog
+from mobcash_inte.setting_cache import invalidate_local_setting
+from payment import ConnectProUnavailable, connect_pro_webhook
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "select_for_update PostgreSQL")
+class ConnectProWebhookConcurrencyTests(TransactionTestCase):
+    """Webhooks Connect Pro dupliqués envoyés en parallèle"""
+
+    webhook_url = "/mobcash/connect-pro-webhook"
+    concurrent_requests = 8
+
+    def setUp(self):
+        invalidate_local_setting()
+        Setting.objects.create(
+            minimum_deposit=200,
+            minimum_withdrawal=500,
+            bonus_percent=2,
+            deposit_reward=False,
+        )
+        user = User.objects.create(
+            username="concurrent_user",
+            email="concurrent.user@example.com",
+            phone="2250700000000",
+        )
+        self.transaction = Transaction.objects.create(
+            user=user,
+            app=AppName.objects.create(name="app_concurrence"),
+            network=Network.objects.create(name="mtn", public_name="MTN concurrence"),
+            type_trans="deposit",
+            amount=1000,
+            user_app_id="123456",
+            reference="ref-concurrent",
+            public_id="uid-concurrent",
+        )
+
+    def _fire(self, barrier, responses):
+        client = APIClient()
+        try:
+            barrier.wait()
+            response = client.post(
+                self.webhook_url, {"uid": self.transaction.public_id}, format="json"
+            )
+            responses.append(response.status_code)
+        finally:
+            connections.close_all()
+
+    @mock.patch("payment.check_solde.delay")
+    @mock.patch("payment.process_transaction_notifications_and_bonus.delay")
+    @mock.patch("mobcash_inte.views.connect_pro_webhook.delay", new=connect_pro_webhook)
+    @mock.patch("payment.MobCashExternalService.create_deposit")
+    @mock.patch("payment.connect_pro_status")
+    def test_duplicate_webhooks_credit_once(
+        self, status_mock, deposit_mock, notify_mock, solde_mock
+    ):
+        status_mock.return_value = {"status": "success"}
+        deposit_mock.return_value = {"Success": True, "Message": "OK"}
+
+        barrier = threading.Barrier(self.concurrent_requests)
+        responses = []
+        threads = [
+            threading.Thread(target=self._fire, args=(barrier, responses))
+            for _ in range(self.concurrent_requests)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(responses), self.concurrent_requests)
+        self.assertTrue(all(code == status.HTTP_200_OK for code in responses))
+
+        # Un seul appel à l'API betting malgré les doublons
+        self.assertEqual(deposit_mock.call_count, 1)
+
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.status, "accept")
+        self.assertEqual(
+            self.transaction.status_history.filter(new_status="init_payment").count(), 1
+        )
+        self.assertTrue(
+            WebhookLog.objects.filter(
+                reference=self.transaction.public_id, processed=True
+            ).exists()
+        )
+        logger.info(
+            "✅ %s webhooks dupliqués → 1 seul crédit", self.concurrent_requests
+        )
+
+    @mock.patch("mobcash_inte.views.connect_pro_webhook.delay")
+    def test_processed_webhook_is_not_requeued(self, delay_mock):
+        WebhookLog.objects.create(
+            reference=self.transaction.public_id,
+            api="CONNECT PRO",
+            processed=True,
+            status=WebhookLog.Status.SUCCESS,
+        )
+        response = APIClient().post(
+            self.webhook_url, {"uid": self.transaction.public_id}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["message"], "Webhook déjà traité")
+        delay_mock.assert_not_called()
+
+
+class ConnectProWebhookRetryTests(TestCase):
+    """Erreurs passagères rejouées, prise en charge datée"""
+
+    webhook_url = "/mobcash/connect-pro-webhook"
+
+    def setUp(self):
+        invalidate_local_setting()
+        Setting.objects.create(minimum_deposit=200, minimum_withdrawal=500, bonus_percent=2)
+        self.transaction = Transaction.objects.create(
+            user=User.objects.create(
+                username="retry_user", email="retry.user@example.com", phone="2250700000000"
+            ),
+            app=AppName.objects.create(name="app_retry"),
+            network=Network.objects.create(name="mtn", public_name="MTN retry"),
+            type_trans="deposit",
+            amount=1000,
+            reference="ref-retry",
+            public_id="uid-retry",
+        )
+        self.webhook_log = WebhookLog.objects.create(
+            reference="uid-retry", api="CONNECT PRO", status=WebhookLog.Status.PROCESSING
+        )
+
+    @mock.patch("payment.connect_pro_status", return_value=None)
+    def test_unavailable_status_is_retried(self, status_mock):
+        # Appel direct : Celery relève l'exception au lieu de replanifier
+        with self.assertRaises(ConnectProUnavailable):
+            connect_pro_webhook(data={"uid": "uid-retry"}, webhook_log_id=self.webhook_log.id)
+
+        self.webhook_log.refresh_from_db()
+        self.assertEqual(self.webhook_log.status, WebhookLog.Status.PROCESSING)
+        self.assertIsNotNone(self.webhook_log.processing_started_at)
+        self.assertIn("indisponible", self.webhook_log.error_message)
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.status, "pending")
+        logger.info("✅ Statut Connect Pro illisible : tâche rejouée, log toujours en cours")
+
+    @mock.patch("mobcash_inte.views.connect_pro_webhook.delay")
+    def test_stale_check_uses_processing_start(self, delay_mock):
+        # Log ancien mais repris à l'instant : pas de doublon
+        WebhookLog.objects.filter(pk=self.webhook_log.pk).update(
+            created_at=timezone.now() - timedelta(hours=1),
+            processing_started_at=timezone.now(),
+        )
+        response = self.client.post(self.webhook_url, {"uid": "uid-retry"}, format="json")
+        self.assertEqual(response.json()["message"], "Webhook en cours de traitement")
+        delay_mock.assert_not_called()
+
+        WebhookLog.objects.filter(pk=self.webhook_log.pk).update(
+            processing_started_at=timezone.now() - timedelta(minutes=10)
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(self.webhook_url, {"uid": "uid-retry"}, format="json")
+        delay_mock.assert_called_once()
+        logger.info("✅ Webhook : prise en charge périmée mesurée depuis processing_started_at")
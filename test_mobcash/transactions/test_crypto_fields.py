@@ -0,0 +1,96 @@
+import logging
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from accounts.models import AppName
+from crypto_fields import decrypt, encrypt, get_key_ring, needs_rotation, reset_key_ring, rotate
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+OLD_KEY = "ancienne-cle-crypto-tests"
+NEW_KEY = "nouvelle-cle-crypto-tests"
+
+
+@override_settings(SECRET_KEY=NEW_KEY, CRYPTO_FIELDS_OLD_SECRET_KEYS=[OLD_KEY])
+class CryptoFieldsTests(TestCase):
+    """Trousseau Fernet : aller-retour, rotation de clé, LRU borné, reset"""
+
+    def setUp(self):
+        reset_key_ring()
+        self.addCleanup(reset_key_ring)
+
+    def _encrypted_with(self, secret, value):
+        with override_settings(SECRET_KEY=secret, CRYPTO_FIELDS_OLD_SECRET_KEYS=[]):
+            reset_key_ring()
+            token = encrypt(value)
+        reset_key_ring()
+        return token
+
+    def test_round_trip(self):
+        token = encrypt("mot-de-passe")
+        self.assertNotEqual(token, "mot-de-passe")
+        self.assertEqual(decrypt(token), "mot-de-passe")
+        # Idempotent : pas de seconde couche
+        self.assertEqual(encrypt(token), token)
+        self.assertEqual(decrypt("valeur-en-clair"), "valeur-en-clair")
+        self.assertIsNone(encrypt(None))
+        logger.info("✅ crypto_fields : aller-retour et chiffrement idempotent")
+
+    def test_rotation_with_old_key(self):
+        old_token = self._encrypted_with(OLD_KEY, "token-connect")
+        self.assertEqual(decrypt(old_token), "token-connect")
+        self.assertTrue(needs_rotation(old_token))
+
+        new_token = rotate(old_token)
+        self.assertFalse(needs_rotation(new_token))
+        with override_settings(CRYPTO_FIELDS_OLD_SECRET_KEYS=[]):
+            self.assertEqual(decrypt(new_token), "token-connect")
+            # Ancienne clé retirée : l'ancien token n'est plus lisible
+            self.assertEqual(decrypt(old_token), old_token)
+            self.assertEqual(rotate(old_token), old_token)
+        logger.info("✅ crypto_fields : rotation vers la clé primaire")
+
+    @override_settings(CRYPTO_FIELDS_DECRYPT_CACHE_SIZE=2)
+    def test_lru_is_bounded(self):
+        tokens = [encrypt(f"valeur-{i}") for i in range(3)]
+        ring = get_key_ring()
+        ring.clear_cache()
+        for token in tokens:
+            decrypt(token)
+        self.assertEqual(list(ring._cache), tokens[1:])
+
+        # Accès récent : tokens[1] devient le plus récent, tokens[2] est évincé
+        decrypt(tokens[1])
+        decrypt(tokens[0])
+        self.assertEqual(list(ring._cache), [tokens[1], tokens[0]])
+        logger.info("✅ crypto_fields : LRU borné, éviction du moins récent")
+
+    def test_reset_key_ring(self):
+        ring = get_key_ring()
+        self.assertIs(get_key_ring(), ring)
+        reset_key_ring()
+        self.assertIsNot(get_key_ring(), ring)
+        with override_settings(SECRET_KEY="autre-cle"):
+            self.assertEqual(get_key_ring().secrets, ("autre-cle", OLD_KEY))
+        logger.info("✅ crypto_fields : trousseau reconstruit après reset ou changement de clé")
+
+    def test_rotate_command(self):
+        app = AppName.objects.create(name="app_rotation")
+        AppName.objects.filter(pk=app.pk).update(
+            _hash=self._encrypted_with(OLD_KEY, "hash-app"),
+            _cashierpass=encrypt("pass-app"),
+        )
+        unchanged_pass = AppName.objects.get(pk=app.pk)._cashierpass
+
+        call_command("rotate_encrypted_fields", "--dry-run", stdout=StringIO())
+        self.assertTrue(needs_rotation(AppName.objects.get(pk=app.pk)._hash))
+
+        call_command("rotate_encrypted_fields", stdout=StringIO())
+        app.refresh_from_db()
+        self.assertFalse(needs_rotation(app._hash))
+        self.assertEqual(app._cashierpass, unchanged_pass)
+        with override_settings(CRYPTO_FIELDS_OLD_SECRET_KEYS=[]):
+            self.assertEqual(app.hash, "hash-app")
+        logger.info("✅ rotate_encrypted_fields : valeurs re-chiffrées avec la clé primaire")
@@ -0,0 +1,72 @@
+import logging
+
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from mobcash_inte.models import Transaction
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class CursorPaginationTests(APITestCase):
+    """Pagination par curseur (created_at, id) sur HistoryTransactionViews"""
+
+    url = "/mobcash/transaction-history"
+
+    def setUp(self):
+        self.admin = User.objects.create(
+            username="cursor_admin",
+            email="cursor.admin@example.com",
+            phone="2250700000000",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        for index in range(5):
+            Transaction.objects.create(
+                user=self.admin, type_trans="deposit", amount=100 + index
+            )
+        # Même created_at pour tous : l'id départage
+        Transaction.objects.update(created_at=timezone.now())
+        self.expected = list(
+            Transaction.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+
+    def _ids(self, data):
+        return [row["id"] for row in data["results"]]
+
+    def test_walk_forward_and_back(self):
+        first = self.client.get(self.url, {"pagination": "cursor", "page_size": 2})
+        self.assertEqual(first.status_code, status.HTTP_200_OK)
+        data = first.json()
+        self.assertNotIn("count", data)
+        self.assertIsNone(data["previous"])
+
+        pages = [self._ids(data)]
+        while data["next"]:
+            data = self.client.get(data["next"]).json()
+            pages.append(self._ids(data))
+        self.assertEqual([len(page) for page in pages], [2, 2, 1])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        back = self.client.get(data["previous"]).json()
+        self.assertEqual(self._ids(back), pages[1])
+        back = self.client.get(back["previous"]).json()
+        self.assertEqual(self._ids(back), pages[0])
+        self.assertIsNone(back["previous"])
+        logger.info("✅ Curseur : pages sans doublon ni trou, dans les deux sens")
+
+    def test_count_and_default_mode(self):
+        data = self.client.get(self.url, {"pagination": "cursor", "with_count": "1"}).json()
+        # Petite table : COUNT exact, même sous PostgreSQL
+        self.assertEqual(data["count"], 5)
+        self.assertNotIn("count_approximate", data)
+
+        paged = self.client.get(self.url).json()
+        self.assertEqual(paged["count"], 5)
+        self.assertIn("results", paged)
+
+        invalid = self.client.get(self.url, {"cursor": "pas-un-curseur"})
+        self.assertEqual(invalid.status_code, status.HTTP_404_NOT_FOUND)
+        logger.info("✅ Curseur : total optionnel, mode page par défaut inchangé")
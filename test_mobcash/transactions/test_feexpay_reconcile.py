@@ -0,0 +1,115 @@
+import logging
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+import constant
+from accounts.models import AppName, User
+from mobcash_inte.cache_lock import CacheLock
+from mobcash_inte.models import Network, Transaction
+from payment import (
+    FEEXPAY_RECONCILE_LOCK_KEY,
+    FEEXPAY_RECONCILE_LOCK_TTL,
+    _feexpay_recheck_interval,
+    check_pending_feexpay_transactions,
+)
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+def feexpay_status(status_by_public_id):
+    def check(public_id):
+        return {"code": constant.CODE_SUCCESS, "data": {"status": status_by_public_id[public_id]}}
+
+    return check
+
+
+class FeexpayReconcileTests(TestCase):
+    """check_pending_feexpay_transactions : verrou, backoff, lots, durée bornée"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(
+            username="feexpay_user", email="feexpay.user@example.com", phone="2250700000000"
+        )
+        self.app = AppName.objects.create(name="app_feexpay")
+        self.network = Network.objects.create(name="mtn", public_name="MTN feexpay")
+
+    def _pending(self, public_id, age=timedelta(0), **kwargs):
+        transaction = Transaction.objects.create(
+            user=self.user,
+            app=self.app,
+            network=self.network,
+            type_trans="deposit",
+            amount=1000,
+            api="feexpay",
+            reference=f"ref-{public_id}",
+            public_id=public_id,
+            **kwargs,
+        )
+        Transaction.objects.filter(pk=transaction.pk).update(created_at=timezone.now() - age)
+        return transaction
+
+    def test_lock(self):
+        held = CacheLock(FEEXPAY_RECONCILE_LOCK_KEY, FEEXPAY_RECONCILE_LOCK_TTL)
+        self.assertTrue(held.acquire())
+        self.assertEqual(check_pending_feexpay_transactions(), {"skipped": True})
+
+        # Verrou expiré puis repris par un autre run : ni prolongé ni supprimé
+        cache.set(FEEXPAY_RECONCILE_LOCK_KEY, held.token + 1)
+        self.assertFalse(held.extend())
+        self.assertFalse(held.release())
+        self.assertEqual(cache.get(FEEXPAY_RECONCILE_LOCK_KEY), held.token + 1)
+
+        cache.delete(FEEXPAY_RECONCILE_LOCK_KEY)
+        self.assertEqual(check_pending_feexpay_transactions()["total"], 0)
+        self.assertIsNone(cache.get(FEEXPAY_RECONCILE_LOCK_KEY))
+        logger.info("✅ Feexpay : un seul run, verrou libéré seulement par son détenteur")
+
+    @mock.patch("payment.feexpay_check_status")
+    def test_backoff(self, check_mock):
+        self.assertEqual(_feexpay_recheck_interval(timedelta(minutes=5)), 0)
+        self.assertEqual(_feexpay_recheck_interval(timedelta(hours=2)), 600)
+        self._pending("fx-recent")
+        self._pending("fx-old", age=timedelta(hours=2))
+        check_mock.side_effect = feexpay_status({"fx-recent": "PENDING", "fx-old": "PENDING"})
+
+        self.assertEqual(check_pending_feexpay_transactions()["checked"], 2)
+        stats = check_pending_feexpay_transactions()
+        self.assertEqual((stats["checked"], stats["backoff_skipped"]), (1, 1))
+        logger.info("✅ Feexpay : anciennes transactions en backoff")
+
+    @mock.patch("payment.FEEXPAY_RECONCILE_BATCH_SIZE", 2)
+    @mock.patch("payment._alert_feexpay_success_not_accepted")
+    @mock.patch("payment.feexpay_webhook")
+    @mock.patch("payment.feexpay_check_status")
+    def test_batches_applied(self, check_mock, webhook_mock, alert_mock):
+        statuses = {f"fx-{i}": "SUCCESSFUL" for i in range(5)}
+        statuses["fx-pending"] = "PENDING"
+        self._pending("fx-pending")
+        for public_id in list(statuses)[:4]:
+            self._pending(public_id)
+        retried = self._pending("fx-4", wehook_receive_at=timezone.now())
+        check_mock.side_effect = feexpay_status(statuses)
+
+        stats = check_pending_feexpay_transactions()
+        self.assertEqual((stats["checked"], stats["changed"], stats["processed"]), (6, 5, 5))
+        self.assertEqual(webhook_mock.call_count, 5)
+        # Déjà tentée et toujours pas accept (webhook simulé) : alerte
+        alert_mock.assert_called_once()
+        self.assertEqual(alert_mock.call_args.args[0].pk, retried.pk)
+        logger.info("✅ Feexpay : statuts finaux appliqués par lots")
+
+    @mock.patch("payment.FEEXPAY_RECONCILE_MAX_RUN_SECONDS", 0)
+    @mock.patch("payment.feexpay_check_status")
+    def test_run_duration_is_capped(self, check_mock):
+        self._pending("fx-late", age=timedelta(hours=2))
+        stats = check_pending_feexpay_transactions()
+        self.assertEqual((stats["checked"], stats["deadline_skipped"]), (0, 1))
+        check_mock.assert_not_called()
+        # Non vérifiée : pas de backoff, reprise au run suivant
+        self.assertEqual(check_pending_feexpay_transactions()["backoff_skipped"], 0)
+        logger.info("✅ Feexpay : durée du run bornée, reste repris au run suivant")
@@ -0,0 +1,64 @@
+import logging
+from unittest import mock
+
+import requests
+from django.test import SimpleTestCase, override_settings
+
+import http_client
+from http_client import DEFAULT_POLICY, close_sessions, get_policy, get_session
+from mobcash_inte.management.stub_server import StubServer
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+@override_settings(HTTP_CLIENT_POLICIES={"stub": {"backoff_factor": 0, "timeout": (2, 5)}})
+class HttpClientTests(SimpleTestCase):
+    """http_client : sessions partagées, retry idempotent, timeout, fork-safety"""
+
+    def setUp(self):
+        close_sessions()
+        self.addCleanup(close_sessions)
+
+    def test_status_retry_only_for_idempotent_methods(self):
+        self.assertEqual(get_policy("stub").retries, DEFAULT_POLICY.retries)
+        with StubServer(statuses={"/flaky": 503}) as server:
+            session = get_session("stub")
+            response = session.get(f"{server.base_url}/flaky")
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(server.paths["/flaky"], DEFAULT_POLICY.retries + 1)
+
+            # POST : jamais rejoué sur 5xx (risque de double paiement)
+            server.reset_counters()
+            self.assertEqual(session.post(f"{server.base_url}/flaky").status_code, 503)
+            self.assertEqual(server.paths["/flaky"], 1)
+
+            # Keep-alive : au plus une nouvelle connexion TCP pour plusieurs requêtes
+            server.reset_counters()
+            for _ in range(3):
+                session.post(f"{server.base_url}/ok", json={})
+            self.assertEqual(server.paths["/ok"], 3)
+            self.assertLessEqual(server.connections, 1)
+        logger.info("✅ http_client : 5xx rejoués pour GET seulement, connexion réutilisée")
+
+    def test_default_timeout(self):
+        session = get_session("stub")
+        with mock.patch.object(requests.Session, "request") as request_mock:
+            session.post("https://provider.example.com/api")
+            self.assertEqual(request_mock.call_args.kwargs["timeout"], (2, 5))
+
+            session.post("https://provider.example.com/api", timeout=60)
+            self.assertEqual(request_mock.call_args.kwargs["timeout"], 60)
+        self.assertEqual(session.pool_stats()["requests"], 2)
+        logger.info("✅ http_client : timeout par défaut du fournisseur, explicite prioritaire")
+
+    def test_sessions_are_reset_after_fork(self):
+        session = get_session("stub")
+        self.assertIs(get_session("stub"), session)
+        self.assertIsNot(get_session("feexpay"), session)
+
+        with mock.patch.object(http_client.os, "getpid", return_value=-1):
+            forked = get_session("stub")
+            self.assertIsNot(forked, session)
+            self.assertIs(get_session("stub"), forked)
+            self.assertEqual([m["provider"] for m in http_client.pool_metrics()], ["stub"])
+        logger.info("✅ http_client : nouvelle session après fork")
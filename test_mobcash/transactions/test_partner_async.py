@@ -0,0 +1,231 @@
+import hashlib
+import hmac
+import json
+import logging
+from datetime import timedelta
+from unittest import mock
+
+from django.core.cache import cache
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import AppName, User
+from mobcash_inte.models import PartnerTransaction
+from mobcash_inte.partner_auth import hash_secret, set_partner_keys
+from mobcash_inte.partner_transactions import (
+    WEBHOOK_EVENT,
+    WEBHOOK_REVIEW_EVENT,
+    UnsafeCallbackUrl,
+    WEBHOOK_SIGNATURE_HEADER,
+    check_callback_url,
+    deliver_partner_webhook,
+    execute_partner_transaction,
+    reap_stale_partner_claims,
+)
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+def resolves_to(address):
+    return mock.patch(
+        "mobcash_inte.partner_transactions.socket.getaddrinfo",
+        new=mock.Mock(return_value=[(2, 1, 6, "", (address, 443))]),
+    )
+
+
+class PartnerAsyncTransactionTests(APITestCase):
+    """Transaction partenaire asynchrone : 202, exécution en tâche, webhook signé"""
+
+    headers = {"HTTP_X_PUBLIC_KEY": "pk_live_async", "HTTP_X_SECRET_KEY": "sk_live_async"}
+
+    def setUp(self):
+        cache.clear()
+        self.partner = User.objects.create(
+            username="partner_async",
+            email="partner.async@example.com",
+            phone="2250700000000",
+            is_partner=True,
+        )
+        self.partner.save(
+            update_fields=set_partner_keys(
+                self.partner, {"public_key": "pk_live_async", "secret_key": "sk_live_async"}
+            )
+        )
+        self.app = AppName.objects.create(name="app_partner_async")
+
+    @resolves_to("93.184.216.34")
+    @mock.patch("mobcash_inte.partner_transactions.get_session")
+    @mock.patch("mobcash_inte.partner_transactions.resolve_api_service")
+    @mock.patch("mobcash_inte.tasks.execute_partner_transaction_task.delay")
+    def test_async_flow(self, delay_mock, resolve_mock, session_mock):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/mobcash/partner-transaction?async=1",
+                {
+                    "user_id": "12345",
+                    "betapp": str(self.app.id),
+                    "type_trans": "deposit",
+                    "amount": "1000",
+                    "callback_url": "https://partner.example.com/hook",
+                },
+                format="json",
+                **self.headers,
+            )
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.json()["status"], "pending")
+        transaction = PartnerTransaction.objects.get(reference=response.json()["reference"])
+        delay_mock.assert_called_once_with(transaction.id)
+        resolve_mock.assert_not_called()
+
+        resolve_mock.return_value.recharge_account.return_value = {"Success": True}
+        execute_partner_transaction(transaction.id)
+        # Tâche rejouée : pas de second appel bookmaker
+        execute_partner_transaction(transaction.id)
+        resolve_mock.return_value.recharge_account.assert_called_once()
+
+        session_mock.return_value.post.return_value.status_code = 200
+        self.assertTrue(deliver_partner_webhook(transaction.id))
+        call = session_mock.return_value.post.call_args
+        body, signature = call.kwargs["data"], call.kwargs["headers"][WEBHOOK_SIGNATURE_HEADER]
+        timestamp = signature.split(",")[0][2:]
+        expected = hmac.new(
+            hash_secret("sk_live_async").encode(), f"{timestamp}.".encode() + body, hashlib.sha256
+        ).hexdigest()
+        self.assertEqual(signature, f"t={timestamp},v1={expected}")
+
+        status_response = self.client.get(
+            "/mobcash/partner-transaction-details",
+            {"reference": transaction.reference},
+            **self.headers,
+        )
+        self.assertEqual(status_response.json()["status"], "accept")
+        self.assertTrue(status_response.json()["event_send"])
+        logger.info("✅ Partenaire asynchrone : 202, exécution unique, webhook signé, statut servi")
+
+    @resolves_to("93.184.216.34")
+    @mock.patch("mobcash_inte.partner_transactions.get_session")
+    @mock.patch("mobcash_inte.partner_transactions.send_telegram_message")
+    @mock.patch("mobcash_inte.tasks.send_partner_webhook.delay")
+    def test_stale_claim_is_reaped(self, delay_mock, telegram_mock, session_mock):
+        def claimed(reference, minutes_ago):
+            return PartnerTransaction.objects.create(
+                partner=self.partner,
+                app=self.app,
+                reference=reference,
+                type_trans="deposit",
+                amount=1000,
+                user_app_id="12345",
+                callback_url="https://partner.example.com/hook",
+                mobcash_api_is_call=True,
+                claimed_at=timezone.now() - timedelta(minutes=minutes_ago),
+            )
+
+        stale = claimed("partner-stale", 20)
+        fresh = claimed("partner-fresh", 1)
+        # Tâche asynchrone jamais consommée (pas de worker « partner »)
+        unclaimed = claimed("partner-unclaimed", 0)
+        PartnerTransaction.objects.filter(pk=unclaimed.pk).update(
+            mobcash_api_is_call=False,
+            claimed_at=None,
+            created_at=timezone.now() - timedelta(minutes=20),
+        )
+
+        self.assertEqual(reap_stale_partner_claims(), 2)
+        for transaction in (stale, fresh, unclaimed):
+            transaction.refresh_from_db()
+        self.assertEqual(
+            (stale.status, fresh.status, unclaimed.status), ("review", "pending", "annuler")
+        )
+        telegram_mock.assert_called_once()
+        self.assertEqual(
+            sorted(call.args[0] for call in delay_mock.call_args_list), sorted([stale.id, unclaimed.id])
+        )
+        # Annulée : une exécution tardive ne réserve plus la transaction
+        with mock.patch("mobcash_inte.partner_transactions.resolve_api_service") as resolve_mock:
+            execute_partner_transaction(unclaimed.id)
+        resolve_mock.assert_not_called()
+
+        session_mock.return_value.post.return_value.status_code = 200
+        self.assertTrue(deliver_partner_webhook(stale.id))
+        body = json.loads(session_mock.return_value.post.call_args.kwargs["data"])
+        self.assertEqual(body["event"], WEBHOOK_REVIEW_EVENT)
+        logger.info("✅ Partenaire : réservation périmée en review, jamais réservée annulée, webhooks")
+
+    @resolves_to("93.184.216.34")
+    @mock.patch("mobcash_inte.partner_transactions.get_session")
+    @mock.patch("mobcash_inte.partner_transactions.send_telegram_message")
+    @mock.patch("mobcash_inte.partner_transactions.resolve_api_service")
+    @mock.patch("mobcash_inte.tasks.send_partner_webhook.delay")
+    def test_late_result_after_review(self, delay_mock, resolve_mock, telegram_mock, session_mock):
+        transaction = PartnerTransaction.objects.create(
+            partner=self.partner,
+            app=self.app,
+            reference="partner-late",
+            type_trans="deposit",
+            amount=1000,
+            user_app_id="12345",
+            callback_url="https://partner.example.com/hook",
+        )
+        session_mock.return_value.post.return_value.status_code = 200
+
+        def slow_recharge(**kwargs):
+            # Appel plus long que PARTNER_CLAIM_STALE_AFTER : reaper puis webhook « review »
+            PartnerTransaction.objects.filter(pk=transaction.pk).update(
+                claimed_at=timezone.now() - timedelta(minutes=20)
+            )
+            self.assertEqual(reap_stale_partner_claims(), 1)
+            self.assertTrue(deliver_partner_webhook(transaction.pk))
+            return {"Success": True}
+
+        resolve_mock.return_value.recharge_account.side_effect = slow_recharge
+        result = execute_partner_transaction(transaction.pk)
+        self.assertEqual((result.status, result.event_send), ("accept", False))
+
+        self.assertTrue(deliver_partner_webhook(transaction.pk))
+        events = [
+            json.loads(call.kwargs["data"])["event"]
+            for call in session_mock.return_value.post.call_args_list
+        ]
+        self.assertEqual(events, [WEBHOOK_REVIEW_EVENT, WEBHOOK_EVENT])
+        transaction.refresh_from_db()
+        self.assertTrue(transaction.event_send)
+        logger.info("✅ Partenaire : résultat tardif après review enregistré, webhook final envoyé")
+
+    @mock.patch("mobcash_inte.partner_transactions.get_session")
+    def test_callback_url_must_be_public_https(self, session_mock):
+        for url in ("http://partner.example.com/hook", "https://169.254.169.254/latest"):
+            response = self.client.post(
+                "/mobcash/partner-transaction?async=1",
+                {
+                    "user_id": "12345",
+                    "betapp": str(self.app.id),
+                    "type_trans": "deposit",
+                    "amount": "1000",
+                    "callback_url": url,
+                },
+                format="json",
+                **self.headers,
+            )
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn("callback_url", response.json())
+
+        # Nom public à la création, résolu vers le réseau interne à l'envoi
+        transaction = PartnerTransaction.objects.create(
+            partner=self.partner,
+            app=self.app,
+            reference="partner-ssrf",
+            type_trans="deposit",
+            amount=1000,
+            user_app_id="12345",
+            status="accept",
+            callback_url="https://hook.partner.example.com/",
+        )
+        for address in ("10.0.0.5", "127.0.0.1", "fe80::1"):
+            with resolves_to(address), self.assertRaises(UnsafeCallbackUrl):
+                check_callback_url(transaction.callback_url)
+        with resolves_to("10.0.0.5"):
+            self.assertIsNone(deliver_partner_webhook(transaction.id))
+        session_mock.return_value.post.assert_not_called()
+        logger.info("✅ Partenaire : callback_url https publique uniquement (SSRF)")
+
@@ -0,0 +1,71 @@
+import logging
+
+from django.core.cache import cache
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from mobcash_inte.partner_auth import _shared_key, authenticate_partner, hash_secret, set_partner_keys
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class PartnerAuthTests(APITestCase):
+    """API partenaire : secret haché, cache par clé publique, seau à jetons"""
+
+    url = "/mobcash/partner-transaction-details"
+    keys = {"public_key": "pk_live_test", "secret_key": "sk_live_test"}
+
+    def setUp(self):
+        cache.clear()
+        self.partner = User.objects.create(
+            username="partner",
+            email="partner@example.com",
+            phone="2250700000000",
+            is_partner=True,
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.partner.save(update_fields=set_partner_keys(self.partner, self.keys))
+
+    def test_cached_and_invalidated_on_block(self):
+        self.partner.refresh_from_db()
+        self.assertIsNone(self.partner.secret_key)
+        self.assertEqual(self.partner.secret_key_hash, hash_secret("sk_live_test"))
+
+        with self.assertNumQueries(1):
+            self.assertEqual(authenticate_partner("pk_live_test", "sk_live_test"), self.partner)
+        with self.assertNumQueries(0):
+            self.assertEqual(authenticate_partner("pk_live_test", "sk_live_test"), self.partner)
+            self.assertIsNone(authenticate_partner("pk_live_test", "sk_live_mauvais"))
+
+        self.partner.is_block = True
+        with self.captureOnCommitCallbacks(execute=True):
+            self.partner.save()
+        self.assertIsNone(authenticate_partner("pk_live_test", "sk_live_test"))
+        logger.info("✅ Partenaire : 0 requête en cache, invalidé au blocage")
+
+    def test_legacy_plaintext_secret_is_hashed(self):
+        User.objects.filter(pk=self.partner.pk).update(secret_key="sk_live_old", secret_key_hash=None)
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(authenticate_partner("pk_live_test", "sk_live_old"), self.partner)
+        # Cache partagé : identifiants et empreinte seulement, jamais le secret en clair
+        entry = cache.get(_shared_key("pk_live_test"))
+        self.assertEqual(set(entry), {"user_id", "secret_hash", "legacy", "version"})
+        self.assertNotIn("sk_live_old", repr(entry))
+        self.partner.refresh_from_db()
+        self.assertIsNone(self.partner.secret_key)
+        self.assertEqual(self.partner.secret_key_hash, hash_secret("sk_live_old"))
+        logger.info("✅ Partenaire : ancien secret en clair converti en hash")
+
+    @override_settings(PARTNER_RATE_LIMIT={"rate": 1, "burst": 2})
+    def test_token_bucket(self):
+        headers = {"HTTP_X_PUBLIC_KEY": "pk_live_test", "HTTP_X_SECRET_KEY": "sk_live_test"}
+        codes = [
+            self.client.get(self.url, {"external_reference": "ext-1"}, **headers).status_code
+            for _ in range(3)
+        ]
+        self.assertEqual(codes[:2], [status.HTTP_404_NOT_FOUND] * 2)
+        self.assertEqual(codes[2], status.HTTP_429_TOO_MANY_REQUESTS)
+        logger.info("✅ Partenaire : rafale au-delà du seau → 429")
@@ -0,0 +1,158 @@
+import logging
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import AppName, User
+from mobcash_inte.local_cache import VersionedLocalCache
+from mobcash_inte.models import Network, Setting, Transaction
+from payment import connect_pro_webhook
+from mobcash_inte.setting_cache import (
+    SETTING_VERSION_CACHE_KEY,
+    get_setting,
+    invalidate_local_setting,
+)
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+def _setting_queries(queries):
+    return [q for q in queries if "mobcash_inte_setting" in q["sql"]]
+
+
+class SettingCacheTests(APITestCase):
+    """Cache process-local du Setting + flux webhook dépôt Connect Pro"""
+
+    webhook_url = "/mobcash/connect-pro-webhook"
+
+    def setUp(self):
+        cache.clear()
+        invalidate_local_setting()
+        self.setting = Setting.objects.create(
+            minimum_deposit=200,
+            minimum_withdrawal=500,
+            bonus_percent=2,
+            deposit_reward=False,
+        )
+        self.user = User.objects.create(
+            username="webhook_user",
+            email="webhook.user@example.com",
+            phone="2250700000000",
+        )
+        self.app = AppName.objects.create(name="app_sans_hash")
+        self.network = Network.objects.create(name="mtn", public_name="MTN test")
+
+    def _create_deposit(self, public_id):
+        return Transaction.objects.create(
+            user=self.user,
+            app=self.app,
+            network=self.network,
+            type_trans="deposit",
+            amount=1000,
+            user_app_id="123456",
+            reference=f"ref-{public_id}",
+            public_id=public_id,
+        )
+
+    def test_get_setting_single_query_then_cached(self):
+        invalidate_local_setting()
+        with self.assertNumQueries(1):
+            get_setting()
+        with self.assertNumQueries(0):
+            for _ in range(5):
+                self.assertEqual(get_setting().pk, self.setting.pk)
+        logger.info("✅ get_setting() : 1 requête puis cache")
+
+    def test_post_save_invalidates_cache(self):
+        self.assertFalse(get_setting().use_whatsapp)
+        self.setting.use_whatsapp = True
+        self.setting.save()
+        self.assertTrue(get_setting().use_whatsapp)
+        logger.info("✅ post_save Setting invalide le cache")
+
+    def test_shared_version_bump_invalidates_other_workers(self):
+        get_setting()
+        # Simule un autre worker qui a modifié le Setting puis bumpé la version
+        Setting.objects.filter(pk=self.setting.pk).update(use_sms=True)
+        cache.set(SETTING_VERSION_CACHE_KEY, 42, timeout=None)
+        with self.settings(SETTING_CACHE_VERSION_CHECK=0):
+            self.assertTrue(get_setting().use_sms)
+        logger.info("✅ Version partagée : rechargement inter-workers")
+
+    def test_returned_setting_is_a_copy(self):
+        setting = get_setting()
+        setting.minimum_deposit = 999999
+        self.assertNotEqual(get_setting().minimum_deposit, 999999)
+
+    def _post_webhook(self, uid):
+        # Exécute la tâche Celery en ligne au commit (pas de broker en test)
+        with self.captureOnCommitCallbacks(execute=True):
+            return self.client.post(self.webhook_url, {"uid": uid}, format="json")
+
+    @mock.patch("payment.check_solde.delay")
+    @mock.patch("payment.process_transaction_notifications_and_bonus.delay")
+    @mock.patch("mobcash_inte.views.connect_pro_webhook.delay", new=connect_pro_webhook)
+    @mock.patch("payment.MobCashExternalService.create_deposit")
+    @mock.patch("payment.connect_pro_status")
+    def test_deposit_webhook_flow_setting_queries(
+        self, status_mock, deposit_mock, notify_mock, solde_mock
+    ):
+        status_mock.return_value = {"status": "success"}
+        deposit_mock.return_value = {"Success": True, "Message": "OK"}
+
+        first = self._create_deposit("uid-webhook-1")
+        second = self._create_deposit("uid-webhook-2")
+
+        with CaptureQueriesContext(connection) as cold:
+            response = self._post_webhook(first.public_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first.refresh_from_db()
+        self.assertEqual(first.status, "accept")
+        self.assertLessEqual(len(_setting_queries(cold.captured_queries)), 1)
+
+        with CaptureQueriesContext(connection) as warm:
+            response = self._post_webhook(second.public_id)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        second.refresh_from_db()
+        self.assertEqual(second.status, "accept")
+        self.assertEqual(len(_setting_queries(warm.captured_queries)), 0)
+        self.assertLessEqual(len(warm.captured_queries), len(cold.captured_queries))
+        logger.info(
+            "✅ Webhook dépôt : %s requêtes (froid) / %s requêtes (chaud)",
+            len(cold.captured_queries),
+            len(warm.captured_queries),
+        )
+
+
+class VersionedLocalCacheTests(SimpleTestCase):
+    """Mécanique commune : version partagée, TTL, taille bornée"""
+
+    def setUp(self):
+        cache.clear()
+        self.loader = mock.Mock(side_effect=lambda version: f"v{version}")
+        self.local = VersionedLocalCache("test:local_cache:version", ttl=60, version_check=0, max_entries=2)
+
+    def test_version_bump_and_bounds(self):
+        self.assertEqual(self.local.get("a", self.loader), "vNone")
+        self.assertEqual(self.local.get("a", self.loader), "vNone")
+        self.assertEqual(self.loader.call_count, 1)
+
+        # Bump depuis un autre process : seule la version partagée change
+        cache.set("test:local_cache:version", 1)
+        self.assertEqual(self.local.get("a", self.loader), "v1")
+
+        self.local.get("b", self.loader)
+        self.local.get("c", self.loader)  # au-delà de max_entries : local vidé
+        self.local.get("a", self.loader)
+        self.assertEqual(self.loader.call_count, 5)
+
+        with mock.patch("mobcash_inte.local_cache.time.monotonic", return_value=10**9):
+            self.local.get("a", self.loader)  # TTL dépassé
+        self.assertEqual(self.loader.call_count, 6)
+        logger.info("✅ VersionedLocalCache : version, TTL et taille bornée")
+
@@ -0,0 +1,252 @@
+import logging
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.admin.sites import site
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import AppName, User
+from mobcash_inte.models import (
+    Caisse,
+    Network,
+    Transaction,
+    TransactionDailyRollup,
+    TransactionStatusHistory,
+)
+from mobcash_inte.statistics import STATISTICS_SNAPSHOT_CACHE_KEY, compute_statistics
+from mobcash_inte.support_lookup import _mark_deposit_accept_aligned, build_expire_transaction_response
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class StatisticsViewTests(APITestCase):
+    """StatisticsView : agrégats groupés + snapshot en cache"""
+
+    url = "/mobcash/statistics"
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create(
+            username="stats_admin",
+            email="stats.admin@example.com",
+            phone="2250700000000",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        self.app = AppName.objects.create(name="app_stats", _hash="hash-test")
+        Caisse.objects.create(bet_app=self.app, solde=5000)
+        self.network = Network.objects.create(name="mtn", public_name="MTN test")
+
+    def _create_referrer(self, index, filleuls):
+        referrer = User.objects.create(
+            username=f"parrain_{index}",
+            email=f"parrain.{index}@example.com",
+            phone="2250700000000",
+            referral_code=f"CODE{index}",
+        )
+        for filleul in range(filleuls):
+            User.objects.create(
+                username=f"filleul_{index}_{filleul}",
+                email=f"filleul.{index}.{filleul}@example.com",
+                phone="2250700000000",
+                referrer_code=referrer.referral_code,
+            )
+        return referrer
+
+    def _create_transaction(self, user, type_trans, amount, status_value="accept"):
+        return Transaction.objects.create(
+            user=user,
+            app=self.app,
+            network=self.network,
+            type_trans=type_trans,
+            amount=amount,
+            status=status_value,
+            source="mobile",
+        )
+
+    def _fresh_query_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"fresh": "1"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries), response.json()
+
+    def test_query_count_independent_of_referrers_and_apps(self):
+        self._create_referrer(0, filleuls=1)
+        baseline, _ = self._fresh_query_count()
+
+        for index in range(1, 8):
+            self._create_referrer(index, filleuls=index)
+        AppName.objects.create(name="app_stats_2")
+        count, data = self._fresh_query_count()
+
+        self.assertEqual(count, baseline)
+        top = data["referral_system"]["top_referrers"]
+        self.assertEqual(top[0]["referral_code"], "CODE7")
+        self.assertEqual(top[0]["filleuls_count"], 7)
+        self.assertIn("app_stats_2", data["dashboard_stats"]["transactions_by_app"])
+        logger.info(f"✅ StatisticsView : {count} requêtes quel que soit le volume")
+
+    def test_aggregates_and_series(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_transaction(self.admin, "deposit", 1000)
+            self._create_transaction(self.admin, "deposit", 500)
+            self._create_transaction(self.admin, "deposit", 700, status_value="error")
+            self._create_transaction(self.admin, "withdrawal", 300)
+
+        data = self.client.get(self.url, {"fresh": "1"}).json()
+
+        volume = data["volume_transactions"]
+        self.assertEqual(volume["deposits"], {"total_amount": 1500.0, "total_count": 2})
+        self.assertEqual(volume["withdrawals"], {"total_amount": 300.0, "total_count": 1})
+        self.assertEqual(volume["net_volume"], 5000.0)
+        self.assertEqual(len(volume["evolution"]["daily"]), 2)
+        self.assertEqual(
+            sum(row["total_amount"] for row in volume["evolution"]["weekly"]), 1800
+        )
+        by_app = data["dashboard_stats"]["transactions_by_app"]["app_stats"]
+        self.assertEqual(by_app["deposit"], {"count": 2, "total_amount": 1500.0})
+        self.assertEqual(by_app["reward"], {"count": 0, "total_amount": 0.0})
+        self.assertEqual(data["user_growth"]["active_users_count"], 1)
+        logger.info("✅ Agrégats conditionnels cohérents")
+
+    def test_rollup_series_uses_same_end_bound(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_transaction(self.admin, "deposit", 1000)
+            self._create_transaction(self.admin, "withdrawal", 300)
+        today = timezone.localdate()
+
+        def volume(start_day, end_day):
+            stats = compute_statistics(start_day.isoformat(), end_day.isoformat())
+            return stats["volume_transactions"]
+
+        for end_day, expected_rows in ((today + timedelta(days=1), 2), (today, 0)):
+            direct = volume(today - timedelta(days=1), end_day)
+            with mock.patch("mobcash_inte.statistics.STATISTICS_USE_ROLLUP", True):
+                rolled = volume(today - timedelta(days=1), end_day)
+            self.assertEqual(len(rolled["evolution"]["daily"]), expected_rows)
+            self.assertEqual(rolled["evolution"], direct["evolution"])
+            # Série et totaux : même borne de fin (une date seule exclut ce jour)
+            self.assertEqual(rolled["deposits"]["total_count"], expected_rows // 2)
+        logger.info("✅ Série du rollup bornée comme les totaux")
+
+    def test_snapshot_served_from_cache_unless_fresh(self):
+        self.client.get(self.url)
+        self.assertIsNotNone(cache.get(STATISTICS_SNAPSHOT_CACHE_KEY))
+
+        self._create_transaction(self.admin, "deposit", 1000)
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url).json()
+        self.assertEqual(cached["volume_transactions"]["deposits"]["total_count"], 0)
+
+        fresh = self.client.get(self.url, {"fresh": "1"}).json()
+        self.assertEqual(fresh["volume_transactions"]["deposits"]["total_count"], 1)
+        logger.info("✅ Snapshot en cache, ?fresh=1 recalcule")
+
+
+class TransactionDailyRollupTests(APITestCase):
+    """TransactionDailyRollup : maintien incrémental et reconstruction"""
+
+    def setUp(self):
+        self.user = User.objects.create(
+            username="rollup_user",
+            email="rollup.user@example.com",
+            phone="2250700000000",
+        )
+        self.app = AppName.objects.create(name="app_rollup")
+        self.network = Network.objects.create(name="mtn", public_name="MTN test")
+
+    def _create_deposit(self, amount):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Transaction.objects.create(
+                user=self.user,
+                app=self.app,
+                network=self.network,
+                type_trans="deposit",
+                amount=amount,
+                source="web",
+            )
+
+    def _buckets(self):
+        return {
+            row.status: (row.count, row.total_amount)
+            for row in TransactionDailyRollup.objects.filter(count__gt=0)
+        }
+
+    def test_creation_and_change_status_move_between_buckets(self):
+        first = self._create_deposit(1000)
+        self._create_deposit(500)
+        self.assertEqual(self._buckets(), {"pending": (2, 1500)})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.change_status("accept", TransactionStatusHistory.Source.WEBHOOK)
+        self.assertEqual(self._buckets(), {"pending": (1, 500), "accept": (1, 1000)})
+        logger.info("✅ Rollup mis à jour par création + change_status")
+
+    def test_rebuild_matches_incremental(self):
+        first = self._create_deposit(1000)
+        self._create_deposit(500)
+        with self.captureOnCommitCallbacks(execute=True):
+            first.change_status("accept", TransactionStatusHistory.Source.WEBHOOK)
+        incremental = self._buckets()
+
+        TransactionDailyRollup.objects.all().delete()
+        call_command("backfill_transaction_rollup", stdout=StringIO())
+        self.assertEqual(self._buckets(), incremental)
+        logger.info("✅ backfill_transaction_rollup reproduit le rollup incrémental")
+
+    def test_direct_status_writes_keep_rollup_consistent(self):
+        aligned = self._create_deposit(1000)
+        expired = self._create_deposit(500)
+        edited = self._create_deposit(700)
+        withdrawal = self._create_deposit(300)
+        Transaction.objects.filter(pk=expired.pk).update(reference="ref-rollup-expire")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(_mark_deposit_accept_aligned(aligned))
+            build_expire_transaction_response(reference="ref-rollup-expire", note="doublon")
+            # Montant modifié dans la même transition (xbet_withdrawal_process)
+            old_amount = withdrawal.amount
+            withdrawal.amount = 250
+            withdrawal.change_status(
+                "init_payment",
+                TransactionStatusHistory.Source.API_RESPONSE,
+                extra_fields=["amount"],
+                old_amount=old_amount,
+            )
+            # Fiche admin : statut, montant et type modifiés d'un coup
+            request = RequestFactory().post("/admin/")
+            request.user = self.user
+            edited.status, edited.amount, edited.type_trans = "accept", 900, "withdrawal"
+            site._registry[Transaction].save_model(request, edited, form=None, change=True)
+
+        def buckets():
+            return {
+                (row.type_trans, row.status): (row.count, row.total_amount)
+                for row in TransactionDailyRollup.objects.filter(count__gt=0)
+            }
+
+        incremental = buckets()
+        self.assertEqual(
+            incremental,
+            {
+                ("deposit", "accept"): (1, 1000),
+                ("deposit", "expired"): (1, 500),
+                ("deposit", "init_payment"): (1, 250),
+                ("withdrawal", "accept"): (1, 900),
+            },
+        )
+        self.assertEqual(
+            TransactionStatusHistory.objects.filter(transaction=edited, new_status="accept").count(), 1
+        )
+        TransactionDailyRollup.objects.all().delete()
+        call_command("backfill_transaction_rollup", stdout=StringIO())
+        self.assertEqual(buckets(), incremental)
+        logger.info("✅ Rollup cohérent après support lookup, admin et changement de montant")
@@ -0,0 +1,88 @@
+import logging
+import threading
+import time
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from mobcash_inte.models import Transaction
+from mobcash_inte.support_lookup import _fetch_agent_sms_and_ussd, _find_transaction_by_reference
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class FindTransactionByReferenceTests(TestCase):
+    """support_lookup : référence en une requête + cache négatif"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_single_query_and_candidate_priority(self):
+        bare = Transaction.objects.create(type_trans="deposit", amount=100, reference="ABC123")
+        prefixed = Transaction.objects.create(
+            type_trans="deposit", amount=100, reference="depot-ABC123"
+        )
+
+        with self.assertNumQueries(1):
+            self.assertEqual(_find_transaction_by_reference("depot-ABC123"), prefixed)
+        with self.assertNumQueries(1):
+            self.assertEqual(_find_transaction_by_reference("ABC123"), bare)
+        with self.assertNumQueries(1):
+            self.assertEqual(_find_transaction_by_reference("retrait-ABC123"), bare)
+        logger.info("✅ Référence : une requête, variante prioritaire retenue")
+
+    def test_negative_cache(self):
+        with self.assertNumQueries(1):
+            self.assertIsNone(_find_transaction_by_reference("INCONNU-42"))
+        with self.assertNumQueries(0):
+            self.assertIsNone(_find_transaction_by_reference("INCONNU-42"))
+        logger.info("✅ Référence introuvable : cache négatif")
+
+
+class FetchAgentSmsFanOutTests(TestCase):
+    """support_lookup : tentatives verify SMS en parallèle, premier résultat utile"""
+
+    HIT_PHONE = "2250700112233"
+
+    def setUp(self):
+        cache.clear()
+        self.calls = []
+        self.lock = threading.Lock()
+        self.transaction = Transaction.objects.create(
+            type_trans="deposit",
+            amount=1000,
+            reference="SMS-FANOUT",
+            public_id="connect-uid-1",
+            phone_number="0700112233",
+        )
+
+    def _fake_verify(self, **attempt):
+        with self.lock:
+            self.calls.append(attempt["phone"])
+        if attempt["phone"] == self.HIT_PHONE:
+            return {
+                "ok": True,
+                "result": "not_found",
+                "nearby_messages": [{"body": "Transfert de 1000 FCFA reçu"}],
+            }
+        time.sleep(1.5)
+        return {"ok": True, "result": "not_found", "nearby_messages": []}
+
+    @mock.patch("mobcash_inte.support_lookup.connect_pro_token", return_value="token")
+    def test_first_hit_wins_and_is_cached(self, _token):
+        with mock.patch(
+            "mobcash_inte.support_lookup.connect_pro_verify_transaction_by_user_sms",
+            side_effect=self._fake_verify,
+        ):
+            started = time.perf_counter()
+            nearby, _ussd, meta = _fetch_agent_sms_and_ussd(self.transaction)
+            elapsed = time.perf_counter() - started
+
+            self.assertLess(elapsed, 1.0)
+            self.assertEqual(nearby[0]["body"], "Transfert de 1000 FCFA reçu")
+            self.assertEqual(meta["connect"]["nearby_count"], 1)
+
+            _fetch_agent_sms_and_ussd(self.transaction)
+            self.assertEqual(self.calls.count(self.HIT_PHONE), 1)
+        logger.info(f"✅ Verify SMS : premier résultat en {elapsed * 1000:.0f} ms, réponse en cache")
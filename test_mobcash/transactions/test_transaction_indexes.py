@@ -0,0 +1,152 @@
+import logging
+import random
+import unittest
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+import constant
+from accounts.models import User
+from mobcash_inte.helpers import cancel_old_pending_transactions, user_has_recent_accepted_deposit
+from mobcash_inte.models import Transaction
+from payment import _connect_pro_webhook_process, check_pending_feexpay_transactions, feexpay_webhook
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+TABLE = Transaction._meta.db_table
+
+
+@unittest.skipUnless(connection.vendor == "postgresql", "EXPLAIN PostgreSQL uniquement")
+class TransactionIndexesTests(TestCase):
+    """
+    Exécute les vues, helpers et tâches réels sur une table Transaction peuplée
+    comme en production (majorité d'accept, peu de pending, ~100 transactions
+    par utilisateur) puis analysée, et vérifie via EXPLAIN qu'aucune de leurs
+    requêtes ne fait de Seq Scan sur la table. Le planner n'est pas forcé.
+    """
+
+    USERS = 200
+    ROWS = 20_000
+    # (statut, poids) : les pending sont une petite fraction de la table
+    STATUSES = [("accept", 80), ("error", 8), ("annuler", 8), ("pending", 3), ("init_payment", 1)]
+    TYPES = [("deposit", 60), ("withdrawal", 35), ("reward", 5)]
+    APIS = [("connect", 60), ("feexpay", 30), (None, 10)]
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(42)
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"explain_user_{index}",
+                    email=f"explain.user.{index}@example.com",
+                    phone="2250700000000",
+                )
+                for index in range(cls.USERS)
+            ]
+        )
+        cls.user = users[0]
+
+        def pick(choices):
+            values, weights = zip(*choices)
+            return rng.choices(values, weights)[0]
+
+        Transaction.objects.bulk_create(
+            [
+                Transaction(
+                    user=users[index % cls.USERS],
+                    type_trans=pick(cls.TYPES),
+                    status=pick(cls.STATUSES),
+                    api=pick(cls.APIS),
+                    amount=1000 + index,
+                    reference=f"ref-{index}",
+                    public_id=f"pub-{index}",
+                )
+                for index in range(cls.ROWS)
+            ],
+            batch_size=2000,
+        )
+        with connection.cursor() as cursor:
+            # Historique sur 90 jours ; les pending ont au plus 48 h (les plus
+            # anciennes sont annulées chaque nuit)
+            cursor.execute(
+                f"UPDATE {TABLE} SET created_at = now() - mod(id, 2160) * interval '1 hour'"
+            )
+            cursor.execute(
+                f"UPDATE {TABLE} SET created_at = now() - mod(id, 48) * interval '1 hour' "
+                "WHERE status = 'pending'"
+            )
+            cursor.execute(f"ANALYZE {TABLE}")
+
+    def setUp(self):
+        cache.clear()
+
+    def assertNoSeqScan(self, label, run):
+        """Exécute `run()` et vérifie le plan de chaque SELECT sur Transaction."""
+        with CaptureQueriesContext(connection) as captured:
+            run()
+        queries = [
+            query["sql"]
+            for query in captured.captured_queries
+            if query["sql"].lstrip().upper().startswith("SELECT") and f'"{TABLE}"' in query["sql"]
+        ]
+        self.assertTrue(queries, f"{label} : aucune requête sur {TABLE}")
+        with connection.cursor() as cursor:
+            for sql in queries:
+                cursor.execute(f"EXPLAIN {sql}")
+                plan = "\n".join(row[0] for row in cursor.fetchall())
+                logger.debug("EXPLAIN %s :\n%s\n%s", label, sql, plan)
+                self.assertNotIn(f"Seq Scan on {TABLE}", plan, f"{label} fait un Seq Scan :\n{sql}\n{plan}")
+        logger.info("✅ %s : %s requête(s), aucun Seq Scan", label, len(queries))
+
+    def _client(self, user):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client
+
+    def test_last_transaction_view(self):
+        client = self._client(self.user)
+        self.assertNoSeqScan("LastTransactionView", lambda: client.get("/mobcash/last-transaction"))
+
+    def test_history_views(self):
+        client = self._client(self.user)
+        self.assertNoSeqScan("Historique utilisateur", lambda: client.get("/mobcash/transaction-history"))
+
+        admin = User.objects.create(
+            username="explain_admin", email="explain.admin@example.com", phone="2250700000000", is_staff=True
+        )
+        client = self._client(admin)
+        self.assertNoSeqScan(
+            "Historique admin (curseur)",
+            lambda: client.get("/mobcash/transaction-history", {"pagination": "cursor"}),
+        )
+
+    def test_recent_accepted_deposit(self):
+        self.assertNoSeqScan("user_has_recent_accepted_deposit", lambda: user_has_recent_accepted_deposit(self.user))
+
+    def test_cancel_old_pending(self):
+        self.assertNoSeqScan(
+            "cancel_old_pending_transactions",
+            lambda: cancel_old_pending_transactions(batch_size=50, max_batches=1),
+        )
+
+    @mock.patch(
+        "payment.feexpay_check_status",
+        return_value={"code": constant.CODE_SUCCESS, "data": {"status": "PENDING"}},
+    )
+    def test_pending_feexpay(self, check_mock):
+        self.assertNoSeqScan("check_pending_feexpay_transactions", check_pending_feexpay_transactions)
+
+    def test_webhook_lookups(self):
+        def feexpay():
+            feexpay_webhook({"reference": "ref-unknown", "status": "SUCCESSFUL"})
+
+        def connect_pro():
+            _connect_pro_webhook_process({"uid": "pub-unknown", "status": "success"})
+
+        self.assertNoSeqScan("feexpay_webhook (reference / public_id)", feexpay)
+        self.assertNoSeqScan("connect_pro_webhook (public_id)", connect_pro)
@@ -0,0 +1,61 @@
+import logging
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import AppName, User
+from mobcash_inte.models import Transaction
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class TransactionPayloadsTests(APITestCase):
+    """Listes de transactions sans les réponses brutes des fournisseurs"""
+
+    url = "/mobcash/transaction-history"
+
+    def setUp(self):
+        self.admin = User.objects.create(
+            username="payload_admin",
+            email="payload.admin@example.com",
+            phone="2250700000000",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        app = AppName.objects.create(name="app_payloads")
+        for index in range(3):
+            Transaction.objects.create(
+                user=self.admin,
+                app=app,
+                type_trans="deposit",
+                amount=1000,
+                reference=f"payload-{index}",
+                webhook_data="x" * 2000,
+                connect_pro_response="y" * 2000,
+                error_message="Solde insuffisant",
+                transaction_link="https://pay.example.com/link",
+            )
+
+    def test_history_list_defers_payloads(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        results = response.json()["results"]
+        self.assertEqual(len(results), 3)
+        for field in Transaction.PAYLOAD_FIELDS:
+            self.assertNotIn(field, results[0])
+        self.assertEqual(results[0]["transaction_link"], "https://pay.example.com/link")
+        # Champs affichés par les clients : toujours renvoyés
+        self.assertEqual(results[0]["error_message"], "Solde insuffisant")
+        self.assertIn("all_status", results[0])
+        self.assertFalse(any("webhook_data" in q["sql"] for q in queries))
+        self.assertEqual(len(queries), 2)  # count + page (user / app en jointure)
+        logger.info("✅ Historique : PAYLOAD_FIELDS ni lus ni renvoyés")
+
+    def test_staff_can_request_payloads(self):
+        results = self.client.get(self.url, {"payloads": "1"}).json()["results"]
+        self.assertEqual(results[0]["webhook_data"], "x" * 2000)
+        logger.info("✅ Historique : ?payloads=1 pour les admins")
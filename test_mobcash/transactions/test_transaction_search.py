@@ -0,0 +1,85 @@
+import logging
+import unittest
+
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import TelegramUser, User
+from mobcash_inte.models import Transaction
+from mobcash_inte.search import TransactionSearch
+
+logger = logging.getLogger("mobcash_inte_backend.transactions")
+
+
+class TransactionSearchTests(APITestCase):
+    """TransactionSearch : HistoryTransactionViews et TransactionStatusHistoryView"""
+
+    def setUp(self):
+        self.admin = User.objects.create(
+            username="search_admin",
+            email="search.admin@example.com",
+            phone="2250700000000",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        self.jean = User.objects.create(
+            username="jean",
+            email="jean.dupont@example.com",
+            phone="2250700000001",
+            first_name="Jean",
+            last_name="Dupont",
+        )
+        self.telegram = TelegramUser.objects.create(
+            telegram_user_id="777", first_name="Awa", last_name="Kone", email="awa@example.com"
+        )
+        self.by_jean = Transaction.objects.create(
+            user=self.jean, type_trans="deposit", amount=1000, reference="DEP-ABC-123",
+            phone_number="0700112233",
+        )
+        self.by_telegram = Transaction.objects.create(
+            telegram_user=self.telegram, type_trans="deposit", amount=500, reference="DEP-XYZ-999",
+        )
+
+    def _search(self, backend, term):
+        return set(backend.filter(Transaction.objects.all(), term).values_list("pk", flat=True))
+
+    def test_backend_fields(self):
+        history = TransactionSearch()
+        self.assertEqual(self._search(history, "abc-1"), {self.by_jean.pk})
+        self.assertEqual(self._search(history, "112233"), {self.by_jean.pk})
+        self.assertEqual(self._search(history, "DUPONT@"), {self.by_jean.pk})
+        self.assertEqual(self._search(history, "Kone"), set())
+
+        names = TransactionSearch(
+            transaction_fields=("reference",),
+            user_fields=("email", "first_name", "last_name"),
+            telegram_user_fields=("email", "first_name", "last_name"),
+        )
+        self.assertEqual(self._search(names, "jean dupont"), {self.by_jean.pk})
+        self.assertEqual(self._search(names, "kone"), {self.by_telegram.pk})
+        self.assertEqual(self._search(names, "dep-"), {self.by_jean.pk, self.by_telegram.pk})
+        logger.info("✅ TransactionSearch : champs transaction, User et TelegramUser")
+
+    def test_views_use_backend(self):
+        results = self.client.get(
+            "/mobcash/transaction-history", {"search": "xyz"}
+        ).json()["results"]
+        self.assertEqual([row["id"] for row in results], [self.by_telegram.pk])
+
+        response = self.client.get(
+            "/mobcash/transaction-status-history", {"search": "Awa Kone"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()["reference"], "DEP-XYZ-999")
+        logger.info("✅ HistoryTransactionViews / TransactionStatusHistoryView via TransactionSearch")
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "index pg_trgm : PostgreSQL uniquement")
+    def test_trigram_index_used(self):
+        queryset = TransactionSearch().filter(Transaction.objects.all(), "abc-1")
+        with connection.cursor() as cursor:
+            cursor.execute("SET enable_seqscan = off")
+        plan = queryset.explain()
+        self.assertIn("trans_reference_trgm", plan)
+        self.assertIn("user_email_trgm", plan)
+        logger.info("✅ Plan PostgreSQL : index trigram utilisés")
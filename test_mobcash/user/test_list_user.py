@@ -0,0 +1,53 @@
+import logging
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from accounts.models import User
+from mobcash_inte.models import Bonus
+
+logger = logging.getLogger("mobcash_inte_backend.auth")
+
+
+class ListUserQueriesTests(APITestCase):
+    """ListUser : bonus_available annoté, nombre de requêtes fixe par page"""
+
+    url = "/auth/users"
+
+    def setUp(self):
+        self.admin = User.objects.create(
+            username="list_admin",
+            email="list.admin@example.com",
+            phone="2250700000000",
+            is_staff=True,
+        )
+        self.client.force_authenticate(self.admin)
+        for index in range(6):
+            user = User.objects.create(
+                username=f"list_user_{index}",
+                email=f"list.user.{index}@example.com",
+                phone="2250700000000",
+            )
+            Bonus.objects.create(user=user, amount=100, reason_bonus="parrainage")
+            Bonus.objects.create(user=user, amount=50 * index, reason_bonus="parrainage")
+            Bonus.objects.create(user=user, amount=999, reason_bonus="retiré", bonus_with=True)
+
+    def _page(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {"page_size": page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()["results"], len(queries)
+
+    def test_queries_do_not_grow_with_page_size(self):
+        small, small_queries = self._page(2)
+        full, full_queries = self._page(7)
+        self.assertEqual(len(full), 7)
+        self.assertEqual(small_queries, full_queries)
+
+        for row in full:
+            user = User.objects.get(pk=row["id"])
+            self.assertEqual(Decimal(str(row["bonus_available"])), Decimal(user.bonus_available))
+        logger.info(f"✅ ListUser : {full_queries} requêtes quelle que soit la taille de page")
@@ -0,0 +1,74 @@
+import logging
+
+from dateutil.relativedelta import relativedelta
+from django.test import TestCase
+from django.utils import timezone
+
+from accounts.models import User
+from mobcash_inte.models import Transaction, UserCredit
+from mobcash_inte.tasks import (
+    DAILY_USER_CREDITS,
+    _create_user_credits,
+    grant_coupon_rating_permissions,
+    grant_daily_user_credits,
+)
+
+logger = logging.getLogger("mobcash_inte_backend.auth")
+
+
+class NightlyTasksTests(TestCase):
+    """Tâches nocturnes ensemblistes (permissions de notation, crédits quotidiens)"""
+
+    def _user(self, name, months_old=2, deposits=(), **extra):
+        user = User.objects.create(
+            username=name, email=f"{name}@example.com", phone="2250700000000", **extra
+        )
+        User.objects.filter(pk=user.pk).update(
+            date_joined=timezone.now() - relativedelta(months=months_old)
+        )
+        for amount in deposits:
+            Transaction.objects.create(
+                user=user, type_trans="deposit", status="accept", amount=amount
+            )
+        return user
+
+    def test_grant_coupon_rating_permissions_single_query(self):
+        eligible = self._user("eligible", deposits=(10000, 5000))
+        too_small = self._user("petit_depot", deposits=(14999,))
+        too_new = self._user("recent", months_old=0, deposits=(20000,))
+
+        with self.assertNumQueries(1):
+            stats = grant_coupon_rating_permissions()
+
+        self.assertEqual(stats["updated"], 1)
+        self.assertEqual(
+            set(User.objects.filter(can_rate_coupons=True).values_list("pk", flat=True)),
+            {eligible.pk},
+        )
+        self.assertFalse(User.objects.get(pk=too_small.pk).can_rate_coupons)
+        self.assertFalse(User.objects.get(pk=too_new.pk).can_rate_coupons)
+        logger.info("✅ grant_coupon_rating_permissions : 1 requête")
+
+    def test_grant_daily_user_credits_idempotent(self):
+        active = self._user("actif")
+        self._user("supprime", is_delete=True)
+        spent = self._user("depense")
+        UserCredit.objects.create(user=spent, amount=0)
+        UserCredit.objects.filter(user=spent).update(
+            updated_at=timezone.now() - relativedelta(days=1)
+        )
+
+        stats = grant_daily_user_credits()
+        self.assertEqual((stats["created"], stats["topped_up"]), (1, 1))
+        self.assertEqual(UserCredit.objects.get(user=active).amount, DAILY_USER_CREDITS)
+        self.assertEqual(UserCredit.objects.get(user=spent).amount, DAILY_USER_CREDITS)
+        self.assertEqual(UserCredit.objects.count(), 2)
+
+        stats = grant_daily_user_credits()
+        self.assertEqual((stats["created"], stats["topped_up"]), (0, 0))
+
+        # Conflit ignoré par bulk_create : tenté mais pas compté comme créé
+        stats = {"attempted": 0, "created": 0, "chunks": 0}
+        _create_user_credits([UserCredit(user=active, amount=DAILY_USER_CREDITS)], stats)
+        self.assertEqual((stats["attempted"], stats["created"]), (1, 0))
+        logger.info("✅ grant_daily_user_credits : bulk_create + top-up idempotents")